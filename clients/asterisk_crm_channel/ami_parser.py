@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Deque, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+# AMI-пакет — строки "Key: Value\r\n", завершённые пустой строкой
+_PACKET_END = b"\r\n\r\n"
+_LINE_END = b"\r\n"
+_EVENT_HEADER = b"event:"
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Пакет без терминатора длиннее этого — поток рассинхронизирован, переподключаемся
+DEFAULT_MAX_PACKET_BYTES = 1024 * 1024
+
+
+def parse_ami_packet(raw: bytes) -> Dict[str, str]:
+    """Разбор одного пакета (без терминатора) в dict с исходными ключами."""
+    payload: Dict[str, str] = {}
+    for line in raw.decode("utf-8", errors="ignore").split("\r\n"):
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        key = key.strip()
+        if key:
+            payload[key] = value.lstrip()
+    return payload
+
+
+class AmiPacketReader:
+    """
+    Буферное чтение AMI-потока: сокет читается кусками, пакеты режутся по
+    `\\r\\n\\r\\n` прямо в буфере.
+
+    Если задан `allowed_events`, у пакета сначала смотрится только первая строка
+    `Event:`; события не из списка отбрасываются без декодирования и разбора.
+    `event_markers` дополнительно требует от события одну из подстрок
+    (без учёта регистра) — например, VarSet нужен только для переменных записи.
+    Пакеты без `Event:` (Response на Action) разбираются всегда.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        *,
+        allowed_events: Optional[FrozenSet[bytes]] = None,
+        event_markers: Optional[Mapping[bytes, Tuple[bytes, ...]]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_packet_bytes: int = DEFAULT_MAX_PACKET_BYTES,
+    ) -> None:
+        self._reader = reader
+        self._allowed_events = allowed_events
+        self._event_markers = dict(event_markers or {})
+        self._chunk_size = max(int(chunk_size), 1024)
+        self._max_packet_bytes = max(int(max_packet_bytes), self._chunk_size)
+        self._buffer = bytearray()
+        self._pending: Deque[Dict[str, str]] = deque()
+        self._eof = False
+        self.parsed = 0
+        self.skipped = 0
+
+    async def read_packet(self) -> Optional[Dict[str, str]]:
+        """Следующий пакет или None, если сокет закрыт."""
+        if not self._pending and not await self._fill():
+            return None
+        return self._pending.popleft()
+
+    async def read_packets(self) -> Optional[List[Dict[str, str]]]:
+        """Все уже прочитанные пакеты (минимум один) или None, если сокет закрыт."""
+        if not self._pending and not await self._fill():
+            return None
+        packets = list(self._pending)
+        self._pending.clear()
+        return packets
+
+    async def _fill(self) -> bool:
+        # Отмена (wait_for с таймаутом пинга) безопасна: буфер меняется только после read()
+        while not self._pending:
+            if self._eof:
+                return False
+            chunk = await self._reader.read(self._chunk_size)
+            if not chunk:
+                self._eof = True
+                # хвост без пустой строки в конце — последний пакет перед закрытием
+                if self._buffer.strip():
+                    self._buffer += _PACKET_END
+                    self._split()
+                self._buffer.clear()
+                continue
+            self._buffer += chunk
+            self._split()
+            if len(self._buffer) > self._max_packet_bytes:
+                raise RuntimeError("AMI packet exceeds max size without terminator")
+        return True
+
+    def _split(self) -> None:
+        buffer = self._buffer
+        pos = 0
+        while True:
+            while buffer.startswith(_LINE_END, pos):
+                pos += len(_LINE_END)
+            end = buffer.find(_PACKET_END, pos)
+            if end < 0:
+                break
+            if self._accepts(buffer, pos, end):
+                self._pending.append(parse_ami_packet(bytes(buffer[pos:end])))
+                self.parsed += 1
+            else:
+                self.skipped += 1
+            pos = end + len(_PACKET_END)
+        if pos:
+            del buffer[:pos]
+
+    def _accepts(self, buffer: bytearray, start: int, end: int) -> bool:
+        if self._allowed_events is None:
+            return True
+        header_end = buffer.find(_LINE_END, start, end)
+        if header_end < 0:
+            header_end = end
+        if buffer[start:start + len(_EVENT_HEADER)].lower() != _EVENT_HEADER:
+            return True
+        name = bytes(buffer[start + len(_EVENT_HEADER):header_end]).strip().lower()
+        if name not in self._allowed_events:
+            return False
+        markers = self._event_markers.get(name)
+        if not markers:
+            return True
+        body = bytes(buffer[header_end:end]).lower()
+        return any(marker in body for marker in markers)
+
+
+__all__ = ["AmiPacketReader", "parse_ami_packet"]
@@ -16,20 +16,24 @@ from urllib.parse import urljoin, urlparse
 import httpx
 from starlette.responses import JSONResponse
 
+from clients.asterisk_crm_channel.ami_parser import AmiPacketReader
 from clients.base import ClientBase
 from config.settings import settings as app_settings
 from core.api.regos_api import RegosAPI
 from core.logger import setup_logger
 from core.redis import (
     redis_ops,
-    redis_error_contains,
     redis_expire_if_due,
     redis_sadd_with_ttl,
-    redis_stream_add_with_ttl,
-    redis_stream_ack_delete,
-    redis_stream_group_create_with_ttl,
     redis_ttl_seconds,
 )
+from core.stream_worker import (
+    RedisStreamWorker,
+    StreamEntryDeadLetter,
+    StreamEntryDrop,
+    StreamEntryRetry,
+    StreamWorkerConfig,
+)
 from schemas.api.chat.chat_message import (
     ChatMessageAddRequest,
     ChatMessageTypeEnum,
@@ -103,6 +107,33 @@ class AsteriskCrmChannelConfig:
     AMI_OWNER_LOCK_TTL_SEC = 30
     AMI_OWNER_LOCK_REFRESH_SEC = 10
     AMI_OWNER_WAIT_SEC = 2
+    AMI_READ_CHUNK_BYTES = 64 * 1024
+    # Events that can become a call stage in _derive_status_from_ami (plus VarSet for
+    # the recording filename). Everything else (RTCP*, Newexten, VarSet noise, DialBegin,
+    # Cdr, ...) is dropped by the reader on the Event: header, before the packet is parsed.
+    # asterisk_crm_channel_ami_events overrides the set; "*" disables the filter.
+    AMI_DEFAULT_EVENTS = frozenset(
+        {
+            "newchannel",
+            "newstate",
+            "agentconnect",
+            "agentcomplete",
+            "bridgeenter",
+            "bridge",
+            "link",
+            "dialend",
+            "mixmonitorstop",
+            "monitorstop",
+            "hangup",
+            "hanguprequest",
+            "softhanguprequest",
+            "varset",
+        }
+    )
+    AMI_EVENTS_SETTING = str(app_settings.asterisk_crm_channel_ami_events or "").strip()
+    AMI_EVENT_MARKERS = {
+        b"varset": (b"mixmonitor_filename", b"cdr(recordingfile)"),
+    }
 
     CHAT_MESSAGE_ADD_CLOSED_ENTITY_ERROR = 1220
 
@@ -197,29 +228,17 @@ class CallLockBusyError(RuntimeError):
 
 
 _MANAGER_LOCK = asyncio.Lock()
-_WORKER_TASKS: Dict[int, asyncio.Task] = {}
+_STREAM_WORKER: Optional[RedisStreamWorker] = None
 _AMI_TASKS: Dict[str, asyncio.Task] = {}
 _INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
 _CI_ACTIVE_MEMORY_CACHE: Dict[str, Tuple[bool, int]] = {}
 _CI_ACTIVE_LOCKS: Dict[str, asyncio.Lock] = {}
 _REDIS_TTL_TOUCH_TS: Dict[str, int] = {}
-_STREAM_GROUP_READY: Set[str] = set()
-_STREAM_CLAIM_TS: Dict[str, int] = {}
 _SETTINGS_LOCAL_CACHE: Dict[str, Tuple[int, Dict[str, str]]] = {}
 _RUNTIME_LOCAL_CACHE: Dict[str, Tuple[int, RuntimeConfig]] = {}
 _RUNTIME_LOCAL_LOCK = asyncio.Lock()
 
-_ENQUEUE_DEDUPE_LUA = """
-local ok = redis.call('set', KEYS[1], '1', 'EX', ARGV[1], 'NX')
-if not ok then
-  return 0
-end
-redis.call('xadd', KEYS[2], 'MAXLEN', '~', ARGV[2], '*', unpack(ARGV, 5))
-if ARGV[4] == '1' then
-  redis.call('expire', KEYS[2], ARGV[3])
-end
-return 1
-"""
+
 
 
 def _now_ts() -> int:
@@ -2670,80 +2689,82 @@ return 0
         )
 
     @classmethod
-    async def _ensure_consumer_group(cls, stream_key: str, *, force: bool = False) -> None:
-        _require_redis()
-        if not force and stream_key in _STREAM_GROUP_READY:
-            return
-        await redis_stream_group_create_with_ttl(
-            stream_key,
-            AsteriskCrmChannelConfig.STREAM_GROUP,
-            ttl_sec=cls._resolve_stream_ttl(),
-            touch_ts_by_key=_REDIS_TTL_TOUCH_TS,
-            now_ts=_now_ts(),
+    async def _enqueue_runtime_events(
+        cls,
+        runtime: RuntimeConfig,
+        events: List[CallEvent],
+    ) -> List[bool]:
+        ci = str(runtime.connected_integration_id or "").strip()
+        if not ci:
+            raise ValueError("connected_integration_id is required")
+        await cls._ensure_stream_workers(ensure_groups=False)
+        now_ts = _now_ts()
+        items = [
+            (
+                cls._enqueue_dedupe_event_key(ci, event.event_id),
+                {
+                    "connected_integration_id": ci,
+                    "event_ts": str(_to_int(event.event_ts, now_ts) or now_ts),
+                    "state_ttl_sec": str(runtime.state_ttl_sec),
+                    "event": cls._event_to_dict(event),
+                    "attempt": "0",
+                    "enqueued_at": str(now_ts),
+                },
+            )
+            for event in events
+        ]
+        return await cls._stream_worker().enqueue_deduped_many(
+            items,
+            dedupe_ttl_sec=AsteriskCrmChannelConfig.DEFAULT_DEDUPE_TTL_SEC,
+            ttl_sec=_to_int(runtime.state_ttl_sec, None),
         )
-        _STREAM_GROUP_READY.add(stream_key)
 
     @classmethod
-    def _serialize_stream_fields(cls, fields: Dict[str, Any]) -> Dict[str, str]:
-        serialized: Dict[str, str] = {}
-        for key, value in fields.items():
-            if isinstance(value, (dict, list)):
-                serialized[key] = _json_dumps(value)
-            elif value is None:
-                serialized[key] = ""
-            else:
-                serialized[key] = str(value)
-        return serialized
+    def _stream_worker(cls) -> RedisStreamWorker:
+        global _STREAM_WORKER
+        if _STREAM_WORKER is None:
+            _STREAM_WORKER = RedisStreamWorker(
+                StreamWorkerConfig(
+                    name="asterisk_crm",
+                    stream_key=cls._stream_key(),
+                    group=AsteriskCrmChannelConfig.STREAM_GROUP,
+                    dlq_stream_key=cls._dlq_stream_key(),
+                    workers=AsteriskCrmChannelConfig.STREAM_WORKERS,
+                    lanes=AsteriskCrmChannelConfig.EVENT_CONCURRENCY,
+                    batch_size=AsteriskCrmChannelConfig.STREAM_BATCH_SIZE,
+                    read_block_ms=AsteriskCrmChannelConfig.STREAM_READ_BLOCK_MS,
+                    min_idle_ms=AsteriskCrmChannelConfig.STREAM_MIN_IDLE_MS,
+                    claim_interval_sec=AsteriskCrmChannelConfig.STREAM_CLAIM_INTERVAL_SEC,
+                    max_retries=AsteriskCrmChannelConfig.STREAM_MAX_RETRIES,
+                    maxlen=AsteriskCrmChannelConfig.STREAM_MAXLEN,
+                    ttl_sec=cls._resolve_stream_ttl(),
+                ),
+                cls._process_stream_entry,
+                ordering_key=cls._stream_entry_call_key,
+                on_dead_letter=cls._on_stream_dead_letter,
+                heartbeat=cls._set_worker_heartbeat,
+                instance_id=_INSTANCE_ID,
+            )
+        return _STREAM_WORKER
 
     @classmethod
-    async def _enqueue(
-        cls,
-        stream_key: str,
-        fields: Dict[str, Any],
-        stream_ttl_sec: Optional[int] = None,
-    ) -> None:
-        _require_redis()
-        await redis_stream_add_with_ttl(
-            stream_key,
-            cls._serialize_stream_fields(fields),
-            maxlen=AsteriskCrmChannelConfig.STREAM_MAXLEN,
-            ttl_sec=cls._resolve_stream_ttl(stream_ttl_sec),
-            touch_ts_by_key=_REDIS_TTL_TOUCH_TS,
-            now_ts=_now_ts(),
-        )
+    def _stream_worker_count(cls) -> int:
+        return _STREAM_WORKER.running_tasks if _STREAM_WORKER is not None else 0
 
     @classmethod
     async def _enqueue_deduped(
         cls,
-        stream_key: str,
         dedupe_key: str,
         fields: Dict[str, Any],
         stream_ttl_sec: Optional[int] = None,
     ) -> bool:
         _require_redis()
-        now_ts = _now_ts()
-        stream_ttl = cls._resolve_stream_ttl(stream_ttl_sec)
-        should_touch = (
-            now_ts - int(_REDIS_TTL_TOUCH_TS.get(stream_key) or 0)
-            >= min(3600, max(10, stream_ttl // 4))
-        )
-        field_args: List[str] = []
-        for key, value in cls._serialize_stream_fields(fields).items():
-            field_args.extend([key, value])
-        result = await redis_ops.eval(
-            _ENQUEUE_DEDUPE_LUA,
-            2,
+        return await cls._stream_worker().enqueue_deduped(
             dedupe_key,
-            stream_key,
-            str(AsteriskCrmChannelConfig.DEFAULT_DEDUPE_TTL_SEC),
-            str(AsteriskCrmChannelConfig.STREAM_MAXLEN),
-            str(stream_ttl),
-            "1" if should_touch else "0",
-            *field_args,
+            fields,
+            dedupe_ttl_sec=AsteriskCrmChannelConfig.DEFAULT_DEDUPE_TTL_SEC,
+            ttl_sec=_to_int(stream_ttl_sec, None),
         )
-        if should_touch and int(result or 0) == 1:
-            _REDIS_TTL_TOUCH_TS[stream_key] = now_ts
-        return int(result or 0) == 1
 
     @classmethod
     async def _enqueue_event(
@@ -2756,10 +2777,8 @@ return 0
         if not ci:
             raise ValueError("connected_integration_id is required")
         await cls._ensure_stream_workers(ensure_groups=False)
-        stream_key = cls._stream_key()
         dedupe_key = cls._enqueue_dedupe_event_key(ci, event.event_id)
         return await cls._enqueue_deduped(
-            stream_key,
             dedupe_key,
             fields,
             stream_ttl_sec=fields.get("state_ttl_sec"),
@@ -2774,24 +2793,6 @@ return 0
         )
         return redis_ttl_seconds(ttl)
 
-    @classmethod
-    async def _touch_stream_ttl(
-        cls,
-        stream_key: str,
-        stream_ttl_sec: Optional[int] = None,
-        *,
-        force: bool = False,
-    ) -> None:
-        _require_redis()
-        await redis_expire_if_due(
-            stream_key,
-            cls._resolve_stream_ttl(stream_ttl_sec),
-            _REDIS_TTL_TOUCH_TS,
-            _now_ts(),
-            min_refresh_sec=10,
-            force=force,
-        )
-
     @classmethod
     async def _set_worker_heartbeat(cls, worker_index: int) -> None:
         _require_redis()
@@ -2811,17 +2812,7 @@ return 0
     ) -> None:
         _require_redis()
         async with _MANAGER_LOCK:
-            stream_key = cls._stream_key()
-            if ensure_groups:
-                await cls._ensure_consumer_group(stream_key)
-            for index in range(AsteriskCrmChannelConfig.STREAM_WORKERS):
-                task = _WORKER_TASKS.get(index)
-                if task and not task.done():
-                    continue
-                _WORKER_TASKS[index] = asyncio.create_task(
-                    cls._stream_worker_loop(index),
-                    name=f"asterisk_crm_stream_{index}",
-                )
+            await cls._stream_worker().ensure_started(ensure_group=ensure_groups)
 
     @classmethod
     async def _ensure_ami_worker(cls, runtime: RuntimeConfig) -> None:
@@ -2838,12 +2829,13 @@ return 0
     @classmethod
     async def shutdown_all(cls) -> None:
         async with _MANAGER_LOCK:
-            worker_tasks = list(_WORKER_TASKS.values())
-            _WORKER_TASKS.clear()
             ami_tasks = list(_AMI_TASKS.values())
             _AMI_TASKS.clear()
 
-        for task in worker_tasks + ami_tasks:
+        if _STREAM_WORKER is not None:
+            await _STREAM_WORKER.stop()
+
+        for task in ami_tasks:
             task.cancel()
             try:
                 await task
@@ -2852,8 +2844,6 @@ return 0
             except Exception:
                 logger.exception("Error while stopping Asterisk background task")
 
-        _STREAM_GROUP_READY.clear()
-        _STREAM_CLAIM_TS.clear()
         _SETTINGS_LOCAL_CACHE.clear()
         _CI_ACTIVE_MEMORY_CACHE.clear()
         async with _RUNTIME_LOCAL_LOCK:
@@ -2882,7 +2872,7 @@ return 0
                 "total": 0,
                 "restored": 0,
                 "failed": 0,
-                "stream_workers": len(_WORKER_TASKS),
+                "stream_workers": cls._stream_worker_count(),
             }
         await cls._touch_active_ci_ids_ttl(force=True)
 
@@ -2918,24 +2908,19 @@ return 0
             "total": len(ci_ids),
             "restored": restored,
             "failed": failed,
-            "stream_workers": len(_WORKER_TASKS),
+            "stream_workers": cls._stream_worker_count(),
         }
 
     @classmethod
     async def _stop_stream_worker(cls, connected_integration_id: Optional[str] = None) -> None:
         if connected_integration_id:
             return
-        async with _MANAGER_LOCK:
-            tasks = list(_WORKER_TASKS.values())
-            _WORKER_TASKS.clear()
-        for task in tasks:
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
-            except Exception:
-                logger.exception("Error while stopping stream worker")
+        if _STREAM_WORKER is None:
+            return
+        try:
+            await _STREAM_WORKER.stop()
+        except Exception:
+            logger.exception("Error while stopping stream worker")
 
     @classmethod
     async def _stop_ami_worker(cls, connected_integration_id: str) -> None:
@@ -2968,38 +2953,36 @@ return 0
         await writer.drain()
         return action_id
 
-    @staticmethod
-    async def _ami_read_packet(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
-        lines: List[str] = []
-        while True:
-            raw_line = await reader.readline()
-            if raw_line == b"":
-                if not lines:
-                    return None
-                break
-            line = raw_line.decode("utf-8", errors="ignore").rstrip("\r\n")
-            if not line:
-                if lines:
-                    break
-                continue
-            lines.append(line)
-
-        payload: Dict[str, Any] = {}
-        for line in lines:
-            if ":" not in line:
-                continue
-            key, value = line.split(":", 1)
-            key = key.strip()
-            if not key:
-                continue
-            payload[key] = value.lstrip()
-        return payload
+    @classmethod
+    def _ami_packet_reader(
+        cls,
+        runtime: RuntimeConfig,
+        reader: asyncio.StreamReader,
+    ) -> AmiPacketReader:
+        allowed_events: Optional[frozenset] = None
+        events_setting = AsteriskCrmChannelConfig.AMI_EVENTS_SETTING
+        # диагностический лог событий должен видеть весь поток
+        if not runtime.log_ami_events and events_setting != "*":
+            names = (
+                events_setting.split(",")
+                if events_setting
+                else AsteriskCrmChannelConfig.AMI_DEFAULT_EVENTS
+            )
+            allowed_events = frozenset(
+                name.strip().lower().encode("utf-8") for name in names if name.strip()
+            )
+        return AmiPacketReader(
+            reader,
+            allowed_events=allowed_events,
+            event_markers=AsteriskCrmChannelConfig.AMI_EVENT_MARKERS,
+            chunk_size=AsteriskCrmChannelConfig.AMI_READ_CHUNK_BYTES,
+        )
 
     @classmethod
     async def _ami_login(
         cls,
         runtime: RuntimeConfig,
-        reader: asyncio.StreamReader,
+        packets: AmiPacketReader,
         writer: asyncio.StreamWriter,
     ) -> None:
         login_action_id = await cls._ami_send_action(
@@ -3014,7 +2997,7 @@ return 0
             timeout_left = deadline - time.monotonic()
             if timeout_left <= 0:
                 raise RuntimeError("AMI login timeout")
-            packet = await asyncio.wait_for(cls._ami_read_packet(reader), timeout_left)
+            packet = await asyncio.wait_for(packets.read_packet(), timeout_left)
             if packet is None:
                 raise RuntimeError("AMI socket closed during login")
             if not packet:
@@ -3074,8 +3057,9 @@ return 0
                         asyncio.open_connection(runtime.ami_host, runtime.ami_port),
                         timeout=AsteriskCrmChannelConfig.AMI_CONNECT_TIMEOUT_SEC,
                     )
+                    packets = cls._ami_packet_reader(runtime, reader)
                     try:
-                        await cls._ami_login(runtime, reader, writer)
+                        await cls._ami_login(runtime, packets, writer)
                         reconnect_delay = AsteriskCrmChannelConfig.AMI_RECONNECT_MIN_SEC
                         last_owner_refresh = time.monotonic()
                         last_active_check = time.monotonic()
@@ -3106,41 +3090,45 @@ return 0
                                 last_active_check = time.monotonic()
 
                             try:
-                                packet = await asyncio.wait_for(
-                                    cls._ami_read_packet(reader),
+                                batch = await asyncio.wait_for(
+                                    packets.read_packets(),
                                     timeout=AsteriskCrmChannelConfig.AMI_PING_INTERVAL_SEC,
                                 )
                             except asyncio.TimeoutError:
                                 await cls._ami_send_action(writer, "Ping")
                                 continue
-                            if packet is None:
+                            if batch is None:
                                 raise RuntimeError("AMI socket closed by remote host")
-                            if not packet:
-                                continue
-                            normalized_packet = cls._normalize_ami_packet(packet)
-                            if not normalized_packet.get("event"):
-                                continue
 
-                            if runtime.log_ami_events:
-                                logger.info(
-                                    "AMI event: ci=%s %s",
-                                    connected_integration_id,
-                                    cls._format_ami_event_for_log(normalized_packet),
+                            events: List[CallEvent] = []
+                            for packet in batch:
+                                normalized_packet = cls._normalize_ami_packet(packet)
+                                if not normalized_packet.get("event"):
+                                    continue
+                                if runtime.log_ami_events:
+                                    logger.info(
+                                        "AMI event: ci=%s %s",
+                                        connected_integration_id,
+                                        cls._format_ami_event_for_log(normalized_packet),
+                                    )
+                                await cls._maybe_capture_recording_filename(
+                                    runtime, normalized_packet
                                 )
-                            await cls._maybe_capture_recording_filename(
-                                runtime, normalized_packet
-                            )
-                            event = cls._normalize_ami_event(runtime, normalized_packet)
-                            if not event:
+                                event = cls._normalize_ami_event(runtime, normalized_packet)
+                                if event:
+                                    events.append(event)
+                            if not events:
                                 continue
+                            # всё, что пришло одним чтением, уходит в стрим одним pipeline
                             try:
-                                await cls._enqueue_runtime_event(runtime, event)
+                                await cls._enqueue_runtime_events(runtime, events)
                                 await cls._ensure_stream_workers()
                             except Exception as enqueue_error:
                                 logger.exception(
-                                    "AMI event enqueue failed: ci=%s event_id=%s error=%s",
+                                    "AMI event enqueue failed: ci=%s events=%s first_event_id=%s error=%s",
                                     connected_integration_id,
-                                    event.event_id,
+                                    len(events),
+                                    events[0].event_id,
                                     enqueue_error,
                                 )
                     finally:
@@ -3183,135 +3171,10 @@ return 0
                     _AMI_TASKS.pop(connected_integration_id, None)
 
     @classmethod
-    async def _stream_worker_loop(cls, worker_index: int) -> None:
-        stream_key = cls._stream_key()
-        consumer = f"{_INSTANCE_ID}:asterisk:{worker_index}"
-        await cls._ensure_consumer_group(stream_key)
-        logger.info("Asterisk stream worker started: index=%s", worker_index)
-        pending_entries: List[Tuple[str, Dict[str, str]]] = []
-        semaphore = asyncio.Semaphore(AsteriskCrmChannelConfig.EVENT_CONCURRENCY)
-
-        try:
-            while True:
-                try:
-                    await cls._set_worker_heartbeat(worker_index)
-                    await cls._touch_stream_ttl(stream_key)
-                    claim_key = f"{stream_key}:{worker_index}"
-                    now_ts = _now_ts()
-                    last_claim_ts = int(_STREAM_CLAIM_TS.get(claim_key) or 0)
-                    if now_ts - last_claim_ts >= AsteriskCrmChannelConfig.STREAM_CLAIM_INTERVAL_SEC:
-                        _STREAM_CLAIM_TS[claim_key] = now_ts
-                        claimed_entries = await cls._process_claimed_entries(
-                            stream_key=stream_key,
-                            consumer=consumer,
-                        )
-                        if claimed_entries:
-                            pending_entries.extend(claimed_entries)
-
-                    try:
-                        records = await redis_ops.xreadgroup(
-                            groupname=AsteriskCrmChannelConfig.STREAM_GROUP,
-                            consumername=consumer,
-                            streams={stream_key: ">"},
-                            count=AsteriskCrmChannelConfig.STREAM_BATCH_SIZE,
-                            block=AsteriskCrmChannelConfig.STREAM_READ_BLOCK_MS,
-                        )
-                    except Exception as error:
-                        if redis_error_contains(error, "NOGROUP"):
-                            await cls._ensure_consumer_group(stream_key, force=True)
-                            await asyncio.sleep(0.1)
-                            continue
-                        raise
-
-                    if records:
-                        for _, entries in records:
-                            pending_entries.extend(
-                                (str(message_id), fields if isinstance(fields, dict) else {})
-                                for message_id, fields in entries
-                            )
-
-                    if not pending_entries:
-                        continue
-
-                    ready_entries, pending_entries = cls._select_ready_stream_entries(pending_entries)
-                    if not ready_entries:
-                        continue
-
-                    async def guarded_process(entry: Tuple[str, Dict[str, str]]) -> None:
-                        async with semaphore:
-                            message_id, fields = entry
-                            await cls._process_stream_entry(
-                                stream_key=stream_key,
-                                message_id=message_id,
-                                fields=fields,
-                            )
-
-                    await asyncio.gather(*(guarded_process(entry) for entry in ready_entries))
-                except asyncio.CancelledError:
-                    raise
-                except Exception as error:
-                    logger.exception(
-                        "Asterisk stream worker error: index=%s error=%s",
-                        worker_index,
-                        error,
-                    )
-                    await asyncio.sleep(1.0)
-        finally:
-            current_task = asyncio.current_task()
-            async with _MANAGER_LOCK:
-                if _WORKER_TASKS.get(worker_index) is current_task:
-                    _WORKER_TASKS.pop(worker_index, None)
-
-    @classmethod
-    async def _process_claimed_entries(
-        cls,
-        stream_key: str,
-        consumer: str,
-    ) -> List[Tuple[str, Dict[str, str]]]:
-        try:
-            claimed_raw = await redis_ops.xautoclaim(
-                stream_key,
-                AsteriskCrmChannelConfig.STREAM_GROUP,
-                consumer,
-                min_idle_time=AsteriskCrmChannelConfig.STREAM_MIN_IDLE_MS,
-                start_id="0-0",
-                count=AsteriskCrmChannelConfig.STREAM_BATCH_SIZE,
-            )
-        except Exception as error:
-            if redis_error_contains(error, "NOGROUP"):
-                await cls._ensure_consumer_group(stream_key, force=True)
-                return []
-            raise
-
-        entries: List[Tuple[str, Dict[str, str]]] = []
-        if isinstance(claimed_raw, (list, tuple)) and len(claimed_raw) >= 2:
-            entries = claimed_raw[1] or []
-        return entries
-
-    @classmethod
-    def _sort_stream_entries_by_event_ts(
-        cls,
-        entries: List[Tuple[str, Dict[str, str]]],
-    ) -> List[Tuple[str, Dict[str, str]]]:
-        def _sort_key(item: Tuple[str, Dict[str, str]]) -> Tuple[int, int, str]:
-            message_id, fields = item
-            event_ts = cls._stream_entry_event_ts(fields)
-            if event_ts is not None:
-                return (0, int(event_ts), str(message_id))
-            fallback_ts = _to_int(fields.get("enqueued_at"), None)
-            if fallback_ts is not None:
-                return (1, int(fallback_ts), str(message_id))
-            return (2, 0, str(message_id))
-
-        return sorted(entries, key=_sort_key)
-
-    @classmethod
-    def _stream_entry_event_ts(cls, fields: Dict[str, str]) -> Optional[int]:
-        direct_ts = _to_int(fields.get("event_ts"), None)
-        if direct_ts is not None:
-            return _normalize_unix_ts_seconds(int(direct_ts))
+    def _stream_entry_call_key(cls, fields: Dict[str, str]) -> Optional[str]:
+        connected_integration_id = str(fields.get("connected_integration_id") or "").strip()
         raw_event = fields.get("event")
-        if not raw_event:
+        if not connected_integration_id or not raw_event:
             return None
         try:
             payload = _json_loads(raw_event)
@@ -3319,21 +3182,11 @@ return 0
             return None
         if not isinstance(payload, dict):
             return None
-        payload_ts = _to_int(payload.get("event_ts"), None)
-        if payload_ts is None:
+        external_call_id = str(payload.get("external_call_id") or "").strip()
+        if not external_call_id:
             return None
-        return _normalize_unix_ts_seconds(int(payload_ts))
-
-    @classmethod
-    def _select_ready_stream_entries(
-        cls,
-        entries: List[Tuple[str, Dict[str, str]]],
-    ) -> Tuple[List[Tuple[str, Dict[str, str]]], List[Tuple[str, Dict[str, str]]]]:
-        # No reorder/defer hold: AMI is a single ordered socket, so the enqueue order is
-        # already the call order. Events process as they arrive; the per-call lock plus
-        # idempotent create/assign/close cover any residual cross-worker reordering. Sort
-        # by event_ts only to keep within-batch ordering stable.
-        return cls._sort_stream_entries_by_event_ts(entries), []
+        asterisk_hash = str(payload.get("asterisk_hash") or "").strip()
+        return f"{connected_integration_id}:{asterisk_hash}:{external_call_id}"
 
     @classmethod
     async def _clear_enqueue_dedupe_for_fields(
@@ -3357,112 +3210,50 @@ return 0
             cls._enqueue_dedupe_event_key(connected_integration_id, event_id)
         )
 
+    @classmethod
+    async def _on_stream_dead_letter(
+        cls,
+        fields: Dict[str, str],
+        error: BaseException,
+    ) -> None:
+        connected_integration_id = str(fields.get("connected_integration_id") or "").strip()
+        if connected_integration_id:
+            await cls._clear_enqueue_dedupe_for_fields(connected_integration_id, fields)
+
     @classmethod
     async def _process_stream_entry(
         cls,
-        stream_key: str,
         message_id: str,
         fields: Dict[str, str],
     ) -> None:
         connected_integration_id = str(fields.get("connected_integration_id") or "").strip()
         if not connected_integration_id:
-            await redis_stream_ack_delete(stream_key, AsteriskCrmChannelConfig.STREAM_GROUP, message_id)
             logger.warning(
                 "Asterisk stream entry skipped without connected_integration_id: message_id=%s",
                 message_id,
             )
             return
-        attempts = _to_int(fields.get("attempt"), 0) or 0
-        state_ttl_sec = (
-            _to_int(fields.get("state_ttl_sec"), None)
-            or AsteriskCrmChannelConfig.DEFAULT_STATE_TTL_SEC
-        )
-        try:
-            raw_event = fields.get("event")
-            if not raw_event:
-                raise RuntimeError("stream payload has no event")
-            event_payload = _json_loads(raw_event)
-            if not isinstance(event_payload, dict):
-                raise RuntimeError("stream event payload is not a dict")
+        raw_event = fields.get("event")
+        if not raw_event:
+            raise RuntimeError("stream payload has no event")
+        event_payload = _json_loads(raw_event)
+        if not isinstance(event_payload, dict):
+            raise RuntimeError("stream event payload is not a dict")
 
+        try:
             await cls._process_queued_event(connected_integration_id, event_payload)
-            await redis_stream_ack_delete(stream_key, AsteriskCrmChannelConfig.STREAM_GROUP, message_id)
-        except CallLockBusyError:
-            # Transient per-call contention: re-enqueue the same entry WITHOUT incrementing
-            # the attempt counter so it never reaches the DLQ. The lock-holder finishes its
-            # CRM round-trip and this stage runs on the next read.
-            await cls._enqueue(stream_key, dict(fields), stream_ttl_sec=state_ttl_sec)
-            await redis_stream_ack_delete(stream_key, AsteriskCrmChannelConfig.STREAM_GROUP, message_id)
-            return
+        except CallLockBusyError as error:
+            # Transient per-call contention: the worker retries the entry in place WITHOUT
+            # incrementing the attempt counter (later stages of the call wait behind it).
+            # The lock-holder finishes its CRM round-trip and this stage runs on the next try.
+            raise StreamEntryRetry(str(error)) from error
         except ConnectedIntegrationInactiveError as error:
-            await redis_stream_ack_delete(stream_key, AsteriskCrmChannelConfig.STREAM_GROUP, message_id)
             await cls._mark_ci_inactive(connected_integration_id)
-            logger.info(
-                "Asterisk event skipped for inactive integration: ci=%s message_id=%s reason=%s",
-                connected_integration_id,
-                message_id,
-                error,
-            )
-            return
+            raise StreamEntryDrop(
+                f"inactive integration: ci={connected_integration_id} reason={error}"
+            ) from error
         except NonRetryableCallEventError as error:
-            dlq_payload = dict(fields)
-            dlq_payload["attempt"] = str(max(attempts, 0) + 1)
-            dlq_payload["error"] = str(error)
-            dlq_payload["source_stream"] = stream_key
-            dlq_payload["source_message_id"] = message_id
-            await cls._enqueue(
-                cls._dlq_stream_key(connected_integration_id),
-                dlq_payload,
-                stream_ttl_sec=state_ttl_sec,
-            )
-            await cls._clear_enqueue_dedupe_for_fields(connected_integration_id, fields)
-            await redis_stream_ack_delete(stream_key, AsteriskCrmChannelConfig.STREAM_GROUP, message_id)
-            logger.error(
-                "Asterisk event moved to DLQ (non-retryable): ci=%s message_id=%s error=%s",
-                connected_integration_id,
-                message_id,
-                error,
-            )
-            return
-        except Exception as error:
-            attempts += 1
-            if attempts >= AsteriskCrmChannelConfig.STREAM_MAX_RETRIES:
-                dlq_payload = dict(fields)
-                dlq_payload["attempt"] = str(attempts)
-                dlq_payload["error"] = str(error)
-                dlq_payload["source_stream"] = stream_key
-                dlq_payload["source_message_id"] = message_id
-                await cls._enqueue(
-                    cls._dlq_stream_key(connected_integration_id),
-                    dlq_payload,
-                    stream_ttl_sec=state_ttl_sec,
-                )
-                await cls._clear_enqueue_dedupe_for_fields(connected_integration_id, fields)
-                await redis_stream_ack_delete(stream_key, AsteriskCrmChannelConfig.STREAM_GROUP, message_id)
-                logger.error(
-                    "Asterisk event moved to DLQ: ci=%s message_id=%s error=%s",
-                    connected_integration_id,
-                    message_id,
-                    error,
-                )
-                return
-
-            retry_payload = dict(fields)
-            retry_payload["attempt"] = str(attempts)
-            retry_payload["last_error"] = str(error)
-            await cls._enqueue(
-                stream_key,
-                retry_payload,
-                stream_ttl_sec=state_ttl_sec,
-            )
-            await redis_stream_ack_delete(stream_key, AsteriskCrmChannelConfig.STREAM_GROUP, message_id)
-            logger.warning(
-                "Asterisk event requeued: ci=%s attempt=%s message_id=%s error=%s",
-                connected_integration_id,
-                attempts,
-                message_id,
-                error,
-            )
+            raise StreamEntryDeadLetter(str(error)) from error
 
     @classmethod
     async def _process_queued_event(
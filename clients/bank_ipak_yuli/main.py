@@ -84,6 +84,8 @@ PAYMENT_ID_FIELD_NAME = "Ipak Yuli payment ID"
 PAYMENT_ID_FIELD_TYPE = "string"
 DOCPAYMENT_DESCRIPTION_MAX_LENGTH = 300
 SCHEDULER_HANDLER_ID = 7
+EXISTING_PAYMENTS_PAGE_LIMIT = 1000
+PARTNER_CACHE_TTL_SEC = 7 * 24 * 60 * 60
 REDIS_PREFIX = "biy"
 SETTINGS_TTL_SEC = max(int(app_settings.redis_cache_ttl or 60), 60)
 SETTINGS_LOCK_TTL_SEC = 30
@@ -348,6 +350,10 @@ def _direction_filter_key(direction: int) -> str:
     return SYNC_DIRECTIONS_INCOME if direction == 2 else SYNC_DIRECTIONS_OUTCOME
 
 
+def _import_concurrency() -> int:
+    return max(int(app_settings.bank_ipak_yuli_import_concurrency or 0), 1)
+
+
 class IpakYuliBankClient:
     def __init__(self, runtime: RuntimeConfig) -> None:
         self.runtime = runtime
@@ -436,6 +442,101 @@ class IpakYuliBankClient:
         )
 
 
+@dataclass(frozen=True)
+class _PaymentCandidate:
+    row: Dict[str, Any]
+    statement_date: date
+    direction: int
+    external_payment_id: str
+
+
+class _PartnerResolver:
+    """
+    Контрагенты одного прогона импорта: карта ИНН -> partner_id на прогон
+    плюс постоянная карта в Redis. Одновременные строки с одним ИНН ждут
+    один и тот же поиск/создание, поэтому дубликаты контрагентов не появляются.
+    """
+
+    def __init__(self, integration: "BankIpakYuliIntegration", api: RegosAPI, runtime: RuntimeConfig) -> None:
+        self._integration = integration
+        self._api = api
+        self._runtime = runtime
+        self._resolved: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _cache_key(self, inn: str) -> str:
+        return self._integration._redis_key("partner", inn)
+
+    async def prefetch(self, candidates: List[_PaymentCandidate]) -> None:
+        """Подтянуть из Redis уже известные ИНН всего прогона одним MGET."""
+        if not redis_is_enabled():
+            return
+        inns = sorted(
+            {
+                inn
+                for inn in (
+                    _counterparty_inn(candidate.row, candidate.direction) for candidate in candidates
+                )
+                if inn
+            }
+        )
+        if not inns:
+            return
+        try:
+            values = await redis_ops.mget(*(self._cache_key(inn) for inn in inns))
+        except Exception as error:
+            logger.warning("Ipak Yuli partner cache read failed: error=%s", error)
+            return
+        for inn, value in zip(inns, values):
+            partner_id = _to_int(value, 0)
+            if partner_id > 0:
+                self._resolved[inn] = partner_id
+
+    async def resolve(self, row: Dict[str, Any], direction: int) -> int:
+        inn, name, account, mfo = self._integration._partner_identity(row, direction)
+        # без ИНН контрагент ищется по имени — в Redis такие не кладём
+        key = inn or f"name:{name.casefold()}"
+        partner_id = self._resolved.get(key)
+        if partner_id:
+            return partner_id
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lookup(key, inn=inn, name=name, account=account, mfo=mfo))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def forget(self, row: Dict[str, Any], direction: int) -> None:
+        inn = _counterparty_inn(row, direction)
+        if not inn or self._resolved.pop(inn, None) is None:
+            return
+        self._inflight.pop(inn, None)
+        if redis_is_enabled():
+            try:
+                await redis_ops.delete(self._cache_key(inn))
+            except Exception as error:
+                logger.warning("Ipak Yuli partner cache drop failed: inn=%s error=%s", inn, error)
+
+    async def _lookup(self, key: str, *, inn: str, name: str, account: str, mfo: str) -> int:
+        try:
+            partner_id = await self._integration._find_or_create_partner(
+                self._api,
+                self._runtime,
+                inn=inn,
+                name=name,
+                account=account,
+                mfo=mfo,
+            )
+        finally:
+            self._inflight.pop(key, None)
+        self._resolved[key] = partner_id
+        if inn and redis_is_enabled():
+            try:
+                await redis_ops.set(self._cache_key(inn), str(partner_id), ex=PARTNER_CACHE_TTL_SEC)
+            except Exception as error:
+                logger.warning("Ipak Yuli partner cache write failed: inn=%s error=%s", inn, error)
+        return partner_id
+
+
 class BankIpakYuliIntegration(ClientBase):
     integration_key = "bank_ipak_yuli"
     stream_group = "biyw"
@@ -823,6 +924,13 @@ class BankIpakYuliIntegration(ClientBase):
             return await work()
 
     async def _import_payments(self, runtime: RuntimeConfig) -> Dict[str, Any]:
+        """
+        Импорт выписки за окно lookback_days:
+        - выписки по всем датам запрашиваются параллельно;
+        - уже загруженные платежи окна читаются одним запросом по доп. полю;
+        - контрагенты резолвятся по ИНН через карту прогона и Redis;
+        - DocPayment/Add и Perform идут параллельно (не больше bank_ipak_yuli_import_concurrency).
+        """
         bank = IpakYuliBankClient(runtime)
         dates = [
             _today() - timedelta(days=offset)
@@ -840,6 +948,11 @@ class BankIpakYuliIntegration(ClientBase):
             "skipped": 0,
             "errors": 0,
         }
+        semaphore = asyncio.Semaphore(_import_concurrency())
+
+        async def fetch_statement(statement_date: date) -> Dict[str, Any]:
+            async with semaphore:
+                return await bank.get_statement(statement_date=statement_date)
 
         async with RegosAPI(runtime.connected_integration_id) as api:
             await self._ensure_payment_id_field(api)
@@ -854,8 +967,12 @@ class BankIpakYuliIntegration(ClientBase):
                 runtime.bank_account,
                 runtime.perform_after_create,
             )
-            for statement_date in dates:
-                statement = await bank.get_statement(statement_date=statement_date)
+            statements = await asyncio.gather(*(fetch_statement(item) for item in dates))
+
+            candidates: List[_PaymentCandidate] = []
+            seen_payment_ids: set[str] = set()
+            operation_days: set[date] = set()
+            for statement_date, statement in zip(dates, statements):
                 operation_day = _try_parse_bank_date(
                     statement.get("oper_day") if isinstance(statement, dict) else None
                 ) or statement_date
@@ -873,19 +990,59 @@ class BankIpakYuliIntegration(ClientBase):
                     if not isinstance(row, dict):
                         stats["skipped"] += 1
                         continue
-                    try:
-                        outcome = await self._import_payment_row(
-                            api=api,
-                            runtime=runtime,
+                    outcome = self._filter_payment_row(runtime, row, operation_day)
+                    if outcome is not None:
+                        stats[outcome] += 1
+                        continue
+                    stats["matched"] += 1
+                    external_payment_id = self._external_payment_id(runtime, row, operation_day)
+                    if external_payment_id in seen_payment_ids:
+                        # одна и та же проводка в выписках соседних дней
+                        stats["duplicates"] += 1
+                        continue
+                    seen_payment_ids.add(external_payment_id)
+                    operation_days.add(operation_day)
+                    candidates.append(
+                        _PaymentCandidate(
                             row=row,
                             statement_date=operation_day,
+                            direction=_to_int(row.get("dir"), 0),
+                            external_payment_id=external_payment_id,
                         )
-                    except Exception as error:
+                    )
+
+            if candidates:
+                existing = await self._existing_payment_ids(api, runtime, operation_days)
+                partners = _PartnerResolver(self, api, runtime)
+                await partners.prefetch(candidates)
+
+                async def import_candidate(candidate: _PaymentCandidate) -> str:
+                    async with semaphore:
+                        return await self._import_payment_candidate(
+                            api=api,
+                            runtime=runtime,
+                            candidate=candidate,
+                            existing=existing,
+                            partners=partners,
+                        )
+
+                async with api.batched():
+                    outcomes = await asyncio.gather(
+                        *(import_candidate(candidate) for candidate in candidates),
+                        return_exceptions=True,
+                    )
+                for candidate, outcome in zip(candidates, outcomes):
+                    if isinstance(outcome, BaseException):
+                        if isinstance(outcome, asyncio.CancelledError):
+                            raise outcome
                         stats["errors"] += 1
-                        logger.exception("Failed to import Ipak Yuli payment: error=%s row=%s", error, row)
+                        logger.error(
+                            "Failed to import Ipak Yuli payment: error=%s row=%s",
+                            outcome,
+                            candidate.row,
+                            exc_info=outcome,
+                        )
                         continue
-                    if outcome not in {"skipped", "excluded"}:
-                        stats["matched"] += 1
                     if outcome == "performed":
                         stats["created"] += 1
                         stats["performed"] += 1
@@ -894,14 +1051,13 @@ class BankIpakYuliIntegration(ClientBase):
         stats["finished_at"] = int(time.time())
         return stats
 
-    async def _import_payment_row(
+    def _filter_payment_row(
         self,
-        *,
-        api: RegosAPI,
         runtime: RuntimeConfig,
         row: Dict[str, Any],
         statement_date: date,
-    ) -> str:
+    ) -> Optional[str]:
+        """Причина отсева строки выписки ("skipped"/"excluded") или None, если её нужно импортировать."""
         if _to_int(row.get("state"), 0) != 3:
             return "skipped"
         row_value_date = _try_parse_bank_date(row.get("vdate"))
@@ -945,23 +1101,36 @@ class BankIpakYuliIntegration(ClientBase):
                 counterparty_inn,
             )
             return "excluded"
+        if _money_from_minor(row.get("amount")) <= 0:
+            return "skipped"
+        return None
 
-        external_payment_id = self._external_payment_id(runtime, row, statement_date)
-        if await self._payment_exists(api, runtime, external_payment_id, statement_date):
+    async def _import_payment_candidate(
+        self,
+        *,
+        api: RegosAPI,
+        runtime: RuntimeConfig,
+        candidate: _PaymentCandidate,
+        existing: Optional[set[str]],
+        partners: "_PartnerResolver",
+    ) -> str:
+        row = candidate.row
+        external_payment_id = candidate.external_payment_id
+        if existing is None:
+            if await self._payment_exists(api, runtime, external_payment_id, candidate.statement_date):
+                return "duplicates"
+        elif external_payment_id in existing:
             return "duplicates"
 
-        partner_id = await self._resolve_partner(api, runtime, row, direction)
-        category_id = runtime.income_category_id if direction == 2 else runtime.outcome_category_id
-        amount = _money_from_minor(row.get("amount"))
-        if amount <= 0:
-            return "skipped"
-
+        partner_id = await partners.resolve(row, candidate.direction)
+        category_id = (
+            runtime.income_category_id if candidate.direction == 2 else runtime.outcome_category_id
+        )
         payment_date = (
             _try_parse_bank_date(row.get("vdate"))
             or _try_parse_bank_date(row.get("ddate"))
-            or statement_date
+            or candidate.statement_date
         )
-        description = self._payment_description(row, external_payment_id)
         add_response = await api.docs.doc_payment.add(
             DocPaymentAddRequest(
                 date=_parse_bank_datetime(payment_date, row.get("time")),
@@ -969,9 +1138,9 @@ class BankIpakYuliIntegration(ClientBase):
                 firm_id=runtime.firm_id,
                 partner_id=partner_id,
                 category_id=category_id,
-                amount=amount,
+                amount=_money_from_minor(row.get("amount")),
                 exchange_rate=Decimal("1"),
-                description=description,
+                description=self._payment_description(row, external_payment_id),
                 attached_user_id=runtime.attached_user_id,
                 fields=[
                     FieldValueAdd(
@@ -981,6 +1150,9 @@ class BankIpakYuliIntegration(ClientBase):
                 ],
             )
         )
+        if not getattr(add_response, "ok", False):
+            # контрагент из кэша мог быть удалён — следующий прогон найдёт его заново
+            await partners.forget(row, candidate.direction)
         payment_id = _result_new_id(add_response, "DocPayment/Add")
         if runtime.perform_after_create:
             perform_response = await api.docs.doc_payment.perform(
@@ -994,6 +1166,56 @@ class BankIpakYuliIntegration(ClientBase):
             return "performed"
         return "created"
 
+    async def _existing_payment_ids(
+        self,
+        api: RegosAPI,
+        runtime: RuntimeConfig,
+        operation_days: set[date],
+    ) -> Optional[set[str]]:
+        """
+        ID банковских платежей, уже загруженных за окно дат, одним постраничным запросом.
+
+        None — ответ не содержит значений доп. поля; тогда дубликаты проверяются построчно.
+        """
+        start_date = _day_bounds_ts(min(operation_days))[0]
+        end_date = _day_bounds_ts(max(operation_days))[1]
+        existing: set[str] = set()
+        offset = 0
+        expected = PAYMENT_ID_FIELD_KEY.lower()
+        while True:
+            response = await api.docs.doc_payment.get(
+                DocPaymentGetRequest(
+                    start_date=start_date,
+                    end_date=end_date,
+                    firm_ids=[runtime.firm_id],
+                    filters=[
+                        Filter(
+                            field=PAYMENT_ID_FIELD_KEY,
+                            operator=FilterOperator.Exists,
+                        )
+                    ],
+                    deleted_mark=False,
+                    limit=EXISTING_PAYMENTS_PAGE_LIMIT,
+                    offset=offset,
+                )
+            )
+            if not getattr(response, "ok", False):
+                raise BankIpakYuliError(111321, "DocPayment/Get by Ipak Yuli payment id failed")
+            rows = getattr(response, "result", None) or []
+            for payment in rows:
+                values = [
+                    _text(getattr(field, "value", None))
+                    for field in getattr(payment, "fields", None) or []
+                    if _text(getattr(field, "key", None)).lower() == expected
+                ]
+                if not any(values):
+                    return None
+                existing.update(value for value in values if value)
+            next_offset = _to_int(getattr(response, "next_offset", None), 0)
+            if not rows or next_offset <= offset:
+                return existing
+            offset = next_offset
+
     async def _payment_exists(
         self,
         api: RegosAPI,
@@ -1023,13 +1245,8 @@ class BankIpakYuliIntegration(ClientBase):
             raise BankIpakYuliError(111321, "DocPayment/Get by Ipak Yuli payment id failed")
         return bool(getattr(response, "result", None) or [])
 
-    async def _resolve_partner(
-        self,
-        api: RegosAPI,
-        runtime: RuntimeConfig,
-        row: Dict[str, Any],
-        direction: int,
-    ) -> int:
+    def _partner_identity(self, row: Dict[str, Any], direction: int) -> Tuple[str, str, str, str]:
+        """(inn, name, account, mfo) контрагента строки выписки."""
         inn = _counterparty_inn(row, direction)
         if direction == 2:
             name = _text(row.get("name_dt"), inn or "Ipak Yuli payer")
@@ -1039,7 +1256,18 @@ class BankIpakYuliIntegration(ClientBase):
             name = _text(row.get("name_ct"), inn or "Ipak Yuli recipient")
             account = _text(row.get("acc_ct"))
             mfo = _text(row.get("mfo_ct"))
+        return inn, name, account, mfo
 
+    async def _find_or_create_partner(
+        self,
+        api: RegosAPI,
+        runtime: RuntimeConfig,
+        *,
+        inn: str,
+        name: str,
+        account: str,
+        mfo: str,
+    ) -> int:
         search = inn or name
         response = await api.references.partner.get(
             PartnerGetRequest(
@@ -4,9 +4,10 @@ import asyncio
 import json
 import time
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import httpx
 from fastapi.encoders import jsonable_encoder
@@ -14,13 +15,16 @@ from fastapi.responses import JSONResponse
 
 from clients.base import ClientBase
 from config.settings import settings
+from core.api.http_pool import get_shared_http_client
 from core.api.regos_api import RegosAPI
 from core.logger import setup_logger
 from core.redis import (
     redis_error_contains,
+    redis_incr_with_ttl,
     redis_is_enabled,
     redis_make_key,
     redis_ops,
+    redis_sadd_with_ttl,
     redis_stream_add_with_ttl,
     redis_stream_ack_delete,
     redis_stream_group_create_with_ttl,
@@ -69,6 +73,12 @@ _STREAM_WORKER_LOCK = asyncio.Lock()
 _STREAM_GROUP_READY = False
 _STREAM_TTL_TOUCH_TS: Dict[str, int] = {}
 _STREAM_CLAIM_TS: Dict[str, int] = {}
+# (ci, firm_id) -> DidoxClient: сессия живёт между задачами (см. DidoxClient.create)
+_CLIENT_CACHE: Dict[Tuple[str, int], "DidoxClient"] = {}
+_CLIENT_LOCKS: Dict[Tuple[str, int], asyncio.Lock] = {}
+_CLIENT_REFRESH_TASKS: Dict[Tuple[str, int], asyncio.Task] = {}
+# ci -> (время проверки, версия настроек в Redis); см. DidoxClient._settings_version
+_SETTINGS_VERSIONS: Dict[str, Tuple[float, int]] = {}
 
 
 def _now_ts() -> int:
@@ -290,6 +300,9 @@ class DidoxClient:
         "DIDOX_PASSWORD",
     }
     DEFAULT_DOCUMENT_TYPES = "002,005,008,023"
+    TOKEN_REFRESH_MARGIN_SEC = 300
+    SETTINGS_VERSION_CHECK_SEC = 5
+    LIST_PAGE_LIMIT = 100
 
     def __init__(
         self,
@@ -301,6 +314,8 @@ class DidoxClient:
         access_token: str,
         base_url: str,
         locale: str,
+        token_expires_at: int = 0,
+        settings_version: int = 0,
     ) -> None:
         self.connected_integration_id = connected_integration_id
         self.firm_id = int(firm_id)
@@ -309,9 +324,28 @@ class DidoxClient:
         self.access_token = access_token
         self.base_url = base_url.rstrip("/")
         self.locale = locale
+        self.token_expires_at = int(token_expires_at or 0)
+        self.settings_version = int(settings_version or 0)
+        self.loaded_at = _now_ts()
+        self._token_lock = asyncio.Lock()
 
     @classmethod
-    async def create(cls, connected_integration_id: str, firm_id: int) -> "DidoxClient":
+    async def create(
+        cls,
+        connected_integration_id: str,
+        firm_id: int,
+        *,
+        refresh: bool = False,
+    ) -> "DidoxClient":
+        """
+        Сессия Didox для (ci, firm_id): фирма, настройки и токен.
+
+        Сессия кешируется в процессе на EDO_DIDOX_SESSION_TTL. Начиная с половины
+        TTL или при истекающем токене она перезагружается в фоне, а задачи
+        продолжают работать со старой. Смена настроек в любом процессе (invalidate)
+        поднимает версию настроек в Redis, и сессии со старой версией
+        перезагружаются. HTTP-запросы идут через общий keep-alive пул.
+        """
         ci = _text(connected_integration_id)
         if not ci:
             raise EdoDidoxError(112001, "connected_integration_id is required", 400)
@@ -319,6 +353,133 @@ class DidoxClient:
         if parsed_firm_id <= 0:
             raise EdoDidoxError(112002, "firm_id is required", 400)
 
+        key = (ci, parsed_firm_id)
+        settings_version = await cls._settings_version(ci)
+        client = _CLIENT_CACHE.get(key)
+        if client is not None and not refresh and client._is_fresh(settings_version):
+            if client._needs_refresh():
+                cls._schedule_refresh(key)
+            return client
+        lock = _CLIENT_LOCKS.setdefault(key, asyncio.Lock())
+        async with lock:
+            client = _CLIENT_CACHE.get(key)
+            if client is not None and not refresh and client._is_fresh(settings_version):
+                return client
+            client = await cls._load(ci, parsed_firm_id)
+            _CLIENT_CACHE[key] = client
+            return client
+
+    @classmethod
+    def forget(cls, connected_integration_id: str) -> None:
+        """Сбросить сессии подключения (смена настроек, отключение)."""
+        ci = _text(connected_integration_id)
+        for key in [key for key in _CLIENT_CACHE if key[0] == ci]:
+            _CLIENT_CACHE.pop(key, None)
+        for key in [key for key in _CLIENT_REFRESH_TASKS if key[0] == ci]:
+            task = _CLIENT_REFRESH_TASKS.pop(key, None)
+            if task is not None and not task.done():
+                task.cancel()
+
+    @classmethod
+    async def invalidate(cls, connected_integration_id: str) -> None:
+        """
+        Сбросить сессии и токены подключения во всех процессах.
+
+        Локальные сессии сбрасываются сразу. В Redis удаляются токены фирм
+        подключения и увеличивается версия настроек: остальные процессы
+        перезагружают сессии не позже SETTINGS_VERSION_CHECK_SEC, а токены
+        новой версии хранятся под другим ключом.
+        """
+        ci = _text(connected_integration_id)
+        firm_ids = {key[1] for key in _CLIENT_CACHE if key[0] == ci}
+        cls.forget(ci)
+        if not redis_is_enabled():
+            return
+        try:
+            firms_key = cls._token_firms_key(ci)
+            version_key = cls._settings_version_key(ci)
+            firm_ids.update(_to_int(item, 0) for item in await redis_ops.smembers(firms_key) or [])
+            version = _to_int(await redis_ops.get(version_key), 0)
+            token_keys = [cls._token_cache_key(ci, firm_id, version) for firm_id in firm_ids if firm_id > 0]
+            await redis_ops.delete(firms_key, *token_keys)
+            version = await redis_incr_with_ttl(version_key, cls._settings_version_ttl())
+            _SETTINGS_VERSIONS[ci] = (time.monotonic(), version)
+        except Exception as error:
+            logger.warning("Didox settings invalidation failed: ci=%s error=%s", ci, error)
+
+    @classmethod
+    def _settings_version_key(cls, connected_integration_id: str) -> str:
+        return redis_make_key("edo", "didox", "settings_version", connected_integration_id)
+
+    @classmethod
+    def _settings_version_ttl(cls) -> int:
+        # версия должна пережить токены и сессии, выданные по прежним настройкам
+        return max(int(settings.edo_didox_token_cache_ttl or 0), cls._session_ttl(), 60) * 2
+
+    @classmethod
+    async def _settings_version(cls, connected_integration_id: str) -> int:
+        """Версия настроек подключения из Redis, в процессе кешируется на SETTINGS_VERSION_CHECK_SEC."""
+        if not redis_is_enabled():
+            return 0
+        cached = _SETTINGS_VERSIONS.get(connected_integration_id)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < cls.SETTINGS_VERSION_CHECK_SEC:
+            return cached[1]
+        try:
+            version = _to_int(await redis_ops.get(cls._settings_version_key(connected_integration_id)), 0)
+        except Exception as error:
+            logger.debug("Didox settings version read failed: %s", error)
+            return cached[1] if cached is not None else 0
+        _SETTINGS_VERSIONS[connected_integration_id] = (now, version)
+        return version
+
+    @classmethod
+    def _session_ttl(cls) -> int:
+        return max(int(settings.edo_didox_session_ttl or 0), 0)
+
+    def _is_fresh(self, settings_version: int) -> bool:
+        if self.settings_version != settings_version:
+            return False
+        now = _now_ts()
+        if self.token_expires_at and now >= self.token_expires_at:
+            return False
+        return now - self.loaded_at < self._session_ttl()
+
+    def _needs_refresh(self) -> bool:
+        now = _now_ts()
+        if self.token_expires_at and self.token_expires_at - now <= self.TOKEN_REFRESH_MARGIN_SEC:
+            return True
+        return now - self.loaded_at >= self._session_ttl() // 2
+
+    @classmethod
+    def _schedule_refresh(cls, key: Tuple[str, int]) -> None:
+        task = _CLIENT_REFRESH_TASKS.get(key)
+        if task is not None and not task.done():
+            return
+        _CLIENT_REFRESH_TASKS[key] = asyncio.create_task(
+            cls._refresh(key),
+            name=f"edo_didox_session_{key[0]}_{key[1]}",
+        )
+
+    @classmethod
+    async def _refresh(cls, key: Tuple[str, int]) -> None:
+        try:
+            client = await cls._load(*key)
+            # сессию могли сбросить (смена настроек), пока шла загрузка
+            if key in _CLIENT_CACHE:
+                _CLIENT_CACHE[key] = client
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.warning("Didox session refresh failed: ci=%s firm_id=%s error=%s", key[0], key[1], error)
+        finally:
+            if _CLIENT_REFRESH_TASKS.get(key) is asyncio.current_task():
+                _CLIENT_REFRESH_TASKS.pop(key, None)
+
+    @classmethod
+    async def _load(cls, ci: str, parsed_firm_id: int) -> "DidoxClient":
+        # версию берем до загрузки настроек: если они сменятся во время загрузки, сессия устареет сразу
+        settings_version = await cls._settings_version(ci)
         async with RegosAPI(connected_integration_id=ci) as api:
             firm_response = await api.references.firm.get(
                 FirmGetRequest(ids=[parsed_firm_id], limit=1)
@@ -336,7 +497,9 @@ class DidoxClient:
         locale = _text(settings_map.get("DIDOX_LOCALE"), "ru").lower()
         if locale not in {"ru", "uz"}:
             locale = "ru"
-        access_token = await cls._get_access_token(ci, parsed_firm_id, firm, settings_map, base_url, locale)
+        access_token, token_expires_at = await cls._get_access_token(
+            ci, parsed_firm_id, firm, settings_map, base_url, locale, settings_version
+        )
         return cls(
             connected_integration_id=ci,
             firm_id=parsed_firm_id,
@@ -345,6 +508,8 @@ class DidoxClient:
             access_token=access_token,
             base_url=base_url,
             locale=locale,
+            token_expires_at=token_expires_at,
+            settings_version=settings_version,
         )
 
     @classmethod
@@ -377,8 +542,13 @@ class DidoxClient:
         return settings_map
 
     @classmethod
-    def _token_cache_key(cls, connected_integration_id: str, firm_id: int) -> str:
-        return redis_make_key("edo", "didox", "token", connected_integration_id, firm_id)
+    def _token_cache_key(cls, connected_integration_id: str, firm_id: int, settings_version: int = 0) -> str:
+        # токен привязан к версии настроек: после invalidate прежний логин не найдется даже при гонке записи
+        return redis_make_key("edo", "didox", "token", connected_integration_id, f"v{int(settings_version or 0)}", firm_id)
+
+    @classmethod
+    def _token_firms_key(cls, connected_integration_id: str) -> str:
+        return redis_make_key("edo", "didox", "token_firms", connected_integration_id)
 
     @classmethod
     async def _get_access_token(
@@ -389,8 +559,10 @@ class DidoxClient:
         settings_map: Dict[str, str],
         base_url: str,
         locale: str,
-    ) -> str:
-        cache_key = cls._token_cache_key(connected_integration_id, firm_id)
+        settings_version: int = 0,
+    ) -> Tuple[str, int]:
+        cache_key = cls._token_cache_key(connected_integration_id, firm_id, settings_version)
+        ttl = max(int(settings.edo_didox_token_cache_ttl or 0), 60)
         if redis_is_enabled():
             try:
                 cached = await redis_ops.get(cache_key)
@@ -398,7 +570,8 @@ class DidoxClient:
                     token_payload = _json_loads(cached)
                     token = _text(_ci_lookup(token_payload, "token"))
                     if token:
-                        return token
+                        expires_at = _to_int(_ci_lookup(token_payload, "expires_at"), 0)
+                        return token, expires_at or _now_ts() + ttl
             except Exception as error:
                 logger.debug("Didox token cache read failed: %s", error)
 
@@ -416,15 +589,15 @@ class DidoxClient:
         }
         url = f"{base_url.rstrip('/')}/v1/auth/{login_tax_id}/password/{locale}"
         try:
-            async with httpx.AsyncClient(timeout=30) as http_client:
-                response = await http_client.post(
-                    url,
-                    headers=headers,
-                    json={"password": settings_map["DIDOX_PASSWORD"]},
-                )
-                text = response.text
-                response.raise_for_status()
-                data = response.json()
+            response = await get_shared_http_client(base_url).post(
+                url,
+                headers=headers,
+                json={"password": settings_map["DIDOX_PASSWORD"]},
+                timeout=30,
+            )
+            text = response.text
+            response.raise_for_status()
+            data = response.json()
         except httpx.HTTPStatusError as error:
             body = _text(getattr(error.response, "text", ""))[:500]
             raise EdoDidoxError(
@@ -441,13 +614,14 @@ class DidoxClient:
         if login_tax_id != company_tax_id:
             token = await cls._login_company(base_url, partner_token, token, company_tax_id, locale)
 
+        expires_at = _now_ts() + ttl
         if redis_is_enabled():
-            ttl = max(int(settings.edo_didox_token_cache_ttl or 0), 60)
             try:
-                await redis_ops.setex(cache_key, ttl, _json_dumps({"token": token}))
+                await redis_ops.setex(cache_key, ttl, _json_dumps({"token": token, "expires_at": expires_at}))
+                await redis_sadd_with_ttl(cls._token_firms_key(connected_integration_id), str(firm_id), ttl)
             except Exception as error:
                 logger.debug("Didox token cache write failed: %s", error)
-        return token
+        return token, expires_at
 
     @classmethod
     async def _login_company(
@@ -465,11 +639,10 @@ class DidoxClient:
             "user-key": user_token,
         }
         try:
-            async with httpx.AsyncClient(timeout=30) as http_client:
-                response = await http_client.post(url, headers=headers)
-                text = response.text
-                response.raise_for_status()
-                data = response.json()
+            response = await get_shared_http_client(base_url).post(url, headers=headers, timeout=30)
+            text = response.text
+            response.raise_for_status()
+            data = response.json()
         except httpx.HTTPStatusError as error:
             body = _text(getattr(error.response, "text", ""))[:500]
             raise EdoDidoxError(
@@ -483,6 +656,27 @@ class DidoxClient:
             raise EdoDidoxError(112010, f"Didox company login response does not contain token: {text[:300]}")
         return token
 
+    async def _renew_token(self, stale_token: str) -> None:
+        async with self._token_lock:
+            if self.access_token != stale_token:
+                return
+            if redis_is_enabled():
+                try:
+                    await redis_ops.delete(
+                        self._token_cache_key(self.connected_integration_id, self.firm_id, self.settings_version)
+                    )
+                except Exception as error:
+                    logger.debug("Didox token cache reset failed: %s", error)
+            self.access_token, self.token_expires_at = await self._get_access_token(
+                self.connected_integration_id,
+                self.firm_id,
+                self.firm,
+                self.settings_map,
+                self.base_url,
+                self.locale,
+                self.settings_version,
+            )
+
     def _headers(self) -> Dict[str, str]:
         return {
             "Accept": "application/json",
@@ -505,20 +699,26 @@ class DidoxClient:
         json_body: Optional[Dict[str, Any]] = None,
     ) -> Any:
         url = f"{self.base_url}/{path.lstrip('/')}"
+        http_client = get_shared_http_client(self.base_url)
+        query = {k: v for k, v in (params or {}).items() if v is not None}
         try:
-            async with httpx.AsyncClient(timeout=90) as http_client:
+            token = self.access_token
+            response = await http_client.request(
+                method, url, headers=self._headers(), params=query, json=json_body, timeout=90
+            )
+            if response.status_code == 401:
+                # токен отозван или истёк раньше TTL кеша — один повтор с новым
+                await self._renew_token(token)
                 response = await http_client.request(
-                    method,
-                    url,
-                    headers=self._headers(),
-                    params={k: v for k, v in (params or {}).items() if v is not None},
-                    json=json_body,
+                    method, url, headers=self._headers(), params=query, json=json_body, timeout=90
                 )
-                text = response.text
-                response.raise_for_status()
-                if not text.strip():
-                    return {}
-                return response.json()
+            text = response.text
+            response.raise_for_status()
+            if not text.strip():
+                return {}
+            return response.json()
+        except EdoDidoxError:
+            raise
         except httpx.HTTPStatusError as error:
             body = _text(getattr(error.response, "text", ""))[:500]
             raise EdoDidoxError(
@@ -546,10 +746,7 @@ class DidoxClient:
             "owner": 0,
             "page": page,
             "limit": page_limit,
-            "doctype": _text(
-                self.settings_map.get("DIDOX_DOCUMENT_TYPES") or settings.didox_document_types,
-                self.DEFAULT_DOCUMENT_TYPES,
-            ),
+            "doctype": self.document_types(),
         }
         if start_date:
             params["docDateFromCreated"] = _format_date(start_date)
@@ -561,6 +758,46 @@ class DidoxClient:
         total = _to_int(_ci_lookup(payload, "total", "Total"), len(raw_documents))
         return [self._map_document_row(item) for item in raw_documents], total
 
+    def document_types(self) -> str:
+        return _text(
+            self.settings_map.get("DIDOX_DOCUMENT_TYPES") or settings.didox_document_types,
+            self.DEFAULT_DOCUMENT_TYPES,
+        )
+
+    async def list_documents(
+        self,
+        *,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None,
+        concurrency: int = 1,
+    ) -> List[Dict[str, Any]]:
+        """Все документы окна: первая страница даёт total, остальные грузятся параллельно."""
+        page_limit = self.LIST_PAGE_LIMIT
+        rows, total = await self.get_documents(
+            start_date=start_date,
+            end_date=end_date,
+            limit=page_limit,
+            offset=0,
+        )
+        if total <= len(rows) or len(rows) < page_limit:
+            return rows
+        semaphore = asyncio.Semaphore(max(int(concurrency), 1))
+
+        async def fetch(offset: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                page_rows, _ = await self.get_documents(
+                    start_date=start_date,
+                    end_date=end_date,
+                    limit=page_limit,
+                    offset=offset,
+                )
+                return page_rows
+
+        pages = await asyncio.gather(*(fetch(offset) for offset in range(page_limit, total, page_limit)))
+        for page_rows in pages:
+            rows.extend(page_rows)
+        return rows
+
     def _map_document_row(self, raw: Dict[str, Any]) -> Dict[str, Any]:
         doc_date = _ci_lookup(raw, "doc_date", "docDate", "document_date")
         external_id = _text(_ci_lookup(raw, "doc_id", "docId", "id"))
@@ -867,6 +1104,38 @@ class DidoxClient:
         )
 
 
+_ItemKey = Tuple[ItemMatchingType, str]
+
+
+@dataclass
+class _ImportResolution:
+    """
+    Общий кеш разрешения ссылок для пачки входящих документов одной фирмы.
+
+    Контрагент и договор с одинаковым ключом ищутся (и при необходимости
+    создаются) один раз на пачку; номенклатура импортируется и сопоставляется
+    одним Item/Import + Item/Match на тип сопоставления по всем документам.
+    """
+
+    invoices: Dict[str, int] = field(default_factory=dict)
+    items: Dict[_ItemKey, int] = field(default_factory=dict)
+    item_failures: Dict[_ItemKey, Any] = field(default_factory=dict)
+    items_task: Optional[asyncio.Task] = None
+    _pending: Dict[Tuple[Any, ...], asyncio.Task] = field(default_factory=dict)
+
+    async def once(self, key: Tuple[Any, ...], factory: Callable[[], Awaitable[int]]) -> int:
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._pending[key] = task
+        # shield: отмена одного документа не должна отменять общий поиск
+        return await asyncio.shield(task)
+
+    async def wait_items(self) -> None:
+        if self.items_task is not None:
+            await asyncio.shield(self.items_task)
+
+
 class EdoDidoxIntegration(ClientBase):
     integration_key = "edo_didox"
     REDIS_PREFIX = "edo:didox"
@@ -874,6 +1143,10 @@ class EdoDidoxIntegration(ClientBase):
     STREAM_READ_BLOCK_MS = 5000
     STREAM_MIN_IDLE_MS = 60_000
     STREAM_CLAIM_INTERVAL_SEC = 30
+    ITEM_BULK_CHUNK_SIZE = 1000
+    SYNC_DIRECTION_INCOMING = "incoming"
+    SYNC_INITIAL_WINDOW_SEC = 7 * 86400
+    SYNC_CURSOR_TTL_SEC = 90 * 86400
 
     @staticmethod
     def _redis_enabled() -> bool:
@@ -916,6 +1189,18 @@ class EdoDidoxIntegration(ClientBase):
     def _stream_retry_limit(cls) -> int:
         return max(int(settings.edo_didox_stream_retry_limit or 0), 1)
 
+    @classmethod
+    def _import_concurrency(cls) -> int:
+        return max(int(settings.edo_didox_import_concurrency or 0), 1)
+
+    @classmethod
+    def _export_batch_size(cls) -> int:
+        return max(int(settings.edo_didox_export_batch_size or 0), 1)
+
+    @classmethod
+    def _sync_concurrency(cls) -> int:
+        return max(int(settings.edo_didox_sync_concurrency or 0), 1)
+
     @staticmethod
     def _serialize_stream_fields(fields: Dict[str, Any]) -> Dict[str, str]:
         serialized: Dict[str, str] = {}
@@ -984,6 +1269,81 @@ class EdoDidoxIntegration(ClientBase):
             document_id,
         )
 
+    @classmethod
+    def _sync_cursor_key(
+        cls,
+        *,
+        connected_integration_id: str,
+        firm_id: int,
+        direction: str,
+        document_types: str,
+    ) -> str:
+        return redis_make_key(
+            cls.REDIS_PREFIX,
+            "cursor",
+            connected_integration_id,
+            firm_id,
+            direction,
+            document_types.replace(",", "-"),
+        )
+
+    @classmethod
+    async def _enqueue_export_group(
+        cls,
+        *,
+        connected_integration_id: str,
+        firm_id: int,
+        document_ids: List[str],
+    ) -> List[str]:
+        """
+        Одна задача stream на группу документов экспорта. Dedupe остаётся
+        по каждому документу: уже стоящие в очереди документы в группу не
+        попадают, для них возвращается id существующей задачи.
+        """
+        cls._require_redis()
+        message_id = uuid.uuid4().hex
+        keys = [
+            cls._dedupe_key(
+                connected_integration_id=connected_integration_id,
+                firm_id=firm_id,
+                action="export",
+                document_id=document_id,
+            )
+            for document_id in document_ids
+        ]
+        pipe = redis_ops.pipeline(transaction=False)
+        for key in keys:
+            pipe.set(key, message_id, ex=cls._stream_ttl(), nx=True)
+        created = await pipe.execute()
+
+        owned = [document_id for document_id, ok in zip(document_ids, created) if ok]
+        if owned:
+            payload = {
+                "connected_integration_id": connected_integration_id,
+                "action": "export",
+                "firm_id": str(firm_id),
+                "data": ",".join(owned),
+                "user_id": "0",
+                "attempt": "0",
+                "created_at": str(_now_ts()),
+            }
+            if len(owned) == 1:
+                # одиночная задача идёт обычным путём и снимает dedupe по полю
+                payload["dedupe_key"] = next(key for key, ok in zip(keys, created) if ok)
+            try:
+                await cls._enqueue_stream(payload, message_id=message_id)
+            except Exception:
+                await redis_ops.delete(*[key for key, ok in zip(keys, created) if ok])
+                raise
+
+        task_ids: List[str] = []
+        for key, ok in zip(keys, created):
+            if ok:
+                task_ids.append(message_id)
+            else:
+                task_ids.append(_text(await redis_ops.get(key), message_id))
+        return task_ids
+
     @classmethod
     async def _enqueue_unique_task(cls, fields: Dict[str, Any]) -> str:
         cls._require_redis()
@@ -1112,8 +1472,9 @@ class EdoDidoxIntegration(ClientBase):
                     last_claim_ts = int(_STREAM_CLAIM_TS.get(cls._stream_key()) or 0)
                     if now - last_claim_ts >= cls.STREAM_CLAIM_INTERVAL_SEC:
                         _STREAM_CLAIM_TS[cls._stream_key()] = now
-                        for entry_id, fields in await cls._process_claimed_entries(consumer):
-                            await cls._process_stream_entry(entry_id, fields)
+                        claimed = await cls._process_claimed_entries(consumer)
+                        if claimed:
+                            await cls._process_stream_entries(claimed)
 
                     try:
                         records = await redis_ops.xreadgroup(
@@ -1129,12 +1490,13 @@ class EdoDidoxIntegration(ClientBase):
                             continue
                         raise
 
-                    for _, entries in records or []:
-                        for entry_id, fields in entries or []:
-                            await cls._process_stream_entry(
-                                str(entry_id),
-                                fields if isinstance(fields, dict) else {},
-                            )
+                    batch = [
+                        (str(entry_id), fields if isinstance(fields, dict) else {})
+                        for _, entries in records or []
+                        for entry_id, fields in entries or []
+                    ]
+                    if batch:
+                        await cls._process_stream_entries(batch)
                 except asyncio.CancelledError:
                     raise
                 except Exception as error:
@@ -1150,6 +1512,44 @@ class EdoDidoxIntegration(ClientBase):
     def _stream_entry_attempt(cls, fields: Dict[str, Any]) -> int:
         return max(_to_int(fields.get("attempt"), 0), 0)
 
+    @classmethod
+    async def _process_stream_entries(cls, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        # Импорты одной фирмы из прочитанной пачки разрешают ссылки и создаются вместе
+        imports: Dict[Tuple[str, int], List[Tuple[str, Dict[str, Any]]]] = {}
+        for entry_id, fields in entries:
+            ci = _text(fields.get("connected_integration_id"))
+            firm_id = _to_int(fields.get("firm_id"), 0)
+            if ci and firm_id > 0 and _text(fields.get("action")) == "import" and _text(fields.get("data")):
+                imports.setdefault((ci, firm_id), []).append((entry_id, fields))
+                continue
+            await cls._process_stream_entry(entry_id, fields)
+
+        for (ci, firm_id), group in imports.items():
+            if len(group) == 1:
+                await cls._process_stream_entry(*group[0])
+                continue
+            await cls._process_import_batch(ci, firm_id, group)
+
+    @classmethod
+    async def _process_import_batch(
+        cls,
+        connected_integration_id: str,
+        firm_id: int,
+        entries: List[Tuple[str, Dict[str, Any]]],
+    ) -> None:
+        worker = cls()
+        worker.connected_integration_id = connected_integration_id
+        documents = [
+            (_text(fields.get("data")), _to_int(fields.get("user_id"), 0))
+            for _, fields in entries
+        ]
+        try:
+            errors = await worker._import_documents_batch(firm_id, documents)
+        except Exception as error:
+            errors = [error] * len(entries)
+        for (entry_id, fields), error in zip(entries, errors):
+            await cls._finish_stream_entry(entry_id, fields, error)
+
     @classmethod
     async def _process_stream_entry(cls, entry_id: str, fields: Dict[str, Any]) -> None:
         ci = _text(fields.get("connected_integration_id"))
@@ -1157,13 +1557,16 @@ class EdoDidoxIntegration(ClientBase):
         firm_id = _to_int(fields.get("firm_id"), 0)
         document_id = _text(fields.get("data"))
         user_id = _to_int(fields.get("user_id"), 0)
-        attempt = cls._stream_entry_attempt(fields)
 
         if not ci or action not in {"import", "export"} or firm_id <= 0 or not document_id:
             logger.warning("EDO Didox invalid stream entry: entry_id=%s fields=%s", entry_id, fields)
             await cls._ack_stream_entry(entry_id)
             return
 
+        if action == "export" and "," in document_id:
+            await cls._process_export_batch(entry_id, fields)
+            return
+
         worker = cls()
         worker.connected_integration_id = ci
         try:
@@ -1173,31 +1576,96 @@ class EdoDidoxIntegration(ClientBase):
                 firm_id=firm_id,
                 user_id=user_id,
             )
-            await cls._release_dedupe(fields)
-            await cls._ack_stream_entry(entry_id)
-        except EdoDidoxNonRetryableError as error:
-            await cls._move_to_dlq(entry_id, fields, error, attempt + 1)
-            await cls._ack_stream_entry(entry_id)
         except Exception as error:
-            next_attempt = attempt + 1
-            if next_attempt >= cls._stream_retry_limit():
-                await cls._move_to_dlq(entry_id, fields, error, next_attempt)
-                await cls._ack_stream_entry(entry_id)
-                return
+            await cls._finish_stream_entry(entry_id, fields, error)
+            return
+        await cls._finish_stream_entry(entry_id, fields, None)
+
+    @classmethod
+    async def _process_export_batch(cls, entry_id: str, fields: Dict[str, Any]) -> None:
+        ci = _text(fields.get("connected_integration_id"))
+        firm_id = _to_int(fields.get("firm_id"), 0)
+        document_ids = [doc_id for doc_id in _text(fields.get("data")).split(",") if doc_id]
+        worker = cls()
+        worker.connected_integration_id = ci
+        try:
+            errors = await worker._export_documents_batch(document_ids, firm_id)
+        except Exception as error:
+            errors = [error] * len(document_ids)
+
+        next_attempt = cls._stream_entry_attempt(fields) + 1
+        retry_ids: List[str] = []
+        for document_id, error in zip(document_ids, errors):
+            # исход считается по документу; dedupe-ключ у каждого свой
+            document_fields = dict(fields)
+            document_fields["data"] = document_id
+            document_fields["dedupe_key"] = cls._dedupe_key(
+                connected_integration_id=ci,
+                firm_id=firm_id,
+                action="export",
+                document_id=document_id,
+            )
+            if error is None:
+                await cls._release_dedupe(document_fields)
+            elif isinstance(error, EdoDidoxNonRetryableError) or next_attempt >= cls._stream_retry_limit():
+                await cls._move_to_dlq(entry_id, document_fields, error, next_attempt)
+            else:
+                retry_ids.append(document_id)
+                logger.warning(
+                    "EDO Didox job requeued: ci=%s action=export doc=%s attempt=%s error=%s",
+                    ci,
+                    document_id,
+                    next_attempt,
+                    error,
+                )
+        if retry_ids:
             retry_fields = dict(fields)
+            retry_fields["data"] = ",".join(retry_ids)
+            if len(retry_ids) == 1:
+                retry_fields["dedupe_key"] = cls._dedupe_key(
+                    connected_integration_id=ci,
+                    firm_id=firm_id,
+                    action="export",
+                    document_id=retry_ids[0],
+                )
             retry_fields["attempt"] = str(next_attempt)
-            retry_fields["last_error"] = str(error)
+            retry_fields["last_error"] = "; ".join(
+                str(error) for error in errors if error is not None
+            )[:1000]
             retry_fields["created_at"] = str(_now_ts())
             await cls._enqueue_stream(retry_fields)
+        await cls._ack_stream_entry(entry_id)
+
+    @classmethod
+    async def _finish_stream_entry(
+        cls,
+        entry_id: str,
+        fields: Dict[str, Any],
+        error: Optional[Exception],
+    ) -> None:
+        if error is None:
+            await cls._release_dedupe(fields)
             await cls._ack_stream_entry(entry_id)
-            logger.warning(
-                "EDO Didox job requeued: ci=%s action=%s doc=%s attempt=%s error=%s",
-                ci,
-                action,
-                document_id,
-                next_attempt,
-                error,
-            )
+            return
+        next_attempt = cls._stream_entry_attempt(fields) + 1
+        if isinstance(error, EdoDidoxNonRetryableError) or next_attempt >= cls._stream_retry_limit():
+            await cls._move_to_dlq(entry_id, fields, error, next_attempt)
+            await cls._ack_stream_entry(entry_id)
+            return
+        retry_fields = dict(fields)
+        retry_fields["attempt"] = str(next_attempt)
+        retry_fields["last_error"] = str(error)
+        retry_fields["created_at"] = str(_now_ts())
+        await cls._enqueue_stream(retry_fields)
+        await cls._ack_stream_entry(entry_id)
+        logger.warning(
+            "EDO Didox job requeued: ci=%s action=%s doc=%s attempt=%s error=%s",
+            _text(fields.get("connected_integration_id")),
+            _text(fields.get("action")),
+            _text(fields.get("data")),
+            next_attempt,
+            error,
+        )
 
     @classmethod
     async def _move_to_dlq(
@@ -1258,18 +1726,21 @@ class EdoDidoxIntegration(ClientBase):
         }
 
     async def disconnect(self, **kwargs) -> Dict[str, Any]:
+        await DidoxClient.invalidate(self._ci())
         return {"status": "disconnected", "connected_integration_id": self._ci()}
 
     async def reconnect(self, **kwargs) -> Dict[str, Any]:
+        await DidoxClient.invalidate(self._ci())
         return await self.connect(**kwargs)
 
     async def update_settings(self, **kwargs) -> Dict[str, Any]:
+        await DidoxClient.invalidate(self._ci())
         return {"status": "settings updated", "connected_integration_id": self._ci()}
 
     async def check(self, firm_id: Optional[int] = None, **kwargs) -> Dict[str, Any]:
         await self._ensure_active_integration()
         if firm_id:
-            await DidoxClient.create(self._ci(), int(firm_id))
+            await DidoxClient.create(self._ci(), int(firm_id), refresh=True)
         return {"status": "ok", "connected_integration_id": self._ci()}
 
     async def handle_webhook(self, data: Optional[Dict] = None, **kwargs) -> Dict[str, Any]:
@@ -1367,30 +1838,29 @@ class EdoDidoxIntegration(ClientBase):
             }
         )
 
-    async def export_documents(
+    async def import_documents(
         self,
         ids: Optional[List[Any]] = None,
-        messages: Optional[List[Any]] = None,
         firm_id: Optional[int] = None,
+        user_id: Optional[int] = None,
         **kwargs,
     ) -> Optional[Dict[str, Any]]:
-        raw_ids = ids if ids is not None else messages
-        if not isinstance(raw_ids, list) or not raw_ids:
-            raise EdoDidoxError(112033, "ids are required", 400)
+        if not isinstance(ids, list) or not ids:
+            raise EdoDidoxError(112049, "ids are required", 400)
         if _to_int(firm_id, 0) <= 0:
-            raise EdoDidoxError(112034, "firm_id is required", 400)
+            raise EdoDidoxError(112050, "firm_id is required", 400)
         await self._ensure_active_integration()
         await self._ensure_stream_workers()
         task_ids: List[str] = []
-        for doc_id in raw_ids:
+        for doc_id in ids:
             task_ids.append(
                 await self._enqueue_unique_task(
                     {
                         "connected_integration_id": self._ci(),
-                        "action": "export",
+                        "action": "import",
                         "firm_id": str(int(firm_id or 0)),
                         "data": _text(doc_id),
-                        "user_id": "0",
+                        "user_id": str(_to_int(user_id, 0)),
                         "attempt": "0",
                         "created_at": str(_now_ts()),
                     }
@@ -1398,6 +1868,93 @@ class EdoDidoxIntegration(ClientBase):
             )
         return {"queued": len(task_ids), "task_ids": task_ids}
 
+    async def export_documents(
+        self,
+        ids: Optional[List[Any]] = None,
+        messages: Optional[List[Any]] = None,
+        firm_id: Optional[int] = None,
+        **kwargs,
+    ) -> Optional[Dict[str, Any]]:
+        raw_ids = ids if ids is not None else messages
+        if not isinstance(raw_ids, list) or not raw_ids:
+            raise EdoDidoxError(112033, "ids are required", 400)
+        if _to_int(firm_id, 0) <= 0:
+            raise EdoDidoxError(112034, "firm_id is required", 400)
+        await self._ensure_active_integration()
+        await self._ensure_stream_workers()
+        document_ids = list(dict.fromkeys(_text(doc_id) for doc_id in raw_ids if _text(doc_id)))
+        batch_size = self._export_batch_size()
+        task_ids: List[str] = []
+        for start in range(0, len(document_ids), batch_size):
+            task_ids.extend(
+                await self._enqueue_export_group(
+                    connected_integration_id=self._ci(),
+                    firm_id=int(firm_id or 0),
+                    document_ids=document_ids[start:start + batch_size],
+                )
+            )
+        return {"queued": len(task_ids), "task_ids": task_ids}
+
+    async def sync_documents(
+        self,
+        firm_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        start_date: Optional[int] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Инкрементальный импорт входящих документов.
+
+        Курсор в Redis хранит время создания последнего поставленного в очередь
+        документа и id документов с этим временем. Список запрашивается только
+        с даты курсора (Didox фильтрует по дню), страницы окна грузятся
+        параллельно, новыми считаются документы позже курсора. Курсор двигается
+        только после постановки импорта в очередь; повторный импорт отсекается
+        по external_code.
+        """
+        if _to_int(firm_id, 0) <= 0:
+            raise EdoDidoxError(112051, "firm_id is required", 400)
+        parsed_firm_id = int(firm_id or 0)
+        self._require_redis()
+        await self._ensure_active_integration()
+        provider = await DidoxClient.create(self._ci(), parsed_firm_id)
+        cursor_key = self._sync_cursor_key(
+            connected_integration_id=self._ci(),
+            firm_id=parsed_firm_id,
+            direction=self.SYNC_DIRECTION_INCOMING,
+            document_types=provider.document_types(),
+        )
+        cursor = _json_loads(await redis_ops.get(cursor_key)) or {}
+        cursor_ts = _to_int(cursor.get("ts"), 0) if isinstance(cursor, dict) else 0
+        cursor_ids = set(cursor.get("ids") or []) if isinstance(cursor, dict) else set()
+        window_start = cursor_ts or _to_int(start_date, 0) or _now_ts() - self.SYNC_INITIAL_WINDOW_SEC
+
+        rows = await provider.list_documents(
+            start_date=window_start,
+            concurrency=self._sync_concurrency(),
+        )
+        fresh: Dict[str, int] = {}
+        for row in rows:
+            doc_id = _text(row.get("external_id") or row.get("id"))
+            created_ts = _parse_date_to_unix(row.get("create_date"), _to_int(row.get("date"), 0))
+            if not doc_id or created_ts < cursor_ts or (created_ts == cursor_ts and doc_id in cursor_ids):
+                continue
+            fresh[doc_id] = created_ts
+        if not fresh:
+            return {"queued": 0, "task_ids": [], "cursor": cursor_ts}
+
+        queued = await self.import_documents(ids=list(fresh), firm_id=parsed_firm_id, user_id=user_id)
+        next_ts = max(fresh.values())
+        next_ids = [doc_id for doc_id, created_ts in fresh.items() if created_ts == next_ts]
+        if next_ts == cursor_ts:
+            next_ids.extend(cursor_ids)
+        await redis_ops.setex(
+            cursor_key,
+            self.SYNC_CURSOR_TTL_SEC,
+            _json_dumps({"ts": next_ts, "ids": sorted(set(next_ids))}),
+        )
+        return {**(queued or {}), "cursor": next_ts}
+
     async def _process_task(
         self,
         *,
@@ -1428,6 +1985,130 @@ class EdoDidoxIntegration(ClientBase):
             return
         raise EdoDidoxError(112035, f"Unsupported EDO action: {action}", 400)
 
+    async def _import_documents_batch(
+        self,
+        firm_id: int,
+        documents: List[Tuple[str, int]],
+    ) -> List[Optional[Exception]]:
+        """
+        Импорт пачки входящих документов одной фирмы.
+
+        Содержимое документов загружается из Didox параллельно, ссылки
+        (существующие счета, контрагенты, договоры, номенклатура) разрешаются
+        через общий _ImportResolution, документы создаются параллельно в одной
+        сессии RegosAPI с объединением запросов в batch. Возвращает ошибку
+        (или None) для каждого документа в исходном порядке.
+        """
+        ci = self._ci()
+        provider = await DidoxClient.create(ci, firm_id)
+        semaphore = asyncio.Semaphore(self._import_concurrency())
+
+        async def fetch(document_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await provider.get_document_content(document_id, owner=0)
+
+        contents = await asyncio.gather(
+            *(fetch(document_id) for document_id, _ in documents),
+            return_exceptions=True,
+        )
+        errors: List[Optional[Exception]] = [
+            content if isinstance(content, Exception) else None for content in contents
+        ]
+        pending = [
+            (position, contents[position], user_id)
+            for position, (_, user_id) in enumerate(documents)
+            if errors[position] is None
+        ]
+        if not pending:
+            return errors
+
+        resolution = _ImportResolution()
+
+        async def find_invoice(document: Dict[str, Any]) -> None:
+            external_id = _text(document.get("external_id") or document.get("id"))
+            resolution.invoices[external_id] = await self._find_imported_invoice_id(
+                api,
+                firm_id=firm_id,
+                external_id=external_id,
+            )
+
+        async def import_one(document: Dict[str, Any], user_id: int) -> int:
+            async with semaphore:
+                return await self._import_document_to_regos(
+                    api,
+                    document,
+                    firm_id=firm_id,
+                    user_id=user_id,
+                    connected_integration_id=ci,
+                    resolution=resolution,
+                )
+
+        async with RegosAPI(connected_integration_id=ci) as api:
+            async with api.batched():
+                # ошибка поиска не фатальна: документ повторит его сам
+                await asyncio.gather(
+                    *(find_invoice(document) for _, document, _ in pending),
+                    return_exceptions=True,
+                )
+                # номенклатуру импортируем только для ещё не загруженных документов
+                new_documents = [
+                    document
+                    for _, document, _ in pending
+                    if resolution.invoices.get(_text(document.get("external_id") or document.get("id")), 0) <= 0
+                ]
+                resolution.items_task = asyncio.create_task(
+                    self._prefetch_items(api, resolution, new_documents)
+                )
+                try:
+                    results = await asyncio.gather(
+                        *(import_one(document, user_id) for _, document, user_id in pending),
+                        return_exceptions=True,
+                    )
+                finally:
+                    await resolution.items_task
+        for (position, _, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                errors[position] = result
+        return errors
+
+    async def _prefetch_items(
+        self,
+        api: RegosAPI,
+        resolution: _ImportResolution,
+        documents: List[Dict[str, Any]],
+    ) -> None:
+        # одна строка импорта на уникальное значение сопоставления по всей пачке
+        unique: Dict[_ItemKey, Dict[str, Any]] = {}
+        for document in documents:
+            for operation in document.get("operations") or []:
+                try:
+                    key = self._operation_matching_value(operation)
+                except EdoDidoxError:
+                    continue
+                if key not in unique:
+                    unique[key] = dict(operation, index=str(len(unique)))
+
+        keys = list(unique)
+        for start in range(0, len(keys), self.ITEM_BULK_CHUNK_SIZE):
+            chunk = keys[start:start + self.ITEM_BULK_CHUNK_SIZE]
+            operations = [unique[key] for key in chunk]
+            keys_by_index = {operation["index"]: key for key, operation in zip(chunk, operations)}
+            try:
+                failed_rows = await self._import_items(api, operations)
+                matches = await self._match_items(api, operations)
+            except Exception as error:
+                # значения останутся неразрешёнными — документы сопоставят их сами
+                logger.warning("EDO Didox bulk item resolution failed: rows=%s error=%s", len(chunk), error)
+                continue
+            for row in failed_rows:
+                key = keys_by_index.get(_text(getattr(row, "index", "")))
+                if key is not None:
+                    resolution.item_failures[key] = row
+            for index, item_id in matches.items():
+                key = keys_by_index.get(index)
+                if key is not None and key not in resolution.item_failures:
+                    resolution.items[key] = item_id
+
     async def _import_document_to_regos(
         self,
         api: RegosAPI,
@@ -1436,21 +2117,35 @@ class EdoDidoxIntegration(ClientBase):
         firm_id: int,
         user_id: int,
         connected_integration_id: str,
+        resolution: Optional[_ImportResolution] = None,
     ) -> int:
         doc_id = 0
         try:
             external_id = _text(document.get("external_id") or document.get("id"))
             roaming_id = _text(document.get("roaming_id"))
-            existing_doc_id = await self._find_imported_invoice_id(
-                api,
-                firm_id=firm_id,
-                external_id=external_id,
-            )
+            if resolution is not None and external_id in resolution.invoices:
+                existing_doc_id = resolution.invoices[external_id]
+            else:
+                existing_doc_id = await self._find_imported_invoice_id(
+                    api,
+                    firm_id=firm_id,
+                    external_id=external_id,
+                )
             if existing_doc_id > 0:
                 return existing_doc_id
 
-            partner_id = await self._resolve_partner(api, document)
-            contract_id = await self._resolve_contract(api, document, firm_id, partner_id)
+            if resolution is None:
+                partner_id = await self._resolve_partner(api, document)
+                contract_id = await self._resolve_contract(api, document, firm_id, partner_id)
+            else:
+                partner_id = await resolution.once(
+                    ("partner", self._partner_key(document)),
+                    lambda: self._resolve_partner(api, document),
+                )
+                contract_id = await resolution.once(
+                    ("contract", partner_id, self._contract_name(document)),
+                    lambda: self._resolve_contract(api, document, firm_id, partner_id),
+                )
             invoice_kwargs = {
                 "date": _parse_date_to_unix(document.get("date")),
                 "contract_id": contract_id,
@@ -1479,7 +2174,12 @@ class EdoDidoxIntegration(ClientBase):
                     roaming_id=roaming_id or None,
                 )
             )
-            await self._import_and_add_operations(api, doc_id, document.get("operations") or [])
+            await self._import_and_add_operations(
+                api,
+                doc_id,
+                document.get("operations") or [],
+                resolution=resolution,
+            )
             await api.docs.doc_invoice.set_status(
                 DocInvoiceSetStatusRequest(
                     document_id=doc_id,
@@ -1524,6 +2224,17 @@ class EdoDidoxIntegration(ClientBase):
                 return invoice_id
         return 0
 
+    @staticmethod
+    def _partner_key(document: Dict[str, Any]) -> str:
+        partner_inn = _digits(document.get("partner_inn"))
+        if partner_inn:
+            return partner_inn
+        return "name:" + _text(document.get("partner_name"), "Unknown partner")
+
+    @staticmethod
+    def _contract_name(document: Dict[str, Any]) -> str:
+        return _text(document.get("contract"), _text(document.get("id"), "EDO"))
+
     async def _resolve_partner(self, api: RegosAPI, document: Dict[str, Any]) -> int:
         partner_inn = _digits(document.get("partner_inn"))
         partner_name = _text(document.get("partner_name"), partner_inn or "Unknown partner")
@@ -1562,7 +2273,7 @@ class EdoDidoxIntegration(ClientBase):
         firm_id: int,
         partner_id: int,
     ) -> int:
-        contract_name = _text(document.get("contract"), _text(document.get("id"), "EDO"))
+        contract_name = self._contract_name(document)
         response = await api.docs.doc_contract.get_short(
             DocContractGetRequest(
                 direction=ContractDirection.Income,
@@ -1607,18 +2318,33 @@ class EdoDidoxIntegration(ClientBase):
         api: RegosAPI,
         document_id: int,
         operations: List[Dict[str, Any]],
+        *,
+        resolution: Optional[_ImportResolution] = None,
     ) -> None:
         if not operations:
             raise EdoDidoxError(112037, "Document operations are empty", 400)
-        groups = self._build_item_import_groups(operations)
-        for matching_type, import_request in groups:
-            response = await api.references.item.import_items(import_request)
-            _ensure_api_ok(response, f"Item/Import {matching_type.value}")
-            failed_rows = [row for row in response.result or [] if getattr(row, "success", None) is False]
+        matches: Dict[str, int] = {}
+        unresolved = operations
+        if resolution is not None:
+            await resolution.wait_items()
+            unresolved = []
+            failed_rows: List[Any] = []
+            for operation in operations:
+                key = self._operation_matching_value(operation)
+                if key in resolution.item_failures:
+                    failed_rows.append(resolution.item_failures[key])
+                elif key in resolution.items:
+                    matches[_text(operation.get("index"))] = resolution.items[key]
+                else:
+                    unresolved.append(operation)
             if failed_rows:
                 raise EdoDidoxError(112038, f"Item import failed: {failed_rows}", 400)
 
-        matches = await self._match_items(api, operations)
+        if unresolved:
+            failed_rows = await self._import_items(api, unresolved)
+            if failed_rows:
+                raise EdoDidoxError(112038, f"Item import failed: {failed_rows}", 400)
+            matches.update(await self._match_items(api, unresolved))
         missing = [row["index"] for row in operations if _text(row.get("index")) not in matches]
         if missing:
             raise EdoDidoxError(112039, f"Items were not matched: {', '.join(missing)}", 400)
@@ -1640,6 +2366,16 @@ class EdoDidoxIntegration(ClientBase):
         finally:
             await api.docs.doc_invoice.unlock(IDRequest(id=document_id))
 
+    async def _import_items(self, api: RegosAPI, operations: List[Dict[str, Any]]) -> List[Any]:
+        failed_rows: List[Any] = []
+        for matching_type, import_request in self._build_item_import_groups(operations):
+            response = await api.references.item.import_items(import_request)
+            _ensure_api_ok(response, f"Item/Import {matching_type.value}")
+            failed_rows.extend(
+                row for row in response.result or [] if getattr(row, "success", None) is False
+            )
+        return failed_rows
+
     def _build_item_import_groups(
         self,
         operations: List[Dict[str, Any]],
@@ -1737,61 +2473,105 @@ class EdoDidoxIntegration(ClientBase):
         if document_id <= 0:
             raise EdoDidoxError(112042, "document_id is required", 400)
         async with RegosAPI(connected_integration_id=connected_integration_id) as api:
-            document = await api.docs.doc_invoice.get_by_id(document_id)
-            if not document:
-                raise EdoDidoxNonRetryableError(112043, f"DocInvoice {document_id} was not found", 404)
-            try:
-                if _text(getattr(document, "external_code", None)) and (
-                    _model_enum_value(getattr(document, "status", None)).lower()
-                    in {
-                        DocInvoiceStatus.InSentProgress.value.lower(),
-                        DocInvoiceStatus.Sent.value.lower(),
-                    }
-                ):
-                    return
-                await self._validate_export_document(document)
-                await api.docs.doc_invoice.set_status(
-                    DocInvoiceSetStatusRequest(
-                        document_id=document_id,
-                        status=DocInvoiceStatus.InSentProgress,
-                    )
+            await self._export_invoice(
+                api,
+                document_id=document_id,
+                firm_id=firm_id,
+                connected_integration_id=connected_integration_id,
+            )
+
+    async def _export_documents_batch(
+        self,
+        document_ids: List[str],
+        firm_id: int,
+    ) -> List[Optional[Exception]]:
+        """Экспорт группы документов в одной сессии RegosAPI; ошибка (или None) на документ."""
+        ci = self._ci()
+        semaphore = asyncio.Semaphore(self._import_concurrency())
+
+        async def export_one(raw_id: str) -> None:
+            document_id = _to_int(raw_id, 0)
+            if document_id <= 0:
+                raise EdoDidoxNonRetryableError(112042, "document_id is required", 400)
+            async with semaphore:
+                await self._export_invoice(
+                    api,
+                    document_id=document_id,
+                    firm_id=firm_id,
+                    connected_integration_id=ci,
                 )
-                operations_response = await api.docs.invoice_operation.get(
-                    InvoiceOperationGetRequest(document_ids=[document_id])
+
+        async with RegosAPI(connected_integration_id=ci) as api:
+            async with api.batched():
+                results = await asyncio.gather(
+                    *(export_one(document_id) for document_id in document_ids),
+                    return_exceptions=True,
                 )
-                _ensure_api_ok(operations_response, "InvoiceOperation/Get")
-                operations = operations_response.result or []
-                if not operations:
-                    raise EdoDidoxNonRetryableError(
-                        112048,
-                        f"DocInvoice {document_id} does not contain operations",
-                        400,
-                    )
-                provider = await DidoxClient.create(connected_integration_id, firm_id)
-                external_id = await provider.create_invoice_draft(document, operations)
-                await api.docs.doc_invoice.set_external_data(
-                    DocInvoiceSetExternalDataRequest(
-                        document_id=document_id,
-                        connected_integration_id=connected_integration_id,
-                        external_id=external_id,
-                    )
+        return [result if isinstance(result, Exception) else None for result in results]
+
+    async def _export_invoice(
+        self,
+        api: RegosAPI,
+        *,
+        document_id: int,
+        firm_id: int,
+        connected_integration_id: str,
+    ) -> None:
+        document = await api.docs.doc_invoice.get_by_id(document_id)
+        if not document:
+            raise EdoDidoxNonRetryableError(112043, f"DocInvoice {document_id} was not found", 404)
+        try:
+            if _text(getattr(document, "external_code", None)) and (
+                _model_enum_value(getattr(document, "status", None)).lower()
+                in {
+                    DocInvoiceStatus.InSentProgress.value.lower(),
+                    DocInvoiceStatus.Sent.value.lower(),
+                }
+            ):
+                return
+            await self._validate_export_document(document)
+            await api.docs.doc_invoice.set_status(
+                DocInvoiceSetStatusRequest(
+                    document_id=document_id,
+                    status=DocInvoiceStatus.InSentProgress,
                 )
-            except EdoDidoxNonRetryableError as error:
-                await self._set_invoice_error(
-                    api,
-                    document_id,
-                    DocInvoiceStatus.ErrorSent,
-                    error.description,
+            )
+            operations_response = await api.docs.invoice_operation.get(
+                InvoiceOperationGetRequest(document_ids=[document_id])
+            )
+            _ensure_api_ok(operations_response, "InvoiceOperation/Get")
+            operations = operations_response.result or []
+            if not operations:
+                raise EdoDidoxNonRetryableError(
+                    112048,
+                    f"DocInvoice {document_id} does not contain operations",
+                    400,
                 )
-                raise
-            except Exception as error:
-                await self._set_invoice_error(
-                    api,
-                    document_id,
-                    DocInvoiceStatus.ErrorSent,
-                    str(error),
+            provider = await DidoxClient.create(connected_integration_id, firm_id)
+            external_id = await provider.create_invoice_draft(document, operations)
+            await api.docs.doc_invoice.set_external_data(
+                DocInvoiceSetExternalDataRequest(
+                    document_id=document_id,
+                    connected_integration_id=connected_integration_id,
+                    external_id=external_id,
                 )
-                raise EdoDidoxNonRetryableError(112044, str(error)) from error
+            )
+        except EdoDidoxNonRetryableError as error:
+            await self._set_invoice_error(
+                api,
+                document_id,
+                DocInvoiceStatus.ErrorSent,
+                error.description,
+            )
+            raise
+        except Exception as error:
+            await self._set_invoice_error(
+                api,
+                document_id,
+                DocInvoiceStatus.ErrorSent,
+                str(error),
+            )
+            raise EdoDidoxNonRetryableError(112044, str(error)) from error
 
     async def _validate_export_document(self, document: DocInvoice) -> None:
         if getattr(document, "performed", None) is False:
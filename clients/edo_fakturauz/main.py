@@ -14,13 +14,16 @@ from fastapi.responses import JSONResponse
 
 from clients.base import ClientBase
 from config.settings import settings
+from core.api.http_pool import get_shared_http_client
 from core.api.regos_api import RegosAPI
 from core.logger import setup_logger
 from core.redis import (
     redis_error_contains,
+    redis_incr_with_ttl,
     redis_is_enabled,
     redis_make_key,
     redis_ops,
+    redis_sadd_with_ttl,
     redis_stream_add_with_ttl,
     redis_stream_ack_delete,
     redis_stream_group_create_with_ttl,
@@ -69,6 +72,12 @@ _STREAM_WORKER_LOCK = asyncio.Lock()
 _STREAM_GROUP_READY = False
 _STREAM_TTL_TOUCH_TS: Dict[str, int] = {}
 _STREAM_CLAIM_TS: Dict[str, int] = {}
+# (ci, firm_id) -> FakturaUzClient: сессия живёт между задачами (см. FakturaUzClient.create)
+_CLIENT_CACHE: Dict[Tuple[str, int], "FakturaUzClient"] = {}
+_CLIENT_LOCKS: Dict[Tuple[str, int], asyncio.Lock] = {}
+_CLIENT_REFRESH_TASKS: Dict[Tuple[str, int], asyncio.Task] = {}
+# ci -> (время проверки, версия настроек в Redis); см. FakturaUzClient._settings_version
+_SETTINGS_VERSIONS: Dict[str, Tuple[float, int]] = {}
 
 
 def _now_ts() -> int:
@@ -276,6 +285,8 @@ class FakturaUzClient:
         "FAKTURA_UZ_PASSWORD",
         "FAKTURA_UZ_PRIVATE_KEY",
     }
+    TOKEN_REFRESH_MARGIN_SEC = 60
+    SETTINGS_VERSION_CHECK_SEC = 5
 
     def __init__(
         self,
@@ -286,6 +297,8 @@ class FakturaUzClient:
         settings_map: Dict[str, str],
         access_token: str,
         token_type: str = "Bearer",
+        token_expires_at: int = 0,
+        settings_version: int = 0,
     ) -> None:
         self.connected_integration_id = connected_integration_id
         self.firm_id = int(firm_id)
@@ -293,9 +306,28 @@ class FakturaUzClient:
         self.settings_map = settings_map
         self.access_token = access_token
         self.token_type = token_type or "Bearer"
+        self.token_expires_at = int(token_expires_at or 0)
+        self.settings_version = int(settings_version or 0)
+        self.loaded_at = _now_ts()
+        self._token_lock = asyncio.Lock()
 
     @classmethod
-    async def create(cls, connected_integration_id: str, firm_id: int) -> "FakturaUzClient":
+    async def create(
+        cls,
+        connected_integration_id: str,
+        firm_id: int,
+        *,
+        refresh: bool = False,
+    ) -> "FakturaUzClient":
+        """
+        Сессия Faktura.uz для (ci, firm_id): фирма, настройки и токен.
+
+        Сессия кешируется в процессе на EDO_FAKTURAUZ_SESSION_TTL. Начиная с
+        половины TTL или за TOKEN_REFRESH_MARGIN_SEC до истечения токена она
+        перезагружается в фоне. Смена настроек в любом процессе (invalidate)
+        поднимает версию настроек в Redis, и сессии со старой версией
+        перезагружаются. HTTP-запросы идут через общий keep-alive пул.
+        """
         ci = _text(connected_integration_id)
         if not ci:
             raise EdoFakturaUzError(111001, "connected_integration_id is required", 400)
@@ -303,6 +335,133 @@ class FakturaUzClient:
         if parsed_firm_id <= 0:
             raise EdoFakturaUzError(111002, "firm_id is required", 400)
 
+        key = (ci, parsed_firm_id)
+        settings_version = await cls._settings_version(ci)
+        client = _CLIENT_CACHE.get(key)
+        if client is not None and not refresh and client._is_fresh(settings_version):
+            if client._needs_refresh():
+                cls._schedule_refresh(key)
+            return client
+        lock = _CLIENT_LOCKS.setdefault(key, asyncio.Lock())
+        async with lock:
+            client = _CLIENT_CACHE.get(key)
+            if client is not None and not refresh and client._is_fresh(settings_version):
+                return client
+            client = await cls._load(ci, parsed_firm_id)
+            _CLIENT_CACHE[key] = client
+            return client
+
+    @classmethod
+    def forget(cls, connected_integration_id: str) -> None:
+        """Сбросить сессии подключения (смена настроек, отключение)."""
+        ci = _text(connected_integration_id)
+        for key in [key for key in _CLIENT_CACHE if key[0] == ci]:
+            _CLIENT_CACHE.pop(key, None)
+        for key in [key for key in _CLIENT_REFRESH_TASKS if key[0] == ci]:
+            task = _CLIENT_REFRESH_TASKS.pop(key, None)
+            if task is not None and not task.done():
+                task.cancel()
+
+    @classmethod
+    async def invalidate(cls, connected_integration_id: str) -> None:
+        """
+        Сбросить сессии и токены подключения во всех процессах.
+
+        Локальные сессии сбрасываются сразу. В Redis удаляются токены фирм
+        подключения и увеличивается версия настроек: остальные процессы
+        перезагружают сессии не позже SETTINGS_VERSION_CHECK_SEC, а токены
+        новой версии хранятся под другим ключом.
+        """
+        ci = _text(connected_integration_id)
+        firm_ids = {key[1] for key in _CLIENT_CACHE if key[0] == ci}
+        cls.forget(ci)
+        if not redis_is_enabled():
+            return
+        try:
+            firms_key = cls._token_firms_key(ci)
+            version_key = cls._settings_version_key(ci)
+            firm_ids.update(_to_int(item, 0) for item in await redis_ops.smembers(firms_key) or [])
+            version = _to_int(await redis_ops.get(version_key), 0)
+            token_keys = [cls._token_cache_key(ci, firm_id, version) for firm_id in firm_ids if firm_id > 0]
+            await redis_ops.delete(firms_key, *token_keys)
+            version = await redis_incr_with_ttl(version_key, cls._settings_version_ttl())
+            _SETTINGS_VERSIONS[ci] = (time.monotonic(), version)
+        except Exception as error:
+            logger.warning("Faktura.uz settings invalidation failed: ci=%s error=%s", ci, error)
+
+    @classmethod
+    def _settings_version_key(cls, connected_integration_id: str) -> str:
+        return redis_make_key("edo", "fakturauz", "settings_version", connected_integration_id)
+
+    @classmethod
+    def _settings_version_ttl(cls) -> int:
+        # версия должна пережить токены и сессии, выданные по прежним настройкам
+        return max(int(settings.edo_fakturauz_token_cache_ttl or 0), cls._session_ttl(), 60) * 2
+
+    @classmethod
+    async def _settings_version(cls, connected_integration_id: str) -> int:
+        """Версия настроек подключения из Redis, в процессе кешируется на SETTINGS_VERSION_CHECK_SEC."""
+        if not redis_is_enabled():
+            return 0
+        cached = _SETTINGS_VERSIONS.get(connected_integration_id)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < cls.SETTINGS_VERSION_CHECK_SEC:
+            return cached[1]
+        try:
+            version = _to_int(await redis_ops.get(cls._settings_version_key(connected_integration_id)), 0)
+        except Exception as error:
+            logger.debug("Faktura settings version read failed: %s", error)
+            return cached[1] if cached is not None else 0
+        _SETTINGS_VERSIONS[connected_integration_id] = (now, version)
+        return version
+
+    @classmethod
+    def _session_ttl(cls) -> int:
+        return max(int(settings.edo_fakturauz_session_ttl or 0), 0)
+
+    def _is_fresh(self, settings_version: int) -> bool:
+        if self.settings_version != settings_version:
+            return False
+        now = _now_ts()
+        if self.token_expires_at and now >= self.token_expires_at:
+            return False
+        return now - self.loaded_at < self._session_ttl()
+
+    def _needs_refresh(self) -> bool:
+        now = _now_ts()
+        if self.token_expires_at and self.token_expires_at - now <= self.TOKEN_REFRESH_MARGIN_SEC:
+            return True
+        return now - self.loaded_at >= self._session_ttl() // 2
+
+    @classmethod
+    def _schedule_refresh(cls, key: Tuple[str, int]) -> None:
+        task = _CLIENT_REFRESH_TASKS.get(key)
+        if task is not None and not task.done():
+            return
+        _CLIENT_REFRESH_TASKS[key] = asyncio.create_task(
+            cls._refresh(key),
+            name=f"edo_fakturauz_session_{key[0]}_{key[1]}",
+        )
+
+    @classmethod
+    async def _refresh(cls, key: Tuple[str, int]) -> None:
+        try:
+            client = await cls._load(*key)
+            # сессию могли сбросить (смена настроек), пока шла загрузка
+            if key in _CLIENT_CACHE:
+                _CLIENT_CACHE[key] = client
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.warning("Faktura.uz session refresh failed: ci=%s firm_id=%s error=%s", key[0], key[1], error)
+        finally:
+            if _CLIENT_REFRESH_TASKS.get(key) is asyncio.current_task():
+                _CLIENT_REFRESH_TASKS.pop(key, None)
+
+    @classmethod
+    async def _load(cls, ci: str, parsed_firm_id: int) -> "FakturaUzClient":
+        # версию берем до загрузки настроек: если они сменятся во время загрузки, сессия устареет сразу
+        settings_version = await cls._settings_version(ci)
         async with RegosAPI(connected_integration_id=ci) as api:
             firm_response = await api.references.firm.get(
                 FirmGetRequest(ids=[parsed_firm_id], limit=1)
@@ -316,7 +475,9 @@ class FakturaUzClient:
                 )
             settings_map = await cls._load_settings(api, ci, parsed_firm_id)
 
-        access_token, token_type = await cls._get_access_token(ci, parsed_firm_id, settings_map)
+        access_token, token_type, token_expires_at = await cls._get_access_token(
+            ci, parsed_firm_id, settings_map, settings_version
+        )
         return cls(
             connected_integration_id=ci,
             firm_id=parsed_firm_id,
@@ -324,6 +485,8 @@ class FakturaUzClient:
             settings_map=settings_map,
             access_token=access_token,
             token_type=token_type,
+            token_expires_at=token_expires_at,
+            settings_version=settings_version,
         )
 
     @classmethod
@@ -354,8 +517,15 @@ class FakturaUzClient:
         return settings_map
 
     @classmethod
-    def _token_cache_key(cls, connected_integration_id: str, firm_id: int) -> str:
-        return redis_make_key("edo", "fakturauz", "token", connected_integration_id, firm_id)
+    def _token_cache_key(cls, connected_integration_id: str, firm_id: int, settings_version: int = 0) -> str:
+        # токен привязан к версии настроек: после invalidate прежний логин не найдется даже при гонке записи
+        return redis_make_key(
+            "edo", "fakturauz", "token", connected_integration_id, f"v{int(settings_version or 0)}", firm_id
+        )
+
+    @classmethod
+    def _token_firms_key(cls, connected_integration_id: str) -> str:
+        return redis_make_key("edo", "fakturauz", "token_firms", connected_integration_id)
 
     @classmethod
     async def _get_access_token(
@@ -363,8 +533,10 @@ class FakturaUzClient:
         connected_integration_id: str,
         firm_id: int,
         settings_map: Dict[str, str],
-    ) -> Tuple[str, str]:
-        cache_key = cls._token_cache_key(connected_integration_id, firm_id)
+        settings_version: int = 0,
+    ) -> Tuple[str, str, int]:
+        cache_key = cls._token_cache_key(connected_integration_id, firm_id, settings_version)
+        ttl_limit = max(int(settings.edo_fakturauz_token_cache_ttl or 0), 1)
         if redis_is_enabled():
             try:
                 cached = await redis_ops.get(cache_key)
@@ -372,8 +544,9 @@ class FakturaUzClient:
                     token_payload = _json_loads(cached)
                     token = _text(_ci_lookup(token_payload, "access_token", "accessToken"))
                     token_type = _text(_ci_lookup(token_payload, "token_type", "tokenType"), "Bearer")
+                    expires_at = _to_int(_ci_lookup(token_payload, "expires_at"), 0)
                     if token:
-                        return token, token_type
+                        return token, token_type, expires_at or _now_ts() + ttl_limit
             except Exception as error:
                 logger.debug("Faktura token cache read failed: %s", error)
 
@@ -386,11 +559,10 @@ class FakturaUzClient:
         }
         url = f"{cls.TOKEN_ENDPOINT.rstrip('/')}/token"
         try:
-            async with httpx.AsyncClient(timeout=30) as http_client:
-                response = await http_client.post(url, data=payload)
-                text = response.text
-                response.raise_for_status()
-                data = response.json()
+            response = await get_shared_http_client(cls.TOKEN_ENDPOINT).post(url, data=payload, timeout=30)
+            text = response.text
+            response.raise_for_status()
+            data = response.json()
         except httpx.HTTPStatusError as error:
             body = _text(getattr(error.response, "text", ""))[:500]
             raise EdoFakturaUzError(
@@ -411,18 +583,37 @@ class FakturaUzClient:
                 111006,
                 f"Faktura.uz token response does not contain access_token: {text[:300]}",
             )
+        ttl = min(max(expires_in - 60, 1), ttl_limit)
+        expires_at = _now_ts() + ttl
         if redis_is_enabled():
-            ttl_limit = max(int(settings.edo_fakturauz_token_cache_ttl or 0), 1)
-            ttl = min(max(expires_in - 60, 1), ttl_limit)
             try:
                 await redis_ops.setex(
                     cache_key,
                     ttl,
-                    _json_dumps({"access_token": token, "token_type": token_type}),
+                    _json_dumps({"access_token": token, "token_type": token_type, "expires_at": expires_at}),
                 )
+                await redis_sadd_with_ttl(cls._token_firms_key(connected_integration_id), str(firm_id), ttl_limit)
             except Exception as error:
                 logger.debug("Faktura token cache write failed: %s", error)
-        return token, token_type
+        return token, token_type, expires_at
+
+    async def _renew_token(self, stale_token: str) -> None:
+        async with self._token_lock:
+            if self.access_token != stale_token:
+                return
+            if redis_is_enabled():
+                try:
+                    await redis_ops.delete(
+                        self._token_cache_key(self.connected_integration_id, self.firm_id, self.settings_version)
+                    )
+                except Exception as error:
+                    logger.debug("Faktura token cache reset failed: %s", error)
+            self.access_token, self.token_type, self.token_expires_at = await self._get_access_token(
+                self.connected_integration_id,
+                self.firm_id,
+                self.settings_map,
+                self.settings_version,
+            )
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -445,20 +636,26 @@ class FakturaUzClient:
         json_body: Optional[Dict[str, Any]] = None,
     ) -> Any:
         url = f"{self.API_ENDPOINT.rstrip('/')}/{path.lstrip('/')}"
+        http_client = get_shared_http_client(self.API_ENDPOINT)
+        query = {k: v for k, v in (params or {}).items() if v is not None}
         try:
-            async with httpx.AsyncClient(timeout=90) as http_client:
+            token = self.access_token
+            response = await http_client.request(
+                method, url, headers=self._headers(), params=query, json=json_body, timeout=90
+            )
+            if response.status_code == 401:
+                # токен отозван или истёк раньше срока — один повтор с новым
+                await self._renew_token(token)
                 response = await http_client.request(
-                    method,
-                    url,
-                    headers=self._headers(),
-                    params={k: v for k, v in (params or {}).items() if v is not None},
-                    json=json_body,
+                    method, url, headers=self._headers(), params=query, json=json_body, timeout=90
                 )
-                text = response.text
-                response.raise_for_status()
-                if not text.strip():
-                    return {}
-                return response.json()
+            text = response.text
+            response.raise_for_status()
+            if not text.strip():
+                return {}
+            return response.json()
+        except EdoFakturaUzError:
+            raise
         except httpx.HTTPStatusError as error:
             body = _text(getattr(error.response, "text", ""))[:500]
             raise EdoFakturaUzError(
@@ -1179,18 +1376,21 @@ class EdoFakturaUzIntegration(ClientBase):
         }
 
     async def disconnect(self, **kwargs) -> Dict[str, Any]:
+        await FakturaUzClient.invalidate(self._ci())
         return {"status": "disconnected", "connected_integration_id": self._ci()}
 
     async def reconnect(self, **kwargs) -> Dict[str, Any]:
+        await FakturaUzClient.invalidate(self._ci())
         return await self.connect(**kwargs)
 
     async def update_settings(self, **kwargs) -> Dict[str, Any]:
+        await FakturaUzClient.invalidate(self._ci())
         return {"status": "settings updated", "connected_integration_id": self._ci()}
 
     async def check(self, firm_id: Optional[int] = None, **kwargs) -> Dict[str, Any]:
         await self._ensure_active_integration()
         if firm_id:
-            await FakturaUzClient.create(self._ci(), int(firm_id))
+            await FakturaUzClient.create(self._ci(), int(firm_id), refresh=True)
         return {"status": "ok", "connected_integration_id": self._ci()}
 
     async def handle_webhook(self, data: Optional[Dict] = None, **kwargs) -> Dict[str, Any]:
@@ -1,10 +1,13 @@
 import asyncio
+import hashlib
 import json
 import re
-from typing import Any, Dict, List, Optional, Sequence
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from email.message import EmailMessage
 
 import aiosmtplib
+from aiosmtplib.email import flatten_message
 
 from core.api.regos_api import RegosAPI
 from schemas.api.integrations.connected_integration_setting import (
@@ -17,6 +20,13 @@ from schemas.integration.base import (
 )
 from schemas.integration.email_integration_base import IntegrationEmailBase
 from clients.base import ClientBase
+from clients.email_sender.smtp_pool import (
+    SlotWaitClock,
+    SmtpConnectionPool,
+    SmtpOpenError,
+    close_smtp_pools,
+    get_smtp_pool,
+)
 from core.logger import setup_logger
 from config.settings import settings
 from core.redis import redis_ops
@@ -56,13 +66,16 @@ class EmailSenderIntegration(IntegrationEmailBase, ClientBase):
     CONNECT_TIMEOUT = 5
     COMMAND_TIMEOUT = 5
 
-    # Производительность: параллельные SMTP-сессии на батч
+    # Производительность: долгоживущие SMTP-сессии на интеграцию (общие для всех батчей)
     DEFAULT_POOL_SIZE = 10
     MAX_POOL_SIZE = 20
+    MAX_MESSAGES_PER_CONNECTION = settings.email_sender_smtp_max_messages_per_connection
+    KEEPALIVE_SEC = settings.email_sender_smtp_keepalive_sec
+    IDLE_TIMEOUT_SEC = settings.email_sender_smtp_idle_timeout_sec
 
     # Управление размером батча
     BATCH_SIZE = 250
-    BATCH_JOIN_TIMEOUT = 15  # сек
+    BATCH_JOIN_TIMEOUT = 15  # сек, без времени ожидания слота в общем SMTP-пуле
 
     SETTINGS_TTL = settings.redis_cache_ttl
     SETTINGS_KEYS = {
@@ -159,6 +172,79 @@ class EmailSenderIntegration(IntegrationEmailBase, ClientBase):
             msg.set_content(body or "")
         return msg
 
+    def _render_email(
+        self,
+        from_addr: str,
+        sender: str,
+        to_addr: str,
+        subject: str,
+        body: str,
+        is_html: bool,
+    ) -> Tuple[EmailMessage, Optional[bytes]]:
+        msg = self._build_email_message(
+            from_addr=from_addr,
+            to_addr=to_addr,
+            subject=subject,
+            body=body,
+            is_html=is_html,
+        )
+        # Не-ASCII адреса требуют SMTPUTF8 — такое письмо развернёт aiosmtplib
+        if not (sender.isascii() and to_addr.isascii()):
+            return msg, None
+        return msg, flatten_message(msg, utf8=False, cte_type="8bit")
+
+    def _render_batch(
+        self, batch: Sequence[Dict], from_addr: str, sender: str, subject: str
+    ) -> List[Tuple[Dict, Any]]:
+        # Вызывается в потоке: сборка MIME и кодирование тел не держат event loop
+        rendered: List[Tuple[Dict, Any]] = []
+        for item in batch:
+            try:
+                rendered.append(
+                    (
+                        item,
+                        self._render_email(
+                            from_addr=from_addr,
+                            sender=sender,
+                            to_addr=str(item["recipient"]).strip(),
+                            subject=subject,
+                            body=item.get("message") or "",
+                            is_html=bool(item.get("is_html", True)),
+                        ),
+                    )
+                )
+            except Exception as err:
+                rendered.append((item, err))
+        return rendered
+
+    def _smtp_pool(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        use_ssl: bool,
+        pool_size: int,
+    ) -> SmtpConnectionPool:
+        signature = (
+            host,
+            port,
+            user,
+            hashlib.sha256(str(password).encode("utf-8")).hexdigest(),
+            use_ssl,
+            pool_size,
+        )
+        return get_smtp_pool(
+            str(self.connected_integration_id),
+            signature,
+            lambda: self._open_smtp(host, port, user, password, use_ssl),
+            size=pool_size,
+            max_messages=self.MAX_MESSAGES_PER_CONNECTION,
+            keepalive_sec=self.KEEPALIVE_SEC,
+            idle_timeout_sec=self.IDLE_TIMEOUT_SEC,
+            command_timeout=self.COMMAND_TIMEOUT,
+        )
+
     async def _open_smtp(
         self, host: str, port: int, user: str, password: str, use_ssl: bool
     ) -> aiosmtplib.SMTP:
@@ -180,6 +266,29 @@ class EmailSenderIntegration(IntegrationEmailBase, ClientBase):
         logger.info(f"handle_external вызван с данными: {data}")
         return IntegrationSuccessResponse(result={"status": "ok"})
 
+    async def disconnect(self, **kwargs: Any) -> Any:
+        if self.connected_integration_id:
+            await close_smtp_pools(str(self.connected_integration_id))
+        return await super().disconnect(**kwargs)
+
+    async def update_settings(self, *args: Any, **kwargs: Any) -> Any:
+        # новые настройки передаются в ClientBase как есть: имя `settings` занято config.settings
+        if self.connected_integration_id:
+            # новые настройки SMTP должны подхватиться сразу, а не по TTL кэша
+            if settings.redis_enabled and redis_ops:
+                try:
+                    await redis_ops.delete(
+                        self._settings_cache_key(self.connected_integration_id)
+                    )
+                except Exception as err:
+                    logger.warning(f"Не удалось сбросить кэш настроек: {err}")
+            await close_smtp_pools(str(self.connected_integration_id))
+        return await super().update_settings(*args, **kwargs)
+
+    @classmethod
+    async def shutdown_all(cls) -> None:
+        await close_smtp_pools()
+
     async def send_messages(self, messages: List[Dict]) -> Dict:
         """Отправка email-сообщений батчами (контракт как в других интеграциях)."""
         logger.info(f"Starting message send for ID {self.connected_integration_id}")
@@ -266,14 +375,21 @@ class EmailSenderIntegration(IntegrationEmailBase, ClientBase):
 
         # ---------- отправка батчами, внутри батча — параллельные воркеры ----------
         results: List[Dict] = []
+        smtp_pool = self._smtp_pool(host, port, smtp_user, password, use_ssl, pool_size)
 
         async def send_batch(batch: Sequence[Dict], batch_index: int) -> Dict:
-            queue: asyncio.Queue[Dict] = asyncio.Queue()
-            for item in batch:
-                await queue.put(item)
+            # MIME собирается в потоке одним вызовом на батч
+            rendered = await asyncio.to_thread(
+                self._render_batch, batch, from_header, from_email, default_subject
+            )
+            queue: asyncio.Queue[Tuple[Dict, Any]] = asyncio.Queue()
+            for entry in rendered:
+                await queue.put(entry)
 
             local_pool = min(pool_size, max(1, queue.qsize()))
             batch_results: List[Dict] = []
+            # ожидание слота пула: пул общий для всех одновременных send_messages интеграции
+            slot_wait = SlotWaitClock()
 
             async def drain_queue_with_error(
                 err_msg: str, worker_label: str = "init"
@@ -281,7 +397,7 @@ class EmailSenderIntegration(IntegrationEmailBase, ClientBase):
                 drained = 0
                 while True:
                     try:
-                        item = queue.get_nowait()
+                        item, _ = queue.get_nowait()
                     except asyncio.QueueEmpty:
                         break
                     batch_results.append(
@@ -298,117 +414,116 @@ class EmailSenderIntegration(IntegrationEmailBase, ClientBase):
                 return drained
 
             async def worker(wid: int):
-                smtp: Optional[aiosmtplib.SMTP] = None
-                try:
-                    logger.debug(
-                        f"[batch {batch_index} w{wid}] opening SMTP {host}:{port} ssl={use_ssl}"
-                    )
-                    smtp = await self._open_smtp(
-                        host, port, smtp_user, password, use_ssl
-                    )
-                    logger.debug(f"[batch {batch_index} w{wid}] SMTP opened")
-                    while True:
-                        try:
-                            item = await asyncio.wait_for(queue.get(), timeout=1.0)
-                        except asyncio.TimeoutError:
-                            break
-
-                        recipient = str(item["recipient"]).strip()
-                        body = item.get("message") or ""
-                        subject = default_subject
-                        is_html = bool(item.get("is_html", True))
+                while True:
+                    try:
+                        item, prepared = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
 
-                        email_msg = self._build_email_message(
-                            from_addr=from_header,
-                            to_addr=recipient,
-                            subject=subject,
-                            body=body,
-                            is_html=is_html,
+                    recipient = str(item["recipient"]).strip()
+                    try:
+                        if isinstance(prepared, Exception):
+                            raise prepared
+                        email_msg, raw = prepared
+                        # соединение берётся из пула интеграции: без TLS/AUTH на каждый батч
+                        send_status, envelope_id = await smtp_pool.send(
+                            from_email, [recipient], email_msg, raw, wait_clock=slot_wait
                         )
-                        try:
-                            send_status, envelope_id = await asyncio.wait_for(
-                                smtp.send_message(
-                                    email_msg, sender=from_email, recipients=[recipient]
+
+                        accepted = {
+                            rcpt: {
+                                "code": resp.code,
+                                "message": (resp.message or b"").decode(
+                                    "utf-8", errors="ignore"
                                 ),
-                                timeout=self.COMMAND_TIMEOUT,
-                            )
-
-                            accepted = {
-                                rcpt: {
-                                    "code": resp.code,
-                                    "message": (resp.message or b"").decode(
-                                        "utf-8", errors="ignore"
-                                    ),
-                                }
-                                for rcpt, resp in (send_status or {}).items()
                             }
+                            for rcpt, resp in (send_status or {}).items()
+                        }
 
-                            batch_results.append(
-                                {
-                                    "campaign_recipient_id": item.get(
-                                        "campaign_recipient_id"
-                                    ),
-                                    "sms_id": item.get("sms_id"),
-                                    "recipient": recipient,
-                                    "status": "sent" if accepted else "unknown",
-                                    "response": {
-                                        "accepted": accepted,  # пер-адресатный код SMTP (обычно 250)
-                                        "envelope_id": envelope_id,  # id транзакции, если сервер вернул
-                                    },
-                                    "worker": wid,
-                                }
-                            )
-                        except Exception as send_err:
-                            logger.error(
-                                f"[batch {batch_index} w{wid}] send error to {recipient}: {send_err}"
-                            )
-                            batch_results.append(
-                                {
-                                    "campaign_recipient_id": item.get(
-                                        "campaign_recipient_id"
-                                    ),
-                                    "sms_id": item.get("sms_id"),
-                                    "recipient": recipient,
-                                    "error": str(send_err),
-                                    "worker": wid,
-                                }
-                            )
-                        finally:
-                            queue.task_done()
-
-                except Exception as open_err:
-                    # Критично: воркер не открыл SMTP — дренируем очередь, иначе queue.join() зависнет
-                    logger.error(
-                        f"[batch {batch_index} w{wid}] SMTP open failed: {open_err}"
-                    )
-                    await drain_queue_with_error(
-                        f"SMTP open failed: {open_err}", worker_label=f"w{wid}"
-                    )
-                finally:
-                    if smtp:
-                        try:
-                            await asyncio.wait_for(smtp.quit(), timeout=2)
-                        except Exception:
-                            pass
+                        batch_results.append(
+                            {
+                                "campaign_recipient_id": item.get(
+                                    "campaign_recipient_id"
+                                ),
+                                "sms_id": item.get("sms_id"),
+                                "recipient": recipient,
+                                "status": "sent" if accepted else "unknown",
+                                "response": {
+                                    "accepted": accepted,  # пер-адресатный код SMTP (обычно 250)
+                                    "envelope_id": envelope_id,  # id транзакции, если сервер вернул
+                                },
+                                "worker": wid,
+                            }
+                        )
+                    except SmtpOpenError as open_err:
+                        # Критично: SMTP не открывается — дренируем очередь, иначе каждое письмо ждёт свой таймаут
+                        logger.error(
+                            f"[batch {batch_index} w{wid}] SMTP open failed: {open_err}"
+                        )
+                        batch_results.append(
+                            {
+                                "campaign_recipient_id": item.get(
+                                    "campaign_recipient_id"
+                                ),
+                                "sms_id": item.get("sms_id"),
+                                "recipient": recipient,
+                                "error": f"SMTP open failed: {open_err}",
+                                "worker": f"w{wid}",
+                            }
+                        )
+                        queue.task_done()
+                        await drain_queue_with_error(
+                            f"SMTP open failed: {open_err}", worker_label=f"w{wid}"
+                        )
+                        return
+                    except Exception as send_err:
+                        logger.error(
+                            f"[batch {batch_index} w{wid}] send error to {recipient}: {send_err}"
+                        )
+                        batch_results.append(
+                            {
+                                "campaign_recipient_id": item.get(
+                                    "campaign_recipient_id"
+                                ),
+                                "sms_id": item.get("sms_id"),
+                                "recipient": recipient,
+                                "error": str(send_err),
+                                "worker": wid,
+                            }
+                        )
+                    queue.task_done()
 
             logger.info(
                 f"[batch {batch_index}] starting with pool={local_pool}, total_items={queue.qsize()}"
             )
             tasks = [asyncio.create_task(worker(i + 1)) for i in range(local_pool)]
 
-            # ждём завершение очереди, но с таймаутом
+            # ждём завершение очереди, но с таймаутом; пока воркеры батча стоят в очереди
+            # за слотом пула (его заняли другие рассылки интеграции), таймаут не тикает
+            join_task = asyncio.create_task(queue.join())
+            started = time.monotonic()
             try:
-                await asyncio.wait_for(queue.join(), timeout=self.BATCH_JOIN_TIMEOUT)
-            except asyncio.TimeoutError:
-                logger.error(
-                    f"[batch {batch_index}] queue.join() timeout after {self.BATCH_JOIN_TIMEOUT}s, cancelling workers"
-                )
-                for t in tasks:
-                    t.cancel()
-                # дренируем остатки очереди, чтобы не потерять письма
-                await drain_queue_with_error(
-                    "Batch join timeout; cancelled workers", worker_label="timeout"
-                )
+                while True:
+                    budget = self.BATCH_JOIN_TIMEOUT - (
+                        time.monotonic() - started - slot_wait.total()
+                    )
+                    if budget > 0:
+                        done, _ = await asyncio.wait({join_task}, timeout=budget)
+                        if done:
+                            break
+                        continue
+                    logger.error(
+                        f"[batch {batch_index}] queue.join() timeout after {self.BATCH_JOIN_TIMEOUT}s, cancelling workers"
+                    )
+                    for t in tasks:
+                        t.cancel()
+                    # дренируем остатки очереди, чтобы не потерять письма
+                    await drain_queue_with_error(
+                        "Batch join timeout; cancelled workers", worker_label="timeout"
+                    )
+                    break
+            finally:
+                join_task.cancel()
 
             # дожимаем воркеров (не упадём, даже если кто-то уже отменён)
             await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import aiosmtplib
+
+from core.logger import setup_logger
+
+logger = setup_logger("email_sender.smtp_pool")
+
+# 421 — сервер закрывает канал (перегрузка, лимит на сессию); письмо повторяем на новом соединении
+_SERVICE_NOT_AVAILABLE = 421
+_QUIT_TIMEOUT_SEC = 2.0
+
+SmtpFactory = Callable[[], Awaitable[aiosmtplib.SMTP]]
+SendResult = Tuple[Dict[str, aiosmtplib.SMTPResponse], str]
+
+
+class SmtpOpenError(Exception):
+    """Не удалось открыть/авторизовать SMTP-соединение."""
+
+
+def is_reconnect_error(error: BaseException) -> bool:
+    """Ошибка канала, после которой письмо можно повторить на новом соединении."""
+    if isinstance(error, aiosmtplib.SMTPServerDisconnected):
+        return True
+    return (
+        isinstance(error, aiosmtplib.SMTPResponseException)
+        and error.code == _SERVICE_NOT_AVAILABLE
+    )
+
+
+class SlotWaitClock:
+    """Сколько времени хотя бы один из отправителей ждал свободный слот пула."""
+
+    __slots__ = ("_waiting", "_since", "_total")
+
+    def __init__(self) -> None:
+        self._waiting = 0
+        self._since = 0.0
+        self._total = 0.0
+
+    def begin(self) -> None:
+        if not self._waiting:
+            self._since = time.monotonic()
+        self._waiting += 1
+
+    def end(self) -> None:
+        self._waiting -= 1
+        if not self._waiting:
+            self._total += time.monotonic() - self._since
+
+    def total(self) -> float:
+        if self._waiting:
+            return self._total + time.monotonic() - self._since
+        return self._total
+
+
+class PooledSmtpConnection:
+    __slots__ = ("smtp", "sent", "last_used_at", "checked_at")
+
+    def __init__(self, smtp: aiosmtplib.SMTP) -> None:
+        self.smtp = smtp
+        self.sent = 0
+        # last_used_at — последняя отправка (для idle-таймаута), checked_at — последний ответ сервера
+        self.last_used_at = self.checked_at = time.monotonic()
+
+
+class SmtpConnectionPool:
+    """
+    Долгоживущие авторизованные SMTP-соединения одной интеграции.
+
+    Одновременно открыто не больше `size` соединений. Свободное соединение
+    раз в `keepalive_sec` получает NOOP (на это время оно занимает слот пула),
+    а после `idle_timeout_sec` простоя закрывается. После `max_messages` писем соединение закрывается и при
+    следующей отправке открывается заново. На 421 или обрыв письмо один раз
+    повторяется на свежем соединении.
+    """
+
+    def __init__(
+        self,
+        factory: SmtpFactory,
+        *,
+        size: int,
+        max_messages: int,
+        keepalive_sec: float,
+        idle_timeout_sec: float,
+        command_timeout: float,
+    ) -> None:
+        self._factory = factory
+        self.size = max(int(size), 1)
+        self._max_messages = max(int(max_messages), 1)
+        self._keepalive_sec = max(float(keepalive_sec), 1.0)
+        self._idle_timeout_sec = max(float(idle_timeout_sec), self._keepalive_sec)
+        self._command_timeout = command_timeout
+        self._semaphore = asyncio.Semaphore(self.size)
+        self._idle: List[PooledSmtpConnection] = []
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._background: Set[asyncio.Task] = set()
+        self._closed = False
+        self.opened = 0
+        self.reconnects = 0
+
+    # -------------------- отправка --------------------
+
+    async def send(
+        self,
+        sender: str,
+        recipients: Sequence[str],
+        message: EmailMessage,
+        raw: Optional[bytes] = None,
+        *,
+        wait_clock: Optional[SlotWaitClock] = None,
+    ) -> SendResult:
+        """
+        Отправка письма через соединение из пула.
+
+        `raw` — заранее развёрнутое письмо (8bit, без SMTPUTF8); если сервер не
+        поддерживает 8BITMIME или raw не передан, письмо разворачивает aiosmtplib.
+        `wait_clock` накапливает время ожидания свободного слота пула.
+        """
+        async with self.acquire(wait_clock=wait_clock) as conn:
+            try:
+                return await self._deliver(conn, sender, recipients, message, raw)
+            except Exception as error:
+                if not is_reconnect_error(error):
+                    raise
+                logger.info(f"SMTP канал закрыт сервером ({error}), переподключаемся")
+                self.reconnects += 1
+                await self._replace(conn)
+                return await self._deliver(conn, sender, recipients, message, raw)
+
+    @asynccontextmanager
+    async def acquire(
+        self, wait_clock: Optional[SlotWaitClock] = None
+    ) -> AsyncIterator[PooledSmtpConnection]:
+        if wait_clock is None:
+            await self._semaphore.acquire()
+        else:
+            wait_clock.begin()
+            try:
+                await self._semaphore.acquire()
+            finally:
+                wait_clock.end()
+        try:
+            conn = await self._checkout()
+            try:
+                yield conn
+            except BaseException as error:
+                if self._reusable_after(conn, error):
+                    self._checkin(conn)
+                else:
+                    self._discard(conn)
+                raise
+            self._checkin(conn)
+        finally:
+            self._semaphore.release()
+
+    async def _deliver(
+        self,
+        conn: PooledSmtpConnection,
+        sender: str,
+        recipients: Sequence[str],
+        message: EmailMessage,
+        raw: Optional[bytes],
+    ) -> SendResult:
+        smtp = conn.smtp
+        conn.sent += 1
+        if raw is not None and smtp.supports_extension("8bitmime"):
+            coro = smtp.sendmail(
+                sender, list(recipients), raw, mail_options=["BODY=8BITMIME"]
+            )
+        else:
+            coro = smtp.send_message(message, sender=sender, recipients=list(recipients))
+        result = await asyncio.wait_for(coro, timeout=self._command_timeout)
+        conn.last_used_at = conn.checked_at = time.monotonic()
+        return result
+
+    @staticmethod
+    def _reusable_after(conn: PooledSmtpConnection, error: BaseException) -> bool:
+        # Отказ по адресату/данным — транзакция сброшена (RSET), канал рабочий
+        if is_reconnect_error(error) or not conn.smtp.is_connected:
+            return False
+        return isinstance(
+            error, (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused)
+        )
+
+    # -------------------- соединения --------------------
+
+    async def _open(self) -> aiosmtplib.SMTP:
+        try:
+            smtp = await self._factory()
+        except Exception as error:
+            raise SmtpOpenError(str(error) or error.__class__.__name__) from error
+        self.opened += 1
+        return smtp
+
+    async def _checkout(self) -> PooledSmtpConnection:
+        while self._idle:
+            conn = self._idle.pop()
+            if await self._alive(conn):
+                return conn
+            self._discard(conn)
+        return PooledSmtpConnection(await self._open())
+
+    async def _alive(self, conn: PooledSmtpConnection) -> bool:
+        if not conn.smtp.is_connected:
+            return False
+        if time.monotonic() - conn.checked_at < self._keepalive_sec:
+            return True
+        # давно не использовалось — сервер мог закрыть сессию по таймауту
+        try:
+            await conn.smtp.noop(timeout=self._command_timeout)
+        except Exception:
+            return False
+        conn.checked_at = time.monotonic()
+        return True
+
+    async def _replace(self, conn: PooledSmtpConnection) -> None:
+        self._quit_later(conn.smtp)
+        conn.smtp = await self._open()
+        conn.sent = 0
+        conn.last_used_at = conn.checked_at = time.monotonic()
+
+    def _checkin(self, conn: PooledSmtpConnection) -> None:
+        if self._closed or conn.sent >= self._max_messages or not conn.smtp.is_connected:
+            self._discard(conn)
+            return
+        self._idle.append(conn)
+        if self._keepalive_task is None or self._keepalive_task.done():
+            self._keepalive_task = asyncio.create_task(
+                self._keepalive(), name="email_sender_smtp_keepalive"
+            )
+
+    def _discard(self, conn: PooledSmtpConnection) -> None:
+        self._quit_later(conn.smtp)
+
+    def _quit_later(self, smtp: aiosmtplib.SMTP) -> None:
+        # QUIT не держит отправку: закрываем в фоне
+        task = asyncio.create_task(_quit(smtp))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _keepalive(self) -> None:
+        while self._idle and not self._closed:
+            await asyncio.sleep(self._keepalive_sec)
+            now = time.monotonic()
+            for conn in list(self._idle):
+                if now - conn.checked_at < self._keepalive_sec:
+                    continue
+                if now - conn.last_used_at >= self._idle_timeout_sec:
+                    try:
+                        self._idle.remove(conn)
+                    except ValueError:
+                        continue
+                    self._discard(conn)
+                    continue
+                # NOOP идёт в слоте пула: иначе _checkout откроет ещё одно соединение
+                # и вместе с проверяемым их станет больше size. Все слоты заняты — соединение
+                # и так скоро понадобится, его проверит _alive при выдаче.
+                if self._semaphore.locked():
+                    continue
+                async with self._semaphore:
+                    try:
+                        self._idle.remove(conn)
+                    except ValueError:
+                        continue
+                    if await self._alive(conn) and not self._closed:
+                        self._idle.append(conn)
+                    else:
+                        self._discard(conn)
+
+    async def close(self) -> None:
+        self._closed = True
+        task, self._keepalive_task = self._keepalive_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        idle, self._idle = self._idle, []
+        await asyncio.gather(
+            *(_quit(conn.smtp) for conn in idle),
+            *list(self._background),
+            return_exceptions=True,
+        )
+
+
+async def _quit(smtp: aiosmtplib.SMTP) -> None:
+    try:
+        await asyncio.wait_for(smtp.quit(), timeout=_QUIT_TIMEOUT_SEC)
+    except Exception:
+        smtp.close()
+
+
+# key -> (loop, signature, pool); signature — параметры подключения, при их смене пул пересоздаётся
+_POOLS: Dict[str, Tuple[asyncio.AbstractEventLoop, Tuple, SmtpConnectionPool]] = {}
+_CLOSING: Set[asyncio.Task] = set()
+
+
+def get_smtp_pool(
+    key: str,
+    signature: Tuple,
+    factory: SmtpFactory,
+    **options: Any,
+) -> SmtpConnectionPool:
+    loop = asyncio.get_running_loop()
+    entry = _POOLS.get(key)
+    if entry is not None:
+        owner_loop, owner_signature, pool = entry
+        if owner_loop is loop and owner_signature == signature:
+            return pool
+        if owner_loop is loop:
+            task = asyncio.create_task(pool.close())
+            _CLOSING.add(task)
+            task.add_done_callback(_CLOSING.discard)
+    pool = SmtpConnectionPool(factory, **options)
+    _POOLS[key] = (loop, signature, pool)
+    logger.debug(f"Создан SMTP-пул: key={key} size={pool.size}")
+    return pool
+
+
+async def close_smtp_pools(key: Optional[str] = None) -> None:
+    """Закрывает пул интеграции `key` или все пулы текущего event loop."""
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    keys = [key] if key is not None else list(_POOLS)
+    for pool_key in keys:
+        entry = _POOLS.get(pool_key)
+        if entry is None:
+            continue
+        owner_loop, _, pool = entry
+        if owner_loop is not loop and not owner_loop.is_closed():
+            continue
+        _POOLS.pop(pool_key, None)
+        if owner_loop is loop:
+            await pool.close()
+
+
+__all__ = [
+    "SlotWaitClock",
+    "SmtpConnectionPool",
+    "SmtpOpenError",
+    "close_smtp_pools",
+    "get_smtp_pool",
+    "is_reconnect_error",
+]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set, Tuple
+
+from core.logger import setup_logger
+from core.redis import redis_ops
+
+logger = setup_logger("external_chat_crm_channel.event_hub")
+
+# Сколько событий копится у одного подключения; при переполнении — ресинк по ревизии
+_SUBSCRIPTION_QUEUE_SIZE = 64
+_RECONNECT_DELAY_SEC = 1.0
+_RECONNECT_MAX_DELAY_SEC = 15.0
+_GET_MESSAGE_TIMEOUT_SEC = 1.0
+
+
+class ChatEventSubscription:
+    """
+    Очередь событий одного SSE-подключения.
+
+    Элемент `None` — события могли потеряться (переподключение к Redis,
+    переполнение очереди): подключение сверяет ревизию чата и при расхождении
+    отдаёт chat_revision_changed.
+    """
+
+    __slots__ = ("key", "queue")
+
+    def __init__(self, key: Tuple[str, str]) -> None:
+        self.key = key
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=_SUBSCRIPTION_QUEUE_SIZE)
+
+    def push(self, event: Optional[Dict[str, Any]]) -> None:
+        if event is not None:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except asyncio.QueueFull:
+                pass
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self, timeout: float) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """(получено ли что-то, событие или None-ресинк) с ожиданием не дольше timeout."""
+        try:
+            return True, await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False, None
+
+
+class ChatEventHub:
+    """
+    Один подписчик Redis pub/sub на процесс, раздающий события чатов
+    SSE-подключениям этого процесса по (connected_integration_id, chat_id).
+
+    Подписка поднимается с первым подключением и снимается, когда
+    подключений не осталось.
+    """
+
+    def __init__(self, channel: str) -> None:
+        self.channel = channel
+        self._subscriptions: Dict[Tuple[str, str], Set[ChatEventSubscription]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, connected_integration_id: str, chat_id: str) -> ChatEventSubscription:
+        key = (str(connected_integration_id), str(chat_id))
+        subscription = ChatEventSubscription(key)
+        self._subscriptions.setdefault(key, set()).add(subscription)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(), name="external_chat_event_hub")
+        return subscription
+
+    def unsubscribe(self, subscription: ChatEventSubscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.key)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            self._subscriptions.pop(subscription.key, None)
+
+    @staticmethod
+    def encode(connected_integration_id: str, chat_id: str, event: Dict[str, Any]) -> str:
+        return json.dumps(
+            {"ci": connected_integration_id, "chat_id": chat_id, "event": event},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+
+    async def stop(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is None:
+            return
+        listener.cancel()
+        try:
+            await listener
+        except asyncio.CancelledError:
+            pass
+
+    async def _listen(self) -> None:
+        delay = _RECONNECT_DELAY_SEC
+        while self._subscriptions:
+            pubsub = redis_ops.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # пока подписки не было (старт, переподключение), события не доходили — всем ресинк
+                self._resync_all()
+                delay = _RECONNECT_DELAY_SEC
+                while self._subscriptions:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=_GET_MESSAGE_TIMEOUT_SEC,
+                    )
+                    if message and message.get("type") == "message":
+                        self._dispatch(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning("Chat event subscription failed: channel=%s error=%s", self.channel, error)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _RECONNECT_MAX_DELAY_SEC)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def _dispatch(self, raw: Any) -> None:
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(message, dict) or not isinstance(message.get("event"), dict):
+            return
+        key = (str(message.get("ci") or ""), str(message.get("chat_id") or ""))
+        for subscription in list(self._subscriptions.get(key) or ()):
+            subscription.push(message["event"])
+
+    def _resync_all(self) -> None:
+        for subscriptions in list(self._subscriptions.values()):
+            for subscription in list(subscriptions):
+                subscription.push(None)
+
+
+__all__ = ["ChatEventHub", "ChatEventSubscription"]
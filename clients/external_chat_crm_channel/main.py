@@ -16,9 +16,10 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 from fastapi.responses import HTMLResponse
-from starlette.responses import JSONResponse, RedirectResponse, Response
+from starlette.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
 
 from clients.base import ClientBase
+from clients.external_chat_crm_channel.event_hub import ChatEventHub
 from config.settings import settings as app_settings
 from core.api.regos_api import RegosAPI
 from core.logger import setup_logger
@@ -100,7 +101,7 @@ class ExternalChatCrmChannelConfig:
     INTEGRATION_KEY = "external_chat_crm_channel"
     REDIS_PREFIX = "ecc:"
     STREAM_REDIS_PREFIX = "ecc"
-    UI_ASSET_VERSION = "20260505-1"
+    UI_ASSET_VERSION = "20261016-1"
     UI_ASSET_VERSION_PARAM = "v"
     SETTINGS_TTL_SEC = max(int(app_settings.redis_cache_ttl or 60), 30)
     SETTINGS_STALE_TTL_SEC = max(SETTINGS_TTL_SEC * 10, 10 * 60)
@@ -131,6 +132,9 @@ class ExternalChatCrmChannelConfig:
     EVENT_QUEUE_TTL_SEC = 6 * 60 * 60
     EVENT_QUEUE_MAX_ITEMS = 500
     EVENT_BATCH_MAX_ITEMS = 30
+    EVENT_STREAM_HEARTBEAT_SEC = 15
+    EVENT_STREAM_MAX_DURATION_SEC = 5 * 60
+    EVENT_STREAM_RETRY_MS = 3000
     STREAM_TTL_SEC = 24 * 60 * 60
     STREAM_GROUP = "eccw"
     STREAM_MAXLEN = max(int(app_settings.external_chat_crm_channel_stream_maxlen or 0), 10000)
@@ -216,6 +220,8 @@ _STREAM_CLAIM_TS: Dict[str, int] = {}
 _SETTINGS_LOCAL_CACHE: Dict[str, Tuple[int, Dict[str, str]]] = {}
 _RUNTIME_LOCAL_CACHE: Dict[str, Tuple[int, RuntimeConfig]] = {}
 _RUNTIME_LOCAL_LOCK = asyncio.Lock()
+# SSE: события чатов из Redis pub/sub раздаются подключениям процесса одним подписчиком
+_CHAT_EVENT_HUB = ChatEventHub(f"{ExternalChatCrmChannelConfig.REDIS_PREFIX}chat_events")
 
 _ENQUEUE_DEDUPE_LUA = """
 local ok = redis.call('set', KEYS[1], '1', 'EX', ARGV[1], 'NX')
@@ -1554,9 +1560,14 @@ class ExternalChatCrmChannelIntegration(ClientBase):
         event["id"] = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
         serialized = _json_dumps(event)
         async with redis_ops.pipeline(transaction=True) as pipe:
+            # список — для short polling (getupdates), publish — для SSE-подключений
             await pipe.rpush(queue_key, serialized)
             await pipe.ltrim(queue_key, -max_items, -1)
             await pipe.expire(queue_key, ttl_sec)
+            await pipe.publish(
+                _CHAT_EVENT_HUB.channel,
+                ChatEventHub.encode(connected_integration_id, safe_chat_id, event),
+            )
             await pipe.execute()
 
     @staticmethod
@@ -1623,6 +1634,94 @@ class ExternalChatCrmChannelIntegration(ClientBase):
                 events.append(payload)
         return events
 
+    @staticmethod
+    def _sse_frame(event: Dict[str, Any]) -> str:
+        # id — ревизия чата: браузер вернёт её в Last-Event-ID при переподключении
+        revision = int(event.get("chat_revision") or 0)
+        prefix = f"id: {revision}\n" if revision > 0 else ""
+        return f"{prefix}event: chat\ndata: {_json_dumps(event)}\n\n"
+
+    @classmethod
+    async def _open_event_stream(
+        cls,
+        connected_integration_id: str,
+        envelope: Dict[str, Any],
+    ) -> Response:
+        query = envelope.get("query") or {}
+        visitor_id = cls._normalize_visitor_id(_query_get(query, "visitor_id"))
+        if not visitor_id:
+            return JSONResponse(
+                status_code=400,
+                content={"error": 400, "description": "visitor_id is required"},
+            )
+        context = await cls._load_cached_context(connected_integration_id, visitor_id)
+        if not context:
+            # 4xx закрывает EventSource — виджет остаётся на short polling
+            return JSONResponse(
+                status_code=404,
+                content={"error": 404, "description": "Chat is not initialized"},
+            )
+
+        chat_id = str(context.chat_id)
+        resume_revision = _parse_int(
+            _headers_ci(envelope.get("headers") or {}, "Last-Event-ID"),
+            _parse_int(_query_get(query, "known_revision"), None),
+        )
+
+        async def revision_sync(known: Optional[int], source_action: str) -> Tuple[Optional[str], Optional[int]]:
+            current = int(await cls._get_chat_revision(connected_integration_id, chat_id) or 0)
+            if current <= 0 or known == current:
+                return None, known
+            frame = cls._sse_frame(cls._build_revision_sync_event(
+                chat_id=chat_id,
+                ticket_id=int(context.ticket_id),
+                chat_revision=current,
+                source_action=source_action,
+            ))
+            return frame, current
+
+        async def stream():
+            last_revision = resume_revision
+            deadline = time.monotonic() + ExternalChatCrmChannelConfig.EVENT_STREAM_MAX_DURATION_SEC
+            # подписка до чтения ревизии: событие между ними не потеряется
+            subscription = _CHAT_EVENT_HUB.subscribe(connected_integration_id, chat_id)
+            try:
+                yield f"retry: {ExternalChatCrmChannelConfig.EVENT_STREAM_RETRY_MS}\n\n"
+                if last_revision is not None:
+                    frame, last_revision = await revision_sync(last_revision, "revision_sync")
+                    if frame:
+                        yield frame
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        # соединение не живёт вечно: браузер переподключится с Last-Event-ID
+                        return
+                    received, event = await subscription.get(
+                        min(remaining, ExternalChatCrmChannelConfig.EVENT_STREAM_HEARTBEAT_SEC)
+                    )
+                    if not received:
+                        yield ": ping\n\n"
+                        continue
+                    if event is None:
+                        frame, last_revision = await revision_sync(last_revision, "revision_sync_after_gap")
+                        if frame:
+                            yield frame
+                        continue
+                    revision = int(event.get("chat_revision") or 0)
+                    if revision > 0:
+                        if last_revision is not None and revision <= last_revision:
+                            continue
+                        last_revision = revision
+                    yield cls._sse_frame(event)
+            finally:
+                _CHAT_EVENT_HUB.unsubscribe(subscription)
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     @classmethod
     async def _write_active_cache(
         cls,
@@ -4594,6 +4693,7 @@ class ExternalChatCrmChannelIntegration(ClientBase):
             except Exception:
                 logger.exception("Error while stopping external chat stream worker")
         _STREAM_GROUP_READY.clear()
+        await _CHAT_EVENT_HUB.stop()
         _STREAM_CLAIM_TS.clear()
         _STREAM_TTL_TOUCH_TS.clear()
         _SETTINGS_LOCAL_CACHE.clear()
@@ -5268,6 +5368,8 @@ class ExternalChatCrmChannelIntegration(ClientBase):
             )
 
         if method == "GET":
+            if _normalize_text(_query_get(envelope.get("query") or {}, "action"), 64).lower() == "stream":
+                return await self._open_event_stream(ci, envelope)
             return {"status": "ok", "connected_integration_id": ci}
         if method != "POST":
             return JSONResponse(status_code=405, content={"error": 405, "description": "Method not allowed"})
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import uuid
 import time
+from dataclasses import dataclass, field
 from decimal import Decimal, InvalidOperation
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -102,6 +105,11 @@ def _nested(data: Any, path: str, default: Any = None) -> Any:
     return current
 
 
+def _payload_hash(entry: Dict[str, Any]) -> str:
+    raw = json.dumps(jsonable_encoder(entry), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
 def _normalize_settings_map(raw: Dict[str, Any]) -> Dict[str, str]:
     normalized: Dict[str, str] = {}
     for key, value in (raw or {}).items():
@@ -111,6 +119,46 @@ def _normalize_settings_map(raw: Dict[str, Any]) -> Dict[str, str]:
     return normalized
 
 
+@dataclass
+class _UnloadPage:
+    offset: int
+    next_offset: int
+    last: bool
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    payload: List[Dict[str, Any]] = field(default_factory=list)
+    hashes: Dict[str, str] = field(default_factory=dict)
+    scanned: int = 0
+    unchanged: int = 0
+
+
+@dataclass
+class _UnloadRun:
+    endpoint: str
+    settings_map: Dict[str, str]
+    price_type_id: int
+    image_size: Optional[ItemGetExtImageSize]
+    stock_ids: List[int]
+    stocks: List[Dict[str, Any]]
+    signature: str
+    delta_enabled: bool
+    full: bool
+    known_hashes: Dict[str, str]
+    start_offset: int = 0
+    resumed: bool = False
+    seen_ids: set[str] = field(default_factory=set)
+    stats: Dict[str, int] = field(
+        default_factory=lambda: {"items_scanned": 0, "items_sent": 0, "items_unchanged": 0, "items_removed": 0}
+    )
+
+    def resume_from(self, checkpoint: Dict[str, Any]) -> None:
+        self.start_offset = _to_int(checkpoint.get("offset"))
+        self.full = bool(checkpoint.get("full", self.full))
+        self.resumed = True
+        for key, value in (checkpoint.get("stats") or {}).items():
+            if key in self.stats:
+                self.stats[key] = _to_int(value)
+
+
 class MarketplaceToServerIntegration(ClientBase):
     integration_key = "marketplace_toserver"
     redis_prefix = "mp:ts"
@@ -144,6 +192,15 @@ class MarketplaceToServerIntegration(ClientBase):
     def _schedule_auth_error_key(self, schedule_uuid: str) -> str:
         return self._redis_key("sae", schedule_uuid)
 
+    def _delta_hash_key(self) -> str:
+        return self._redis_key("dh")
+
+    def _delta_state_key(self) -> str:
+        return self._redis_key("ds")
+
+    def _checkpoint_key(self) -> str:
+        return self._redis_key("cp")
+
     @classmethod
     def _stream_key(cls) -> str:
         return redis_make_key(cls.redis_prefix, "scheduler")
@@ -272,42 +329,69 @@ class MarketplaceToServerIntegration(ClientBase):
             if not stock_ids:
                 raise MarketplaceToServerError(111422, f"{self.integration_key} stock_ids is not specified")
 
-            sent_items = 0
-            offset = 0
-            total = 0
             image_size = self._image_size(settings_map.get("image_size"))
+            delta_enabled = self._delta_enabled(settings_map)
+            signature = self._delta_signature(endpoint, price_type_id, stock_ids, image_size)
+            full, known_hashes = (
+                await self._delta_plan(signature) if delta_enabled else (True, {})
+            )
+
+            run = _UnloadRun(
+                endpoint=endpoint,
+                settings_map=settings_map,
+                price_type_id=price_type_id,
+                image_size=image_size,
+                stock_ids=stock_ids,
+                stocks=stocks,
+                signature=signature,
+                delta_enabled=delta_enabled,
+                full=full,
+                known_hashes=known_hashes,
+            )
+            checkpoint = await self._load_checkpoint(signature)
+            if checkpoint is not None:
+                run.resume_from(checkpoint)
+                logger.info(
+                    "Marketplace toserver unload resumed: ci=%s offset=%s mode=%s",
+                    self._ci(),
+                    run.start_offset,
+                    "full" if run.full else "delta",
+                )
+
             async with httpx.AsyncClient(timeout=settings.marketplace_external_timeout) as client:
                 await self._preflight(client, endpoint, settings_map)
-                while True:
-                    item_ext_rows, next_offset, response_total = await self._item_ext_page(
+                await self._run_unload_pipeline(run, client)
+
+                # после возобновления часть выборки просмотрена в прошлом запуске —
+                # выпавшие товары определим в следующем полном проходе
+                if delta_enabled and not run.resumed:
+                    removed_ids = sorted(_to_int(item_id) for item_id in known_hashes if item_id not in run.seen_ids)
+                    run.stats["items_removed"] = await self._push_removed(
+                        client,
+                        endpoint,
+                        settings_map,
+                        item_ids=[item_id for item_id in removed_ids if item_id > 0],
                         price_type_id=price_type_id,
                         image_size=image_size,
-                        offset=offset,
+                        stocks=stocks,
                     )
-                    if not item_ext_rows:
-                        break
-
-                    item_ids = [_to_int(_nested(row, "item.id")) for row in item_ext_rows]
-                    item_ids = [item_id for item_id in item_ids if item_id > 0]
-                    qty_rows = await self._current_quantities(item_ids=item_ids, stock_ids=stock_ids)
-                    payload = self._build_payload(item_ext_rows, qty_rows, stocks)
-                    if payload:
-                        post_response = await client.post(
-                            endpoint,
-                            json=jsonable_encoder(payload),
-                            auth=self._basic_auth(settings_map),
-                        )
-                        post_response.raise_for_status()
-                        sent_items += len(payload)
-
-                    total = _to_int(response_total, total)
-                    if next_offset == 0 or next_offset == offset or (total > 0 and next_offset >= total):
-                        break
-                    offset = next_offset
+                if delta_enabled:
+                    await self._save_delta_state(signature, full=run.full, stats=run.stats)
+            await redis_delete_keys(self._checkpoint_key())
 
+            logger.info(
+                "Marketplace toserver unload: ci=%s mode=%s scanned=%s sent=%s unchanged=%s removed=%s",
+                self._ci(),
+                "full" if run.full else "delta",
+                run.stats["items_scanned"],
+                run.stats["items_sent"],
+                run.stats["items_unchanged"],
+                run.stats["items_removed"],
+            )
             return {
                 "status": "ok",
-                "items_sent": sent_items,
+                "mode": "full" if run.full else "delta",
+                **run.stats,
                 "finished_at": int(time.time()),
             }
         finally:
@@ -747,16 +831,19 @@ class MarketplaceToServerIntegration(ClientBase):
         price_type_id: int,
         image_size: Optional[ItemGetExtImageSize],
         offset: int,
+        ids: Optional[List[int]] = None,
     ) -> Tuple[List[Dict[str, Any]], int, int]:
+        # по ids выбираем и помеченные на удаление / с нулевой ценой — для снятия с витрины
         async with RegosAPI(self._ci()) as api:
             response = await api.references.item.get_ext(
                 ItemGetExtRequest(
                     price_type_id=price_type_id if price_type_id > 0 else None,
+                    ids=ids or None,
                     offset=offset,
-                    limit=settings.marketplace_unload_page_size,
-                    deleted_mark=False,
+                    limit=len(ids) if ids else settings.marketplace_unload_page_size,
+                    deleted_mark=None if ids else False,
                     image_size=image_size,
-                    zero_price=False,
+                    zero_price=None if ids else False,
                 )
             )
         if not response.ok:
@@ -788,6 +875,229 @@ class MarketplaceToServerIntegration(ClientBase):
                 )
         return result
 
+    # ---------- конвейер выгрузки ----------
+
+    async def _run_unload_pipeline(self, run: _UnloadRun, client: httpx.AsyncClient) -> None:
+        """
+        Три стадии, связанные ограниченными очередями: страница Item/GetExt ->
+        остатки и payload -> POST. Пока страница N отправляется, N+1 уже
+        читается; заполненная очередь притормаживает предыдущую стадию.
+        Каждая стадия — одна задача, поэтому страницы идут строго по порядку,
+        и чекпоинт после отправки страницы всегда указывает на непрерывный префикс.
+        """
+        depth = max(int(settings.marketplace_toserver_pipeline_depth or 0), 1)
+        fetched: asyncio.Queue = asyncio.Queue(maxsize=depth)
+        enriched: asyncio.Queue = asyncio.Queue(maxsize=depth)
+        tasks = [
+            asyncio.create_task(self._fetch_stage(run, fetched)),
+            asyncio.create_task(self._enrich_stage(run, fetched, enriched)),
+            asyncio.create_task(self._push_stage(run, client, enriched)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _fetch_stage(self, run: _UnloadRun, out_queue: asyncio.Queue) -> None:
+        offset = run.start_offset
+        total = 0
+        while True:
+            item_ext_rows, next_offset, response_total = await self._item_ext_page(
+                price_type_id=run.price_type_id,
+                image_size=run.image_size,
+                offset=offset,
+            )
+            if not item_ext_rows:
+                break
+            total = _to_int(response_total, total)
+            last = next_offset == 0 or next_offset == offset or (total > 0 and next_offset >= total)
+            await out_queue.put(
+                _UnloadPage(offset=offset, next_offset=next_offset, last=last, rows=item_ext_rows)
+            )
+            if last:
+                break
+            offset = next_offset
+        await out_queue.put(None)
+
+    async def _enrich_stage(
+        self,
+        run: _UnloadRun,
+        in_queue: asyncio.Queue,
+        out_queue: asyncio.Queue,
+    ) -> None:
+        while True:
+            page: Optional[_UnloadPage] = await in_queue.get()
+            if page is None:
+                await out_queue.put(None)
+                return
+            item_ids = [_to_int(_nested(row, "item.id")) for row in page.rows]
+            item_ids = [item_id for item_id in item_ids if item_id > 0]
+            qty_rows = await self._current_quantities(item_ids=item_ids, stock_ids=run.stock_ids)
+            payload = self._build_payload(page.rows, qty_rows, run.stocks)
+            page.rows = []
+            page.scanned = len(payload)
+            if run.delta_enabled:
+                page.hashes = {str(entry["id"]): _payload_hash(entry) for entry in payload}
+                run.seen_ids.update(page.hashes)
+                if not run.full:
+                    payload = [
+                        entry for entry in payload
+                        if run.known_hashes.get(str(entry["id"])) != page.hashes[str(entry["id"])]
+                    ]
+                    page.unchanged = len(page.hashes) - len(payload)
+            page.payload = payload
+            await out_queue.put(page)
+
+    async def _push_stage(
+        self,
+        run: _UnloadRun,
+        client: httpx.AsyncClient,
+        in_queue: asyncio.Queue,
+    ) -> None:
+        while True:
+            page: Optional[_UnloadPage] = await in_queue.get()
+            if page is None:
+                return
+            if page.payload:
+                await self._push(client, run.endpoint, run.settings_map, page.payload)
+                if run.delta_enabled:
+                    await self._store_hashes(
+                        {str(entry["id"]): page.hashes[str(entry["id"])] for entry in page.payload}
+                    )
+            run.stats["items_scanned"] += page.scanned
+            run.stats["items_sent"] += len(page.payload)
+            run.stats["items_unchanged"] += page.unchanged
+            if not page.last:
+                await self._save_checkpoint(run, page.next_offset)
+
+    async def _load_checkpoint(self, signature: str) -> Optional[Dict[str, Any]]:
+        checkpoint = await redis_get_json(self._checkpoint_key(), local_ttl_sec=0)
+        if not isinstance(checkpoint, dict) or checkpoint.get("signature") != signature:
+            return None
+        if _to_int(checkpoint.get("offset")) <= 0:
+            return None
+        return checkpoint
+
+    async def _save_checkpoint(self, run: _UnloadRun, offset: int) -> None:
+        await redis_set_json(
+            self._checkpoint_key(),
+            {
+                "signature": run.signature,
+                "full": run.full,
+                "offset": offset,
+                "stats": run.stats,
+                "saved_at": int(time.time()),
+            },
+            max(int(settings.marketplace_toserver_checkpoint_ttl or 0), 60),
+            local_ttl_sec=0,
+        )
+
+    # ---------- delta-выгрузка ----------
+
+    @staticmethod
+    def _delta_enabled(settings_map: Dict[str, str]) -> bool:
+        default = "1" if settings.marketplace_toserver_delta_sync else "0"
+        return str(settings_map.get("delta_sync", default)).strip() != "0"
+
+    @staticmethod
+    def _delta_signature(
+        endpoint: str,
+        price_type_id: int,
+        stock_ids: List[int],
+        image_size: Optional[ItemGetExtImageSize],
+    ) -> str:
+        # смена адресата или состава выгрузки обнуляет сохранённые хэши
+        source = json.dumps(
+            [endpoint, price_type_id, stock_ids, image_size.value if image_size else None],
+            separators=(",", ":"),
+        )
+        return hashlib.blake2b(source.encode("utf-8"), digest_size=8).hexdigest()
+
+    async def _delta_plan(self, signature: str) -> Tuple[bool, Dict[str, str]]:
+        """(полная выгрузка?, сохранённые хэши item_id -> hash)."""
+        state = await redis_get_json(self._delta_state_key(), local_ttl_sec=0)
+        if not isinstance(state, dict) or state.get("signature") != signature:
+            await redis_delete_keys(self._delta_hash_key())
+            return True, {}
+        known_hashes = await redis_ops.hgetall(self._delta_hash_key()) or {}
+        interval = max(int(settings.marketplace_toserver_full_sync_interval_sec or 0), 0)
+        full_at = _to_int(state.get("full_at"))
+        full = not known_hashes or (interval > 0 and int(time.time()) - full_at >= interval)
+        return full, known_hashes
+
+    async def _store_hashes(self, hashes: Dict[str, str]) -> None:
+        if not hashes:
+            return
+        key = self._delta_hash_key()
+        async with redis_ops.pipeline(transaction=False) as pipe:
+            await pipe.hset(key, mapping=hashes)
+            await pipe.expire(key, max(int(settings.marketplace_toserver_delta_ttl or 0), 86400))
+            await pipe.execute()
+
+    async def _save_delta_state(self, signature: str, *, full: bool, stats: Dict[str, int]) -> None:
+        previous = await redis_get_json(self._delta_state_key(), local_ttl_sec=0)
+        full_at = int(time.time()) if full else _to_int((previous or {}).get("full_at"))
+        await redis_set_json(
+            self._delta_state_key(),
+            {
+                "signature": signature,
+                "full_at": full_at,
+                "last_run_at": int(time.time()),
+                "last_mode": "full" if full else "delta",
+                "last_stats": stats,
+            },
+            max(int(settings.marketplace_toserver_delta_ttl or 0), 86400),
+            local_ttl_sec=0,
+        )
+
+    async def _push_removed(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        settings_map: Dict[str, str],
+        *,
+        item_ids: List[int],
+        price_type_id: int,
+        image_size: Optional[ItemGetExtImageSize],
+        stocks: List[Dict[str, Any]],
+    ) -> int:
+        """Выпавшие из выборки товары отправляются с нулевыми остатками и забываются."""
+        removed = 0
+        page_size = max(int(settings.marketplace_unload_page_size or 0), 1)
+        for start in range(0, len(item_ids), page_size):
+            chunk_ids = item_ids[start : start + page_size]
+            item_ext_rows, _, _ = await self._item_ext_page(
+                price_type_id=price_type_id,
+                image_size=image_size,
+                offset=0,
+                ids=chunk_ids,
+            )
+            payload = self._build_payload(item_ext_rows, [], stocks)
+            if payload:
+                await self._push(client, endpoint, settings_map, payload)
+                removed += len(payload)
+            async with redis_ops.pipeline(transaction=False) as pipe:
+                await pipe.hdel(self._delta_hash_key(), *[str(item_id) for item_id in chunk_ids])
+                await pipe.execute()
+        return removed
+
+    async def _push(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        settings_map: Dict[str, str],
+        payload: List[Dict[str, Any]],
+    ) -> None:
+        response = await client.post(
+            endpoint,
+            json=jsonable_encoder(payload),
+            auth=self._basic_auth(settings_map),
+        )
+        response.raise_for_status()
+
     async def _preflight(
         self,
         client: httpx.AsyncClient,
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import gzip
 import hashlib
+import json
 import time
 import uuid
 from datetime import datetime, timezone
@@ -11,7 +14,7 @@ from urllib.parse import parse_qs
 
 import httpx
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from clients.base import ClientBase
 from config.settings import settings
@@ -22,6 +25,7 @@ from core.redis import (
     redis_delete_keys,
     redis_get_json,
     redis_make_key,
+    redis_ops,
     redis_release_lock,
     redis_set_json,
 )
@@ -68,6 +72,17 @@ def _json(payload: Any, status_code: int = 200) -> JSONResponse:
     return JSONResponse(status_code=status_code, content=jsonable_encoder(_drop_none(payload)))
 
 
+def _json_bytes(payload: Any) -> bytes:
+    # те же байты, что отдал бы _json (JSONResponse.render)
+    return json.dumps(
+        jsonable_encoder(_drop_none(payload)),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
 def _error(code: int, description: str) -> Dict[str, Any]:
     return {"code": int(code), "description": str(description)}
 
@@ -171,6 +186,35 @@ def _authorization(envelope: Dict[str, Any]) -> str:
     return ""
 
 
+def _header(envelope: Dict[str, Any], name: str) -> str:
+    for key, value in (envelope.get("headers") or {}).items():
+        if str(key).lower() == name:
+            return str(value or "")
+    return ""
+
+
+def _accepts_gzip(envelope: Dict[str, Any]) -> bool:
+    for part in str(envelope.get("accept_encoding") or "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip() in {"gzip", "*"}:
+            return params.replace(" ", "") not in {"q=0", "q=0.0", "q=0.00", "q=0.000"}
+    return False
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
 def _path(envelope: Dict[str, Any]) -> str:
     external_path = str(envelope.get("external_path") or "").strip("/")
     if not external_path:
@@ -220,6 +264,7 @@ def _order_status_id(order: Dict[str, Any]) -> int:
 class UzumTezkorIntegration(ClientBase):
     integration_key = "marketplace_uzum_tezkor"
     redis_prefix = "mp:uz"
+    NOMENCLATURE_DOCUMENTS = ("composition", "availability")
 
     def __init__(self) -> None:
         self.connected_integration_id: Optional[str] = None
@@ -250,6 +295,12 @@ class UzumTezkorIntegration(ClientBase):
     def _order_dedupe_key(self, external_order_id: str) -> str:
         return self._redis_key("od", _sha1(external_order_id)[:16])
 
+    def _document_key(self, action: str, store_id: int, price_type: int) -> str:
+        return self._redis_key("doc", action, store_id, price_type)
+
+    def _document_lock_key(self, store_id: int, price_type: int) -> str:
+        return self._redis_key("docl", store_id, price_type)
+
     async def handle_external(self, envelope: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Any:
         if envelope is None:
             envelope = dict(kwargs)
@@ -272,9 +323,9 @@ class UzumTezkorIntegration(ClientBase):
                 return _json(_error_list(auth_error["code"], auth_error["description"]), 401 if auth_error["code"] == 401 else 500)
 
             if method == "GET" and path.startswith("v1/nomenclature/"):
-                return await self._handle_nomenclature(path)
+                return await self._handle_nomenclature(path, envelope)
             if method == "GET" and path.startswith("nomenclature/"):
-                return await self._handle_nomenclature(path)
+                return await self._handle_nomenclature(path, envelope)
             if method == "POST" and path in {"v1/order", "order"}:
                 return _json(await self._create_order(_body(envelope)))
 
@@ -480,7 +531,7 @@ class UzumTezkorIntegration(ClientBase):
                 local_ttl_sec=0,
             )
 
-    async def _handle_nomenclature(self, path: str) -> JSONResponse:
+    async def _handle_nomenclature(self, path: str, envelope: Dict[str, Any]) -> Response:
         parts = path.split("/")
         if parts[0] == "v1":
             store_id = _to_int(parts[2]) if len(parts) > 2 else 0
@@ -488,11 +539,140 @@ class UzumTezkorIntegration(ClientBase):
         else:
             store_id = _to_int(parts[1]) if len(parts) > 1 else 0
             action = parts[2] if len(parts) > 2 else ""
-        if action == "composition":
-            return _json(await self._composition(store_id))
-        if action == "availability":
-            return _json(await self._availability(store_id))
-        return _json(_error_list(404, "Route not found"), 404)
+        if action not in self.NOMENCLATURE_DOCUMENTS:
+            return _json(_error_list(404, "Route not found"), 404)
+        if store_id <= 0:
+            raise UzumTezkorError(400, "Неверный формат storeId")
+        price_type = await self._price_type()
+        etag, body = await self._nomenclature_document(
+            action,
+            store_id,
+            price_type,
+            if_none_match=_header(envelope, "if-none-match"),
+        )
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if body is None:
+            return Response(status_code=304, headers=headers)
+        if _accepts_gzip(envelope):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=body, media_type="application/json", headers=headers)
+        return Response(content=gzip.decompress(body), media_type="application/json", headers=headers)
+
+    # ---------- готовые ответы nomenclature ----------
+    #
+    # После каждого обновления каталога composition и availability склада
+    # сериализуются один раз, сжимаются gzip и кладутся в Redis вместе с ETag.
+    # Повторный опрос партнёра — чтение из Redis (или 304 по If-None-Match)
+    # вместо полной выгрузки Item/GetExt. Оба документа строятся из одной выгрузки.
+
+    async def _nomenclature_document(
+        self,
+        action: str,
+        store_id: int,
+        price_type: int,
+        *,
+        if_none_match: str = "",
+    ) -> Tuple[str, Optional[bytes]]:
+        """(etag, gzip-тело) документа; тело None — у партнёра актуальная версия (304)."""
+        key = self._document_key(action, store_id, price_type)
+        meta = await redis_get_json(f"{key}:m", local_ttl_sec=1)
+        meta = meta if isinstance(meta, dict) and meta.get("etag") else None
+        ttl = max(float(settings.marketplace_uzum_tezkor_document_ttl_sec or 0), 1.0)
+        if meta is None or time.time() - float(meta.get("built_at") or 0) >= ttl:
+            documents = await self._materialize_documents(store_id, price_type, has_stale=meta is not None)
+            if documents is not None:
+                etag, body = documents[action]
+                return etag, None if _etag_matches(if_none_match, etag) else body
+            # обновляет другой воркер — отдаём то, что уже лежит в Redis
+            meta = await redis_get_json(f"{key}:m", local_ttl_sec=0) or meta
+
+        etag = str(meta["etag"])
+        if _etag_matches(if_none_match, etag):
+            return etag, None
+        stored = await redis_ops.get(f"{key}:b")
+        stored_etag, _, data = str(stored or "").partition(":")
+        if stored_etag != etag:
+            # тело и meta разошлись (идёт запись) — собираем сами
+            documents = await self._materialize_documents(store_id, price_type, has_stale=False, force=True)
+            etag, body = documents[action]
+            return etag, None if _etag_matches(if_none_match, etag) else body
+        return etag, base64.b64decode(data)
+
+    async def _materialize_documents(
+        self,
+        store_id: int,
+        price_type: int,
+        *,
+        has_stale: bool,
+        force: bool = False,
+    ) -> Optional[Dict[str, Tuple[str, bytes]]]:
+        """
+        Пересобрать документы склада под Redis-локом. None — пересборка не нужна
+        или уже идёт в другом воркере, а в Redis есть что отдать.
+        """
+        build_timeout = int(settings.marketplace_uzum_tezkor_document_build_timeout_sec)
+        lock_key = self._document_lock_key(store_id, price_type)
+        lock_token = await redis_acquire_lock(
+            lock_key,
+            build_timeout,
+            wait_timeout_sec=0 if has_stale else build_timeout,
+            retry_delay_sec=0.2,
+        )
+        if not lock_token:
+            if has_stale:
+                return None
+            logger.warning("Uzum document lock timeout, building without lock: ci=%s store=%s", self._ci(), store_id)
+            return await self._build_documents(store_id, price_type)
+        try:
+            if not force:
+                meta = await redis_get_json(
+                    f"{self._document_key('composition', store_id, price_type)}:m",
+                    local_ttl_sec=0,
+                )
+                ttl = max(float(settings.marketplace_uzum_tezkor_document_ttl_sec or 0), 1.0)
+                if isinstance(meta, dict) and time.time() - float(meta.get("built_at") or 0) < ttl:
+                    # пока ждали лок, документы собрал другой воркер
+                    return None
+            return await self._build_documents(store_id, price_type)
+        finally:
+            await redis_release_lock(lock_key, lock_token)
+
+    async def _build_documents(self, store_id: int, price_type: int) -> Dict[str, Tuple[str, bytes]]:
+        started = time.monotonic()
+        # zero_price=True: availability нужны все товары, composition сам отсекает нулевую цену
+        groups, items = await asyncio.gather(
+            self._item_groups(),
+            self._item_ext_all(store_id, price_type, zero_price=True),
+        )
+        payloads = {
+            "composition": self._composition_document(groups, items),
+            "availability": self._availability_document(items),
+        }
+        built_at = time.time()
+        keep_sec = int(max(float(settings.marketplace_uzum_tezkor_document_ttl_sec or 0), 1.0) * 10)
+        documents: Dict[str, Tuple[str, bytes]] = {}
+        for action, payload in payloads.items():
+            raw = _json_bytes(payload)
+            etag = f'"{hashlib.sha1(raw).hexdigest()[:20]}"'
+            body = gzip.compress(raw, compresslevel=6, mtime=0)
+            key = self._document_key(action, store_id, price_type)
+            # клиент Redis работает со строками — gzip кладём в base64
+            await redis_ops.set(f"{key}:b", f"{etag}:{base64.b64encode(body).decode('ascii')}", ex=keep_sec)
+            await redis_set_json(
+                f"{key}:m",
+                {"etag": etag, "built_at": built_at, "bytes": len(raw), "gzip_bytes": len(body)},
+                keep_sec,
+                local_ttl_sec=1,
+            )
+            documents[action] = (etag, body)
+        logger.info(
+            "Uzum nomenclature documents built: ci=%s store=%s items=%s elapsed=%.2fs",
+            self._ci(),
+            store_id,
+            len(items),
+            time.monotonic() - started,
+        )
+        return documents
 
     async def _price_type(self) -> int:
         settings_map = await self._load_settings()
@@ -535,14 +715,7 @@ class UzumTezkorIntegration(ClientBase):
                 offset = next_offset
         return result
 
-    async def _composition(self, store_id: int) -> Dict[str, Any]:
-        if store_id <= 0:
-            raise UzumTezkorError(400, "Неверный формат storeId")
-        price_type = await self._price_type()
-        groups, items = await asyncio.gather(
-            self._item_groups(),
-            self._item_ext_all(store_id, price_type, zero_price=False),
-        )
+    def _composition_document(self, groups: List[Dict[str, Any]], items: List[Dict[str, Any]]) -> Dict[str, Any]:
         categories = []
         for group in groups:
             group_id = _to_int(group.get("id"))
@@ -587,11 +760,8 @@ class UzumTezkorIntegration(ClientBase):
             "vendorCode": str(_to_int(item.get("code"))).zfill(6),
         }
 
-    async def _availability(self, store_id: int) -> Dict[str, Any]:
-        if store_id <= 0:
-            raise UzumTezkorError(400, "Неверный формат storeId")
-        price_type = await self._price_type()
-        items = await self._item_ext_all(store_id, price_type, zero_price=True)
+    @staticmethod
+    def _availability_document(items: List[Dict[str, Any]]) -> Dict[str, Any]:
         result = []
         for ext in items:
             item_id = _to_int(_nested(ext, "item.id"))
@@ -14,6 +14,7 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse, Response
 
 from clients.base import ClientBase
+from clients.marketplace_yandex_eats.snapshot import drop_local_snapshots, get_catalog_snapshot
 from config.settings import settings
 from core.api.regos_api import RegosAPI
 from core.logger import setup_logger
@@ -308,6 +309,9 @@ class YandexEatsIntegration(ClientBase):
     def _groups_lock_key(self) -> str:
         return self._redis_key("gl")
 
+    def _catalog_snapshot_key(self, store_id: Optional[int], price_type_id: Optional[int]) -> str:
+        return self._redis_key("cs", max(int(store_id or 0), 0), max(int(price_type_id or 0), 0))
+
     def _token_lock_key(self) -> str:
         return self._redis_key("tl")
 
@@ -390,6 +394,7 @@ class YandexEatsIntegration(ClientBase):
         self._integration_key = None
         self._settings = None
         await redis_delete_keys(self._active_cache_key(), self._settings_cache_key(), self._groups_cache_key())
+        drop_local_snapshots(self._redis_key("cs"))
         return {"status": "settings updated"}
 
     async def _load_integration(self) -> str:
@@ -623,6 +628,10 @@ class YandexEatsIntegration(ClientBase):
             raise YandexEatsError(113422, f"{await self._load_integration()} PRICE_TYPE not set")
         return price_type
 
+    async def _price_type_or_zero(self) -> int:
+        settings_map = await self._load_settings()
+        return max(_to_int(settings_map.get("price_type")), 0)
+
     def _nomenclature_page(self, query: Dict[str, Any]) -> Tuple[int, int]:
         return (
             _query_int(
@@ -665,29 +674,6 @@ class YandexEatsIntegration(ClientBase):
         vat = _to_int(_nested(item, "vat.value"), -1)
         return vat if vat in {-1, 5, 7, 10, 20, 22} else -1
 
-    async def _item_ext_page(
-        self,
-        *,
-        stock_id: Optional[int],
-        price_type_id: Optional[int],
-        zero_price: bool,
-        limit: int,
-        offset: int,
-        include_images: bool,
-        has_image: Optional[bool] = None,
-    ) -> Tuple[List[Dict[str, Any]], int, int]:
-        async with RegosAPI(self._ci()) as api:
-            return await self._item_ext_page_api(
-                api,
-                stock_id=stock_id,
-                price_type_id=price_type_id,
-                zero_price=zero_price,
-                limit=limit,
-                offset=offset,
-                include_images=include_images,
-                has_image=has_image,
-            )
-
     async def _item_ext_page_api(
         self,
         api: RegosAPI,
@@ -752,35 +738,47 @@ class YandexEatsIntegration(ClientBase):
                 offset = next_offset
         return result
 
-    async def _brand_composition(self, query: Dict[str, Any]) -> Dict[str, Any]:
-        pagination_enabled = await self._nomenclature_pagination_enabled()
-        if pagination_enabled:
+    async def _catalog(self, store_id: Optional[int], price_type_id: Optional[int]) -> List[Dict[str, Any]]:
+        """
+        Каталог склада из общего снимка (см. snapshot.py): composition, availability
+        и prices читают один и тот же снимок вместо трёх полных выгрузок Item/GetExt.
+        В снимке все товары с картинками, включая нулевую цену, — фильтры по цене
+        применяются при сборке ответа. Строки снимка общие: не мутировать.
+        """
+        snapshot = await get_catalog_snapshot(
+            self._catalog_snapshot_key(store_id, price_type_id),
+            lambda: self._item_ext_all(
+                store_id,
+                price_type_id,
+                zero_price=True,
+                include_images=True,
+                has_image=True,
+            ),
+        )
+        return snapshot.rows
+
+    async def _catalog_items(
+        self,
+        query: Dict[str, Any],
+        store_id: Optional[int],
+        price_type_id: Optional[int],
+        *,
+        priced_only: bool,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        items = await self._catalog(store_id, price_type_id)
+        if priced_only:
+            items = [ext for ext in items if _to_decimal(ext.get("price")) > 0]
+        total = len(items)
+        if await self._nomenclature_pagination_enabled():
             limit, offset = self._nomenclature_page(query)
-            groups, page = await asyncio.gather(
-                self._item_groups(),
-                self._item_ext_page(
-                    stock_id=None,
-                    price_type_id=None,
-                    zero_price=True,
-                    limit=limit,
-                    offset=offset,
-                    include_images=True,
-                    has_image=True,
-                ),
-            )
-            items, total, _ = page
-        else:
-            groups, items = await asyncio.gather(
-                self._item_groups(),
-                self._item_ext_all(
-                    None,
-                    None,
-                    zero_price=True,
-                    include_images=True,
-                    has_image=True,
-                ),
-            )
-            total = len(items)
+            items = items[offset : offset + limit]
+        return items, total
+
+    async def _brand_composition(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        groups, (items, total) = await asyncio.gather(
+            self._item_groups(),
+            self._catalog_items(query, None, None, priced_only=False),
+        )
         return {
             "categories": self._catalog_categories(groups),
             "items": [x for x in (self._map_catalog_item(i, include_price=False) for i in items) if x],
@@ -791,34 +789,10 @@ class YandexEatsIntegration(ClientBase):
         if store_id <= 0:
             raise YandexEatsError(400, "Неверный формат storeId")
         price_type = await self._price_type()
-        pagination_enabled = await self._nomenclature_pagination_enabled()
-        if pagination_enabled:
-            limit, offset = self._nomenclature_page(query)
-            groups, page = await asyncio.gather(
-                self._item_groups(),
-                self._item_ext_page(
-                    stock_id=store_id,
-                    price_type_id=price_type,
-                    zero_price=False,
-                    limit=limit,
-                    offset=offset,
-                    include_images=True,
-                    has_image=True,
-                ),
-            )
-            items, total, _ = page
-        else:
-            groups, items = await asyncio.gather(
-                self._item_groups(),
-                self._item_ext_all(
-                    store_id,
-                    price_type,
-                    zero_price=False,
-                    include_images=True,
-                    has_image=True,
-                ),
-            )
-            total = len(items)
+        groups, (items, total) = await asyncio.gather(
+            self._item_groups(),
+            self._catalog_items(query, store_id, price_type, priced_only=True),
+        )
         return {
             "categories": self._catalog_categories(groups),
             "items": [x for x in (self._map_catalog_item(i, include_price=True) for i in items) if x],
@@ -876,7 +850,8 @@ class YandexEatsIntegration(ClientBase):
     async def _availability(self, store_id: int) -> Dict[str, Any]:
         if store_id <= 0:
             raise YandexEatsError(400, "Неверный формат storeId")
-        items = await self._item_ext_all(store_id, None, zero_price=True, has_image=True)
+        # тот же снимок, что у composition/prices (остатки не зависят от типа цены)
+        items = await self._catalog(store_id, await self._price_type_or_zero())
         result = []
         for ext in items:
             item_id = _to_int(_nested(ext, "item.id"))
@@ -889,7 +864,7 @@ class YandexEatsIntegration(ClientBase):
         if store_id <= 0:
             raise YandexEatsError(400, "Invalid storeId")
         price_type = await self._price_type()
-        items = await self._item_ext_all(store_id, price_type, zero_price=False, has_image=True)
+        items = await self._catalog(store_id, price_type)
         result = []
         for ext in items:
             item = ext.get("item") if isinstance(ext, dict) else None
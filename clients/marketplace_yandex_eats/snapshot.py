@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from core.logger import setup_logger
+from core.redis import redis_acquire_lock, redis_get_json, redis_ops, redis_release_lock, redis_set_json
+
+
+logger = setup_logger("yandexeats.snapshot")
+
+# Во сколько раз разобранные dict/list в памяти больше своего JSON (оценка для бюджета)
+_PY_OBJECT_OVERHEAD = 4
+
+# Поля ItemExt, которые читают партнёрские эндпоинты; остальное в снимок не попадает
+_ITEM_FIELDS = ("id", "name", "description", "base_barcode", "code", "icps")
+_ITEM_NESTED_FIELDS = (
+    ("unit", "type"),
+    ("group", "id"),
+    ("country", "name"),
+    ("producer", "name"),
+    ("vat", "value"),
+)
+
+CatalogLoader = Callable[[], Awaitable[List[Dict[str, Any]]]]
+
+
+@dataclass
+class CatalogSnapshot:
+    version: str
+    built_at: float
+    rows: List[Dict[str, Any]]
+    size: int
+
+
+def compact_row(ext: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    item = ext.get("item") if isinstance(ext, dict) else None
+    if not isinstance(item, dict):
+        return None
+    compact_item: Dict[str, Any] = {name: item.get(name) for name in _ITEM_FIELDS}
+    for parent, name in _ITEM_NESTED_FIELDS:
+        value = item.get(parent)
+        if isinstance(value, dict) and value.get(name) is not None:
+            compact_item[parent] = {name: value.get(name)}
+    quantity = ext.get("quantity")
+    return {
+        "item": compact_item,
+        "price": ext.get("price"),
+        "image_url": ext.get("image_url"),
+        "quantity": {"allowed": quantity.get("allowed")} if isinstance(quantity, dict) else None,
+    }
+
+
+def _encode_rows(rows: List[Dict[str, Any]]) -> Tuple[str, int]:
+    raw = json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    # клиент Redis работает со строками (decode_responses=True) — сжатое кладём в base64
+    return base64.b64encode(zlib.compress(raw, 6)).decode("ascii"), len(raw)
+
+
+def _decode_rows(data: str) -> Tuple[List[Dict[str, Any]], int]:
+    raw = zlib.decompress(base64.b64decode(data))
+    return json.loads(raw), len(raw)
+
+
+class _LocalSnapshots:
+    """LRU снимков процесса с бюджетом памяти (settings.marketplace_yandex_eats_snapshot_memory_mb)."""
+
+    def __init__(self) -> None:
+        self._items: "OrderedDict[str, CatalogSnapshot]" = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def _budget() -> int:
+        return max(int(settings.marketplace_yandex_eats_snapshot_memory_mb or 0), 0) * 1024 * 1024
+
+    def get(self, key: str, version: str) -> Optional[CatalogSnapshot]:
+        snapshot = self._items.get(key)
+        if snapshot is None or snapshot.version != version:
+            return None
+        self._items.move_to_end(key)
+        return snapshot
+
+    def put(self, key: str, snapshot: CatalogSnapshot) -> None:
+        self.drop(key)
+        budget = self._budget()
+        cost = snapshot.size * _PY_OBJECT_OVERHEAD
+        if cost > budget:
+            # не влезает целиком — не держим, следующий запрос разожмёт из Redis
+            return
+        while self._items and self._bytes + cost > budget:
+            _, evicted = self._items.popitem(last=False)
+            self._bytes -= evicted.size * _PY_OBJECT_OVERHEAD
+        self._items[key] = snapshot
+        self._bytes += cost
+
+    def drop(self, key: str) -> None:
+        snapshot = self._items.pop(key, None)
+        if snapshot is not None:
+            self._bytes -= snapshot.size * _PY_OBJECT_OVERHEAD
+
+    def drop_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._items if key.startswith(prefix)]:
+            self.drop(key)
+
+
+_LOCAL_SNAPSHOTS = _LocalSnapshots()
+_INFLIGHT_BUILDS: Dict[Tuple[int, str], asyncio.Task] = {}
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+
+
+def _meta_key(cache_key: str) -> str:
+    return f"{cache_key}:m"
+
+
+def _data_key(cache_key: str) -> str:
+    return f"{cache_key}:d"
+
+
+def _lock_key(cache_key: str) -> str:
+    return f"{cache_key}:l"
+
+
+def _fresh_sec() -> float:
+    return max(float(settings.marketplace_yandex_eats_snapshot_fresh_sec or 0), 1.0)
+
+
+def _stale_sec() -> float:
+    return max(float(settings.marketplace_yandex_eats_snapshot_stale_sec or 0), _fresh_sec())
+
+
+async def _read_meta(cache_key: str, *, local_ttl_sec: int = 1) -> Optional[Dict[str, Any]]:
+    meta = await redis_get_json(_meta_key(cache_key), local_ttl_sec=local_ttl_sec)
+    return meta if isinstance(meta, dict) and meta.get("version") else None
+
+
+async def _load(cache_key: str, meta: Dict[str, Any]) -> Optional[CatalogSnapshot]:
+    version = str(meta.get("version"))
+    snapshot = _LOCAL_SNAPSHOTS.get(cache_key, version)
+    if snapshot is not None:
+        return snapshot
+    blob = await redis_ops.get(_data_key(cache_key))
+    if not blob:
+        return None
+    blob_version, _, data = str(blob).partition(":")
+    if blob_version != version:
+        # data уже перезаписали, а meta ещё старая (или наоборот) — считаем промахом
+        return None
+    rows, size = _decode_rows(data)
+    snapshot = CatalogSnapshot(version=version, built_at=float(meta.get("built_at") or 0), rows=rows, size=size)
+    _LOCAL_SNAPSHOTS.put(cache_key, snapshot)
+    return snapshot
+
+
+async def _build(cache_key: str, loader: CatalogLoader) -> CatalogSnapshot:
+    started = time.monotonic()
+    rows = [row for row in (compact_row(ext) for ext in await loader()) if row is not None]
+    data, size = _encode_rows(rows)
+    built_at = time.time()
+    digest = hashlib.sha1(data.encode("ascii")).hexdigest()[:12]
+    version = f"{int(built_at * 1000):x}-{digest}"
+    ttl = int(_stale_sec() * 2)
+    await redis_ops.set(_data_key(cache_key), f"{version}:{data}", ex=ttl)
+    await redis_set_json(
+        _meta_key(cache_key),
+        {"version": version, "built_at": built_at, "rows": len(rows), "bytes": len(data)},
+        ttl,
+        local_ttl_sec=1,
+    )
+    snapshot = CatalogSnapshot(version=version, built_at=built_at, rows=rows, size=size)
+    _LOCAL_SNAPSHOTS.put(cache_key, snapshot)
+    logger.info(
+        "Catalog snapshot built: key=%s rows=%s json=%sKB redis=%sKB elapsed=%.2fs",
+        cache_key,
+        len(rows),
+        size // 1024,
+        len(data) // 1024,
+        time.monotonic() - started,
+    )
+    return snapshot
+
+
+async def _build_locked(cache_key: str, loader: CatalogLoader, *, wait: bool) -> Optional[CatalogSnapshot]:
+    """Собрать снимок под Redis-локом; без `wait` — только если лок свободен."""
+    lock_token = await redis_acquire_lock(
+        _lock_key(cache_key),
+        int(settings.marketplace_yandex_eats_snapshot_build_timeout_sec),
+        wait_timeout_sec=settings.marketplace_yandex_eats_snapshot_build_timeout_sec if wait else 0,
+        retry_delay_sec=0.2,
+    )
+    if not lock_token:
+        if not wait:
+            return None
+        # сборщик не уложился в таймаут — отдаём что есть или строим сами
+        meta = await _read_meta(cache_key)
+        snapshot = await _load(cache_key, meta) if meta else None
+        return snapshot or await _build(cache_key, loader)
+    try:
+        meta = await _read_meta(cache_key, local_ttl_sec=0)
+        if meta and time.time() - float(meta.get("built_at") or 0) < _fresh_sec():
+            # пока ждали лок, снимок собрал другой воркер
+            snapshot = await _load(cache_key, meta)
+            if snapshot is not None:
+                return snapshot
+        return await _build(cache_key, loader)
+    finally:
+        await redis_release_lock(_lock_key(cache_key), lock_token)
+
+
+async def _shared_build(cache_key: str, loader: CatalogLoader, *, wait: bool) -> Optional[CatalogSnapshot]:
+    # одна сборка на ключ в пределах event loop
+    loop = asyncio.get_running_loop()
+    flight_key = (id(loop), cache_key)
+    task = _INFLIGHT_BUILDS.get(flight_key)
+    if task is None or task.done():
+        task = loop.create_task(_build_locked(cache_key, loader, wait=wait))
+        _INFLIGHT_BUILDS[flight_key] = task
+        task.add_done_callback(lambda done: _forget_build(flight_key, done))
+    return await asyncio.shield(task)
+
+
+def _forget_build(flight_key: Tuple[int, str], task: asyncio.Task) -> None:
+    if _INFLIGHT_BUILDS.get(flight_key) is task:
+        _INFLIGHT_BUILDS.pop(flight_key, None)
+    if not task.cancelled():
+        task.exception()  # помечаем как полученное, если все ожидающие отменились
+
+
+def _schedule_refresh(cache_key: str, loader: CatalogLoader) -> None:
+    loop = asyncio.get_running_loop()
+    if (id(loop), cache_key) in _INFLIGHT_BUILDS:
+        return
+
+    async def refresh() -> None:
+        try:
+            await _shared_build(cache_key, loader, wait=False)
+        except Exception as error:
+            logger.warning("Catalog snapshot background refresh failed: key=%s error=%s", cache_key, error)
+
+    task = loop.create_task(refresh())
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+async def get_catalog_snapshot(cache_key: str, loader: CatalogLoader) -> CatalogSnapshot:
+    """
+    Снимок каталога по ключу (stale-while-revalidate):
+    - моложе fresh_sec — отдаём как есть;
+    - моложе stale_sec — отдаём и пересобираем в фоне (один воркер, под Redis-локом);
+    - старше или нет — собираем сразу, остальные воркеры ждут готовый снимок.
+    """
+    meta = await _read_meta(cache_key)
+    if meta:
+        age = time.time() - float(meta.get("built_at") or 0)
+        if age < _stale_sec():
+            snapshot = await _load(cache_key, meta)
+            if snapshot is not None:
+                if age >= _fresh_sec():
+                    _schedule_refresh(cache_key, loader)
+                return snapshot
+    snapshot = await _shared_build(cache_key, loader, wait=True)
+    if snapshot is None:  # pragma: no cover - с wait=True сборка всегда что-то возвращает
+        raise RuntimeError(f"catalog snapshot is not available: {cache_key}")
+    return snapshot
+
+
+def drop_local_snapshots(prefix: str) -> None:
+    _LOCAL_SNAPSHOTS.drop_prefix(prefix)
+
+
+__all__ = [
+    "CatalogSnapshot",
+    "compact_row",
+    "drop_local_snapshots",
+    "get_catalog_snapshot",
+]
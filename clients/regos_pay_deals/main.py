@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 import hashlib
 import json
 import re
@@ -8,7 +7,7 @@ import time
 import uuid
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional
 
 import httpx
 
@@ -16,17 +15,8 @@ from clients.base import ClientBase
 from config.settings import settings as app_settings
 from core.api.regos_api import RegosAPI
 from core.logger import setup_logger
-from core.redis import (
-    redis_error_contains,
-    redis_expire_if_due,
-    redis_is_enabled,
-    redis_make_key,
-    redis_ops,
-    redis_stream_ack_delete,
-    redis_stream_add_with_ttl,
-    redis_stream_group_create_with_ttl,
-    redis_ttl_seconds,
-)
+from core.redis import redis_is_enabled, redis_make_key
+from core.stream_worker import RedisStreamWorker, StreamEntryDrop, StreamWorkerConfig
 from schemas.api.chat.chat_message import ChatMessageAddRequest, ChatMessageTypeEnum
 from schemas.api.common.filters import Filter, FilterOperator
 from schemas.api.crm.deal import Deal, DealEditRequest, DealGetRequest, DealSetStageRequest
@@ -51,6 +41,7 @@ STREAM_TTL_SEC = 24 * 60 * 60
 STREAM_MAXLEN = 10000
 STREAM_BATCH_SIZE = 10
 STREAM_WORKERS = 1
+STREAM_LANES = 4
 STREAM_READ_BLOCK_MS = 5000
 STREAM_MIN_IDLE_MS = 60_000
 STREAM_CLAIM_INTERVAL_SEC = 30
@@ -63,23 +54,7 @@ ACCEPTED_DEAL_WEBHOOKS = {
 }
 
 _INSTANCE_ID = uuid.uuid4().hex[:12]
-_STREAM_WORKER_TASKS: Dict[str, asyncio.Task] = {}
-_STREAM_WORKER_LOCK = asyncio.Lock()
-_STREAM_TTL_TOUCH_TS: Dict[str, int] = {}
-_STREAM_GROUP_READY: Set[str] = set()
-_STREAM_CLAIM_TS: Dict[str, int] = {}
-
-_ENQUEUE_DEDUPE_LUA = """
-local ok = redis.call('set', KEYS[1], '1', 'EX', ARGV[1], 'NX')
-if not ok then
-  return 0
-end
-redis.call('xadd', KEYS[2], 'MAXLEN', '~', ARGV[2], '*', unpack(ARGV, 5))
-if ARGV[4] == '1' then
-  redis.call('expire', KEYS[2], ARGV[3])
-end
-return 1
-"""
+_STREAM_WORKER: Optional[RedisStreamWorker] = None
 
 
 @dataclass(frozen=True)
@@ -158,10 +133,6 @@ def _stable_hash(payload: Any) -> str:
     return hashlib.sha256(dumped.encode("utf-8")).hexdigest()
 
 
-def _json_dumps(payload: Any) -> str:
-    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
-
-
 def _json_loads(raw: str) -> Any:
     return json.loads(raw)
 
@@ -361,10 +332,6 @@ class RegosPayDealsIntegration(ClientBase):
     def _dlq_stream_key(cls) -> str:
         return cls._redis_key("s", "dlq")
 
-    @classmethod
-    def _worker_task_key(cls, worker_index: int) -> str:
-        return f"{cls._stream_key()}:{int(worker_index)}"
-
     @classmethod
     def _queue_dedupe_key(
         cls,
@@ -391,46 +358,30 @@ class RegosPayDealsIntegration(ClientBase):
         return f"{cls._resolve_external_base_url()}/{connected_integration_id}/"
 
     @classmethod
-    def _resolve_stream_ttl(cls) -> int:
-        return redis_ttl_seconds(STREAM_TTL_SEC)
-
-    @classmethod
-    async def _touch_stream_ttl(cls, stream_key: str, *, force: bool = False) -> None:
-        cls._require_redis()
-        await redis_expire_if_due(
-            stream_key,
-            cls._resolve_stream_ttl(),
-            _STREAM_TTL_TOUCH_TS,
-            _now_ts(),
-            min_refresh_sec=10,
-            force=force,
-        )
-
-    @classmethod
-    async def _ensure_consumer_group(cls, stream_key: str, *, force: bool = False) -> None:
-        cls._require_redis()
-        if not force and stream_key in _STREAM_GROUP_READY:
-            return
-        await redis_stream_group_create_with_ttl(
-            stream_key,
-            STREAM_GROUP,
-            ttl_sec=cls._resolve_stream_ttl(),
-            touch_ts_by_key=_STREAM_TTL_TOUCH_TS,
-            now_ts=_now_ts(),
-        )
-        _STREAM_GROUP_READY.add(stream_key)
-
-    @classmethod
-    def _serialize_stream_fields(cls, fields: Dict[str, Any]) -> Dict[str, str]:
-        serialized: Dict[str, str] = {}
-        for key, value in fields.items():
-            if isinstance(value, (dict, list)):
-                serialized[str(key)] = _json_dumps(value)
-            elif value is None:
-                serialized[str(key)] = ""
-            else:
-                serialized[str(key)] = str(value)
-        return serialized
+    def _stream_worker(cls) -> RedisStreamWorker:
+        global _STREAM_WORKER
+        if _STREAM_WORKER is None:
+            _STREAM_WORKER = RedisStreamWorker(
+                StreamWorkerConfig(
+                    name="regos_pay_deals",
+                    stream_key=cls._stream_key(),
+                    group=STREAM_GROUP,
+                    dlq_stream_key=cls._dlq_stream_key(),
+                    workers=STREAM_WORKERS,
+                    lanes=STREAM_LANES,
+                    batch_size=STREAM_BATCH_SIZE,
+                    read_block_ms=STREAM_READ_BLOCK_MS,
+                    min_idle_ms=STREAM_MIN_IDLE_MS,
+                    claim_interval_sec=STREAM_CLAIM_INTERVAL_SEC,
+                    max_retries=STREAM_MAX_RETRIES,
+                    maxlen=STREAM_MAXLEN,
+                    ttl_sec=STREAM_TTL_SEC,
+                ),
+                cls._handle_stream_entry,
+                ordering_key=cls._stream_ordering_key,
+                instance_id=_INSTANCE_ID,
+            )
+        return _STREAM_WORKER
 
     @classmethod
     def _decode_stream_payload(cls, raw: Any) -> Any:
@@ -444,52 +395,6 @@ class RegosPayDealsIntegration(ClientBase):
         except Exception:
             return {}
 
-    @classmethod
-    async def _enqueue_stream(cls, stream_key: str, fields: Dict[str, Any]) -> None:
-        cls._require_redis()
-        await redis_stream_add_with_ttl(
-            stream_key,
-            cls._serialize_stream_fields(fields),
-            maxlen=STREAM_MAXLEN,
-            ttl_sec=cls._resolve_stream_ttl(),
-            touch_ts_by_key=_STREAM_TTL_TOUCH_TS,
-            now_ts=_now_ts(),
-        )
-
-    @classmethod
-    async def _enqueue_stream_deduped(
-        cls,
-        *,
-        stream_key: str,
-        dedupe_key: str,
-        fields: Dict[str, Any],
-    ) -> bool:
-        cls._require_redis()
-        stream_ttl = cls._resolve_stream_ttl()
-        now_ts = _now_ts()
-        should_touch = (
-            now_ts - int(_STREAM_TTL_TOUCH_TS.get(stream_key) or 0)
-            >= min(3600, max(10, stream_ttl // 4))
-        )
-        serialized = cls._serialize_stream_fields(fields)
-        field_args: List[str] = []
-        for key, value in serialized.items():
-            field_args.extend([key, value])
-        queued = await redis_ops.eval(
-            _ENQUEUE_DEDUPE_LUA,
-            2,
-            dedupe_key,
-            stream_key,
-            str(QUEUE_DEDUPE_TTL_SEC),
-            str(STREAM_MAXLEN),
-            str(stream_ttl),
-            "1" if should_touch else "0",
-            *field_args,
-        )
-        if queued and should_touch:
-            _STREAM_TTL_TOUCH_TS[stream_key] = now_ts
-        return bool(queued)
-
     @classmethod
     async def _enqueue_event(
         cls,
@@ -502,8 +407,8 @@ class RegosPayDealsIntegration(ClientBase):
         last_error: Optional[str] = None,
         dedupe: bool = True,
     ) -> bool:
+        cls._require_redis()
         await cls._ensure_stream_workers(ensure_groups=False)
-        stream_key = cls._stream_key()
         fields = {
             "connected_integration_id": connected_integration_id,
             "action": action,
@@ -514,131 +419,36 @@ class RegosPayDealsIntegration(ClientBase):
             "last_error": _text(last_error),
         }
         if not dedupe:
-            await cls._enqueue_stream(stream_key, fields)
+            await cls._stream_worker().enqueue(fields)
             return True
-        return await cls._enqueue_stream_deduped(
-            stream_key=stream_key,
-            dedupe_key=cls._queue_dedupe_key(
+        return await cls._stream_worker().enqueue_deduped(
+            cls._queue_dedupe_key(
                 connected_integration_id,
                 action,
                 payload,
                 event_id,
             ),
-            fields=fields,
+            fields,
+            dedupe_ttl_sec=QUEUE_DEDUPE_TTL_SEC,
         )
 
     @classmethod
     async def _ensure_stream_workers(cls, *, ensure_groups: bool = True) -> None:
         cls._require_redis()
-        stream_key = cls._stream_key()
-        if ensure_groups:
-            await cls._ensure_consumer_group(stream_key)
-        for worker_index in range(STREAM_WORKERS):
-            task_key = cls._worker_task_key(worker_index)
-            async with _STREAM_WORKER_LOCK:
-                task = _STREAM_WORKER_TASKS.get(task_key)
-                if task and not task.done():
-                    continue
-                _STREAM_WORKER_TASKS[task_key] = asyncio.create_task(
-                    cls._stream_worker_loop(worker_index),
-                    name=f"regos_pay_deals_stream_{worker_index}",
-                )
+        await cls._stream_worker().ensure_started(ensure_group=ensure_groups)
 
     @classmethod
-    async def _ack_stream_entry(cls, stream_key: str, entry_id: str) -> None:
-        await redis_stream_ack_delete(stream_key, STREAM_GROUP, entry_id)
+    async def shutdown_all(cls) -> None:
+        if _STREAM_WORKER is not None:
+            await _STREAM_WORKER.stop()
 
     @classmethod
-    async def _process_claimed_entries(
-        cls,
-        stream_key: str,
-        consumer: str,
-    ) -> List[Tuple[str, Dict[str, Any]]]:
-        try:
-            claimed_raw = await redis_ops.xautoclaim(
-                stream_key,
-                STREAM_GROUP,
-                consumer,
-                min_idle_time=STREAM_MIN_IDLE_MS,
-                start_id="0-0",
-                count=STREAM_BATCH_SIZE,
-            )
-        except Exception as error:
-            if redis_error_contains(error, "NOGROUP"):
-                await cls._ensure_consumer_group(stream_key, force=True)
-                return []
-            logger.warning("REGOS Pay deals stream xautoclaim failed: %s", error)
-            return []
-
-        entries: List[Tuple[str, Dict[str, Any]]] = []
-        if isinstance(claimed_raw, (list, tuple)) and len(claimed_raw) >= 2:
-            entries = claimed_raw[1] or []
-        return [
-            (str(entry_id), fields if isinstance(fields, dict) else {})
-            for entry_id, fields in entries
-        ]
-
-    @classmethod
-    async def _stream_worker_loop(cls, worker_index: int) -> None:
-        stream_key = cls._stream_key()
-        task_key = cls._worker_task_key(worker_index)
-        consumer = f"{_INSTANCE_ID}:events:{worker_index}"
-        logger.info("REGOS Pay deals stream worker started: stream=%s", stream_key)
-        try:
-            await cls._ensure_consumer_group(stream_key)
-            while True:
-                try:
-                    await cls._touch_stream_ttl(stream_key)
-                    now_ts = _now_ts()
-                    last_claim_ts = int(_STREAM_CLAIM_TS.get(stream_key) or 0)
-                    if now_ts - last_claim_ts >= STREAM_CLAIM_INTERVAL_SEC:
-                        _STREAM_CLAIM_TS[stream_key] = now_ts
-                        claimed_entries = await cls._process_claimed_entries(
-                            stream_key,
-                            consumer,
-                        )
-                        for entry_id, fields in claimed_entries:
-                            await cls._process_stream_entry(
-                                stream_key=stream_key,
-                                entry_id=entry_id,
-                                fields=fields,
-                            )
-
-                    try:
-                        records = await redis_ops.xreadgroup(
-                            groupname=STREAM_GROUP,
-                            consumername=consumer,
-                            streams={stream_key: ">"},
-                            count=STREAM_BATCH_SIZE,
-                            block=STREAM_READ_BLOCK_MS,
-                        )
-                    except Exception as error:
-                        if redis_error_contains(error, "NOGROUP"):
-                            await cls._ensure_consumer_group(stream_key, force=True)
-                            continue
-                        raise
-
-                    for _, entries in records or []:
-                        for entry_id, fields in entries or []:
-                            await cls._process_stream_entry(
-                                stream_key=stream_key,
-                                entry_id=str(entry_id),
-                                fields=fields if isinstance(fields, dict) else {},
-                            )
-                except asyncio.CancelledError:
-                    raise
-                except Exception as error:
-                    logger.exception("REGOS Pay deals stream worker error: %s", error)
-                    await asyncio.sleep(2)
-        finally:
-            async with _STREAM_WORKER_LOCK:
-                current = _STREAM_WORKER_TASKS.get(task_key)
-                if current is asyncio.current_task():
-                    _STREAM_WORKER_TASKS.pop(task_key, None)
-
-    @classmethod
-    def _stream_entry_attempt(cls, fields: Dict[str, Any]) -> int:
-        return max(_to_int(fields.get("attempt"), 0), 0)
+    def _stream_ordering_key(cls, fields: Dict[str, Any]) -> Optional[str]:
+        payload = cls._decode_stream_payload(fields.get("payload"))
+        deal_id = _extract_deal_id(payload) if isinstance(payload, dict) else 0
+        if deal_id <= 0:
+            return None
+        return f"{_text(fields.get('connected_integration_id'))}:{deal_id}"
 
     @classmethod
     def _is_non_retryable_error(cls, error: object) -> bool:
@@ -649,13 +459,7 @@ class RegosPayDealsIntegration(ClientBase):
         )
 
     @classmethod
-    async def _process_stream_entry(
-        cls,
-        *,
-        stream_key: str,
-        entry_id: str,
-        fields: Dict[str, Any],
-    ) -> None:
+    async def _handle_stream_entry(cls, entry_id: str, fields: Dict[str, Any]) -> None:
         ci = _text(fields.get("connected_integration_id"))
         action = _text(fields.get("action"))
         event_id = _optional_text(fields.get("event_id"))
@@ -667,75 +471,26 @@ class RegosPayDealsIntegration(ClientBase):
                 entry_id,
                 fields,
             )
-            await cls._ack_stream_entry(stream_key, entry_id)
             return
 
-        attempt = cls._stream_entry_attempt(fields)
         worker = cls()
         worker.connected_integration_id = ci
         try:
             result = await worker._process_webhook_event(action, payload, event_id)
-            logger.debug(
-                "REGOS Pay deals stream job processed: "
-                "ci=%s action=%s entry_id=%s status=%s",
-                ci,
-                action,
-                entry_id,
-                result.get("status") if isinstance(result, dict) else result,
-            )
-            await cls._ack_stream_entry(stream_key, entry_id)
         except Exception as error:
             if cls._is_non_retryable_error(error):
-                logger.warning(
-                    "REGOS Pay deals stream job skipped: "
-                    "ci=%s action=%s entry_id=%s error=%s",
-                    ci,
-                    action,
-                    entry_id,
-                    error,
-                )
-                await cls._ack_stream_entry(stream_key, entry_id)
-                return
-
-            next_attempt = attempt + 1
-            if next_attempt >= STREAM_MAX_RETRIES:
-                dlq_payload = dict(fields)
-                dlq_payload["attempt"] = str(next_attempt)
-                dlq_payload["source_stream"] = stream_key
-                dlq_payload["source_entry_id"] = entry_id
-                dlq_payload["failed_at"] = str(_now_ts())
-                dlq_payload["error"] = str(error)
-                await cls._enqueue_stream(cls._dlq_stream_key(), dlq_payload)
-                await cls._ack_stream_entry(stream_key, entry_id)
-                logger.error(
-                    "REGOS Pay deals stream job moved to DLQ: "
-                    "ci=%s action=%s entry_id=%s error=%s",
-                    ci,
-                    action,
-                    entry_id,
-                    error,
-                )
-                return
-
-            await cls._enqueue_event(
-                connected_integration_id=ci,
-                action=action,
-                payload=payload,
-                event_id=event_id,
-                attempt=next_attempt,
-                last_error=str(error),
-                dedupe=False,
-            )
-            await cls._ack_stream_entry(stream_key, entry_id)
-            logger.warning(
-                "REGOS Pay deals stream job requeued: "
-                "ci=%s action=%s entry_id=%s attempt=%s error=%s",
-                ci,
-                action,
-                entry_id,
-                next_attempt,
-                error,
-            )
+                raise StreamEntryDrop(
+                    f"ci={ci} action={action} error={error}"
+                ) from error
+            raise
+        logger.debug(
+            "REGOS Pay deals stream job processed: "
+            "ci=%s action=%s entry_id=%s status=%s",
+            ci,
+            action,
+            entry_id,
+            result.get("status") if isinstance(result, dict) else result,
+        )
 
     def _ci(self, connected_integration_id: Optional[str] = None) -> str:
         ci = _text(connected_integration_id or self.connected_integration_id)
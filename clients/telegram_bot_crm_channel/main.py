@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import base64
 import html
+import functools
 import hashlib
 import json
 import os
@@ -12,7 +13,7 @@ import time
 import uuid
 from dataclasses import dataclass
 from html.parser import HTMLParser
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 from aiogram import Bot
@@ -28,19 +29,22 @@ from aiogram.types import (
 from starlette.responses import JSONResponse
 
 from clients.base import ClientBase
+from clients.telegram_polling import PollingTarget, telegram_polling_supervisor
 from config.settings import settings as app_settings
 from core.api.regos_api import RegosAPI
 from core.logger import setup_logger
 from core.redis import (
     redis_ops,
-    redis_error_contains,
     redis_expire_if_due,
     redis_sadd_with_ttl,
     redis_stream_add_with_ttl,
-    redis_stream_ack_delete,
-    redis_stream_group_create_with_ttl,
     redis_ttl_seconds,
 )
+from core.stream_worker import (
+    RedisStreamWorker,
+    StreamEntryDrop,
+    StreamWorkerConfig,
+)
 from core.telegram_api import create_telegram_bot, telegram_file_url
 from schemas.api.chat.chat import ChatGetRequest
 from schemas.api.chat.chat_message import (
@@ -91,6 +95,14 @@ class TelegramBotCrmChannelConfig:
     REDIS_PREFIX = "tbc:"
     STREAM_REDIS_PREFIX = "tbc"
     ALERT_EXTERNAL_PREFIX = "tgsys"
+    ALLOWED_UPDATES = [
+        "message",
+        "business_message",
+        "edited_message",
+        "edited_business_message",
+        "callback_query",
+        "deleted_business_messages",
+    ]
 
     SETTINGS_TTL = max(int(app_settings.redis_cache_ttl or 60), 30)
     SETTINGS_STALE_TTL = max(SETTINGS_TTL * 10, 10 * 60)
@@ -112,11 +124,12 @@ class TelegramBotCrmChannelConfig:
     STREAM_READ_BLOCK_MS = 5000
     STREAM_BATCH_SIZE = max(int(app_settings.telegram_crm_channel_stream_batch_size or 0), 1)
     STREAM_WORKERS_PER_KIND = max(int(app_settings.telegram_crm_channel_stream_workers or 0), 1)
+    STREAM_LANES_PER_KIND = max(int(app_settings.telegram_crm_channel_stream_lanes or 0), 1)
+    STREAM_KEY_LOCK_TTL_SEC = 60
     STREAM_CLAIM_INTERVAL_SEC = 30
     STREAM_MAX_RETRIES = 5
     SEND_CONCURRENCY = max(int(app_settings.telegram_crm_channel_send_concurrency or 0), 1)
 
-    POLLING_LOCK_TTL_SEC = 30
     LEAD_SYNC_AVATAR_RECHECK_SEC = 6 * 60 * 60
     MAX_TELEGRAM_FILE_SIZE_BYTES = 50 * 1024 * 1024
     LARGE_FILE_NOTICE_TEXT = (
@@ -205,15 +218,13 @@ class ChannelMessageSettings:
 
 
 _MANAGER_LOCK = asyncio.Lock()
-_WORKER_TASKS: Dict[Tuple[str, int], asyncio.Task] = {}
-_POLLER_TASKS: Dict[Tuple[str, str], asyncio.Task] = {}
+_STREAM_WORKERS: Dict[str, RedisStreamWorker] = {}
+_POLLER_TARGETS: Dict[Tuple[str, str], PollingTarget] = {}
 _BOT_CLIENTS: Dict[str, Bot] = {}
 _BOT_CLIENTS_LOCK = asyncio.Lock()
 _HTTP_CLIENT: Optional[httpx.AsyncClient] = None
 _INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
 _REDIS_TTL_TOUCH_TS: Dict[str, int] = {}
-_STREAM_GROUP_READY: Set[str] = set()
-_STREAM_CLAIM_TS: Dict[str, int] = {}
 _SETTINGS_LOCAL_CACHE: Dict[str, Tuple[int, Dict[str, str]]] = {}
 _WEBHOOK_LOCAL_CACHE: Dict[str, int] = {}
 _RUNTIME_LOCAL_CACHE: Dict[str, Tuple[int, RuntimeConfig]] = {}
@@ -1413,10 +1424,8 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
         )
 
     @staticmethod
-    def _lock_polling_owner_key(bot_hash: str) -> str:
-        return TelegramBotCrmChannelIntegration._redis_key(
-            "lock", "polling_owner", bot_hash
-        )
+    def _polling_target_key(bot_hash: str) -> str:
+        return TelegramBotCrmChannelIntegration._redis_key("polling", bot_hash)
 
     @staticmethod
     def _typing_key(connected_integration_id: str, bot_hash: str, tg_chat_id: str) -> str:
@@ -2262,19 +2271,19 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
     @classmethod
     async def shutdown_all(cls) -> None:
         async with _MANAGER_LOCK:
-            worker_tasks = list(_WORKER_TASKS.values())
-            _WORKER_TASKS.clear()
-            poller_tasks = list(_POLLER_TASKS.values())
-            _POLLER_TASKS.clear()
+            stream_workers = list(_STREAM_WORKERS.values())
+            _STREAM_WORKERS.clear()
+            poller_targets = list(_POLLER_TARGETS.values())
+            _POLLER_TARGETS.clear()
+
+        for stream_worker in stream_workers:
+            await stream_worker.stop()
 
-        for task in worker_tasks + poller_tasks:
-            task.cancel()
+        for target in poller_targets:
             try:
-                await task
-            except asyncio.CancelledError:
-                pass
+                await telegram_polling_supervisor.unregister(target.key, target)
             except Exception:
-                logger.exception("Error while stopping Telegram background task")
+                logger.exception("Error while stopping Telegram poller")
 
         async with _BOT_CLIENTS_LOCK:
             bots = list(_BOT_CLIENTS.values())
@@ -2294,8 +2303,6 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
                 await http_client.aclose()
             except Exception:
                 logger.exception("Error while closing Telegram shared http client")
-        _STREAM_GROUP_READY.clear()
-        _STREAM_CLAIM_TS.clear()
         _SETTINGS_LOCAL_CACHE.clear()
         _WEBHOOK_LOCAL_CACHE.clear()
         async with _RUNTIME_LOCAL_LOCK:
@@ -2427,40 +2434,65 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
         return redis_ttl_seconds(ttl)
 
     @classmethod
-    async def _touch_stream_ttl(
-        cls,
-        stream_key: str,
-        stream_ttl_sec: Optional[int] = None,
-        *,
-        force: bool = False,
-    ) -> None:
-        _require_redis()
-        await redis_expire_if_due(
-            stream_key,
-            cls._resolve_stream_ttl(stream_ttl_sec),
-            _REDIS_TTL_TOUCH_TS,
-            _now_ts(),
-            min_refresh_sec=10,
-            force=force,
-        )
+    def _stream_worker_kinds(cls) -> Tuple[str, ...]:
+        return ("telegram_in", "regos_in", "send_messages")
 
     @classmethod
-    async def _ensure_consumer_group(cls, stream_key: str, *, force: bool = False) -> None:
-        _require_redis()
-        if not force and stream_key in _STREAM_GROUP_READY:
-            return
-        await redis_stream_group_create_with_ttl(
-            stream_key,
-            TelegramBotCrmChannelConfig.STREAM_GROUP,
-            ttl_sec=cls._resolve_stream_ttl(),
-            touch_ts_by_key=_REDIS_TTL_TOUCH_TS,
-            now_ts=_now_ts(),
+    def _stream_worker(cls, kind: str) -> RedisStreamWorker:
+        stream_worker = _STREAM_WORKERS.get(kind)
+        if stream_worker is not None:
+            return stream_worker
+
+        async def handler(message_id: str, fields: Dict[str, str]) -> None:
+            await cls._process_stream_entry(message_id, fields, kind)
+
+        async def heartbeat(worker_index: int) -> None:
+            await cls._set_worker_heartbeat(kind, worker_index)
+
+        async def on_dead_letter(fields: Dict[str, str], error: BaseException) -> None:
+            if kind != "regos_in":
+                return
+            await cls._notify_telegram_delivery_issue_best_effort(
+                connected_integration_id=str(fields.get("connected_integration_id") or "").strip(),
+                fields=fields,
+                error_text=str(error),
+            )
+
+        def ordering_key(fields: Dict[str, str]) -> Optional[str]:
+            connected_integration_id = str(fields.get("connected_integration_id") or "").strip()
+            if not connected_integration_id:
+                return None
+            return cls._stream_processing_lock_key(connected_integration_id, kind, fields)
+
+        stream_worker = RedisStreamWorker(
+            StreamWorkerConfig(
+                name=f"tg_crm_{kind}",
+                stream_key=cls._stream_key(kind),
+                group=TelegramBotCrmChannelConfig.STREAM_GROUP,
+                dlq_stream_key=cls._dlq_stream_key(),
+                workers=TelegramBotCrmChannelConfig.STREAM_WORKERS_PER_KIND,
+                lanes=TelegramBotCrmChannelConfig.STREAM_LANES_PER_KIND,
+                batch_size=TelegramBotCrmChannelConfig.STREAM_BATCH_SIZE,
+                read_block_ms=TelegramBotCrmChannelConfig.STREAM_READ_BLOCK_MS,
+                min_idle_ms=TelegramBotCrmChannelConfig.STREAM_MIN_IDLE_MS,
+                claim_interval_sec=TelegramBotCrmChannelConfig.STREAM_CLAIM_INTERVAL_SEC,
+                max_retries=TelegramBotCrmChannelConfig.STREAM_MAX_RETRIES,
+                maxlen=TelegramBotCrmChannelConfig.STREAM_MAXLEN,
+                ttl_sec=cls._resolve_stream_ttl(),
+                key_lock_ttl_sec=TelegramBotCrmChannelConfig.STREAM_KEY_LOCK_TTL_SEC,
+            ),
+            handler,
+            ordering_key=ordering_key,
+            on_dead_letter=on_dead_letter,
+            heartbeat=heartbeat,
+            instance_id=_INSTANCE_ID,
         )
-        _STREAM_GROUP_READY.add(stream_key)
+        _STREAM_WORKERS[kind] = stream_worker
+        return stream_worker
 
     @classmethod
-    def _stream_worker_kinds(cls) -> Tuple[str, ...]:
-        return ("telegram_in", "regos_in", "send_messages")
+    def _stream_worker_count(cls) -> int:
+        return sum(worker.running_tasks for worker in _STREAM_WORKERS.values())
 
     @classmethod
     async def _ensure_stream_workers(
@@ -2472,32 +2504,18 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
         _require_redis()
         async with _MANAGER_LOCK:
             for kind in cls._stream_worker_kinds():
-                stream_key = cls._stream_key(kind)
-                if ensure_groups:
-                    await cls._ensure_consumer_group(stream_key)
-                for index in range(TelegramBotCrmChannelConfig.STREAM_WORKERS_PER_KIND):
-                    key = (kind, index)
-                    task = _WORKER_TASKS.get(key)
-                    if task and not task.done():
-                        continue
-                    _WORKER_TASKS[key] = asyncio.create_task(
-                        cls._stream_worker_loop(kind, index),
-                        name=f"tg_crm_stream_{kind}_{index}",
-                    )
+                await cls._stream_worker(kind).ensure_started(ensure_group=ensure_groups)
 
     @classmethod
     async def _stop_stream_workers(cls, connected_integration_id: Optional[str] = None) -> None:
         if connected_integration_id:
             return
         async with _MANAGER_LOCK:
-            keys = list(_WORKER_TASKS.keys())
-            tasks = [_WORKER_TASKS.pop(k) for k in keys]
-        for task in tasks:
-            task.cancel()
+            stream_workers = list(_STREAM_WORKERS.values())
+            _STREAM_WORKERS.clear()
+        for stream_worker in stream_workers:
             try:
-                await task
-            except asyncio.CancelledError:
-                pass
+                await stream_worker.stop()
             except Exception:
                 logger.exception("Error while stopping stream worker")
 
@@ -2507,13 +2525,30 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
     ) -> None:
         key = (connected_integration_id, bot_config.bot_hash)
         async with _MANAGER_LOCK:
-            task = _POLLER_TASKS.get(key)
-            if task and not task.done():
+            target = _POLLER_TARGETS.get(key)
+            if (
+                target is not None
+                and target.token == bot_config.token
+                and telegram_polling_supervisor.is_registered(target.key, target)
+            ):
                 return
-            _POLLER_TASKS[key] = asyncio.create_task(
-                cls._polling_loop(connected_integration_id, bot_config),
-                name=f"tg_crm_poll_{connected_integration_id}_{bot_config.bot_hash}",
+            # getUpdates, аренда бота между процессами и offset — на супервизоре
+            target = PollingTarget(
+                key=cls._polling_target_key(bot_config.bot_hash),
+                token=bot_config.token,
+                handler=functools.partial(
+                    cls._enqueue_polled_updates, connected_integration_id, bot_config.bot_hash
+                ),
+                allowed_updates=TelegramBotCrmChannelConfig.ALLOWED_UPDATES,
+                keepalive=functools.partial(cls._polling_keepalive, connected_integration_id),
             )
+            _POLLER_TARGETS[key] = target
+            await telegram_polling_supervisor.register(target)
+        logger.info(
+            "Longpolling registered for bot_hash=%s ci=%s",
+            bot_config.bot_hash,
+            connected_integration_id,
+        )
 
     @classmethod
     async def _stop_pollers_for_ci(
@@ -2523,16 +2558,13 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
         async with _MANAGER_LOCK:
             keys = [
                 key
-                for key in _POLLER_TASKS
+                for key in _POLLER_TARGETS
                 if key[0] == connected_integration_id and key[1] not in keep_hashes
             ]
-            tasks = [_POLLER_TASKS.pop(key) for key in keys]
-        for task in tasks:
-            task.cancel()
+            targets = [_POLLER_TARGETS.pop(key) for key in keys]
+        for target in targets:
             try:
-                await task
-            except asyncio.CancelledError:
-                pass
+                await telegram_polling_supervisor.unregister(target.key, target)
             except Exception:
                 logger.exception("Error while stopping poller")
 
@@ -2559,7 +2591,7 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
                 "total": 0,
                 "restored": 0,
                 "failed": 0,
-                "stream_workers": len(_WORKER_TASKS),
+                "stream_workers": cls._stream_worker_count(),
             }
         await cls._touch_active_ci_ids_ttl(force=True)
 
@@ -2607,7 +2639,7 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
             "total": len(ci_ids),
             "restored": restored,
             "failed": failed,
-            "stream_workers": len(_WORKER_TASKS),
+            "stream_workers": cls._stream_worker_count(),
         }
 
     async def connect(self, data: Optional[Dict] = None, **kwargs) -> Dict[str, Any]:
@@ -4812,107 +4844,6 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
         )
         await cls._touch_active_ci_ids_ttl()
 
-    @classmethod
-    async def _stream_worker_loop(cls, kind: str, worker_index: int) -> None:
-        stream_key = cls._stream_key(kind)
-        task_key = (kind, worker_index)
-        consumer = f"{_INSTANCE_ID}:{kind}:{worker_index}"
-        await cls._ensure_consumer_group(stream_key)
-        logger.info("Telegram CRM stream worker started: kind=%s index=%s", kind, worker_index)
-
-        try:
-            while True:
-                try:
-                    await cls._set_worker_heartbeat(kind, worker_index)
-                    now_ts = _now_ts()
-                    last_claim_ts = int(_STREAM_CLAIM_TS.get(stream_key) or 0)
-                    if now_ts - last_claim_ts >= TelegramBotCrmChannelConfig.STREAM_CLAIM_INTERVAL_SEC:
-                        _STREAM_CLAIM_TS[stream_key] = now_ts
-                        await cls._process_claimed_entries(stream_key, consumer, kind)
-                    await cls._touch_stream_ttl(stream_key)
-                    try:
-                        records = await redis_ops.xreadgroup(
-                            groupname=TelegramBotCrmChannelConfig.STREAM_GROUP,
-                            consumername=consumer,
-                            streams={stream_key: ">"},
-                            count=TelegramBotCrmChannelConfig.STREAM_BATCH_SIZE,
-                            block=TelegramBotCrmChannelConfig.STREAM_READ_BLOCK_MS,
-                        )
-                    except Exception as error:
-                        if redis_error_contains(error, "NOGROUP"):
-                            await cls._ensure_consumer_group(stream_key, force=True)
-                            logger.warning(
-                                "Recovered missing Redis stream/group after NOGROUP: kind=%s stream=%s op=xreadgroup",
-                                kind,
-                                stream_key,
-                            )
-                            await asyncio.sleep(0.1)
-                            continue
-                        raise
-                    if not records:
-                        continue
-
-                    for _, entries in records:
-                        for message_id, fields in entries:
-                            await cls._process_stream_entry(
-                                stream_key=stream_key,
-                                message_id=str(message_id),
-                                fields=fields if isinstance(fields, dict) else {},
-                                kind=kind,
-                            )
-                except asyncio.CancelledError:
-                    raise
-                except Exception as error:
-                    logger.exception(
-                        "Telegram CRM stream worker error: kind=%s index=%s error=%s",
-                        kind,
-                        worker_index,
-                        error,
-                    )
-                    await asyncio.sleep(1.0)
-        finally:
-            async with _MANAGER_LOCK:
-                current = _WORKER_TASKS.get(task_key)
-                if current is asyncio.current_task():
-                    _WORKER_TASKS.pop(task_key, None)
-
-    @classmethod
-    async def _process_claimed_entries(
-        cls,
-        stream_key: str,
-        consumer: str,
-        kind: str,
-    ) -> None:
-        try:
-            claimed_raw = await redis_ops.xautoclaim(
-                stream_key,
-                TelegramBotCrmChannelConfig.STREAM_GROUP,
-                consumer,
-                min_idle_time=TelegramBotCrmChannelConfig.STREAM_MIN_IDLE_MS,
-                start_id="0-0",
-                count=TelegramBotCrmChannelConfig.STREAM_BATCH_SIZE,
-            )
-        except Exception as error:
-            if redis_error_contains(error, "NOGROUP"):
-                await cls._ensure_consumer_group(stream_key, force=True)
-                logger.warning(
-                    "Recovered missing Redis stream/group after NOGROUP: kind=%s stream=%s op=xautoclaim",
-                    kind,
-                    stream_key,
-                )
-                return
-            raise
-        entries = []
-        if isinstance(claimed_raw, (list, tuple)) and len(claimed_raw) >= 2:
-            entries = claimed_raw[1] or []
-        for message_id, fields in entries:
-            await cls._process_stream_entry(
-                stream_key=stream_key,
-                message_id=str(message_id),
-                fields=fields if isinstance(fields, dict) else {},
-                kind=kind,
-            )
-
     @staticmethod
     def _telegram_payload_chat_id(payload: Dict[str, Any]) -> Optional[str]:
         for key in ("message", "business_message", "edited_message", "edited_business_message"):
@@ -4966,34 +4897,19 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
     @classmethod
     async def _process_stream_entry(
         cls,
-        stream_key: str,
         message_id: str,
         fields: Dict[str, str],
         kind: str,
     ) -> None:
         connected_integration_id = str(fields.get("connected_integration_id") or "").strip()
         if not connected_integration_id:
-            await redis_stream_ack_delete(stream_key, TelegramBotCrmChannelConfig.STREAM_GROUP, message_id)
             logger.warning(
                 "Telegram CRM stream entry skipped without connected_integration_id: kind=%s message_id=%s",
                 kind,
                 message_id,
             )
             return
-        attempts = int(str(fields.get("attempt") or "0"))
-        lock_key = cls._stream_processing_lock_key(connected_integration_id, kind, fields)
-        lock_token: Optional[str] = None
         try:
-            if lock_key:
-                lock_token = await cls._acquire_lock(
-                    lock_key,
-                    60,
-                    wait_seconds=10.0,
-                )
-                if not lock_token:
-                    raise TimeoutError(
-                        f"Timed out waiting for Telegram CRM processing lock {lock_key}"
-                    )
             if kind == "telegram_in":
                 await cls._process_telegram_event(connected_integration_id, fields)
             elif kind == "regos_in":
@@ -5002,179 +4918,52 @@ class TelegramBotCrmChannelIntegration(IntegrationTelegramBase, ClientBase):
                 await cls._process_send_messages_event(connected_integration_id, fields)
             else:
                 raise ValueError(f"Unsupported stream kind: {kind}")
-            await redis_stream_ack_delete(stream_key, TelegramBotCrmChannelConfig.STREAM_GROUP, message_id)
-            logger.debug(
-                "stream ack: ci=%s kind=%s message_id=%s",
-                connected_integration_id,
-                kind,
-                message_id,
-            )
         except ConnectedIntegrationInactiveError as error:
-            await redis_stream_ack_delete(stream_key, TelegramBotCrmChannelConfig.STREAM_GROUP, message_id)
             await redis_ops.srem(cls._active_ci_ids_key(), connected_integration_id)
             async with _RUNTIME_LOCAL_LOCK:
                 _RUNTIME_LOCAL_CACHE.pop(connected_integration_id, None)
-            logger.info(
-                "Stream event skipped for inactive or not ready integration: ci=%s kind=%s message_id=%s reason=%s",
-                connected_integration_id,
-                kind,
-                message_id,
-                error,
-            )
-            return
-        except Exception as error:
-            attempts += 1
-            if attempts >= TelegramBotCrmChannelConfig.STREAM_MAX_RETRIES:
-                dlq_payload = dict(fields)
-                dlq_payload["error"] = str(error)
-                dlq_payload["attempt"] = str(attempts)
-                dlq_payload["source_stream"] = stream_key
-                dlq_payload["source_message_id"] = message_id
-                await cls._enqueue(cls._dlq_stream_key(connected_integration_id), dlq_payload)
-                if kind == "regos_in":
-                    await cls._notify_telegram_delivery_issue_best_effort(
-                        connected_integration_id=connected_integration_id,
-                        fields=fields,
-                        error_text=str(error),
-                    )
-                await redis_stream_ack_delete(stream_key, TelegramBotCrmChannelConfig.STREAM_GROUP, message_id)
-                logger.error(
-                    "Moved message to DLQ: ci=%s kind=%s message_id=%s error=%s",
-                    connected_integration_id,
-                    kind,
-                    message_id,
-                    error,
-                )
-                return
+            raise StreamEntryDrop(
+                f"inactive or not ready integration: ci={connected_integration_id} "
+                f"kind={kind} reason={error}"
+            ) from error
+        logger.debug(
+            "stream ack: ci=%s kind=%s message_id=%s",
+            connected_integration_id,
+            kind,
+            message_id,
+        )
 
-            retry_payload = dict(fields)
-            retry_payload["attempt"] = str(attempts)
-            retry_payload["last_error"] = str(error)
-            await cls._enqueue(stream_key, retry_payload)
-            await redis_stream_ack_delete(stream_key, TelegramBotCrmChannelConfig.STREAM_GROUP, message_id)
-            logger.warning(
-                "Requeued stream event: ci=%s kind=%s attempt=%s message_id=%s error=%s",
-                connected_integration_id,
-                kind,
-                attempts,
-                message_id,
-                error,
+    @classmethod
+    async def _enqueue_polled_updates(
+        cls, connected_integration_id: str, bot_hash: str, updates: List[Dict[str, Any]]
+    ) -> None:
+        stream_key = cls._stream_key("telegram_in", connected_integration_id)
+        for update in updates:
+            await cls._enqueue(
+                stream_key,
+                {
+                    "connected_integration_id": connected_integration_id,
+                    "bot_hash": bot_hash,
+                    "payload": update,
+                    "attempt": "0",
+                    "enqueued_at": str(_now_ts()),
+                },
             )
-        finally:
-            if lock_key and lock_token:
-                await cls._release_lock(lock_key, lock_token)
 
     @classmethod
-    async def _polling_loop(
-        cls, connected_integration_id: str, bot_config: BotSlotConfig
-    ) -> None:
-        bot = await cls._get_bot(bot_config.token)
-        offset: Optional[int] = None
-        lock_key = cls._lock_polling_owner_key(bot_config.bot_hash)
-        # Owner must be unique per CI+bot within a process.
-        # Using only instance id lets multiple pollers in one process treat the lock as "mine".
-        owner = f"{_INSTANCE_ID}:{connected_integration_id}:{bot_config.bot_hash}"
+    async def _polling_keepalive(cls, connected_integration_id: str) -> bool:
+        if await cls._is_connected_integration_active(connected_integration_id):
+            return True
         logger.info(
-            "Longpolling worker started for bot_hash=%s ci=%s",
-            bot_config.bot_hash,
+            "Longpolling stopped for inactive or not ready integration: ci=%s",
             connected_integration_id,
         )
-        last_active_check = 0.0
-
-        try:
-            while True:
-                try:
-                    now = time.monotonic()
-                    if (
-                        now - last_active_check
-                        >= TelegramBotCrmChannelConfig.POLLING_LOCK_TTL_SEC
-                    ):
-                        if not await cls._is_connected_integration_active(
-                            connected_integration_id
-                        ):
-                            raise ConnectedIntegrationInactiveError(
-                                f"ConnectedIntegration {connected_integration_id} is inactive"
-                            )
-                        last_active_check = now
-                    acquired = await redis_ops.set(
-                        lock_key,
-                        owner,
-                        ex=TelegramBotCrmChannelConfig.POLLING_LOCK_TTL_SEC,
-                        nx=True,
-                    )
-                    if not acquired:
-                        current_owner = await redis_ops.get(lock_key)
-                        if current_owner == owner:
-                            await redis_ops.expire(
-                                lock_key, TelegramBotCrmChannelConfig.POLLING_LOCK_TTL_SEC
-                            )
-                            acquired = True
-
-                    if not acquired:
-                        await asyncio.sleep(1.5)
-                        continue
-
-                    updates = await bot.get_updates(
-                        offset=offset,
-                        timeout=20,
-                        allowed_updates=[
-                            "message",
-                            "business_message",
-                            "edited_message",
-                            "edited_business_message",
-                            "callback_query",
-                            "deleted_business_messages",
-                        ],
-                    )
-                    if not updates:
-                        await asyncio.sleep(0.1)
-                        continue
-
-                    for update in updates:
-                        offset = int(update.update_id) + 1
-                        await cls._enqueue(
-                            cls._stream_key("telegram_in", connected_integration_id),
-                            {
-                                "connected_integration_id": connected_integration_id,
-                                "bot_hash": bot_config.bot_hash,
-                                "payload": _to_jsonable(
-                                    update.model_dump(
-                                        mode="python",
-                                        by_alias=True,
-                                        exclude_none=True,
-                                    )
-                                ),
-                                "attempt": "0",
-                                "enqueued_at": str(_now_ts()),
-                            },
-                        )
-                except asyncio.CancelledError:
-                    raise
-                except ConnectedIntegrationInactiveError as error:
-                    logger.info(
-                        "Longpolling worker stopped for inactive or not ready integration: bot_hash=%s ci=%s reason=%s",
-                        bot_config.bot_hash,
-                        connected_integration_id,
-                        error,
-                    )
-                    if _redis_enabled():
-                        await redis_ops.srem(
-                            cls._active_ci_ids_key(),
-                            connected_integration_id,
-                        )
-                    break
-                except Exception as error:
-                    logger.warning(
-                        "Polling loop transient error for bot_hash=%s ci=%s: %s",
-                        bot_config.bot_hash,
-                        connected_integration_id,
-                        error,
-                    )
-                    await asyncio.sleep(1.5)
-        except asyncio.CancelledError:
-            raise
-        finally:
-            await cls._release_lock(lock_key, owner)
+        if _redis_enabled():
+            await redis_ops.srem(cls._active_ci_ids_key(), connected_integration_id)
+        async with _MANAGER_LOCK:
+            for key in [key for key in _POLLER_TARGETS if key[0] == connected_integration_id]:
+                _POLLER_TARGETS.pop(key, None)
+        return False
 
     @classmethod
     async def _process_telegram_event(
@@ -15,8 +15,12 @@ from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter, TelegramU
 from aiogram.filters import Command
 from aiogram.types import Update as TelegramUpdate
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from clients.telegram_bot_notification.services.send_messages import (
-    send_messages as send_message_batch,
+from clients.telegram_bot_notification.services.send_scheduler import (
+    OutboxJob,
+    TelegramSendScheduler,
+    get_send_scheduler,
+    start_send_schedulers,
+    stop_send_schedulers,
 )
 from clients.telegram_bot_notification.services.message_formatters import (
     format_cheque_details,
@@ -77,6 +81,8 @@ _WEBHOOK_LOCAL_CACHE: Dict[str, int] = {}
 _UNAVAILABLE_CHAT_LOCAL_CACHE: Dict[str, int] = {}
 _OPERATING_CASH_STOCK_LOCAL_CACHE: Dict[str, Tuple[int, Optional[int]]] = {}
 _OPERATING_CASH_STOCK_LOCKS: Dict[str, asyncio.Lock] = {}
+_CASH_SESSION_OC_LOCAL_CACHE: Dict[str, Tuple[int, int]] = {}
+_CHEQUE_PREFETCH: Dict[Tuple[str, str], Tuple[float, Any]] = {}
 _BOT_RUNTIME_CACHE: Dict[str, Tuple[str, Any]] = {}
 _BOT_RUNTIME_LOCK = asyncio.Lock()
 _CI_ACTIVE_LOCAL_CACHE: Dict[str, Tuple[int, bool]] = {}
@@ -106,6 +112,16 @@ def _json_loads(raw: str) -> Any:
     return json.loads(raw)
 
 
+def _prune_local_cache(cache: Dict[str, Tuple[int, Any]], max_items: int) -> None:
+    if len(cache) < max_items:
+        return
+    now_ts = _now_ts()
+    for key in [key for key, (expires_at, _) in cache.items() if expires_at <= now_ts]:
+        cache.pop(key, None)
+    while len(cache) >= max_items:
+        cache.pop(next(iter(cache)), None)
+
+
 class TelegramChatUnavailableError(RuntimeError):
     pass
 
@@ -142,7 +158,6 @@ class TelegramBotConfig:
     ACTIVE_CACHE_TTL = 5 * 60
     ACTIVE_LOCK_TTL = 10
     ACTIVE_LOCK_WAIT_SECONDS = 1.0
-    BATCH_SIZE = 50  # Number of messages to process in one batch
     RETRY_ATTEMPTS = 3  # Number of retry attempts for failed requests
     RETRY_WAIT_SECONDS = 2  # Seconds to wait between retries
     INTEGRATION_KEY = "regos_telegram_notifier"
@@ -159,17 +174,22 @@ class TelegramBotConfig:
     DEDUPE_TTL_SEC = 60 * 60
     SETTINGS_LOCAL_TTL = min(30, max(5, SETTINGS_TTL // 4))
     SETTINGS_LOCAL_MAX = 10000
-    SEND_CONCURRENCY = max(int(settings.telegram_notification_send_concurrency or 0), 1)
-    CHAT_MIN_INTERVAL_SEC = max(float(settings.telegram_notification_chat_min_interval_sec or 0), 0.0)
-    FLOOD_RETRY_ATTEMPTS = max(int(settings.telegram_notification_flood_retry_attempts or 0), 1)
-    FLOOD_EXTRA_DELAY_SEC = max(float(settings.telegram_notification_flood_extra_delay_sec or 0), 0.0)
-    SEND_LOCK_TTL = 120
-    SEND_LOCK_WAIT_SECONDS = 30.0
     UNAVAILABLE_CHAT_TTL = 10 * 60
     OPERATING_CASH_CACHE_TTL = max(
         int(settings.telegram_notification_operating_cash_cache_ttl or 0),
         60,
     )
+    CASH_SESSION_CACHE_TTL = max(
+        int(settings.telegram_notification_cash_session_cache_ttl or 0),
+        60,
+    )
+    ENRICHMENT_LOCAL_TTL = 60
+    ENRICHMENT_LOCAL_MAX = 10000
+    CHEQUE_PREFETCH_TTL_SEC = 60.0
+    CHEQUE_ACTIONS = frozenset({"DocChequeClosed", "DocChequeCanceled"})
+    SESSION_ACTIONS = frozenset({"DocSessionOpened", "DocSessionClosed"})
+    # справочные события, которые только сбрасывают кэш обогащения
+    INVALIDATION_ACTIONS = frozenset({"OperatingCashEdited", "OperatingCashDeleted"})
 
 
 class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
@@ -294,7 +314,7 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
                 return False, None
             stock_id = self._decode_cached_stock_id(raw)
             _OPERATING_CASH_STOCK_LOCAL_CACHE[key] = (
-                now_ts + min(TelegramBotConfig.OPERATING_CASH_CACHE_TTL, 60),
+                now_ts + min(TelegramBotConfig.OPERATING_CASH_CACHE_TTL, TelegramBotConfig.ENRICHMENT_LOCAL_TTL),
                 stock_id,
             )
             return True, stock_id
@@ -308,8 +328,9 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
         stock_id: Optional[int],
     ) -> None:
         key = self._operating_cash_stock_cache_key(operating_cash_id)
+        _prune_local_cache(_OPERATING_CASH_STOCK_LOCAL_CACHE, TelegramBotConfig.ENRICHMENT_LOCAL_MAX)
         _OPERATING_CASH_STOCK_LOCAL_CACHE[key] = (
-            _now_ts() + min(TelegramBotConfig.OPERATING_CASH_CACHE_TTL, 60),
+            _now_ts() + min(TelegramBotConfig.OPERATING_CASH_CACHE_TTL, TelegramBotConfig.ENRICHMENT_LOCAL_TTL),
             stock_id,
         )
         if not self._redis_enabled():
@@ -340,23 +361,201 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
             _OPERATING_CASH_STOCK_LOCKS[key] = lock
 
         async with lock:
+            stock_ids = await self._get_operating_cash_stock_ids(api, [oc_id])
+            return stock_ids.get(oc_id)
+
+    async def _get_operating_cash_stock_ids(
+        self,
+        api: RegosAPI,
+        operating_cash_ids: List[int],
+    ) -> Dict[int, Optional[int]]:
+        """Склады касс: из кэша, недостающие — одним OperatingCash/Get."""
+        result: Dict[int, Optional[int]] = {}
+        missing: List[int] = []
+        for oc_id in dict.fromkeys(int(item) for item in operating_cash_ids):
             hit, stock_id = await self._read_cached_operating_cash_stock_id(oc_id)
             if hit:
-                return stock_id
+                result[oc_id] = stock_id
+            else:
+                missing.append(oc_id)
+        if not missing:
+            return result
+
+        oc_resp = await api.references.operating_cash.get(
+            OperatingCashGetRequest(ids=missing)
+        )
+        fetched: Dict[int, Optional[int]] = {oc_id: None for oc_id in missing}
+        for operating_cash in getattr(oc_resp, "result", oc_resp) or []:
+            raw_id = getattr(operating_cash, "id", None)
+            if raw_id is None or int(raw_id) not in fetched:
+                continue
+            raw_stock_id = getattr(getattr(operating_cash, "stock", None), "id", None)
+            fetched[int(raw_id)] = int(raw_stock_id) if raw_stock_id is not None else None
+        for oc_id, stock_id in fetched.items():
+            await self._write_cached_operating_cash_stock_id(oc_id, stock_id)
+        result.update(fetched)
+        return result
+
+    async def _invalidate_operating_cash_stock(self, operating_cash_id: int) -> None:
+        key = self._operating_cash_stock_cache_key(operating_cash_id)
+        _OPERATING_CASH_STOCK_LOCAL_CACHE.pop(key, None)
+        if self._redis_enabled():
+            await self._redis_delete(key)
+
+    # ---------- смена -> касса ----------
+
+    def _cash_session_cache_key(self, session_uuid: str) -> str:
+        return self._redis_key(
+            "cs_oc",
+            self.connected_integration_id or "unknown",
+            str(session_uuid),
+        )
 
-            oc_resp = await api.references.operating_cash.get(
-                OperatingCashGetRequest(ids=[oc_id])
+    async def _read_cached_session_operating_cash_ids(
+        self,
+        session_uuids: List[str],
+    ) -> Dict[str, int]:
+        now_ts = _now_ts()
+        result: Dict[str, int] = {}
+        remote: List[str] = []
+        for session_uuid in session_uuids:
+            cached = _CASH_SESSION_OC_LOCAL_CACHE.get(self._cash_session_cache_key(session_uuid))
+            if cached and cached[0] > now_ts:
+                result[session_uuid] = cached[1]
+            else:
+                remote.append(session_uuid)
+        if not remote or not self._redis_enabled():
+            return result
+        try:
+            raw_values = await redis_ops.mget(
+                [self._cash_session_cache_key(session_uuid) for session_uuid in remote]
+            )
+        except Exception as error:
+            logger.warning("Failed to read cash session cache: %s", error)
+            return result
+        for session_uuid, raw in zip(remote, raw_values or []):
+            if not raw:
+                continue
+            try:
+                oc_id = int(raw)
+            except (TypeError, ValueError):
+                continue
+            result[session_uuid] = oc_id
+            _CASH_SESSION_OC_LOCAL_CACHE[self._cash_session_cache_key(session_uuid)] = (
+                now_ts + TelegramBotConfig.ENRICHMENT_LOCAL_TTL,
+                oc_id,
             )
-            oc_list = getattr(oc_resp, "result", oc_resp) or []
-            fetched_stock_id: Optional[int] = None
-            if oc_list:
-                operating_cash = oc_list[0]
-                stock = getattr(operating_cash, "stock", None)
-                raw_stock_id = getattr(stock, "id", None)
-                if raw_stock_id is not None:
-                    fetched_stock_id = int(raw_stock_id)
-            await self._write_cached_operating_cash_stock_id(oc_id, fetched_stock_id)
-            return fetched_stock_id
+        return result
+
+    async def _write_cached_session_operating_cash_ids(self, mapping: Dict[str, int]) -> None:
+        if not mapping:
+            return
+        # касса смены не меняется — держим долго; локально — с тем же ограничением, что и склады касс
+        _prune_local_cache(_CASH_SESSION_OC_LOCAL_CACHE, TelegramBotConfig.ENRICHMENT_LOCAL_MAX)
+        local_until = _now_ts() + TelegramBotConfig.ENRICHMENT_LOCAL_TTL
+        for session_uuid, oc_id in mapping.items():
+            _CASH_SESSION_OC_LOCAL_CACHE[self._cash_session_cache_key(session_uuid)] = (local_until, int(oc_id))
+        if not self._redis_enabled():
+            return
+        try:
+            async with redis_ops.pipeline(transaction=False) as pipe:
+                for session_uuid, oc_id in mapping.items():
+                    pipe.set(
+                        self._cash_session_cache_key(session_uuid),
+                        str(int(oc_id)),
+                        ex=TelegramBotConfig.CASH_SESSION_CACHE_TTL,
+                    )
+                await pipe.execute()
+        except Exception as error:
+            logger.warning("Failed to write cash session cache: %s", error)
+
+    async def _get_session_operating_cash_ids(
+        self,
+        api: RegosAPI,
+        session_uuids: List[str],
+    ) -> Dict[str, int]:
+        """Кассы смен: из кэша, недостающие — одним DocCashSession/Get."""
+        uuids = list(dict.fromkeys(str(item) for item in session_uuids if item))
+        result = await self._read_cached_session_operating_cash_ids(uuids)
+        missing = [session_uuid for session_uuid in uuids if session_uuid not in result]
+        if not missing:
+            return result
+        sessions_resp = await api.docs.cash_session.get_by_uuids(missing)
+        fetched = {
+            str(session.uuid): int(session.operating_cash_id)
+            for session in getattr(sessions_resp, "result", sessions_resp) or []
+            if getattr(session, "uuid", None) and getattr(session, "operating_cash_id", None)
+        }
+        await self._write_cached_session_operating_cash_ids(fetched)
+        result.update(fetched)
+        return result
+
+    # ---------- чеки пачкой ----------
+
+    async def _get_notification_cheque(self, api: RegosAPI, uuid_value: str) -> Optional[DocCheque]:
+        prefetched = _CHEQUE_PREFETCH.pop((str(self.connected_integration_id), str(uuid_value)), None)
+        if prefetched and prefetched[0] > time.monotonic():
+            return prefetched[1]
+        cheques_resp = await api.docs.cheque.get_by_uuids([uuid_value])
+        raw_cheques = getattr(cheques_resp, "result", cheques_resp) or []
+        if not raw_cheques:
+            return None
+        cheque = raw_cheques[0]
+        return cheque if isinstance(cheque, DocCheque) else DocCheque.model_validate(cheque)
+
+    @classmethod
+    async def _prefetch_notification_cheques(cls, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """
+        Чеки пачки из стрима — одним get_by_uuids на интеграцию (и, если задан
+        STOCK_IDS, смены и кассы этих чеков — тоже одним запросом каждые).
+        Одиночные события обрабатываются как раньше.
+        """
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in _CHEQUE_PREFETCH.items() if expires_at <= now]:
+            _CHEQUE_PREFETCH.pop(key, None)
+
+        by_ci: Dict[str, List[str]] = {}
+        for _, fields in entries:
+            if str(fields.get("kind") or "") != "crm_notification":
+                continue
+            if str(fields.get("action") or "") not in TelegramBotConfig.CHEQUE_ACTIONS:
+                continue
+            ci = str(fields.get("connected_integration_id") or "").strip()
+            payload = cls._decode_stream_payload(fields.get("payload"))
+            uuid_value = str(payload.get("uuid") or "").strip() if isinstance(payload, dict) else ""
+            if ci and uuid_value:
+                by_ci.setdefault(ci, []).append(uuid_value)
+
+        for ci, uuids in by_ci.items():
+            uuids = list(dict.fromkeys(uuids))
+            if len(uuids) < 2:
+                continue
+            worker = cls()
+            worker.connected_integration_id = ci
+            try:
+                async with RegosAPI(ci) as api:
+                    cheques_resp = await api.docs.cheque.get_by_uuids(uuids)
+                    cheques = [
+                        item if isinstance(item, DocCheque) else DocCheque.model_validate(item)
+                        for item in getattr(cheques_resp, "result", cheques_resp) or []
+                    ]
+                    expires_at = time.monotonic() + TelegramBotConfig.CHEQUE_PREFETCH_TTL_SEC
+                    for cheque in cheques:
+                        _CHEQUE_PREFETCH[(ci, str(cheque.uuid))] = (expires_at, cheque)
+
+                    settings_map = await worker._fetch_settings(worker._settings_cache_key())
+                    if settings_map and worker._parse_stock_ids(settings_map):
+                        oc_ids = await worker._get_session_operating_cash_ids(
+                            api,
+                            [cheque.session for cheque in cheques],
+                        )
+                        await worker._get_operating_cash_stock_ids(api, list(oc_ids.values()))
+                logger.debug("Prefetched cheque burst: ci=%s uuids=%s found=%s", ci, len(uuids), len(cheques))
+            except Exception as error:
+                # не страшно: каждое событие дочитает своё само
+                logger.warning("Cheque burst prefetch failed: ci=%s uuids=%s error=%s", ci, len(uuids), error)
+            finally:
+                await worker.__aexit__(None, None, None)
 
     @staticmethod
     def _stock_filter_error_response(
@@ -536,31 +735,6 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
         )
         await self._close_bot_runtime_cache(self.connected_integration_id)
 
-    async def _wait_chat_send_turn(self, chat_id: str) -> None:
-        self._require_redis()
-        raw = await redis_ops.get(self._chat_send_next_key(chat_id))
-        if not raw:
-            return
-        try:
-            send_after = float(raw)
-        except Exception:
-            return
-        delay = send_after - time.time()
-        if delay > 0:
-            await asyncio.sleep(delay)
-
-    async def _mark_chat_send_after(self, chat_id: str, delay_seconds: float) -> None:
-        self._require_redis()
-        delay = max(float(delay_seconds or 0), 0.0)
-        if delay <= 0:
-            return
-        ttl = max(int(delay) + 60, 60)
-        await redis_ops.set(
-            self._chat_send_next_key(chat_id),
-            str(time.time() + delay),
-            ex=ttl,
-        )
-
     async def _send_message_once(
         self,
         *,
@@ -636,59 +810,6 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
                 return
             raise
 
-    async def _send_message_markdown_with_plain_fallback(
-        self,
-        *,
-        chat_id: str,
-        text: str,
-        image_url: Optional[str] = None,
-        reply_markup: Optional[InlineKeyboardMarkup] = None,
-    ) -> Any:
-        self._require_redis()
-        lock_key = self._chat_send_lock_key(chat_id)
-        lock_token = await self._acquire_redis_lock(
-            lock_key,
-            TelegramBotConfig.SEND_LOCK_TTL,
-            wait_seconds=TelegramBotConfig.SEND_LOCK_WAIT_SECONDS,
-        )
-        if not lock_token:
-            raise TimeoutError(f"Timed out waiting for Telegram send lock: chat_id={chat_id}")
-        try:
-            last_error: Optional[Exception] = None
-            for attempt in range(TelegramBotConfig.FLOOD_RETRY_ATTEMPTS):
-                await self._wait_chat_send_turn(chat_id)
-                try:
-                    result = await self._send_message_once(
-                        chat_id=chat_id,
-                        text=text,
-                        image_url=image_url,
-                        reply_markup=reply_markup,
-                    )
-                    await self._mark_chat_send_after(
-                        chat_id,
-                        TelegramBotConfig.CHAT_MIN_INTERVAL_SEC,
-                    )
-                    return result
-                except Exception as error:
-                    retry_after = self._telegram_retry_after_seconds(error)
-                    if retry_after is None:
-                        raise
-                    last_error = error
-                    delay = retry_after + TelegramBotConfig.FLOOD_EXTRA_DELAY_SEC
-                    await self._mark_chat_send_after(chat_id, delay)
-                    logger.warning(
-                        "Telegram flood control: chat_id=%s retry_after=%s attempt=%s/%s",
-                        chat_id,
-                        retry_after,
-                        attempt + 1,
-                        TelegramBotConfig.FLOOD_RETRY_ATTEMPTS,
-                    )
-            if last_error:
-                raise last_error
-            raise RuntimeError(f"Telegram message was not sent: chat_id={chat_id}")
-        finally:
-            await self._release_redis_lock(lock_key, lock_token)
-
     async def _answer_callback_query(
         self,
         callback_query: types.CallbackQuery,
@@ -772,15 +893,25 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
     def _telegram_send_identity(self) -> str:
         return self._bot_token_fingerprint or str(self.connected_integration_id or "").strip()
 
-    def _chat_send_key(self, chat_id: str, suffix: str) -> str:
-        chat_hash = hashlib.sha256(str(chat_id or "").encode("utf-8")).hexdigest()[:16]
-        return self._redis_key("snd", suffix, self._telegram_send_identity(), chat_hash)
-
-    def _chat_send_lock_key(self, chat_id: str) -> str:
-        return self._chat_send_key(chat_id, "l")
+    @classmethod
+    def _outbox_key_prefix(cls) -> str:
+        return cls._redis_key("ob")
+
+    def _send_scheduler(self) -> TelegramSendScheduler:
+        return get_send_scheduler(
+            self._telegram_send_identity(),
+            key_prefix=self._outbox_key_prefix(),
+            sender=type(self)._deliver_outbox_job,
+            retry_after_of=self._telegram_retry_after_seconds,
+        )
 
-    def _chat_send_next_key(self, chat_id: str) -> str:
-        return self._chat_send_key(chat_id, "n")
+    @classmethod
+    async def _start_send_schedulers(cls) -> int:
+        return await start_send_schedulers(
+            key_prefix=cls._outbox_key_prefix(),
+            sender=cls._deliver_outbox_job,
+            retry_after_of=cls._telegram_retry_after_seconds,
+        )
 
     @staticmethod
     def _redis_enabled() -> bool:
@@ -1297,13 +1428,15 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
                 pass
             except Exception:
                 logger.exception("Error while stopping Telegram notification stream worker")
+        await stop_send_schedulers()
         await cls._close_bot_runtime_cache()
 
     @classmethod
     async def restore_active_connections(cls) -> Dict[str, int]:
         cls._require_redis()
         await cls._ensure_stream_workers()
-        return {"streams": 2, "workers": len(_STREAM_WORKER_TASKS)}
+        outboxes = await cls._start_send_schedulers()
+        return {"streams": 2, "workers": len(_STREAM_WORKER_TASKS), "outboxes": outboxes}
 
     @classmethod
     def _decode_stream_payload(cls, raw: Any) -> Any:
@@ -1431,7 +1564,12 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
                     last_claim_ts = int(_STREAM_CLAIM_TS.get(stream_key) or 0)
                     if now_ts - last_claim_ts >= TelegramBotConfig.STREAM_CLAIM_INTERVAL_SEC:
                         _STREAM_CLAIM_TS[stream_key] = now_ts
-                        for entry_id, fields in await cls._process_claimed_entries(stream_key, consumer):
+                        if stream_key == cls._notifications_stream_key():
+                            # outbox ботов, оставшиеся от упавших процессов
+                            await cls._start_send_schedulers()
+                        claimed = await cls._process_claimed_entries(stream_key, consumer)
+                        await cls._prefetch_notification_cheques(claimed)
+                        for entry_id, fields in claimed:
                             await cls._process_stream_entry(
                                 stream_key=stream_key,
                                 entry_id=entry_id,
@@ -1453,11 +1591,17 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
                         raise
 
                     for _, entries in records or []:
-                        for entry_id, fields in entries or []:
+                        entries = [
+                            (str(entry_id), fields if isinstance(fields, dict) else {})
+                            for entry_id, fields in entries or []
+                        ]
+                        if stream_key == cls._notifications_stream_key():
+                            await cls._prefetch_notification_cheques(entries)
+                        for entry_id, fields in entries:
                             await cls._process_stream_entry(
                                 stream_key=stream_key,
-                                entry_id=str(entry_id),
-                                fields=fields if isinstance(fields, dict) else {},
+                                entry_id=entry_id,
+                                fields=fields,
                             )
                 except asyncio.CancelledError:
                     raise
@@ -2511,12 +2655,9 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
         webhook_action, webhook_data = self._normalize_notification_input(action, data)
         if not webhook_action:
             return self._create_error_response(1006, "No action specified in webhook")
-        if webhook_action not in {
-            "DocSessionOpened",
-            "DocSessionClosed",
-            "DocChequeClosed",
-            "DocChequeCanceled",
-        }:
+        if webhook_action in TelegramBotConfig.INVALIDATION_ACTIONS:
+            return await self._handle_enrichment_invalidation(webhook_action, webhook_data)
+        if webhook_action not in TelegramBotConfig.CHEQUE_ACTIONS | TelegramBotConfig.SESSION_ACTIONS:
             return self._create_error_response(
                 1006, f"Unsupported action: {webhook_action}"
             )
@@ -2545,6 +2686,27 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
             "duplicate": not queued,
         }
 
+    async def _handle_enrichment_invalidation(
+        self,
+        webhook_action: str,
+        webhook_data: Dict[str, Any],
+    ) -> Dict:
+        # касса сменила склад или удалена — следующий чек перечитает её склад
+        try:
+            operating_cash_id = int(webhook_data.get("id"))
+        except (TypeError, ValueError):
+            return self._create_error_response(1007, "Webhook missing id")
+        if not self.connected_integration_id:
+            return self._create_error_response(
+                1000, "No connected_integration_id specified"
+            )
+        await self._invalidate_operating_cash_stock(operating_cash_id)
+        return {
+            "status": "cache invalidated",
+            "action": webhook_action,
+            "operating_cash_id": operating_cash_id,
+        }
+
     async def _process_notification_webhook(
         self, action: Optional[str] = None, data: Optional[Dict] = None, **kwargs
     ) -> Dict:
@@ -2622,10 +2784,10 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
             # ---------------- ЧЕК ----------------
             if webhook_action in {"DocChequeClosed", "DocChequeCanceled"}:
                 async with RegosAPI(self.connected_integration_id) as api:
-                    cheques_resp = await api.docs.cheque.get_by_uuids([uuid])
-                    raw_cheques = getattr(cheques_resp, "result", cheques_resp) or []
+                    # чек мог быть уже получен пачкой вместе с соседними событиями
+                    cheque = await self._get_notification_cheque(api, uuid)
 
-                    if not raw_cheques:
+                    if cheque is None:
                         logger.warning(f"Cheque with UUID {uuid} not found")
                         message_text = (
                             f"*Event:* `{webhook_action}`\n"
@@ -2633,41 +2795,31 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
                             f"Details: Cheque not found"
                         )
                     else:
-                        # Приводим к DocCheque
-                        cheque = (
-                            raw_cheques[0]
-                            if isinstance(raw_cheques[0], DocCheque)
-                            else DocCheque.model_validate(raw_cheques[0])
-                        )
-
                         # --- Фильтрация по STOCK_IDS через смену и кассу ---
                         stock_id_for_filter: Optional[int] = None
                         if allowed_stock_ids:
                             session_uuid = cheque.session  # UUID кассовой сессии
 
                             try:
-                                # 1. Получаем смену
-                                sessions_resp = await api.docs.cash_session.get_by_uuids(
-                                    [session_uuid]
+                                # 1. Касса смены (кэш смена -> касса)
+                                session_cash_ids = await self._get_session_operating_cash_ids(
+                                    api,
+                                    [session_uuid],
                                 )
-                                sessions = getattr(
-                                    sessions_resp, "result", sessions_resp
-                                ) or []
-
-                                if not sessions:
+                                operating_cash_id = session_cash_ids.get(str(session_uuid))
+                                if operating_cash_id is None:
                                     raise StockFilterUnavailableError(
                                         f"cash session {session_uuid} not found"
                                     )
-                                session = sessions[0]
 
-                                    # 2. Получаем кассу (OperatingCash)
+                                # 2. Склад кассы (кэш касса -> склад)
                                 stock_id_for_filter = await self._get_operating_cash_stock_id(
                                     api,
-                                    session.operating_cash_id,
+                                    operating_cash_id,
                                 )
                                 if stock_id_for_filter is None:
                                     raise StockFilterUnavailableError(
-                                        f"stock not found for operating_cash_id={session.operating_cash_id}"
+                                        f"stock not found for operating_cash_id={operating_cash_id}"
                                     )
 
                             except Exception as error:
@@ -2732,6 +2884,10 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
                         )
                     else:
                         session = sessions[0]
+                        # событие смены освежает кэш смена -> касса для её будущих чеков
+                        await self._write_cached_session_operating_cash_ids(
+                            {str(session.uuid): int(session.operating_cash_id)}
+                        )
 
                         # --- Фильтр по STOCK_IDS через кассу ---
                         stock_id_for_filter: Optional[int] = None
@@ -2804,36 +2960,56 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
                 f"Details unavailable: `{str(error)}`"
             )
 
-        # Рассылка сообщений подписчикам
-        semaphore = asyncio.Semaphore(TelegramBotConfig.SEND_CONCURRENCY)
-
-        async def send_to_subscriber(chat_id: str) -> Dict:
-            async with semaphore:
-                return await self._send_notification_to_subscriber(
+        # Рассылка подписчикам — через outbox бота: темп (бот/чат/429) держит планировщик
+        reply_markup = keyboard.model_dump_json(exclude_none=True) if keyboard else None
+        queued = await self._send_scheduler().submit(
+            [
+                OutboxJob(
+                    flow=str(self.connected_integration_id),
                     chat_id=str(chat_id),
-                    message_text=message_text,
-                    keyboard=keyboard,
+                    text=message_text,
+                    reply_markup=reply_markup,
                 )
-
-        results = await asyncio.gather(
-            *(send_to_subscriber(str(chat_id)) for chat_id in subscribers)
+                for chat_id in subscribers
+            ]
         )
 
         return {
             "status": "webhook processed",
             "action": webhook_action,
             "uuid": uuid,
-            "sent_to": sum(1 for item in results if item.get("status") == "sent"),
-            "details": results,
+            "queued": queued,
         }
 
 
+    @classmethod
+    async def _deliver_outbox_job(cls, job: OutboxJob) -> Dict:
+        """Send one outbox message; pacing and retry_after are handled by the scheduler."""
+        if not await cls._is_connected_integration_active(job.flow):
+            return {"status": "skipped", "chat_id": job.chat_id, "reason": "integration_inactive"}
+        worker = cls()
+        worker.connected_integration_id = job.flow
+        try:
+            return await worker._send_notification_to_subscriber(
+                chat_id=job.chat_id,
+                message_text=job.text,
+                image_url=job.image_url,
+                keyboard=(
+                    InlineKeyboardMarkup.model_validate_json(job.reply_markup)
+                    if job.reply_markup
+                    else None
+                ),
+            )
+        finally:
+            await worker.__aexit__(None, None, None)
+
     async def _send_notification_to_subscriber(
         self,
         *,
         chat_id: str,
         message_text: str,
         keyboard: Optional[InlineKeyboardMarkup],
+        image_url: Optional[str] = None,
     ) -> Dict:
         if await self._is_unavailable_chat(chat_id):
             return {
@@ -2842,13 +3018,17 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
                 "reason": "chat_unavailable",
             }
         try:
-            await self._send_message_markdown_with_plain_fallback(
+            await self._send_message_once(
                 chat_id=chat_id,
                 text=message_text,
+                image_url=image_url,
                 reply_markup=keyboard if keyboard else None,
             )
             return {"status": "sent", "chat_id": chat_id}
         except Exception as error:
+            if self._telegram_retry_after_seconds(error) is not None:
+                # flood control — решает планировщик outbox
+                raise
             migrated_to = self._migrate_to_chat_id(error)
             if migrated_to:
                 try:
@@ -2861,9 +3041,10 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
                         replace_error,
                     )
                 try:
-                    await self._send_message_markdown_with_plain_fallback(
+                    await self._send_message_once(
                         chat_id=migrated_to,
                         text=message_text,
+                        image_url=image_url,
                         reply_markup=keyboard if keyboard else None,
                     )
                     return {
@@ -2933,7 +3114,7 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
         }
 
     async def _send_messages_now(self, messages: List[Dict]) -> Dict:
-        """Send multiple messages to Telegram in batches."""
+        """Queue messages to the bot outbox; the send scheduler delivers them."""
         logger.debug("Starting message send for ID %s", self.connected_integration_id)
         if not self.connected_integration_id:
             return self._create_error_response(
@@ -2967,67 +3148,19 @@ class TelegramBotNotificationIntegration(IntegrationTelegramBase, ClientBase):
         await self._initialize_bot(settings_map)
         await self._setup_handlers()
 
-        async def throttled_sender(
-            chat_id: str,
-            text: str,
-            image_url: Optional[str] = None,
-        ) -> None:
-            await self._send_message_markdown_with_plain_fallback(
-                chat_id=chat_id,
-                text=text,
-                image_url=image_url,
-            )
-
-        results = []
-        for i in range(0, len(messages), TelegramBotConfig.BATCH_SIZE):
-            batch = messages[i : i + TelegramBotConfig.BATCH_SIZE]
-            logger.debug(f"Sending batch {i}-{i + len(batch)}")
-            try:
-                result = await send_message_batch(
-                    messages=batch,
-                    sleep_between=0.0,
-                    logger=logger,
-                    concurrency=TelegramBotConfig.SEND_CONCURRENCY,
-                    sender=throttled_sender,
-                )
-                results.append(result)
-            except Exception as error:
-                logger.error(f"Error sending batch {i}: {error}")
-                results.append({"error": str(error), "batch_index": i})
-
-        for batch_result in results:
-            details = batch_result.get("details") if isinstance(batch_result, dict) else None
-            if not details:
-                continue
-            for detail in details:
-                if not isinstance(detail, dict) or detail.get("status") != "error":
-                    continue
-                error_text = detail.get("error", "")
-                chat_id = detail.get("chat_id")
-                if not chat_id:
-                    continue
-                migrated_to = detail.get("migrate_to_chat_id") or self._migrate_to_chat_id(
-                    error_text
+        queued = await self._send_scheduler().submit(
+            [
+                OutboxJob(
+                    flow=str(self.connected_integration_id),
+                    chat_id=str(message["recipient"]),
+                    text=str(message.get("message") or ""),
+                    image_url=str(message.get("image_url") or "").strip() or None,
                 )
-                if migrated_to:
-                    try:
-                        replaced = await self._replace_subscriber(
-                            str(chat_id), str(migrated_to)
-                        )
-                        if replaced:
-                            detail["migrated_to_chat_id"] = str(migrated_to)
-                    except Exception as replace_error:
-                        logger.warning(
-                            "Failed to replace migrated subscriber %s -> %s: %s",
-                            chat_id,
-                            migrated_to,
-                            replace_error,
-                        )
-                    continue
-                await self._cleanup_failed_subscriber(str(chat_id), error_text)
-
-        logger.debug("Message sending completed. Processed %s batches", len(results))
-        return {"sent_batches": len(results), "details": results}
+                for message in messages
+            ]
+        )
+        logger.debug("Queued %s messages to Telegram outbox", queued)
+        return {"status": "queued", "queued": queued}
 
     async def handle_external(self, envelope: Dict) -> Dict:
         """Queue incoming Telegram updates."""
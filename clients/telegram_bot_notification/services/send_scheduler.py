@@ -0,0 +1,632 @@
+import asyncio
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from config.settings import settings
+from core.api.rate_limiter import DistributedTokenBucket
+from core.logger import setup_logger
+from core.redis import redis_error_contains, redis_ops
+
+logger = setup_logger("telegram_send_scheduler")
+
+OUTBOX_GROUP = "tbno"
+OUTBOX_TTL_SEC = 24 * 60 * 60
+READ_BLOCK_MS = 1000
+CLAIM_INTERVAL_SEC = 20
+CLAIM_MIN_IDLE_MS = 60_000  # больше CLAIM_INTERVAL_SEC: свои удерживаемые записи успевают продлиться
+IDLE_EXIT_SEC = 60
+SCAN_DEPTH = 32  # сколько задач потока смотрим в поисках чата, которому уже можно слать
+TRANSIENT_RETRY_SEC = 2.0
+CHAT_READY_LOCAL_MAX = 10000
+
+_CONSUMER_ID = uuid.uuid4().hex[:12]
+
+# KEYS[1] — пауза всего бота после 429, KEYS[2] — очередь чата.
+# Возвращает {ждать паузу мс, ждать чат мс}; если оба 0 — ход чата занят на ARGV[1] мс.
+_CHAT_TURN_LUA = """
+local pause = redis.call('pttl', KEYS[1])
+local chat = redis.call('pttl', KEYS[2])
+if pause > 0 or chat > 0 then
+  return {math.max(pause, 0), math.max(chat, 0)}
+end
+redis.call('set', KEYS[2], '1', 'PX', ARGV[1])
+return {0, 0}
+"""
+
+# Убрать опустевшие очереди интеграций; бота снять из индекса, если очередей не осталось.
+# KEYS[1] — набор интеграций бота, KEYS[2] — индекс ботов; ARGV[1] — бот, ARGV[2] — префикс очередей
+_OUTBOX_RELEASE_LUA = """
+for _, flow in ipairs(redis.call('smembers', KEYS[1])) do
+  local stream = ARGV[2] .. flow
+  if redis.call('xlen', stream) == 0 then
+    redis.call('del', stream)
+    redis.call('srem', KEYS[1], flow)
+  end
+end
+if redis.call('scard', KEYS[1]) == 0 then
+  redis.call('srem', KEYS[2], ARGV[1])
+  return 1
+end
+return 0
+"""
+
+
+@dataclass
+class OutboxJob:
+    """One outgoing Telegram message stored in the bot outbox stream."""
+
+    flow: str  # connected_integration_id — единица справедливого разделения
+    chat_id: str
+    text: str
+    image_url: Optional[str] = None
+    reply_markup: Optional[str] = None  # InlineKeyboardMarkup в JSON
+    weight: float = 1.0
+    entry_id: str = ""
+    attempt: int = 0
+    tag: float = 0.0
+
+    def to_fields(self) -> Dict[str, str]:
+        fields = {
+            "ci": self.flow,
+            "chat": self.chat_id,
+            "text": self.text,
+            "w": str(self.weight),
+        }
+        if self.image_url:
+            fields["img"] = self.image_url
+        if self.reply_markup:
+            fields["kb"] = self.reply_markup
+        return fields
+
+    @classmethod
+    def from_fields(cls, entry_id: str, fields: Any) -> Optional["OutboxJob"]:
+        if not isinstance(fields, dict):
+            return None
+        flow = str(fields.get("ci") or "").strip()
+        chat_id = str(fields.get("chat") or "").strip()
+        if not flow or not chat_id:
+            return None
+        try:
+            weight = max(float(fields.get("w") or 1.0), 0.01)
+        except (TypeError, ValueError):
+            weight = 1.0
+        return cls(
+            flow=flow,
+            chat_id=chat_id,
+            text=str(fields.get("text") or ""),
+            image_url=str(fields.get("img") or "").strip() or None,
+            reply_markup=str(fields.get("kb") or "").strip() or None,
+            weight=weight,
+            entry_id=str(entry_id),
+        )
+
+
+OutboxSender = Callable[[OutboxJob], Awaitable[Any]]
+RetryAfterResolver = Callable[[object], Optional[float]]
+
+
+class _FairQueue:
+    """
+    Weighted fair queuing across flows (integrations sharing one bot).
+
+    Each job gets a virtual finish tag `max(virtual, last tag of its flow) + 1/weight`;
+    the ready job with the smallest tag goes next, so a 10k-subscriber fan-out
+    of one integration does not starve a small one of another.
+    """
+
+    def __init__(self) -> None:
+        self._queues: Dict[str, Deque[OutboxJob]] = {}
+        self._finish: Dict[str, float] = {}
+        self._virtual = 0.0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, job: OutboxJob) -> None:
+        start = max(self._virtual, self._finish.get(job.flow, 0.0))
+        job.tag = start + 1.0 / job.weight
+        self._finish[job.flow] = job.tag
+        self._queues.setdefault(job.flow, deque()).append(job)
+        self._size += 1
+
+    def requeue(self, job: OutboxJob) -> None:
+        # в голову своего потока с прежним тегом — порядок сообщений чата сохраняется
+        self._queues.setdefault(job.flow, deque()).appendleft(job)
+        self._size += 1
+
+    def pop(self, ready: Callable[[OutboxJob], bool]) -> Optional[OutboxJob]:
+        best: Optional[OutboxJob] = None
+        for queue in self._queues.values():
+            blocked_chats: Set[str] = set()
+            for index, job in enumerate(queue):
+                if index >= SCAN_DEPTH:
+                    break
+                if job.chat_id in blocked_chats:
+                    continue
+                if ready(job):
+                    if best is None or job.tag < best.tag:
+                        best = job
+                    break
+                blocked_chats.add(job.chat_id)
+        if best is None:
+            return None
+        queue = self._queues[best.flow]
+        queue.remove(best)
+        self._size -= 1
+        if not queue:
+            self._queues.pop(best.flow, None)
+        self._virtual = max(self._virtual, best.tag)
+        for flow in [flow for flow, tag in self._finish.items() if flow not in self._queues and tag <= self._virtual]:
+            self._finish.pop(flow, None)
+        return best
+
+
+class TelegramSendScheduler:
+    """
+    Send scheduler of one bot token.
+
+    Messages are written to a Redis outbox — one stream per integration using the
+    bot — and drained by consumer groups, so queued work survives restarts and is
+    shared between processes. The drainer enforces:
+    - the global messages/second budget of the bot (cluster-wide token bucket);
+    - the per-chat interval (private chats / groups), reserved atomically in Redis;
+    - retry_after from Telegram: the whole bot pauses, in every process;
+    - weighted fair queuing across integrations using the same bot.
+    """
+
+    def __init__(
+        self,
+        identity: str,
+        *,
+        key_prefix: str,
+        sender: OutboxSender,
+        retry_after_of: RetryAfterResolver,
+    ) -> None:
+        self.identity = identity
+        self._flows_key = f"{key_prefix}:{identity}:f"
+        self._flow_stream_prefix = f"{key_prefix}:{identity}:q:"
+        self._index_key = f"{key_prefix}:idx"
+        self._pause_key = f"{key_prefix}:{identity}:p"
+        self._chat_key_prefix = f"{key_prefix}:{identity}:c"
+        self._consumer = f"{_CONSUMER_ID}:{identity}"
+        self._sender = sender
+        self._retry_after_of = retry_after_of
+
+        rate = max(float(settings.telegram_notification_global_rate_per_sec or 0), 1.0)
+        self._bucket = DistributedTokenBucket(
+            identity,
+            rate,
+            max(int(rate), 1),
+            lease_size=settings.integration_rate_limit_lease_size,
+            lease_ttl_sec=settings.integration_rate_limit_lease_ttl_sec,
+            redis_prefix=f"{key_prefix}:rl",
+        )
+        self._concurrency = max(int(settings.telegram_notification_send_concurrency or 0), 1)
+        # на интеграцию держим в памяти пару секунд работы бота — остальное ждёт в Redis;
+        # окно у каждой своё, иначе большая рассылка одной вытеснит из WFQ всех остальных
+        self._flow_prefetch = max(int(rate * 2), self._concurrency)
+        self._max_attempts = max(int(settings.telegram_notification_flood_retry_attempts or 0), 1)
+
+        self._queue = _FairQueue()
+        self._held: Dict[Tuple[str, str], OutboxJob] = {}
+        self._busy_chats: Set[str] = set()
+        self._chat_ready_at: Dict[str, float] = {}
+        self._paused_until = 0.0
+        self._inflight: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._chat_turn_script: Any = None
+        self._release_script: Any = None
+
+    # ---------- outbox ----------
+
+    async def submit(self, jobs: List[OutboxJob]) -> int:
+        if not jobs:
+            return 0
+        flows = {job.flow for job in jobs}
+        async with redis_ops.pipeline(transaction=True) as pipe:
+            for flow in flows:
+                pipe.xgroup_create(self._flow_stream_key(flow), OUTBOX_GROUP, id="0-0", mkstream=True)
+            for job in jobs:
+                pipe.xadd(self._flow_stream_key(job.flow), job.to_fields())
+            for flow in flows:
+                pipe.expire(self._flow_stream_key(flow), OUTBOX_TTL_SEC)
+            pipe.sadd(self._flows_key, *flows)
+            pipe.sadd(self._index_key, self.identity)
+            results = await pipe.execute(raise_on_error=False)
+        for result in results:
+            if isinstance(result, Exception) and not redis_error_contains(result, "BUSYGROUP"):
+                raise result
+        self.start()
+        return len(jobs)
+
+    def start(self) -> None:
+        self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(),
+                name=f"tbn_outbox_{self.identity}",
+            )
+
+    async def stop(self) -> None:
+        task = self._task
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("Error while stopping Telegram outbox drainer: identity=%s", self.identity)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "identity": self.identity,
+            "queued": len(self._queue),
+            "held": len(self._held),
+            "inflight": len(self._inflight),
+            "paused_for": max(self._paused_until - time.monotonic(), 0.0),
+        }
+
+    def _flow_stream_key(self, flow: str) -> str:
+        return f"{self._flow_stream_prefix}{flow}"
+
+    def _flow_of(self, stream_key: Any) -> str:
+        return str(stream_key)[len(self._flow_stream_prefix):]
+
+    async def _ensure_groups(self, stream_keys: List[str]) -> None:
+        async with redis_ops.pipeline(transaction=False) as pipe:
+            for stream_key in stream_keys:
+                pipe.xgroup_create(stream_key, OUTBOX_GROUP, id="0-0", mkstream=True)
+            await pipe.execute(raise_on_error=False)
+
+    def _accept(self, flow: str, entry_id: str, fields: Any) -> bool:
+        """Take a read entry into the fair queue; False if its payload is invalid."""
+        key = (flow, str(entry_id))
+        if key in self._held:
+            return True
+        job = OutboxJob.from_fields(str(entry_id), fields)
+        if job is None or job.flow != flow:
+            return False
+        self._held[key] = job
+        self._queue.push(job)
+        return True
+
+    async def _fill(self, *, block: bool) -> None:
+        held = Counter(flow for flow, _ in self._held)
+        flows = await redis_ops.smembers(self._flows_key)
+        streams = {
+            self._flow_stream_key(str(flow)): ">"
+            for flow in flows or []
+            if held[str(flow)] < self._flow_prefetch
+        }
+        if not streams:
+            if block:
+                await self._wait(READ_BLOCK_MS / 1000.0)
+            return
+        try:
+            records = await redis_ops.xreadgroup(
+                groupname=OUTBOX_GROUP,
+                consumername=self._consumer,
+                streams=streams,
+                count=self._flow_prefetch,
+                block=READ_BLOCK_MS if block else None,
+            )
+        except Exception as error:
+            if redis_error_contains(error, "NOGROUP"):
+                # очередь истекла по TTL, а интеграция осталась в наборе
+                await self._ensure_groups(list(streams))
+                return
+            raise
+        invalid: List[Tuple[str, str]] = []
+        for stream_key, entries in records or []:
+            flow = self._flow_of(stream_key)
+            for entry_id, fields in entries or []:
+                if not self._accept(flow, entry_id, fields):
+                    invalid.append((flow, str(entry_id)))
+        if invalid:
+            logger.warning("Telegram outbox entries have invalid payload: identity=%s ids=%s", self.identity, invalid)
+            for flow, entry_id in invalid:
+                await self._ack(flow, entry_id)
+
+    async def _claim(self) -> None:
+        # продлеваем свои записи (пока ждут хода, они не должны считаться брошенными) ...
+        by_flow: Dict[str, List[str]] = {}
+        for flow, entry_id in self._held:
+            by_flow.setdefault(flow, []).append(entry_id)
+        for flow, entry_ids in by_flow.items():
+            await redis_ops.xclaim(
+                self._flow_stream_key(flow),
+                OUTBOX_GROUP,
+                self._consumer,
+                min_idle_time=0,
+                message_ids=entry_ids,
+                justid=True,
+            )
+        # ... и забираем записи упавших процессов
+        held = Counter(flow for flow, _ in self._held)
+        for flow in await redis_ops.smembers(self._flows_key) or []:
+            flow = str(flow)
+            room = self._flow_prefetch - held[flow]
+            if room <= 0:
+                continue
+            try:
+                claimed = await redis_ops.xautoclaim(
+                    self._flow_stream_key(flow),
+                    OUTBOX_GROUP,
+                    self._consumer,
+                    min_idle_time=CLAIM_MIN_IDLE_MS,
+                    start_id="0-0",
+                    count=room,
+                )
+            except Exception as error:
+                if redis_error_contains(error, "NOGROUP"):
+                    continue
+                raise
+            entries = claimed[1] if isinstance(claimed, (list, tuple)) and len(claimed) >= 2 else []
+            for entry_id, fields in entries or []:
+                if not self._accept(flow, entry_id, fields):
+                    await self._ack(flow, str(entry_id))
+
+    async def _ack(self, flow: str, entry_id: str, *, chat_id: Optional[str] = None) -> None:
+        self._held.pop((flow, entry_id), None)
+        stream_key = self._flow_stream_key(flow)
+        async with redis_ops.pipeline(transaction=False) as pipe:
+            if chat_id is not None:
+                # интервал чата отсчитываем от фактической отправки
+                pipe.set(self._chat_key(chat_id), "1", px=self._chat_interval_ms(chat_id))
+            pipe.xack(stream_key, OUTBOX_GROUP, entry_id)
+            pipe.xdel(stream_key, entry_id)
+            await pipe.execute()
+
+    async def _release_index(self) -> bool:
+        if self._release_script is None:
+            self._release_script = redis_ops.register_script(_OUTBOX_RELEASE_LUA)
+        released = await self._release_script(
+            keys=[self._flows_key, self._index_key],
+            args=[self.identity, self._flow_stream_prefix],
+        )
+        return bool(int(released or 0))
+
+    # ---------- pacing ----------
+
+    def _chat_key(self, chat_id: str) -> str:
+        return f"{self._chat_key_prefix}:{chat_id}"
+
+    @staticmethod
+    def _chat_interval_ms(chat_id: str) -> int:
+        # отрицательные id — группы и каналы, у них лимит Telegram строже (~20 сообщений в минуту)
+        if str(chat_id).startswith("-"):
+            interval = settings.telegram_notification_group_min_interval_sec
+        else:
+            interval = settings.telegram_notification_chat_min_interval_sec
+        return max(int(float(interval or 0) * 1000), 1)
+
+    async def _take_chat_turn(self, chat_id: str) -> float:
+        """Reserve the chat (and check the bot pause); returns seconds to wait, 0 if reserved."""
+        if self._chat_turn_script is None:
+            self._chat_turn_script = redis_ops.register_script(_CHAT_TURN_LUA)
+        pause_ms, chat_ms = await self._chat_turn_script(
+            keys=[self._pause_key, self._chat_key(chat_id)],
+            args=[self._chat_interval_ms(chat_id)],
+        )
+        pause_sec = max(int(pause_ms or 0), 0) / 1000.0
+        if pause_sec > 0:
+            self._paused_until = max(self._paused_until, time.monotonic() + pause_sec)
+        return max(pause_sec, max(int(chat_ms or 0), 0) / 1000.0)
+
+    async def _pause(self, chat_id: str, delay: float) -> None:
+        delay_ms = max(int(delay * 1000), 1)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        async with redis_ops.pipeline(transaction=False) as pipe:
+            pipe.set(self._pause_key, "1", px=delay_ms)
+            pipe.set(self._chat_key(chat_id), "1", px=delay_ms)
+            await pipe.execute()
+
+    def _job_ready(self, job: OutboxJob) -> bool:
+        if job.chat_id in self._busy_chats:
+            return False
+        return self._chat_ready_at.get(job.chat_id, 0.0) <= time.monotonic()
+
+    def _next_ready_in(self) -> float:
+        now = time.monotonic()
+        if self._paused_until > now:
+            return self._paused_until - now
+        waits = [ready_at - now for ready_at in self._chat_ready_at.values() if ready_at > now]
+        return min(waits) if waits else 0.5
+
+    def _prune_chat_ready(self) -> None:
+        if len(self._chat_ready_at) <= CHAT_READY_LOCAL_MAX:
+            return
+        now = time.monotonic()
+        for chat_id in [chat_id for chat_id, ready_at in self._chat_ready_at.items() if ready_at <= now]:
+            self._chat_ready_at.pop(chat_id, None)
+
+    # ---------- drain ----------
+
+    def _dispatch(self) -> int:
+        if time.monotonic() < self._paused_until:
+            return 0
+        self._prune_chat_ready()
+        dispatched = 0
+        loop = asyncio.get_running_loop()
+        while len(self._inflight) < self._concurrency:
+            job = self._queue.pop(self._job_ready)
+            if job is None:
+                break
+            self._busy_chats.add(job.chat_id)
+            task = loop.create_task(self._deliver(job))
+            self._inflight.add(task)
+            task.add_done_callback(self._delivered)
+            dispatched += 1
+        return dispatched
+
+    def _delivered(self, task: asyncio.Task) -> None:
+        self._inflight.discard(task)
+        self._wake.set()
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Telegram outbox delivery crashed: identity=%s error=%s", self.identity, task.exception())
+
+    async def _deliver(self, job: OutboxJob) -> None:
+        retry_in: Optional[float] = None
+        sent = False
+        try:
+            wait = await self._take_chat_turn(job.chat_id)
+            if wait > 0:
+                retry_in = wait
+                return
+            await self._bucket.acquire()
+            await self._sender(job)
+            sent = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            job.attempt += 1
+            retry_after = self._retry_after_of(error)
+            if retry_after is not None:
+                delay = float(retry_after) + max(float(settings.telegram_notification_flood_extra_delay_sec or 0), 0.0)
+                await self._pause(job.chat_id, delay)
+                logger.warning(
+                    "Telegram flood control: identity=%s chat_id=%s retry_after=%s attempt=%s/%s",
+                    self.identity,
+                    job.chat_id,
+                    retry_after,
+                    job.attempt,
+                    self._max_attempts,
+                )
+            else:
+                delay = TRANSIENT_RETRY_SEC * job.attempt
+                logger.warning(
+                    "Telegram outbox send failed: identity=%s chat_id=%s attempt=%s/%s error=%s",
+                    self.identity,
+                    job.chat_id,
+                    job.attempt,
+                    self._max_attempts,
+                    error,
+                )
+            if job.attempt < self._max_attempts:
+                retry_in = delay
+                return
+            logger.error(
+                "Telegram outbox message dropped: identity=%s ci=%s chat_id=%s attempts=%s",
+                self.identity,
+                job.flow,
+                job.chat_id,
+                job.attempt,
+            )
+        finally:
+            self._busy_chats.discard(job.chat_id)
+            if retry_in is not None:
+                self._chat_ready_at[job.chat_id] = time.monotonic() + retry_in
+                self._queue.requeue(job)
+        if retry_in is None:
+            await self._ack(job.flow, job.entry_id, chat_id=job.chat_id if sent else None)
+
+    async def _wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=max(timeout, 0.01))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        logger.info("Telegram outbox drainer started: identity=%s", self.identity)
+        last_claim = 0.0
+        idle_since = time.monotonic()
+        try:
+            while True:
+                try:
+                    self._wake.clear()
+                    if time.monotonic() - last_claim >= CLAIM_INTERVAL_SEC:
+                        last_claim = time.monotonic()
+                        await self._claim()
+                    await self._fill(block=not self._held)
+                    if self._held:
+                        idle_since = time.monotonic()
+                        if not self._dispatch():
+                            await self._wait(self._next_ready_in())
+                        continue
+                    if (
+                        time.monotonic() - idle_since >= IDLE_EXIT_SEC
+                        and await self._release_index()
+                        and not self._wake.is_set()
+                    ):
+                        return
+                except asyncio.CancelledError:
+                    raise
+                except Exception as error:
+                    logger.exception("Telegram outbox drainer error: identity=%s error=%s", self.identity, error)
+                    await asyncio.sleep(2)
+        finally:
+            for task in list(self._inflight):
+                task.cancel()
+            _forget_scheduler(self)
+            logger.info("Telegram outbox drainer stopped: identity=%s", self.identity)
+
+
+# Планировщики живут в event loop, где созданы (asyncio-примитивы) — ключ (id(loop), stream)
+_SCHEDULERS: Dict[Tuple[int, str], TelegramSendScheduler] = {}
+
+
+def _forget_scheduler(scheduler: TelegramSendScheduler) -> None:
+    for key, current in list(_SCHEDULERS.items()):
+        if current is scheduler:
+            _SCHEDULERS.pop(key, None)
+
+
+def get_send_scheduler(
+    identity: str,
+    *,
+    key_prefix: str,
+    sender: OutboxSender,
+    retry_after_of: RetryAfterResolver,
+) -> TelegramSendScheduler:
+    loop = asyncio.get_running_loop()
+    key = (id(loop), f"{key_prefix}:{identity}")
+    scheduler = _SCHEDULERS.get(key)
+    if scheduler is None:
+        scheduler = TelegramSendScheduler(
+            identity,
+            key_prefix=key_prefix,
+            sender=sender,
+            retry_after_of=retry_after_of,
+        )
+        _SCHEDULERS[key] = scheduler
+    return scheduler
+
+
+async def start_send_schedulers(
+    *,
+    key_prefix: str,
+    sender: OutboxSender,
+    retry_after_of: RetryAfterResolver,
+) -> int:
+    """Start drainers for every bot with a non-empty outbox (after restart or a peer crash)."""
+    identities = await redis_ops.smembers(f"{key_prefix}:idx")
+    for identity in identities or []:
+        get_send_scheduler(
+            str(identity),
+            key_prefix=key_prefix,
+            sender=sender,
+            retry_after_of=retry_after_of,
+        ).start()
+    return len(identities or [])
+
+
+async def stop_send_schedulers() -> None:
+    for scheduler in list(_SCHEDULERS.values()):
+        await scheduler.stop()
+    _SCHEDULERS.clear()
+
+
+__all__ = [
+    "OutboxJob",
+    "TelegramSendScheduler",
+    "get_send_scheduler",
+    "start_send_schedulers",
+    "stop_send_schedulers",
+]
@@ -1,21 +1,32 @@
 from __future__ import annotations
 
 import asyncio
+from dataclasses import dataclass
 from decimal import Decimal
-from io import BytesIO
-from typing import List, Optional
+from tempfile import SpooledTemporaryFile
+from typing import Any, AsyncGenerator, Iterator, List, Optional
 
-from aiogram import types
-from aiogram.types import BufferedInputFile
+from aiogram import Bot, types
+from aiogram.types.input_file import InputFile
 
+from config.settings import settings
 from core.api.regos_api import RegosAPI
-from schemas.api.references.item import ItemExt, ItemGetExtRequest
+from core.api.response import LazyModelList
+from schemas.api.references.item import ItemGetExtRequest
 from schemas.api.references.stock import StockGetRequest
 
 
 MAX_PAGES_PER_STOCK = 10
 DEFAULT_ITEM_GETEXT_PAGE_LIMIT = 10_000
 
+REPORT_HEADERS = [
+    "Код товара",
+    "Наименование",
+    "Артикул",
+    "Остаток",
+    "Минимальный остаток",
+]
+
 
 def _safe_decimal(v) -> Decimal:
     try:
@@ -26,42 +37,110 @@ def _safe_decimal(v) -> Decimal:
         return Decimal(0)
 
 
-def _should_include(item_ext: ItemExt) -> bool:
-    min_qty = item_ext.item.min_quantity
+def _field(obj: Any, name: str) -> Any:
+    # строка страницы — сырой dict (ленивый ответ) или уже провалидированная модель
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _report_row(item_ext: Any) -> Optional[List[object]]:
+    """Строка отчёта, если остаток ниже минимального, иначе None."""
+    item = _field(item_ext, "item")
+    min_qty = _field(item, "min_quantity")
     if min_qty is None:
-        return False
+        return None
 
     try:
         min_qty_dec = Decimal(str(min_qty))
     except Exception:
-        return False
-
-    qty = _safe_decimal(
-        getattr(item_ext.quantity, "common", None) if item_ext.quantity else None
-    )
-    return qty < min_qty_dec
-
+        return None
 
-def _item_to_row(item_ext: ItemExt) -> List[object]:
-    qty = _safe_decimal(
-        getattr(item_ext.quantity, "common", None) if item_ext.quantity else None
-    )
+    qty = _safe_decimal(_field(_field(item_ext, "quantity"), "common"))
+    if qty >= min_qty_dec:
+        return None
     return [
-        item_ext.item.code,
-        item_ext.item.name,
-        item_ext.item.articul,
+        _field(item, "code"),
+        _field(item, "name"),
+        _field(item, "articul"),
         float(qty),
-        item_ext.item.min_quantity,
+        min_qty,
     ]
 
 
-async def _fetch_all_items_for_stock(
+def _page_entries(result: Any) -> Iterator[Any]:
+    # Ленивая страница: фильтруем по сырым dict, без валидации 10k моделей ItemExt
+    if isinstance(result, LazyModelList):
+        for index in range(len(result)):
+            yield result.raw(index)
+        return
+    yield from result or []
+
+
+class _XlsxReportWriter:
+    """openpyxl write-only книга, которая пишется в SpooledTemporaryFile."""
+
+    def __init__(self, sheet_title: str):
+        from openpyxl import Workbook
+
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(title=sheet_title[:31])  # лимит Excel
+        self._sheet.append(REPORT_HEADERS)
+        self.rows = 0
+
+    def append_rows(self, rows: List[List[object]]) -> None:
+        for row in rows:
+            self._sheet.append(row)
+        self.rows += len(rows)
+
+    def save(self) -> SpooledTemporaryFile:
+        spool_bytes = max(int(settings.telegram_min_quantity_report_spool_mb or 0), 1) * 1024 * 1024
+        output = SpooledTemporaryFile(max_size=spool_bytes, suffix=".xlsx")
+        try:
+            self._workbook.save(output)
+        except Exception:
+            output.close()
+            raise
+        output.seek(0)
+        return output
+
+
+class SpooledInputFile(InputFile):
+    """Отправка отчёта из временного файла кусками, без чтения целиком в память."""
+
+    def __init__(self, file: SpooledTemporaryFile, filename: str):
+        super().__init__(filename=filename)
+        self._file = file
+
+    async def read(self, bot: Bot) -> AsyncGenerator[bytes, None]:
+        self._file.seek(0)
+        while chunk := await asyncio.to_thread(self._file.read, self.chunk_size):
+            yield chunk
+
+
+@dataclass
+class _StockReport:
+    stock_name: str
+    rows: int
+    file: Optional[SpooledTemporaryFile]
+
+
+async def _build_stock_report(
     *, connected_integration_id: str, stock_id: int, search: Optional[str] = None
-) -> List[ItemExt]:
-    items: List[ItemExt] = []
+) -> _StockReport:
+    stock_name = await _get_stock_name(
+        connected_integration_id=connected_integration_id,
+        stock_id=stock_id,
+    )
+    writer: Optional[_XlsxReportWriter] = None
     offset: Optional[int] = None
 
-    async with RegosAPI(connected_integration_id=connected_integration_id) as api:
+    async with RegosAPI(
+        connected_integration_id=connected_integration_id,
+        lazy_results=True,
+    ) as api:
         for _ in range(MAX_PAGES_PER_STOCK):
             req = ItemGetExtRequest(
                 stock_id=stock_id,
@@ -74,15 +153,22 @@ async def _fetch_all_items_for_stock(
             if not getattr(resp, "ok", False):
                 raise RuntimeError("REGOS API returned ok=false for Item/GetExt")
 
-            page_items = resp.result or []
-            items.extend(page_items)
-
+            # страница фильтруется и сразу уходит в книгу — в памяти не копится
+            rows = [row for row in map(_report_row, _page_entries(resp.result)) if row is not None]
             next_offset = getattr(resp, "next_offset", None)
+            del resp
+            if rows:
+                if writer is None:
+                    writer = await asyncio.to_thread(_XlsxReportWriter, stock_name)
+                await asyncio.to_thread(writer.append_rows, rows)
+
             if not next_offset:
                 break
             offset = next_offset
 
-    return items
+    if writer is None:
+        return _StockReport(stock_name=stock_name, rows=0, file=None)
+    return _StockReport(stock_name=stock_name, rows=writer.rows, file=await asyncio.to_thread(writer.save))
 
 
 async def _get_stock_name(
@@ -118,30 +204,6 @@ def _safe_filename(name: str) -> str:
     )
 
 
-def _build_excel_bytes(*, stock_name: str, rows: List[List[object]]) -> bytes:
-    from openpyxl import Workbook
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = stock_name[:31]  # лимит Excel
-
-    headers = [
-        "Код товара",
-        "Наименование",
-        "Артикул",
-        "Остаток",
-        "Минимальный остаток",
-    ]
-
-    ws.append(headers)
-    for row in rows:
-        ws.append(row)
-
-    bio = BytesIO()
-    wb.save(bio)
-    return bio.getvalue()
-
-
 async def handle_get_quantity(
     *,
     integration,
@@ -159,39 +221,39 @@ async def handle_get_quantity(
 
     await message.answer("Формируем отчет по минимальным остаткам…")
 
-    for stock_id in stock_ids:
-        stock_name = await _get_stock_name(
-            connected_integration_id=str(integration.connected_integration_id),
-            stock_id=int(stock_id),
-        )
-
-        all_items = await _fetch_all_items_for_stock(
-            connected_integration_id=str(integration.connected_integration_id),
-            stock_id=int(stock_id),
-            search=search,
-        )
+    # склады собираются параллельно (с ограничением), отправляются по порядку
+    semaphore = asyncio.Semaphore(max(int(settings.telegram_min_quantity_report_concurrency or 0), 1))
 
-        rows: List[List[object]] = [
-            _item_to_row(item)
-            for item in all_items
-            if _should_include(item)
-        ]
-
-        if not rows:
-            await message.answer(
-                f"На складе {stock_name} нет товаров ниже минимального остатка."
+    async def build(stock_id: int) -> _StockReport:
+        async with semaphore:
+            return await _build_stock_report(
+                connected_integration_id=str(integration.connected_integration_id),
+                stock_id=int(stock_id),
+                search=search,
             )
-            continue
 
-        xlsx_bytes = await asyncio.to_thread(
-            _build_excel_bytes,
-            stock_name=stock_name,
-            rows=rows,
-        )
-
-        filename = f"Минимальные_остатки_{_safe_filename(stock_name)}.xlsx"
-
-        await message.answer_document(
-            document=BufferedInputFile(xlsx_bytes, filename=filename),
-            caption=f"Отчет по товарам с остатком ниже минимального\nСклад: {stock_name}",
-        )
+    tasks = [asyncio.create_task(build(stock_id)) for stock_id in stock_ids]
+    try:
+        for task in tasks:
+            report = await task
+            if report.file is None:
+                await message.answer(
+                    f"На складе {report.stock_name} нет товаров ниже минимального остатка."
+                )
+                continue
+
+            filename = f"Минимальные_остатки_{_safe_filename(report.stock_name)}.xlsx"
+            try:
+                await message.answer_document(
+                    document=SpooledInputFile(report.file, filename=filename),
+                    caption=f"Отчет по товарам с остатком ниже минимального\nСклад: {report.stock_name}",
+                )
+            finally:
+                report.file.close()
+    finally:
+        for task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, _StockReport) and result.file is not None:
+                result.file.close()
@@ -3,6 +3,7 @@
 import asyncio
 import base64
 import html
+import functools
 import hashlib
 import json
 import os
@@ -25,6 +26,7 @@ from aiogram.types import (
 from starlette.responses import JSONResponse
 
 from clients.base import ClientBase
+from clients.telegram_polling import PollingTarget, telegram_polling_supervisor
 from config.settings import settings as app_settings
 from core.api.regos_api import RegosAPI
 from core.logger import setup_logger
@@ -119,7 +121,6 @@ class TelegramBusinessCrmChannelConfig:
     STREAM_MAX_RETRIES = 5
     SEND_CONCURRENCY = max(int(app_settings.telegram_business_crm_channel_send_concurrency or 0), 1)
 
-    POLLING_LOCK_TTL_SEC = 30
     LEAD_SYNC_AVATAR_RECHECK_SEC = 6 * 60 * 60
     MAX_TELEGRAM_PHOTO_SIZE_BYTES = 10 * 1024 * 1024
     MAX_TELEGRAM_FILE_SIZE_BYTES = 50 * 1024 * 1024
@@ -204,7 +205,7 @@ class ChannelMessageSettings:
 
 _MANAGER_LOCK = asyncio.Lock()
 _WORKER_TASKS: Dict[Tuple[str, int], asyncio.Task] = {}
-_POLLER_TASKS: Dict[Tuple[str, str], asyncio.Task] = {}
+_POLLER_TARGETS: Dict[Tuple[str, str], PollingTarget] = {}
 _BOT_CLIENTS: Dict[str, Bot] = {}
 _BOT_CLIENTS_LOCK = asyncio.Lock()
 _HTTP_CLIENT: Optional[httpx.AsyncClient] = None
@@ -1456,10 +1457,8 @@ class TelegramBusinessCrmChannelIntegration(IntegrationTelegramBase, ClientBase)
         )
 
     @staticmethod
-    def _lock_polling_owner_key(bot_hash: str) -> str:
-        return TelegramBusinessCrmChannelIntegration._redis_key(
-            "lock", "polling_owner", bot_hash
-        )
+    def _polling_target_key(bot_hash: str) -> str:
+        return TelegramBusinessCrmChannelIntegration._redis_key("polling", bot_hash)
 
     @staticmethod
     def _typing_key(connected_integration_id: str, bot_hash: str, tg_chat_id: str) -> str:
@@ -2284,10 +2283,10 @@ class TelegramBusinessCrmChannelIntegration(IntegrationTelegramBase, ClientBase)
         async with _MANAGER_LOCK:
             worker_tasks = list(_WORKER_TASKS.values())
             _WORKER_TASKS.clear()
-            poller_tasks = list(_POLLER_TASKS.values())
-            _POLLER_TASKS.clear()
+            poller_targets = list(_POLLER_TARGETS.values())
+            _POLLER_TARGETS.clear()
 
-        for task in worker_tasks + poller_tasks:
+        for task in worker_tasks:
             task.cancel()
             try:
                 await task
@@ -2296,6 +2295,12 @@ class TelegramBusinessCrmChannelIntegration(IntegrationTelegramBase, ClientBase)
             except Exception:
                 logger.exception("Error while stopping Telegram background task")
 
+        for target in poller_targets:
+            try:
+                await telegram_polling_supervisor.unregister(target.key, target)
+            except Exception:
+                logger.exception("Error while stopping Telegram poller")
+
         async with _BOT_CLIENTS_LOCK:
             bots = list(_BOT_CLIENTS.values())
             _BOT_CLIENTS.clear()
@@ -2527,13 +2532,30 @@ class TelegramBusinessCrmChannelIntegration(IntegrationTelegramBase, ClientBase)
     ) -> None:
         key = (connected_integration_id, bot_config.bot_hash)
         async with _MANAGER_LOCK:
-            task = _POLLER_TASKS.get(key)
-            if task and not task.done():
+            target = _POLLER_TARGETS.get(key)
+            if (
+                target is not None
+                and target.token == bot_config.token
+                and telegram_polling_supervisor.is_registered(target.key, target)
+            ):
                 return
-            _POLLER_TASKS[key] = asyncio.create_task(
-                cls._polling_loop(connected_integration_id, bot_config),
-                name=f"tgb_crm_poll_{connected_integration_id}_{bot_config.bot_hash}",
+            # getUpdates, аренда бота между процессами и offset — на супервизоре
+            target = PollingTarget(
+                key=cls._polling_target_key(bot_config.bot_hash),
+                token=bot_config.token,
+                handler=functools.partial(
+                    cls._enqueue_polled_updates, connected_integration_id, bot_config.bot_hash
+                ),
+                allowed_updates=TelegramBusinessCrmChannelConfig.ALLOWED_UPDATES,
+                keepalive=functools.partial(cls._polling_keepalive, connected_integration_id),
             )
+            _POLLER_TARGETS[key] = target
+            await telegram_polling_supervisor.register(target)
+        logger.info(
+            "Longpolling registered for bot_hash=%s ci=%s",
+            bot_config.bot_hash,
+            connected_integration_id,
+        )
 
     @classmethod
     async def _stop_pollers_for_ci(
@@ -2543,16 +2565,13 @@ class TelegramBusinessCrmChannelIntegration(IntegrationTelegramBase, ClientBase)
         async with _MANAGER_LOCK:
             keys = [
                 key
-                for key in _POLLER_TASKS
+                for key in _POLLER_TARGETS
                 if key[0] == connected_integration_id and key[1] not in keep_hashes
             ]
-            tasks = [_POLLER_TASKS.pop(key) for key in keys]
-        for task in tasks:
-            task.cancel()
+            targets = [_POLLER_TARGETS.pop(key) for key in keys]
+        for target in targets:
             try:
-                await task
-            except asyncio.CancelledError:
-                pass
+                await telegram_polling_supervisor.unregister(target.key, target)
             except Exception:
                 logger.exception("Error while stopping poller")
 
@@ -4699,109 +4718,36 @@ class TelegramBusinessCrmChannelIntegration(IntegrationTelegramBase, ClientBase)
                 await cls._release_lock(lock_key, lock_token)
 
     @classmethod
-    async def _polling_loop(
-        cls, connected_integration_id: str, bot_config: BotSlotConfig
+    async def _enqueue_polled_updates(
+        cls, connected_integration_id: str, bot_hash: str, updates: List[Dict[str, Any]]
     ) -> None:
-        bot = await cls._get_bot(bot_config.token)
-        offset: Optional[int] = None
-        lock_key = cls._lock_polling_owner_key(bot_config.bot_hash)
-        # Owner must be unique per CI+bot within a process.
-        # Using only instance id lets multiple pollers in one process treat the lock as "mine".
-        owner = f"{_INSTANCE_ID}:{connected_integration_id}:{bot_config.bot_hash}"
+        stream_key = cls._stream_key("telegram_in", connected_integration_id)
+        for update in updates:
+            await cls._enqueue(
+                stream_key,
+                {
+                    "connected_integration_id": connected_integration_id,
+                    "bot_hash": bot_hash,
+                    "payload": update,
+                    "attempt": "0",
+                    "enqueued_at": str(_now_ts()),
+                },
+            )
+
+    @classmethod
+    async def _polling_keepalive(cls, connected_integration_id: str) -> bool:
+        if await cls._is_connected_integration_active(connected_integration_id):
+            return True
         logger.info(
-            "Longpolling worker started for bot_hash=%s ci=%s",
-            bot_config.bot_hash,
+            "Longpolling stopped for inactive or not ready integration: ci=%s",
             connected_integration_id,
         )
-        last_active_check = 0.0
-
-        try:
-            while True:
-                try:
-                    now = time.monotonic()
-                    if (
-                        now - last_active_check
-                        >= TelegramBusinessCrmChannelConfig.POLLING_LOCK_TTL_SEC
-                    ):
-                        if not await cls._is_connected_integration_active(
-                            connected_integration_id
-                        ):
-                            raise ConnectedIntegrationInactiveError(
-                                f"ConnectedIntegration {connected_integration_id} is inactive"
-                            )
-                        last_active_check = now
-                    acquired = await redis_ops.set(
-                        lock_key,
-                        owner,
-                        ex=TelegramBusinessCrmChannelConfig.POLLING_LOCK_TTL_SEC,
-                        nx=True,
-                    )
-                    if not acquired:
-                        current_owner = await redis_ops.get(lock_key)
-                        if current_owner == owner:
-                            await redis_ops.expire(
-                                lock_key, TelegramBusinessCrmChannelConfig.POLLING_LOCK_TTL_SEC
-                            )
-                            acquired = True
-
-                    if not acquired:
-                        await asyncio.sleep(1.5)
-                        continue
-
-                    updates = await bot.get_updates(
-                        offset=offset,
-                        timeout=20,
-                        allowed_updates=TelegramBusinessCrmChannelConfig.ALLOWED_UPDATES,
-                    )
-                    if not updates:
-                        await asyncio.sleep(0.1)
-                        continue
-
-                    for update in updates:
-                        offset = int(update.update_id) + 1
-                        await cls._enqueue(
-                            cls._stream_key("telegram_in", connected_integration_id),
-                            {
-                                "connected_integration_id": connected_integration_id,
-                                "bot_hash": bot_config.bot_hash,
-                                "payload": _to_jsonable(
-                                    update.model_dump(
-                                        mode="python",
-                                        by_alias=True,
-                                        exclude_none=True,
-                                    )
-                                ),
-                                "attempt": "0",
-                                "enqueued_at": str(_now_ts()),
-                            },
-                        )
-                except asyncio.CancelledError:
-                    raise
-                except ConnectedIntegrationInactiveError as error:
-                    logger.info(
-                        "Longpolling worker stopped for inactive or not ready integration: bot_hash=%s ci=%s reason=%s",
-                        bot_config.bot_hash,
-                        connected_integration_id,
-                        error,
-                    )
-                    if _redis_enabled():
-                        await redis_ops.srem(
-                            cls._active_ci_ids_key(),
-                            connected_integration_id,
-                        )
-                    break
-                except Exception as error:
-                    logger.warning(
-                        "Polling loop transient error for bot_hash=%s ci=%s: %s",
-                        bot_config.bot_hash,
-                        connected_integration_id,
-                        error,
-                    )
-                    await asyncio.sleep(1.5)
-        except asyncio.CancelledError:
-            raise
-        finally:
-            await cls._release_lock(lock_key, owner)
+        if _redis_enabled():
+            await redis_ops.srem(cls._active_ci_ids_key(), connected_integration_id)
+        async with _MANAGER_LOCK:
+            for key in [key for key in _POLLER_TARGETS if key[0] == connected_integration_id]:
+                _POLLER_TARGETS.pop(key, None)
+        return False
 
     @classmethod
     async def _process_telegram_event(
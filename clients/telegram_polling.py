@@ -1,65 +1,614 @@
 import asyncio
-from dataclasses import dataclass
-from typing import Dict, Optional
+import functools
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 
+import httpx
 from aiogram import Bot, Dispatcher
 
+from config.settings import settings
 from core.logger import setup_logger
+from core.redis import redis_is_enabled, redis_ops
+from core.telegram_api import telegram_api_base_url
 
 logger = setup_logger("telegram_polling")
 
+UpdatesHandler = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+KeepaliveCheck = Callable[[], Awaitable[bool]]
 
-@dataclass
+
+class TelegramPollingConfig:
+    KEY_PREFIX = "tgpoll"
+    LEASE_TICK_SEC = 10.0
+    LEASE_TTL_SEC = 30
+    PROCESS_TTL_SEC = 30
+    OFFSET_TTL_SEC = 24 * 60 * 60
+    KEEPALIVE_INTERVAL_SEC = 30.0
+    LONG_POLL_TIMEOUT_SEC = 25
+    RETRY_DELAY_SEC = 1.5
+    RETRY_MAX_DELAY_SEC = 30.0
+    CONFLICT_DELAY_SEC = 30.0
+    UNAUTHORIZED_DELAY_SEC = 300.0
+
+
+# Один вызов на тик процесса: heartbeat, справедливая доля, продление/захват/сдача
+# аренд и сохранение offset. KEYS: процессы (zset), боты (zset), затем тройки
+# (lease, offset, registrants) на бота. ARGV: owner, now_ms, process_ttl_ms,
+# lease_ttl_ms, offset_ttl_sec, затем тройки (key, force, offset) — в порядке
+# от активных к простаивающим. registrants — живые процессы, зарегистрировавшие
+# бота: в долю и сдачу идут только боты, которых может взять кто-то ещё.
+# Ответ: пары (status, offset) на ключ и в конце share, live.
+# status: 1 — аренда наша, 0 — свободна, -1 — у другого процесса, 2 — сдана.
+_LEASE_TICK_LUA = """
+local owner = ARGV[1]
+local now = tonumber(ARGV[2])
+local process_ttl = tonumber(ARGV[3])
+local lease_ttl = tonumber(ARGV[4])
+local offset_ttl = tonumber(ARGV[5])
+local n = (#ARGV - 5) / 3
+
+redis.call('ZADD', KEYS[1], now, owner)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - process_ttl)
+redis.call('PEXPIRE', KEYS[1], process_ttl * 4)
+local shared = {}
+for i = 0, n - 1 do
+  redis.call('ZADD', KEYS[2], now, ARGV[6 + i * 3])
+  local registrants_key = KEYS[5 + i * 3]
+  redis.call('ZADD', registrants_key, now, owner)
+  redis.call('ZREMRANGEBYSCORE', registrants_key, '-inf', now - process_ttl)
+  redis.call('PEXPIRE', registrants_key, process_ttl * 4)
+  shared[i] = redis.call('ZCARD', registrants_key) > 1
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now - process_ttl)
+redis.call('PEXPIRE', KEYS[2], process_ttl * 4)
+
+local live = math.max(redis.call('ZCARD', KEYS[1]), 1)
+local share = math.ceil(redis.call('ZCARD', KEYS[2]) / live)
+
+local status = {}
+local held = 0
+for i = 0, n - 1 do
+  local current = redis.call('GET', KEYS[3 + i * 3])
+  if current == owner then
+    if shared[i] then
+      held = held + 1
+    end
+    if shared[i] and held > share then
+      status[i] = 2
+    else
+      status[i] = 1
+    end
+  elseif current then
+    status[i] = -1
+  else
+    status[i] = 0
+  end
+end
+
+held = math.min(held, share)
+
+local result = {}
+for i = 0, n - 1 do
+  local lease_key = KEYS[3 + i * 3]
+  local offset_key = KEYS[4 + i * 3]
+  local offset = tonumber(ARGV[8 + i * 3])
+  local s = status[i]
+  if s == 0 and (not shared[i] or held < share or ARGV[7 + i * 3] == '1') then
+    if redis.call('SET', lease_key, owner, 'NX', 'PX', lease_ttl) then
+      if shared[i] then
+        held = held + 1
+      end
+      s = 1
+    else
+      s = -1
+    end
+  elseif s == 1 then
+    redis.call('PEXPIRE', lease_key, lease_ttl)
+  end
+  if (s == 1 or s == 2) and offset > 0 then
+    redis.call('SET', offset_key, offset, 'EX', offset_ttl)
+  end
+  if s == 2 then
+    redis.call('DEL', lease_key)
+  end
+  local stored = 0
+  if s == 1 then
+    stored = tonumber(redis.call('GET', offset_key) or '0')
+  end
+  result[#result + 1] = s
+  result[#result + 1] = stored
+end
+result[#result + 1] = share
+result[#result + 1] = live
+return result
+"""
+
+_LEASE_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  if tonumber(ARGV[2]) > 0 then
+    redis.call('SET', KEYS[2], ARGV[2], 'EX', tonumber(ARGV[3]))
+  end
+  redis.call('DEL', KEYS[1])
+end
+redis.call('ZREM', KEYS[3], ARGV[4])
+redis.call('ZREM', KEYS[4], ARGV[1])
+return 1
+"""
+
+
+@dataclass(eq=False)
+class PollingTarget:
+    """
+    Бот, которого опрашивает супервизор.
+
+    `key` — глобальная идентичность бота (по ней аренда и offset в Redis),
+    `handler` получает пачку сырых update (dict из getUpdates); offset
+    подтверждается только после успешного возврата handler.
+    `keepalive` (опционально) вызывается владельцем аренды раз в
+    KEEPALIVE_INTERVAL_SEC; False — бот снимается с опроса.
+    """
+
+    key: str
+    token: str
+    handler: UpdatesHandler
+    allowed_updates: Optional[List[str]] = None
+    keepalive: Optional[KeepaliveCheck] = None
+
+
+@dataclass(eq=False)
+class _BotState:
+    target: PollingTarget
+    offset: int = 0
+    offset_dirty: bool = False
+    held: bool = False
+    free_ticks: int = 0
+    last_activity: float = field(default_factory=time.monotonic)
+    next_poll_at: float = 0.0
+    failures: int = 0
+    last_keepalive: float = field(default_factory=time.monotonic)
+    task: Optional[asyncio.Task] = None
+    long_poll: bool = False
+
+
+class TelegramPollingSupervisor:
+    """
+    Long polling всех ботов процесса одним супервизором.
+
+    - Боты распределяются между процессами через аренды в Redis: процесс
+      держит не больше справедливой доли (боты / живые процессы) из ботов,
+      зарегистрированных и в других процессах, лишние сдаёт, осиротевшие
+      подбирает. Бота, которого зарегистрировал только этот процесс, он
+      держит всегда. Продление всех аренд — один Lua-вызов
+      на тик, а не SET/EXPIRE на каждого бота.
+    - Все getUpdates идут через один httpx-пул.
+    - Активные боты (update за последние telegram_polling_hot_window_sec)
+      держат long poll на LONG_POLL_TIMEOUT_SEC (~2.4 getUpdates в минуту,
+      не больше telegram_polling_max_long_polls одновременно). Простаивающие
+      держат long poll на telegram_polling_idle_poll_timeout_sec (50 с —
+      ~1.2 getUpdates в минуту на бота, update приходит сразу), одновременно
+      не больше telegram_polling_max_idle_polls; остальные ждут свободного
+      слота, и запросов становится ещё меньше.
+    Без Redis процесс опрашивает всех своих ботов сам.
+    """
+
+    def __init__(self) -> None:
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._states: Dict[str, _BotState] = {}
+        self._runner: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._idle_slots: Optional[asyncio.Semaphore] = None
+        self._tick_script: Any = None
+        self._release_script: Any = None
+        self._next_lease_tick = 0.0
+        self._background: Set[asyncio.Task] = set()
+
+    # ---------- регистрация ----------
+
+    async def register(self, target: PollingTarget) -> None:
+        previous = self._states.get(target.key)
+        if previous is not None and previous.target is target:
+            return
+        state = _BotState(target=target)
+        if previous is not None:
+            # тот же бот, новый обработчик/токен: offset и аренду сохраняем
+            await self._cancel_poll(previous)
+            state.offset = previous.offset
+            state.offset_dirty = previous.offset_dirty
+            state.held = previous.held
+        self._states[target.key] = state
+        self._ensure_running()
+        self._next_lease_tick = 0.0
+        self._wake.set()
+
+    async def unregister(self, key: str, target: Optional[PollingTarget] = None) -> None:
+        """Снять бота; с `target` — только если зарегистрирован именно он."""
+        state = self._states.get(key)
+        if state is None or (target is not None and state.target is not target):
+            return
+        self._states.pop(key, None)
+        await self._cancel_poll(state)
+        await self._release(state)
+
+    def is_registered(self, key: str, target: Optional[PollingTarget] = None) -> bool:
+        state = self._states.get(key)
+        return state is not None and (target is None or state.target is target)
+
+    def is_polling(self, key: str) -> bool:
+        state = self._states.get(key)
+        return bool(state and state.held)
+
+    async def stop(self) -> None:
+        runner, self._runner = self._runner, None
+        if runner is not None:
+            runner.cancel()
+            try:
+                await runner
+            except asyncio.CancelledError:
+                pass
+        states = list(self._states.values())
+        self._states.clear()
+        for state in states:
+            await self._cancel_poll(state)
+            await self._release(state)
+        if redis_is_enabled():
+            try:
+                await redis_ops.eval(
+                    "return redis.call('ZREM', KEYS[1], ARGV[1])", 1, self._processes_key(), self._owner
+                )
+            except Exception as error:
+                logger.warning("Polling supervisor deregistration failed: %s", error)
+        http, self._http = self._http, None
+        if http is not None:
+            await http.aclose()
+
+    # ---------- цикл ----------
+
+    def _ensure_running(self) -> None:
+        if self._runner is not None and not self._runner.done():
+            return
+        self._wake = asyncio.Event()
+        self._idle_slots = asyncio.Semaphore(self._max_idle_polls())
+        self._runner = asyncio.create_task(self._run(), name="telegram_polling_supervisor")
+
+    async def _run(self) -> None:
+        logger.info("Telegram polling supervisor started: owner=%s", self._owner)
+        while True:
+            try:
+                now = time.monotonic()
+                if now >= self._next_lease_tick:
+                    await self._lease_tick()
+                    self._next_lease_tick = time.monotonic() + TelegramPollingConfig.LEASE_TICK_SEC
+                    self._run_keepalives()
+                next_at = self._dispatch()
+                if not self._states:
+                    logger.info("Telegram polling supervisor idle, stopping")
+                    return
+                delay = max(min(next_at, self._next_lease_tick) - time.monotonic(), 0.05)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning("Telegram polling supervisor error: %s", error)
+                self._next_lease_tick = time.monotonic() + TelegramPollingConfig.RETRY_DELAY_SEC
+                await asyncio.sleep(TelegramPollingConfig.RETRY_DELAY_SEC)
+
+    def _dispatch(self) -> float:
+        """Запустить опросы, которым пора; вернуть время ближайшего следующего."""
+        now = time.monotonic()
+        hot_window = max(float(settings.telegram_polling_hot_window_sec or 0), 0.0)
+        long_slots = max(int(settings.telegram_polling_max_long_polls or 0), 0)
+        long_polls = sum(1 for state in self._states.values() if state.task is not None and state.long_poll)
+        next_at = now + TelegramPollingConfig.LEASE_TICK_SEC
+
+        # сначала самые недавно активные — им достаются слоты long poll
+        ordered = sorted(self._states.values(), key=lambda state: state.last_activity, reverse=True)
+        for state in ordered:
+            if not state.held or state.task is not None:
+                continue
+            if state.next_poll_at > now:
+                next_at = min(next_at, state.next_poll_at)
+                continue
+            long_poll = now - state.last_activity < hot_window and long_polls < long_slots
+            if long_poll:
+                long_polls += 1
+            state.long_poll = long_poll
+            state.task = asyncio.create_task(self._poll(state, long_poll))
+        return next_at
+
+    @staticmethod
+    def _max_idle_polls() -> int:
+        return max(int(settings.telegram_polling_max_idle_polls or 0), 1)
+
+    @staticmethod
+    def _idle_poll_timeout() -> int:
+        # не короче long poll активных ботов: простой не должен стоить больше запросов
+        return max(int(settings.telegram_polling_idle_poll_timeout_sec or 0), TelegramPollingConfig.LONG_POLL_TIMEOUT_SEC)
+
+    async def _poll(self, state: _BotState, long_poll: bool) -> None:
+        target = state.target
+        try:
+            if long_poll:
+                updates = await self._get_updates(state, TelegramPollingConfig.LONG_POLL_TIMEOUT_SEC)
+            else:
+                async with self._idle_slots:
+                    updates = await self._get_updates(state, self._idle_poll_timeout())
+            if updates:
+                await target.handler(updates)
+                state.offset = max(int(update.get("update_id") or 0) for update in updates) + 1
+                state.offset_dirty = True
+                state.last_activity = time.monotonic()
+            state.failures = 0
+            state.next_poll_at = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except _PollingPause as pause:
+            state.next_poll_at = time.monotonic() + pause.delay
+        except Exception as error:
+            state.failures += 1
+            delay = min(
+                TelegramPollingConfig.RETRY_DELAY_SEC * (2 ** (state.failures - 1)),
+                TelegramPollingConfig.RETRY_MAX_DELAY_SEC,
+            )
+            logger.warning("Polling error for key=%s: %s (retry in %.1fs)", target.key, error, delay)
+            state.next_poll_at = time.monotonic() + delay
+        finally:
+            state.task = None
+            if self._wake is not None:
+                self._wake.set()
+
+    async def _get_updates(self, state: _BotState, timeout: int) -> List[Dict[str, Any]]:
+        target = state.target
+        payload: Dict[str, Any] = {"timeout": timeout}
+        if state.offset:
+            payload["offset"] = state.offset
+        if target.allowed_updates is not None:
+            payload["allowed_updates"] = target.allowed_updates
+        response = await self._client().post(
+            f"{telegram_api_base_url()}/bot{target.token}/getUpdates",
+            json=payload,
+            timeout=httpx.Timeout(timeout + 15.0, connect=10.0),
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise
+        if body.get("ok"):
+            return [update for update in body.get("result") or [] if isinstance(update, dict)]
+
+        code = int(body.get("error_code") or response.status_code)
+        description = body.get("description")
+        if code == 409:
+            # установлен webhook или бота опрашивает кто-то вне супервизора
+            logger.warning("getUpdates conflict for key=%s: %s", target.key, description)
+            raise _PollingPause(TelegramPollingConfig.CONFLICT_DELAY_SEC)
+        if code in (401, 404):
+            logger.warning("getUpdates rejected token for key=%s: %s", target.key, description)
+            raise _PollingPause(TelegramPollingConfig.UNAUTHORIZED_DELAY_SEC)
+        if code == 429:
+            retry_after = (body.get("parameters") or {}).get("retry_after")
+            raise _PollingPause(float(retry_after or TelegramPollingConfig.RETRY_DELAY_SEC))
+        raise RuntimeError(f"getUpdates failed: {code} {description}")
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            # long poll держит соединение: пул на все слоты активных и простаивающих ботов
+            connections = max(int(settings.telegram_polling_max_long_polls or 0), 0) + self._max_idle_polls()
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+            )
+        return self._http
+
+    # ---------- аренды ----------
+
+    @classmethod
+    def _processes_key(cls) -> str:
+        return f"{TelegramPollingConfig.KEY_PREFIX}:procs"
+
+    @classmethod
+    def _bots_key(cls) -> str:
+        return f"{TelegramPollingConfig.KEY_PREFIX}:bots"
+
+    @classmethod
+    def _lease_key(cls, key: str) -> str:
+        return f"{TelegramPollingConfig.KEY_PREFIX}:lease:{key}"
+
+    @classmethod
+    def _offset_key(cls, key: str) -> str:
+        return f"{TelegramPollingConfig.KEY_PREFIX}:offset:{key}"
+
+    @classmethod
+    def _registrants_key(cls, key: str) -> str:
+        return f"{TelegramPollingConfig.KEY_PREFIX}:reg:{key}"
+
+    async def _lease_tick(self) -> None:
+        if not redis_is_enabled():
+            for state in self._states.values():
+                state.held = True
+            return
+
+        states = sorted(self._states.values(), key=lambda state: state.last_activity, reverse=True)
+        if not states:
+            return
+        args: List[Any] = [
+            self._owner,
+            int(time.time() * 1000),
+            TelegramPollingConfig.PROCESS_TTL_SEC * 1000,
+            TelegramPollingConfig.LEASE_TTL_SEC * 1000,
+            TelegramPollingConfig.OFFSET_TTL_SEC,
+        ]
+        keys: List[str] = [self._processes_key(), self._bots_key()]
+        for state in states:
+            key = state.target.key
+            # свободная аренда, которую за два тика никто не взял, — берём сверх доли
+            force = "1" if state.free_ticks >= 2 else "0"
+            args.extend([key, force, state.offset if state.offset_dirty else 0])
+            keys.extend([self._lease_key(key), self._offset_key(key), self._registrants_key(key)])
+
+        if self._tick_script is None:
+            self._tick_script = redis_ops.register_script(_LEASE_TICK_LUA)
+        result = await self._tick_script(keys=keys, args=args)
+
+        for index, state in enumerate(states):
+            status, stored_offset = int(result[index * 2]), int(result[index * 2 + 1] or 0)
+            if status in (1, 2):
+                state.offset_dirty = False
+            if status == 1:
+                if not state.held:
+                    # offset предыдущего владельца, чтобы не получить его update повторно
+                    state.offset = max(state.offset, stored_offset)
+                    state.next_poll_at = 0.0
+                    state.last_keepalive = time.monotonic()
+                    logger.debug("Polling lease acquired: key=%s", state.target.key)
+                state.held = True
+                state.free_ticks = 0
+                continue
+            state.free_ticks = state.free_ticks + 1 if status == 0 else 0
+            if state.held:
+                state.held = False
+                logger.debug("Polling lease lost or handed over: key=%s status=%s", state.target.key, status)
+                await self._cancel_poll(state)
+
+    async def _release(self, state: _BotState) -> None:
+        # и без аренды: процесс перестаёт числиться среди зарегистрировавших бота
+        if not redis_is_enabled():
+            return
+        state.held = False
+        key = state.target.key
+        try:
+            if self._release_script is None:
+                self._release_script = redis_ops.register_script(_LEASE_RELEASE_LUA)
+            await self._release_script(
+                keys=[
+                    self._lease_key(key),
+                    self._offset_key(key),
+                    self._bots_key(),
+                    self._registrants_key(key),
+                ],
+                args=[self._owner, state.offset, TelegramPollingConfig.OFFSET_TTL_SEC, key],
+            )
+        except Exception as error:
+            logger.warning("Polling lease release failed for key=%s: %s", key, error)
+
+    async def _cancel_poll(self, state: _BotState) -> None:
+        # прерванный getUpdates ничего не подтверждает: offset сдвигается только после handler
+        task, state.task = state.task, None
+        if task is None or task is asyncio.current_task():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as error:
+            logger.warning("Polling task failed for key=%s: %s", state.target.key, error)
+
+    # ---------- keepalive ----------
+
+    def _run_keepalives(self) -> None:
+        now = time.monotonic()
+        for state in list(self._states.values()):
+            keepalive = state.target.keepalive
+            if keepalive is None or not state.held:
+                continue
+            if now - state.last_keepalive < TelegramPollingConfig.KEEPALIVE_INTERVAL_SEC:
+                continue
+            state.last_keepalive = now
+            task = asyncio.create_task(self._check_keepalive(state))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _check_keepalive(self, state: _BotState) -> None:
+        try:
+            alive = await state.target.keepalive()
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.warning("Polling keepalive failed for key=%s: %s", state.target.key, error)
+            return
+        if not alive:
+            logger.info("Polling stopped by keepalive: key=%s", state.target.key)
+            await self.unregister(state.target.key, state.target)
+
+
+class _PollingPause(Exception):
+    def __init__(self, delay: float) -> None:
+        super().__init__(f"polling paused for {delay:.1f}s")
+        self.delay = max(float(delay), 0.0)
+
+
+telegram_polling_supervisor = TelegramPollingSupervisor()
+
+
+@dataclass(eq=False)
 class _PollingSession:
-    task: asyncio.Task
     bot: Bot
     dispatcher: Dispatcher
+    target: Optional[PollingTarget] = None
+    tasks: Set[asyncio.Task] = field(default_factory=set)
 
 
 class TelegramPollingManager:
-    def __init__(self) -> None:
+    """aiogram-боты поверх супервизора: update уходят в dispatcher.feed_raw_update."""
+
+    def __init__(self, supervisor: TelegramPollingSupervisor) -> None:
+        self._supervisor = supervisor
         self._sessions: Dict[str, _PollingSession] = {}
         self._lock = asyncio.Lock()
 
     async def start(self, key: str, bot: Bot, dispatcher: Dispatcher) -> None:
         await self.stop(key)
-        task = asyncio.create_task(self._run_polling(key, bot, dispatcher))
-        session = _PollingSession(task=task, bot=bot, dispatcher=dispatcher)
+        session = _PollingSession(bot=bot, dispatcher=dispatcher)
+        session.target = PollingTarget(
+            key=f"aiogram:{key}",
+            token=bot.token,
+            handler=functools.partial(self._feed, key, session),
+        )
         async with self._lock:
             self._sessions[key] = session
+        await self._supervisor.register(session.target)
 
     async def stop(self, key: str) -> None:
         session = await self._pop_session(key)
         if not session:
             return
-        session.task.cancel()
-        try:
-            await session.task
-        except asyncio.CancelledError:
-            pass
+        await self._supervisor.unregister(session.target.key, session.target)
+        for task in list(session.tasks):
+            task.cancel()
 
     async def is_running(self, key: str) -> bool:
         async with self._lock:
             session = self._sessions.get(key)
-        return bool(session and not session.task.done())
+        return bool(session and self._supervisor.is_registered(session.target.key, session.target))
 
     async def _pop_session(self, key: str) -> Optional[_PollingSession]:
         async with self._lock:
             return self._sessions.pop(key, None)
 
-    async def _run_polling(self, key: str, bot: Bot, dispatcher: Dispatcher) -> None:
+    async def _feed(self, key: str, session: _PollingSession, updates: List[Dict[str, Any]]) -> None:
+        # как start_polling(handle_as_tasks=True): медленный handler не держит опрос
+        for update in updates:
+            task = asyncio.create_task(self._feed_one(key, session, update))
+            session.tasks.add(task)
+            task.add_done_callback(session.tasks.discard)
+
+    @staticmethod
+    async def _feed_one(key: str, session: _PollingSession, update: Dict[str, Any]) -> None:
         try:
-            await dispatcher.start_polling(bot)
+            await session.dispatcher.feed_raw_update(session.bot, update)
         except asyncio.CancelledError:
             raise
         except Exception as error:
-            logger.exception("Polling error for key=%s: %s", key, error)
-        finally:
-            try:
-                await bot.close()
-            except Exception as error:
-                logger.warning("Failed to close bot for key=%s: %s", key, error)
-            await self._pop_session(key)
+            logger.exception("Polling update handling failed for key=%s: %s", key, error)
 
 
-telegram_polling_manager = TelegramPollingManager()
+telegram_polling_manager = TelegramPollingManager(telegram_polling_supervisor)
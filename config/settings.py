@@ -18,6 +18,18 @@ class Settings(BaseSettings):
     integration_429_base_delay_sec: float = 1.0
     integration_429_max_delay_sec: float = 30.0
     integration_429_cooldown_ttl_sec: int = 120
+    integration_429_reconcile_sec: float = 15.0
+    integration_rate_limit_distributed: bool = True
+    integration_rate_limit_lease_size: int = 3
+    integration_rate_limit_lease_ttl_sec: float = 1.0
+    integration_http_max_connections: int = 100
+    integration_http_max_keepalive: int = 20
+    integration_http_keepalive_expiry_sec: float = 30.0
+    integration_http2: bool = False
+    integration_fast_json: bool = False
+    integration_batch_window_ms: float = 5.0
+    integration_batch_max_size: int = 50
+    integration_singleflight: bool = True
     service_a_token: str = ""
     scheduler_hostname: str = Field(
         default="",
@@ -59,14 +71,21 @@ class Settings(BaseSettings):
     telegram_api_base_url: str = "https://api.telegram.org"
     telegram_webhook_refresh_ttl: int = 86400
     telegram_update_mode: str = "webhook"
+    telegram_polling_max_long_polls: int = 200
+    telegram_polling_hot_window_sec: int = 120
+    telegram_polling_idle_poll_timeout_sec: int = 50
+    telegram_polling_max_idle_polls: int = 200
     telegram_notification_stream_workers: int = 2
     telegram_notification_stream_batch_size: int = 50
     telegram_notification_stream_maxlen: int = 100000
     telegram_notification_send_concurrency: int = 20
     telegram_notification_chat_min_interval_sec: float = 1.0
+    telegram_notification_group_min_interval_sec: float = 3.0
+    telegram_notification_global_rate_per_sec: float = 25.0
     telegram_notification_flood_retry_attempts: int = 3
     telegram_notification_flood_extra_delay_sec: float = 0.5
     telegram_notification_operating_cash_cache_ttl: int = 3600
+    telegram_notification_cash_session_cache_ttl: int = 86400
     telegram_orders_stream_workers: int = 2
     telegram_orders_stream_batch_size: int = 50
     telegram_orders_stream_maxlen: int = 100000
@@ -76,7 +95,10 @@ class Settings(BaseSettings):
     telegram_min_quantity_stream_maxlen: int = 100000
     telegram_min_quantity_stream_retry_limit: int = 3
     telegram_min_quantity_send_concurrency: int = 20
+    telegram_min_quantity_report_concurrency: int = 3
+    telegram_min_quantity_report_spool_mb: int = 8
     telegram_crm_channel_stream_workers: int = 2
+    telegram_crm_channel_stream_lanes: int = 8
     telegram_crm_channel_stream_batch_size: int = 50
     telegram_crm_channel_stream_maxlen: int = 100000
     telegram_crm_channel_send_concurrency: int = 20
@@ -91,6 +113,7 @@ class Settings(BaseSettings):
     asterisk_crm_channel_stream_maxlen: int = 100000
     asterisk_crm_channel_stream_retry_limit: int = 5
     asterisk_crm_channel_event_concurrency: int = 20
+    asterisk_crm_channel_ami_events: str = ""
     external_chat_crm_channel_stream_workers: int = 2
     external_chat_crm_channel_stream_batch_size: int = 50
     external_chat_crm_channel_stream_maxlen: int = 100000
@@ -111,12 +134,20 @@ class Settings(BaseSettings):
     edo_fakturauz_stream_retry_limit: int = 3
     edo_fakturauz_stream_ttl: int = 86400
     edo_fakturauz_token_cache_ttl: int = 240
+    edo_fakturauz_session_ttl: int = 600
     edo_didox_stream_workers: int = 2
     edo_didox_stream_batch_size: int = 20
     edo_didox_stream_maxlen: int = 100000
     edo_didox_stream_retry_limit: int = 3
     edo_didox_stream_ttl: int = 86400
     edo_didox_token_cache_ttl: int = 21000
+    edo_didox_import_concurrency: int = 8
+    edo_didox_session_ttl: int = 600
+    edo_didox_export_batch_size: int = 20
+    edo_didox_sync_concurrency: int = 4
+    email_sender_smtp_max_messages_per_connection: int = 100
+    email_sender_smtp_keepalive_sec: float = 30.0
+    email_sender_smtp_idle_timeout_sec: float = 300.0
     didox_partner_token: str = Field(
         default="",
         validation_alias=AliasChoices("didox_partner_token", "DIDOX_PARTNER_TOKEN"),
@@ -135,6 +166,12 @@ class Settings(BaseSettings):
     marketplace_lock_ttl: int = 30
     marketplace_lock_wait_timeout: float = 5.0
     marketplace_order_dedupe_ttl: int = 86400
+    marketplace_yandex_eats_snapshot_fresh_sec: float = 60.0
+    marketplace_yandex_eats_snapshot_stale_sec: float = 900.0
+    marketplace_yandex_eats_snapshot_build_timeout_sec: int = 120
+    marketplace_yandex_eats_snapshot_memory_mb: int = 128
+    marketplace_uzum_tezkor_document_ttl_sec: float = 60.0
+    marketplace_uzum_tezkor_document_build_timeout_sec: int = 120
     marketplace_toserver_lock_ttl: int = 3600
     marketplace_toserver_stream_workers: int = 1
     marketplace_toserver_stream_batch_size: int = 10
@@ -142,10 +179,16 @@ class Settings(BaseSettings):
     marketplace_toserver_stream_ttl: int = 86400
     marketplace_toserver_disable_schedule_after_auth_errors: int = 3
     marketplace_toserver_auth_error_ttl: int = 3600
+    marketplace_toserver_delta_sync: bool = True
+    marketplace_toserver_full_sync_interval_sec: int = 86400
+    marketplace_toserver_delta_ttl: int = 7 * 86400
+    marketplace_toserver_pipeline_depth: int = 2
+    marketplace_toserver_checkpoint_ttl: int = 6 * 3600
     bank_ipak_yuli_stream_workers: int = 1
     bank_ipak_yuli_stream_batch_size: int = 10
     bank_ipak_yuli_stream_maxlen: int = 10000
     bank_ipak_yuli_stream_ttl: int = 86400
+    bank_ipak_yuli_import_concurrency: int = 8
     instagram_app_id: str = ""
     instagram_app_secret: str = ""
     instagram_redirect_uri: str = ""
@@ -191,6 +234,7 @@ class Settings(BaseSettings):
     oauth_endpoint: str = "https://auth.regos.uz/" # oath/token
     oauth_client_id: str = ""
     oauth_secret: str = ""
+    oauth_refresh_ahead_sec: float = 120.0
 
     @field_validator("debug", mode="before")
     @classmethod
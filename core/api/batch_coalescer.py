@@ -0,0 +1,197 @@
+# core/api/batch_coalescer.py
+"""Склейка независимых вызовов REGOS API в один запрос к эндпоинту `batch`.
+
+Вызовы, пришедшие в пределах окна (или внутри `async with api.batched():`),
+упаковываются в один `batch` (stop_on_error=false) и раздаются обратно своим
+ожидающим future. Каждый шаг разбирается отдельно и с тем же `lazy_results`, что
+и прямой вызов. Шаг с 429/5xx повторяется прямым вызовом (с его ретраями), а
+остальные неуспешные шаги превращаются в то же httpx.HTTPStatusError, которое дал
+бы прямой вызов, поэтому код обработки ошибок у вызывающих не меняется.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Type
+
+import httpx
+
+from core.api.response import parse_response_data
+from core.api.service import JsonPayload
+from core.logger import setup_logger
+from schemas.api.batch import BatchResponseRegosObjectResult
+
+logger = setup_logger("batch_coalescer")
+
+BATCH_PATH = "batch"
+BATCH_MAX_STEPS = 50  # ограничение REGOS на число шагов в пакете
+
+
+class BatchStepMissingError(RuntimeError):
+    """В ответе batch нет шага с ожидаемым ключом."""
+
+
+@dataclass
+class _PendingCall:
+    path: str
+    payload: JsonPayload
+    response_model: type
+    future: asyncio.Future = field(repr=False)
+
+
+class BatchCoalescer:
+    def __init__(
+        self,
+        api,
+        *,
+        window_sec: float,
+        max_size: int = BATCH_MAX_STEPS,
+    ):
+        self._api = api
+        self.window_sec = max(float(window_sec), 0.0)
+        self.max_size = min(max(int(max_size), 1), BATCH_MAX_STEPS)
+        self._pending: List[_PendingCall] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def submit(self, path: str, body: Any, response_model: Type[Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        call = _PendingCall(
+            path=path,
+            payload=JsonPayload.dump(body),
+            response_model=response_model,
+            future=loop.create_future(),
+        )
+        self._pending.append(call)
+        if len(self._pending) >= self.max_size:
+            self._schedule_flush(loop, immediate=True)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop)
+        return await call.future
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, *, immediate: bool = False) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if immediate or self.window_sec <= 0:
+            self._start_flush()
+            return
+        self._flush_handle = loop.call_later(self.window_sec, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._flush_handle = None
+        while self._pending:
+            chunk = self._pending[: self.max_size]
+            del self._pending[: self.max_size]
+            task = asyncio.ensure_future(self._flush(chunk))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def drain(self) -> None:
+        """Отправить всё накопленное и дождаться ответов (выход из `batched()`)."""
+        self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*list(self._flush_tasks), return_exceptions=True)
+
+    async def _flush(self, calls: List[_PendingCall]) -> None:
+        calls = [call for call in calls if not call.future.done()]
+        if not calls:
+            return
+        if len(calls) == 1:
+            await self._call_single(calls[0])
+            return
+
+        try:
+            response = await self._api._call_direct(
+                BATCH_PATH,
+                _batch_body(calls),
+                BatchResponseRegosObjectResult,
+            )
+        except Exception as error:
+            for call in calls:
+                _set_exception(call.future, error)
+            return
+
+        result = response.result
+        steps = getattr(result, "responses", None)
+        if not response.ok or steps is None:
+            error = RuntimeError(f"REGOS batch failed: {result}")
+            for call in calls:
+                _set_exception(call.future, error)
+            return
+
+        by_key = {str(step.key): step for step in steps if step.key is not None}
+        logger.debug("REGOS batch fan-out: steps=%s", len(calls))
+        retry_calls: List[_PendingCall] = []
+        for index, call in enumerate(calls):
+            step = by_key.get(str(index))
+            if step is None:
+                _set_exception(
+                    call.future,
+                    BatchStepMissingError(f"REGOS batch has no response for {call.path}"),
+                )
+                continue
+            if _is_retryable_status(int(step.status or 200)):
+                retry_calls.append(call)
+                continue
+            try:
+                _set_result(call.future, self._step_result(call, step))
+            except Exception as error:
+                _set_exception(call.future, error)
+        if retry_calls:
+            logger.debug("REGOS batch steps retried directly: steps=%s", len(retry_calls))
+            await asyncio.gather(*(self._call_single(call) for call in retry_calls))
+
+    async def _call_single(self, call: _PendingCall) -> None:
+        try:
+            result = await self._api._call_direct(call.path, call.payload, call.response_model)
+        except Exception as error:
+            _set_exception(call.future, error)
+        else:
+            _set_result(call.future, result)
+
+    def _step_result(self, call: _PendingCall, step: Any) -> Any:
+        status = int(step.status or 200)
+        if status >= 400:
+            request = httpx.Request("POST", self._api._method_url(call.path))
+            step_response = httpx.Response(status, json=step.response, request=request)
+            raise httpx.HTTPStatusError(
+                f"REGOS batch step {call.path} failed with status {status}",
+                request=request,
+                response=step_response,
+            )
+        return parse_response_data(
+            step.response,
+            call.response_model,
+            lazy=bool(getattr(self._api, "lazy_results", False)),
+        )
+
+
+def _is_retryable_status(status: int) -> bool:
+    # то, что прямой вызов переживает ретраями (tenacity на 5xx, APIClient на 429)
+    return status == 429 or status >= 500
+
+
+def _batch_body(calls: List[_PendingCall]) -> JsonPayload:
+    # payload уже сериализован — вклеиваем байты без повторного разбора
+    steps = b",".join(
+        b'{"Key":"%d","path":%s,"payload":%s}'
+        % (index, json.dumps(call.path).encode(), bytes(call.payload))
+        for index, call in enumerate(calls)
+    )
+    return JsonPayload(b'{"stop_on_error":false,"requests":[' + steps + b"]}")
+
+
+def _set_result(future: asyncio.Future, value: Any) -> None:
+    if not future.done():
+        future.set_result(value)
+
+
+def _set_exception(future: asyncio.Future, error: BaseException) -> None:
+    if not future.done():
+        future.set_exception(error)
+
+
+__all__ = ["BATCH_MAX_STEPS", "BatchCoalescer", "BatchStepMissingError"]
@@ -13,22 +13,26 @@ import logging
 from typing import Any, Awaitable, Callable, Dict, Optional, Type, TypeVar
 
 import httpx
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from pydantic_core import PydanticSerializationError
 
 from config.settings import settings
+from core.api.http_pool import get_shared_http_client
+from core.api.rate_limit_cooldown import (
+    ensure_cooldown_listener,
+    get_local_cooldown,
+    publish_cooldown,
+)
 from core.api.rate_limiter import get_shared_limiter
+from core.api.response import parse_response
+from core.api.service import JsonPayload
 from core.api.regos_oauth import RegosOAuthProvider
 from core.logger import setup_logger
-from core.redis import redis_is_enabled, redis_ops
 from schemas.api.base import APIBaseResponse
 
 logger = setup_logger("api_client")
 TResponse = TypeVar("TResponse", bound=BaseModel)
 
-_RATE_LIMIT_COOLDOWNS: Dict[str, float] = {}
-_RATE_LIMIT_COOLDOWN_LOCK = asyncio.Lock()
-
-
 class APIClient:
     """
     Лёгкий клиент REGOS API с минималистичным логированием.
@@ -62,6 +66,8 @@ class APIClient:
         30,
     )
 
+    FAST_JSON: bool = settings.integration_fast_json
+
     REQ_PREVIEW_LIMIT = 2_048    # bytes
     RESP_PREVIEW_LIMIT = 2_048   # chars
 
@@ -74,7 +80,6 @@ class APIClient:
         self.integration_id = connected_integration_id
         self._timeout = timeout
         self._bearer_token = str(bearer_token or "").strip()
-        self.client = self._build_http_client()
 
         self._limiter = get_shared_limiter(
             self.integration_id,
@@ -82,8 +87,7 @@ class APIClient:
             self.BURST,
         )
 
-        # реюзаем общий httpx-клиент в провайдере токена
-        self._oauth = RegosOAuthProvider(http_client=self.client)
+        self._oauth_provider: Optional[RegosOAuthProvider] = None
 
         logger.debug(
             "Инициализирован APIClient: base_url=%s, integration_id=%s, rate=%s/s, burst=%s",
@@ -92,6 +96,10 @@ class APIClient:
 
     # ------------------------ helpers ------------------------
 
+    @classmethod
+    def method_url(cls, integration_id: str, method_path: str) -> str:
+        return f"{cls.BASE_URL}/gateway/out/{integration_id}/v1/{method_path.lstrip('/')}"
+
     @staticmethod
     def _new_trace_id() -> str:
         return uuid.uuid4().hex[:12]
@@ -122,38 +130,49 @@ class APIClient:
             n //= 1024
         return f"{n}GB"
 
-    def _build_http_client(self) -> httpx.AsyncClient:
-        return httpx.AsyncClient(timeout=self._timeout)
-
-    async def _reset_http_client(self, reason: Optional[Exception] = None) -> None:
-        old_client = self.client
-        self.client = self._build_http_client()
-        self._oauth = RegosOAuthProvider(http_client=self.client)
-        try:
-            await old_client.aclose()
-        except Exception:
-            pass
-        if reason is not None:
-            logger.warning(
-                "Reset API HTTP client after transport error: integration_id=%s error=%s",
-                self.integration_id,
-                reason,
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # общий пул соединений процесса (на event loop + base URL), см. core.api.http_pool
+        return get_shared_http_client(self.BASE_URL)
+
+    @property
+    def _oauth(self) -> RegosOAuthProvider:
+        if self._oauth_provider is None:
+            # реюзаем общий пул и в провайдере токена
+            self._oauth_provider = RegosOAuthProvider(
+                http_client=get_shared_http_client(settings.oauth_endpoint)
             )
+        return self._oauth_provider
+
+    async def _send(
+        self,
+        request: httpx.Request,
+        *,
+        fresh_connection: bool = False,
+    ) -> httpx.Response:
+        if not fresh_connection:
+            return await self.client.send(request)
+        # Разовое отдельное соединение мимо общего пула: не трогаем чужие keep-alive.
+        async with httpx.AsyncClient() as client:
+            response = await client.send(request)
+            await response.aread()
+            return response
+
+    def _log_transport_error(self, error: Exception) -> None:
+        # Сломанное соединение httpcore уже выбросил из пула; остальные живут дальше.
+        logger.warning(
+            "API transport error: integration_id=%s error=%s",
+            self.integration_id,
+            error,
+        )
 
     @staticmethod
-    def _serialize_payload(data: Any) -> Any:
-        if isinstance(data, BaseModel):
-            return data.model_dump(mode="json", exclude_none=True, by_alias=True)
-        if data is None or isinstance(data, (str, int, float, bool)):
-            return data
-        if isinstance(data, list):
-            return [APIClient._serialize_payload(item) for item in data]
-        if isinstance(data, dict):
-            return {
-                key: APIClient._serialize_payload(value)
-                for key, value in data.items()
-            }
-        raise TypeError(f"Unsupported data type for POST: {type(data)}")
+    def _serialize_payload(data: Any) -> JsonPayload:
+        # Тело от RegosAPIService уже готово (JsonPayload) — повторно не обходим.
+        try:
+            return JsonPayload.dump(data)
+        except PydanticSerializationError as error:
+            raise TypeError(f"Unsupported data type for POST: {error}") from error
 
     async def _auth_headers(
         self,
@@ -208,27 +227,12 @@ class APIClient:
         return min(exponential + jitter, self.RATE_LIMIT_MAX_DELAY_SEC)
 
     async def _wait_for_rate_limit_cooldown(self, *, trace_id: str, url: str) -> None:
-        key = self._rate_limit_cooldown_key()
-        now = time.time()
-        async with _RATE_LIMIT_COOLDOWN_LOCK:
-            cooldown_until = float(_RATE_LIMIT_COOLDOWNS.get(key) or 0)
-            if cooldown_until <= now:
-                _RATE_LIMIT_COOLDOWNS.pop(key, None)
-                cooldown_until = 0
-
-        if redis_is_enabled():
-            try:
-                raw = await redis_ops.get(key)
-                if raw:
-                    cooldown_until = max(cooldown_until, float(raw))
-            except Exception as error:
-                logger.warning(
-                    "[trace:%s] Failed to read REGOS 429 cooldown: integration_id=%s error=%s",
-                    trace_id,
-                    self.integration_id,
-                    error,
-                )
-
+        # Только локальная память: cooldown других процессов приходит через pub/sub
+        # (core.api.rate_limit_cooldown) и периодически сверяется с Redis.
+        ensure_cooldown_listener()
+        cooldown_until = get_local_cooldown(self._rate_limit_cooldown_key())
+        if not cooldown_until:
+            return
         delay = cooldown_until - time.time()
         if delay <= 0:
             return
@@ -253,27 +257,19 @@ class APIClient:
             self.RATE_LIMIT_MAX_DELAY_SEC,
         )
         cooldown_until = time.time() + delay
-        key = self._rate_limit_cooldown_key()
-        async with _RATE_LIMIT_COOLDOWN_LOCK:
-            _RATE_LIMIT_COOLDOWNS[key] = max(
-                float(_RATE_LIMIT_COOLDOWNS.get(key) or 0),
-                cooldown_until,
+        try:
+            ttl = max(
+                int(delay) + 5,
+                min(self.RATE_LIMIT_COOLDOWN_TTL_SEC, 30),
+            )
+            await publish_cooldown(self._rate_limit_cooldown_key(), cooldown_until, ttl)
+        except Exception as error:
+            logger.warning(
+                "[trace:%s] Failed to write REGOS 429 cooldown: integration_id=%s error=%s",
+                trace_id,
+                self.integration_id,
+                error,
             )
-
-        if redis_is_enabled():
-            try:
-                ttl = max(
-                    int(delay) + 5,
-                    min(self.RATE_LIMIT_COOLDOWN_TTL_SEC, 30),
-                )
-                await redis_ops.set(key, str(cooldown_until), ex=ttl)
-            except Exception as error:
-                logger.warning(
-                    "[trace:%s] Failed to write REGOS 429 cooldown: integration_id=%s error=%s",
-                    trace_id,
-                    self.integration_id,
-                    error,
-                )
 
         logger.warning(
             "[trace:%s] REGOS 429 cooldown set for %.2fs: integration_id=%s url=%s",
@@ -313,6 +309,38 @@ class APIClient:
             raise RuntimeError("REGOS request was not sent")
         return last_response
 
+    def _parse_response(
+        self,
+        resp: httpx.Response,
+        response_model: Type[TResponse],
+        *,
+        trace_id: str,
+        lazy_result: bool = False,
+    ) -> TResponse:
+        raw = getattr(resp, "_decoded_body", None)
+        if raw is None:
+            raw, _ = self._decompress_if_gzip(resp.content or b"")
+
+        # Ленивый режим не зависит от FAST_JSON: строки валидируются при обращении
+        if not self.FAST_JSON and not lazy_result:
+            try:
+                parsed = json.loads(raw.decode("utf-8", errors="replace"))
+            except json.JSONDecodeError as e:
+                logger.error("[trace:%s] Некорректный JSON в ответе: %s", trace_id, e)
+                raise
+            return response_model(**parsed)
+
+        try:
+            return parse_response(raw, response_model, lazy=lazy_result)
+        except ValidationError as e:
+            if any(error.get("type") == "json_invalid" for error in e.errors()):
+                logger.error("[trace:%s] Некорректный JSON в ответе: %s", trace_id, e)
+            raise
+        except ValueError as e:
+            # orjson.JSONDecodeError / json.JSONDecodeError в ленивом режиме
+            logger.error("[trace:%s] Некорректный JSON в ответе: %s", trace_id, e)
+            raise
+
     # ------------------------- POST ---------------------------
 
     async def post(
@@ -320,22 +348,35 @@ class APIClient:
         method_path: str,
         data: Any,
         response_model: Type[TResponse] = APIBaseResponse,
+        *,
+        lazy_result: bool = False,
     ) -> TResponse:
         """
         POST {BASE_URL}/gateway/out/{integration_id}/v1/{method_path}
         Сериализация -> рейтлимит -> Bearer -> запрос -> (401→рефреш) -> JSON -> валидация.
+        lazy_result=True: элементы списка `result` валидируются при обращении (LazyModelList).
         """
-        url = f"{self.BASE_URL}/gateway/out/{self.integration_id}/v1/{method_path.lstrip('/')}"
+        url = self.method_url(self.integration_id, method_path)
         trace_id = self._new_trace_id()
         payload = self._serialize_payload(data)
 
-        async def send_once(*, force_refresh: bool) -> httpx.Response:
+        async def send_once(
+            *,
+            force_refresh: bool,
+            fresh_connection: bool = False,
+        ) -> httpx.Response:
             headers = await self._auth_headers(
                 trace_id=trace_id,
                 force_refresh=force_refresh,
                 with_json_content_type=True,
             )
-            req = self.client.build_request("POST", url, json=payload, headers=headers)
+            req = self.client.build_request(
+                "POST",
+                url,
+                content=payload,
+                headers=headers,
+                timeout=self._timeout,
+            )
 
             # INFO: кратко
             body_bytes = req.content or b""
@@ -353,16 +394,15 @@ class APIClient:
             # отправляем
             try:
                 t0 = time.perf_counter()
-                resp = await self.client.send(req)
+                resp = await self._send(req, fresh_connection=fresh_connection)
                 elapsed_ms = (time.perf_counter() - t0) * 1000.0
 
                 # читаем тело
                 await resp.aread()
                 raw = resp.content or b""
                 raw_dec, gz = self._decompress_if_gzip(raw)
-                text = raw_dec.decode("utf-8", errors="replace")
             except httpx.RequestError as error:
-                await self._reset_http_client(reason=error)
+                self._log_transport_error(error)
                 raise
 
             # INFO: кратко
@@ -373,10 +413,13 @@ class APIClient:
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug("Response headers: %s", dict(resp.headers))
                 if resp.status_code >= 400:
-                    logger.debug("Response body (preview): %s", text[: self.RESP_PREVIEW_LIMIT])
+                    logger.debug(
+                        "Response body (preview): %s",
+                        raw_dec[: self.RESP_PREVIEW_LIMIT].decode("utf-8", errors="replace"),
+                    )
 
-            # положим обратно уже декодированный текст для последующего парсинга
-            resp._decoded_text = text  # внутреннее поле для нашего использования
+            # положим обратно уже распакованное тело для последующего парсинга
+            resp._decoded_body = raw_dec  # внутреннее поле для нашего использования
             return resp
 
         # Первая попытка
@@ -396,33 +439,25 @@ class APIClient:
             )
             if resp.status_code == 401:
                 logger.warning(
-                    "[trace:%s] 401 persists after token refresh. Resetting transport and retrying once more...",
+                    "[trace:%s] 401 persists after token refresh. Retrying once more on a fresh connection...",
                     trace_id,
                 )
-                await self._reset_http_client()
                 resp = await self._send_with_rate_limit_retry(
                     trace_id=trace_id,
                     url=url,
-                    send_once=lambda: send_once(force_refresh=True),
+                    send_once=lambda: send_once(force_refresh=True, fresh_connection=True),
                 )
 
         # Ошибки статуса
         resp.raise_for_status()
 
         # Парс JSON
-        text = getattr(resp, "_decoded_text", None)
-        if text is None:
-            raw = resp.content or b""
-            raw_dec, _ = self._decompress_if_gzip(raw)
-            text = raw_dec.decode("utf-8", errors="replace")
-
-        try:
-            parsed = json.loads(text)
-        except json.JSONDecodeError as e:
-            logger.error("[trace:%s] Некорректный JSON в ответе: %s", trace_id, e)
-            raise
-
-        return response_model(**parsed)
+        return self._parse_response(
+            resp,
+            response_model,
+            trace_id=trace_id,
+            lazy_result=lazy_result,
+        )
 
     async def post_multipart(
         self,
@@ -430,16 +465,22 @@ class APIClient:
         data: Dict[str, Any],
         files: Dict[str, tuple[str, bytes] | tuple[str, bytes, str]],
         response_model: Type[TResponse] = APIBaseResponse,
+        *,
+        lazy_result: bool = False,
     ) -> TResponse:
         """
         POST multipart/form-data
         {BASE_URL}/gateway/out/{integration_id}/v1/{method_path}
         """
-        url = f"{self.BASE_URL}/gateway/out/{self.integration_id}/v1/{method_path.lstrip('/')}"
+        url = self.method_url(self.integration_id, method_path)
         trace_id = self._new_trace_id()
         form_data = {k: str(v) for k, v in data.items() if v is not None}
 
-        async def send_once(*, force_refresh: bool) -> httpx.Response:
+        async def send_once(
+            *,
+            force_refresh: bool,
+            fresh_connection: bool = False,
+        ) -> httpx.Response:
             headers = await self._auth_headers(
                 trace_id=trace_id,
                 force_refresh=force_refresh,
@@ -451,6 +492,7 @@ class APIClient:
                 data=form_data,
                 files=files,
                 headers=headers,
+                timeout=self._timeout,
             )
 
             body_bytes = req.content or b""
@@ -482,15 +524,14 @@ class APIClient:
 
             try:
                 t0 = time.perf_counter()
-                resp = await self.client.send(req)
+                resp = await self._send(req, fresh_connection=fresh_connection)
                 elapsed_ms = (time.perf_counter() - t0) * 1000.0
 
                 await resp.aread()
                 raw = resp.content or b""
                 raw_dec, gz = self._decompress_if_gzip(raw)
-                text = raw_dec.decode("utf-8", errors="replace")
             except httpx.RequestError as error:
-                await self._reset_http_client(reason=error)
+                self._log_transport_error(error)
                 raise
 
             logger.info(
@@ -506,9 +547,12 @@ class APIClient:
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug("Response headers: %s", dict(resp.headers))
                 if resp.status_code >= 400:
-                    logger.debug("Response body (preview): %s", text[: self.RESP_PREVIEW_LIMIT])
+                    logger.debug(
+                        "Response body (preview): %s",
+                        raw_dec[: self.RESP_PREVIEW_LIMIT].decode("utf-8", errors="replace"),
+                    )
 
-            resp._decoded_text = text
+            resp._decoded_body = raw_dec
             return resp
 
         resp = await self._send_with_rate_limit_retry(
@@ -527,37 +571,30 @@ class APIClient:
             )
             if resp.status_code == 401:
                 logger.warning(
-                    "[trace:%s] 401 persists after token refresh. Resetting transport and retrying once more...",
+                    "[trace:%s] 401 persists after token refresh. Retrying once more on a fresh connection...",
                     trace_id,
                 )
-                await self._reset_http_client()
                 resp = await self._send_with_rate_limit_retry(
                     trace_id=trace_id,
                     url=url,
-                    send_once=lambda: send_once(force_refresh=True),
+                    send_once=lambda: send_once(force_refresh=True, fresh_connection=True),
                 )
 
         resp.raise_for_status()
 
-        text = getattr(resp, "_decoded_text", None)
-        if text is None:
-            raw = resp.content or b""
-            raw_dec, _ = self._decompress_if_gzip(raw)
-            text = raw_dec.decode("utf-8", errors="replace")
-
-        try:
-            parsed = json.loads(text)
-        except json.JSONDecodeError as e:
-            logger.error("[trace:%s] Некорректный JSON в ответе: %s", trace_id, e)
-            raise
-
-        return response_model(**parsed)
+        return self._parse_response(
+            resp,
+            response_model,
+            trace_id=trace_id,
+            lazy_result=lazy_result,
+        )
 
     # ---------------------- lifecycle -------------------------
 
     async def close(self) -> None:
-        logger.debug("Закрытие httpx.AsyncClient")
-        await self.client.aclose()
+        # Соединения принадлежат общему пулу и закрываются при остановке сервиса
+        # (close_shared_http_clients); здесь освобождать нечего.
+        logger.debug("Закрытие APIClient: integration_id=%s", self.integration_id)
 
     async def __aenter__(self) -> "APIClient":
         return self
@@ -1,4 +1,5 @@
 from typing import List, Iterable
+from core.api.service import RegosAPIService
 from core.logger import setup_logger
 from schemas.api.docs.cash_session import (
     DocCashSession,
@@ -9,19 +10,13 @@ from schemas.api.docs.cash_session import (
 logger = setup_logger("docs.CashSession")
 
 
-class DocCashSessionService:
+class DocCashSessionService(RegosAPIService):
     PATH_GET = "DocCashSession/Get"
 
-    def __init__(self, api):
-        self.api = api
-
     async def get(
         self, req: DocCashSessionGetRequest
     ) -> DocCashSessionGetResponse:
-        payload = req.model_dump(mode="json", exclude_none=True)
-        resp = await self.api.call(
-            self.PATH_GET, payload, DocCashSessionGetResponse
-        )
+        resp = await self._call(self.PATH_GET, req, DocCashSessionGetResponse)
         return resp
 
     async def get_by_uuids(
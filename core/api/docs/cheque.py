@@ -1,4 +1,5 @@
 from typing import List, Iterable
+from core.api.service import RegosAPIService
 from core.logger import setup_logger
 from schemas.api.base import APIBaseResponse
 from schemas.api.docs.cheque import DocChequeGetRequest, DocCheque
@@ -6,14 +7,11 @@ from schemas.api.docs.cheque import DocChequeGetRequest, DocCheque
 logger = setup_logger("docs.cheque")
 
 
-class DocsChequeService:
+class DocsChequeService(RegosAPIService):
     PATH_GET = "DocCheque/Get"
 
-    def __init__(self, api):
-        self.api = api
-
     async def get(self, req: DocChequeGetRequest) -> APIBaseResponse[List[DocCheque]]:
-        resp = await self.api.call(self.PATH_GET, req, APIBaseResponse)
+        resp = await self._call(self.PATH_GET, req, APIBaseResponse)
         return resp
 
     async def get_by_uuids(self, uuids: Iterable) -> APIBaseResponse[List[DocCheque]]:
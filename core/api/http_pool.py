@@ -0,0 +1,99 @@
+# core/api/http_pool.py
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from config.settings import settings
+from core.logger import setup_logger
+
+logger = setup_logger("http_pool")
+
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+# таймаут по умолчанию, как у прежних httpx.AsyncClient(timeout=30); без него httpx ждёт 5 с
+_DEFAULT_TIMEOUT_SEC = 30.0
+
+# (id(loop), base_url) -> (loop, client)
+_SHARED_HTTP_CLIENTS: Dict[Tuple[int, str], Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def _normalize_base_url(base_url: str) -> str:
+    return str(base_url or "").strip().rstrip("/")
+
+
+def _build_limits() -> httpx.Limits:
+    max_connections = max(int(settings.integration_http_max_connections or 0), 1)
+    max_keepalive = max(int(settings.integration_http_max_keepalive or 0), 0)
+    keepalive_expiry = max(float(settings.integration_http_keepalive_expiry_sec or 0), 0.0)
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(max_keepalive, max_connections),
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+def _http2_enabled() -> bool:
+    if not settings.integration_http2:
+        return False
+    if not _HTTP2_AVAILABLE:
+        logger.warning("integration_http2 is enabled but 'h2' is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _purge_closed_loops() -> None:
+    for key, (loop, _) in list(_SHARED_HTTP_CLIENTS.items()):
+        if loop.is_closed():
+            _SHARED_HTTP_CLIENTS.pop(key, None)
+
+
+def get_shared_http_client(base_url: str) -> httpx.AsyncClient:
+    """
+    Общий httpx.AsyncClient на (event loop, base URL).
+
+    Все APIClient одного процесса берут соединения из одного пула, поэтому
+    keep-alive переживает отдельные запросы и экземпляры клиентов. Таймаут
+    по умолчанию 30 с, запрос может задать свой. При транспортной ошибке httpcore сам закрывает и
+    выбрасывает из пула только сломанное соединение, пул целиком не пересоздаётся.
+    """
+    loop = asyncio.get_running_loop()
+    key = (id(loop), _normalize_base_url(base_url))
+    entry = _SHARED_HTTP_CLIENTS.get(key)
+    if entry is not None:
+        owner_loop, client = entry
+        if owner_loop is loop and not client.is_closed:
+            return client
+
+    _purge_closed_loops()
+    client = httpx.AsyncClient(
+        limits=_build_limits(),
+        http2=_http2_enabled(),
+        timeout=_DEFAULT_TIMEOUT_SEC,
+    )
+    _SHARED_HTTP_CLIENTS[key] = (loop, client)
+    logger.debug("Created shared HTTP pool: base_url=%s", key[1])
+    return client
+
+
+async def close_shared_http_clients() -> None:
+    """Закрывает пулы текущего event loop (вызывается при остановке сервиса)."""
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    for key, (owner_loop, client) in list(_SHARED_HTTP_CLIENTS.items()):
+        if owner_loop is not loop and not owner_loop.is_closed():
+            continue
+        _SHARED_HTTP_CLIENTS.pop(key, None)
+        if owner_loop is not loop:
+            continue
+        try:
+            await client.aclose()
+        except Exception:
+            logger.exception("Failed to close shared HTTP pool: base_url=%s", key[1])
+
+
+__all__ = ["close_shared_http_clients", "get_shared_http_client"]
@@ -0,0 +1,152 @@
+# core/api/rate_limit_cooldown.py
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import settings
+from core.logger import setup_logger
+from core.redis import redis_is_enabled, redis_ops
+
+logger = setup_logger("rate_limit_cooldown")
+
+# cooldown key -> unix timestamp, до которого запросы к REGOS придерживаются
+_RATE_LIMIT_COOLDOWNS: Dict[str, float] = {}
+
+_COOLDOWN_CHANNEL = "api:regos:429:events"
+_COOLDOWN_INDEX_KEY = "api:regos:429:index"
+_LISTENER_RETRY_SEC = 5.0
+
+# id(loop) -> (loop, listener task)
+_LISTENERS: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+
+
+def get_local_cooldown(key: str) -> float:
+    """Cooldown из памяти процесса; 0 — если его нет или он истёк."""
+    cooldown_until = float(_RATE_LIMIT_COOLDOWNS.get(key) or 0)
+    if cooldown_until and cooldown_until <= time.time():
+        _RATE_LIMIT_COOLDOWNS.pop(key, None)
+        return 0.0
+    return cooldown_until
+
+
+def set_local_cooldown(key: str, cooldown_until: float) -> None:
+    if cooldown_until <= time.time():
+        return
+    _RATE_LIMIT_COOLDOWNS[key] = max(
+        float(_RATE_LIMIT_COOLDOWNS.get(key) or 0),
+        float(cooldown_until),
+    )
+
+
+def _apply_message(data: Any) -> None:
+    key, _, raw_until = str(data or "").rpartition("|")
+    if not key:
+        return
+    try:
+        set_local_cooldown(key, float(raw_until))
+    except ValueError:
+        return
+
+
+async def publish_cooldown(key: str, cooldown_until: float, ttl_sec: int) -> None:
+    """
+    Записывает cooldown в Redis и рассылает его всем процессам через pub/sub.
+
+    Ключ `key` остаётся для совместимости с процессами, читающими его через GET;
+    индекс (ZSET) нужен для периодической сверки пропущенных сообщений.
+    """
+    set_local_cooldown(key, cooldown_until)
+    if not redis_is_enabled():
+        return
+    async with redis_ops.pipeline(transaction=False) as pipe:
+        await pipe.set(key, str(cooldown_until), ex=ttl_sec)
+        await pipe.zadd(_COOLDOWN_INDEX_KEY, {key: cooldown_until})
+        await pipe.expire(_COOLDOWN_INDEX_KEY, max(int(ttl_sec), 60))
+        await pipe.publish(_COOLDOWN_CHANNEL, f"{key}|{cooldown_until}")
+        await pipe.execute()
+
+
+async def reconcile_cooldowns() -> int:
+    """Подтягивает активные cooldown из Redis в память процесса."""
+    now = time.time()
+    async with redis_ops.pipeline(transaction=True) as pipe:
+        await pipe.zremrangebyscore(_COOLDOWN_INDEX_KEY, "-inf", now)
+        await pipe.zrangebyscore(_COOLDOWN_INDEX_KEY, now, "+inf", withscores=True)
+        _, active = await pipe.execute()
+    for key, cooldown_until in active or []:
+        set_local_cooldown(str(key), float(cooldown_until))
+    return len(active or [])
+
+
+async def _listener_loop() -> None:
+    reconcile_sec = max(float(settings.integration_429_reconcile_sec or 0), 1.0)
+    while True:
+        pubsub = redis_ops.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(_COOLDOWN_CHANNEL)
+            await reconcile_cooldowns()
+            next_reconcile = time.monotonic() + reconcile_sec
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    _apply_message(message.get("data"))
+                if time.monotonic() >= next_reconcile:
+                    await reconcile_cooldowns()
+                    next_reconcile = time.monotonic() + reconcile_sec
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.warning("REGOS 429 cooldown listener error: %s", error)
+            await asyncio.sleep(_LISTENER_RETRY_SEC)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+
+def ensure_cooldown_listener() -> None:
+    """Запускает подписчика cooldown для текущего event loop (если Redis включён)."""
+    if not redis_is_enabled():
+        return
+    loop = asyncio.get_running_loop()
+    entry = _LISTENERS.get(id(loop))
+    if entry is not None and entry[0] is loop and not entry[1].done():
+        return
+    for loop_id, (owner_loop, _) in list(_LISTENERS.items()):
+        if owner_loop.is_closed():
+            _LISTENERS.pop(loop_id, None)
+    _LISTENERS[id(loop)] = (
+        loop,
+        loop.create_task(_listener_loop(), name="regos_429_cooldown_listener"),
+    )
+
+
+async def stop_cooldown_listeners() -> None:
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    entry = _LISTENERS.pop(id(loop), None) if loop is not None else None
+    if entry is None:
+        return
+    task = entry[1]
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception:
+        logger.exception("Error while stopping REGOS 429 cooldown listener")
+
+
+__all__ = [
+    "ensure_cooldown_listener",
+    "get_local_cooldown",
+    "publish_cooldown",
+    "reconcile_cooldowns",
+    "set_local_cooldown",
+    "stop_cooldown_listeners",
+]
@@ -1,7 +1,14 @@
 import asyncio
+import math
 import time
 import threading
-from typing import Dict
+from typing import Any, Dict, Optional, Union
+
+from config.settings import settings
+from core.logger import setup_logger
+from core.redis import redis_is_enabled, redis_ops
+
+logger = setup_logger("rate_limiter")
 
 
 class TokenBucket:
@@ -39,16 +46,198 @@ class TokenBucket:
             await asyncio.sleep(max(need, 0.0))
 
 
+# Атомарно списывает до ARGV[3] токенов из общего ведра. Часы — Redis TIME,
+# чтобы у всех узлов было одно время. Возвращает {выдано, сколько ждать мс}.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local ttl_ms = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+if now > ts then
+    tokens = math.min(capacity, tokens + (now - ts) * rate / 1000)
+    ts = now
+end
+local granted = math.min(requested, math.floor(tokens))
+local wait_ms = 0
+if granted > 0 then
+    tokens = tokens - granted
+else
+    wait_ms = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', ts)
+redis.call('PEXPIRE', KEYS[1], ttl_ms)
+return {granted, wait_ms}
+"""
+
+# Возвращает в общее ведро неизрасходованный остаток порции (не выше capacity).
+# Если ключ уже истёк, ведро и так считается полным — возвращать некуда.
+_TOKEN_REFUND_LUA = """
+local refund = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local ttl_ms = tonumber(ARGV[3])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens == nil then
+    return 0
+end
+tokens = math.min(capacity, tokens + refund)
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens))
+redis.call('PEXPIRE', KEYS[1], ttl_ms)
+return 1
+"""
+
+
+class DistributedTokenBucket:
+    """Токен-бакет, общий для всех процессов и узлов через Redis.
+
+    Процесс берёт токены у Redis небольшими порциями (lease_size) одним EVALSHA
+    и тратит их локально, поэтому на каждый запрос не приходится поход в Redis.
+    Неизрасходованный остаток порции через lease_ttl_sec возвращается в общее
+    ведро, чтобы простаивающий процесс не удерживал чужую пропускную способность
+    и не сжигал её.
+    Если Redis недоступен — временно работаем на локальном TokenBucket.
+    """
+
+    FALLBACK_RETRY_SEC = 5.0
+
+    def __init__(
+        self,
+        key: str,
+        rate_per_sec: float,
+        capacity: int,
+        *,
+        lease_size: int = 1,
+        lease_ttl_sec: float = 1.0,
+        redis_prefix: str = "api:regos:rl",
+    ):
+        self.key = key
+        self.rate = max(float(rate_per_sec), 0.001)
+        self.capacity = max(int(capacity), 1)
+        self.lease_size = min(max(int(lease_size), 1), self.capacity)
+        self.lease_ttl_sec = max(float(lease_ttl_sec), 0.05)
+        self._redis_key = f"{redis_prefix}:{key}"
+        self._ttl_ms = int(math.ceil(self.capacity / self.rate) * 1000) + 60_000
+        self._leased = 0
+        self._leased_at = 0.0
+        self._lock = asyncio.Lock()
+        self._script: Any = None
+        self._refund_script: Any = None
+        self._expiry_task: Optional[asyncio.Task] = None
+        self._local = TokenBucket(rate_per_sec, capacity)
+        self._fallback_until = 0.0
+
+    async def _take_from_redis(self, count: int) -> tuple[int, float]:
+        if self._script is None:
+            self._script = redis_ops.register_script(_TOKEN_BUCKET_LUA)
+        granted, wait_ms = await self._script(
+            keys=[self._redis_key],
+            args=[self.rate, self.capacity, count, self._ttl_ms],
+        )
+        return int(granted or 0), max(int(wait_ms or 0), 1) / 1000.0
+
+    async def _release_lease(self) -> None:
+        """Вернуть остаток порции в Redis. Вызывается под self._lock."""
+        count, self._leased = self._leased, 0
+        if count <= 0:
+            return
+        try:
+            if self._refund_script is None:
+                self._refund_script = redis_ops.register_script(_TOKEN_REFUND_LUA)
+            await self._refund_script(
+                keys=[self._redis_key],
+                args=[count, self.capacity, self._ttl_ms],
+            )
+        except Exception as error:
+            logger.debug("Rate limiter lease refund failed: key=%s error=%s", self.key, error)
+
+    def _schedule_expiry(self) -> None:
+        if self._expiry_task is None or self._expiry_task.done():
+            self._expiry_task = asyncio.create_task(self._expire_lease())
+
+    async def _expire_lease(self) -> None:
+        # порцию продлевает каждое новое получение токенов, поэтому ждём до фактического истечения
+        while True:
+            await asyncio.sleep(max(self._leased_at + self.lease_ttl_sec - time.monotonic(), 0.0) + 0.01)
+            async with self._lock:
+                if not self._leased:
+                    return
+                if time.monotonic() - self._leased_at > self.lease_ttl_sec:
+                    await self._release_lease()
+                    return
+
+    async def acquire(self, n: float = 1.0) -> None:
+        """Дождаться появления ≥ n токенов и списать их."""
+        need = max(int(math.ceil(n)), 1)
+        while True:
+            if time.monotonic() < self._fallback_until:
+                await self._local.acquire(n)
+                return
+            async with self._lock:
+                now = time.monotonic()
+                if self._leased and now - self._leased_at > self.lease_ttl_sec:
+                    await self._release_lease()
+                if self._leased >= need:
+                    self._leased -= need
+                    return
+                try:
+                    granted, wait_sec = await self._take_from_redis(
+                        max(self.lease_size, need - self._leased)
+                    )
+                except Exception as error:
+                    self._fallback_until = time.monotonic() + self.FALLBACK_RETRY_SEC
+                    logger.warning(
+                        "Distributed rate limiter unavailable, using local bucket: key=%s error=%s",
+                        self.key,
+                        error,
+                    )
+                    continue
+                if granted > 0:
+                    self._leased += granted
+                    self._leased_at = time.monotonic()
+                    if self._leased >= need:
+                        self._leased -= need
+                        if self._leased:
+                            self._schedule_expiry()
+                        return
+                    continue
+            # Спим вне локa, чтобы не блокировать другие корутины
+            await asyncio.sleep(wait_sec)
+
+
 # ---------- Общий реестр лимитеров по ключу (например, integration_id) ----------
-_LIMITERS: Dict[str, TokenBucket] = {}
+_LIMITERS: Dict[str, Union[TokenBucket, DistributedTokenBucket]] = {}
 _LIMITERS_LOCK = threading.Lock()
 
 
-def get_shared_limiter(key: str, rate_per_sec: float, capacity: int) -> TokenBucket:
-    """Вернуть (или создать) общий лимитер для данного ключа внутри одного процесса."""
+def get_shared_limiter(
+    key: str,
+    rate_per_sec: float,
+    capacity: int,
+) -> Union[TokenBucket, DistributedTokenBucket]:
+    """Вернуть (или создать) общий лимитер для данного ключа.
+
+    При включённом Redis лимит общий для всего кластера, иначе — на процесс.
+    """
     with _LIMITERS_LOCK:
         lim = _LIMITERS.get(key)
         if lim is None:
-            lim = TokenBucket(rate_per_sec, capacity)
+            if redis_is_enabled() and settings.integration_rate_limit_distributed:
+                lim = DistributedTokenBucket(
+                    key,
+                    rate_per_sec,
+                    capacity,
+                    lease_size=settings.integration_rate_limit_lease_size,
+                    lease_ttl_sec=settings.integration_rate_limit_lease_ttl_sec,
+                )
+            else:
+                lim = TokenBucket(rate_per_sec, capacity)
             _LIMITERS[key] = lim
         return lim
@@ -1,7 +1,8 @@
 from __future__ import annotations
 import asyncio
 import hashlib
-from typing import Any, Dict, Optional, Type, TypeVar
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Type, TypeVar
 
 import httpx
 from tenacity import (
@@ -12,8 +13,16 @@ from tenacity import (
 )
 
 from core.api.batch import BatchService
+from core.api.batch_coalescer import BATCH_PATH, BatchCoalescer
 from core.api.client import APIClient
+from core.api.registry import (
+    LazyNamespace,
+    LazyService,
+    ServiceNamespace,
+    install_generated_services,
+)
 
+from config.settings import settings
 from core.logger import setup_logger
 
 logger = setup_logger("regos_api")
@@ -42,8 +51,13 @@ class RegosAPI:
         self,
         connected_integration_id: str,
         bearer_token: Optional[str] = None,
+        *,
+        lazy_results: bool = False,
+        batch_window_ms: Optional[float] = None,
     ):
         self.connected_integration_id = connected_integration_id
+        # Ленивая валидация больших списков `result` (см. core.api.response.LazyModelList)
+        self.lazy_results = lazy_results
         self._bearer_token = str(bearer_token or "").strip()
         base_key = str(connected_integration_id or "").strip()
         if self._bearer_token:
@@ -53,21 +67,16 @@ class RegosAPI:
             self._shared_key = base_key
         self._client: Optional[APIClient] = None
         self._closed = False
-        self.batch = BatchService(self)
-
-        self.common: "RegosAPI.Common" = self.Common(self)
-        self.docs: "RegosAPI.Docs" = self.Docs(self)
-        self.crm: "RegosAPI.Crm" = self.Crm(self)
-        self.chat: "RegosAPI.Chat" = self.Chat(self)
-        self.files: "RegosAPI.Files" = self.Files(self)
-        self.integrations: "RegosAPI.Integrations" = self.Integrations(self)
-        self.reports: "RegosAPI.Reports" = self.Reports(self)
-        self.references: "RegosAPI.References" = self.References(self)
-        self.rbac: "RegosAPI.Rbac" = self.Rbac(self)
-
-        from core.api.registry import attach_generated_services
-
-        attach_generated_services(self)
+        # Сервисы и пространства имён — дескрипторы класса (см. core.api.registry):
+        # создаются при первом обращении, а не на каждый RegosAPI(...).
+        self._services: Dict[tuple, Any] = {}
+        # Склейка независимых вызовов в batch: постоянно (batch_window_ms) или
+        # только внутри `async with api.batched():`.
+        self._coalescer: Optional[BatchCoalescer] = (
+            BatchCoalescer(self, window_sec=float(batch_window_ms) / 1000.0)
+            if batch_window_ms is not None
+            else None
+        )
 
     async def _acquire_client(self) -> APIClient:
         if self._client is not None:
@@ -123,16 +132,55 @@ class RegosAPI:
         except Exception:
             logger.exception("Failed to close shared API client: integration_id=%s", shared_key)
 
+    async def call(self, path: str, body: Any, response_model: Type[T]) -> T:
+        coalescer = self._coalescer
+        if coalescer is not None and path != BATCH_PATH:
+            return await coalescer.submit(path, body, response_model)
+        return await self._call_direct(path, body, response_model)
+
+    @asynccontextmanager
+    async def batched(
+        self,
+        *,
+        window_ms: Optional[float] = None,
+        max_size: Optional[int] = None,
+    ) -> AsyncIterator["RegosAPI"]:
+        """
+        Внутри блока независимые вызовы (например, собранные через asyncio.gather)
+        уходят одним запросом `batch`; при выходе всё накопленное отправляется.
+        """
+        if self._coalescer is not None:
+            yield self
+            return
+        window = settings.integration_batch_window_ms if window_ms is None else window_ms
+        coalescer = BatchCoalescer(
+            self,
+            window_sec=max(float(window or 0), 0.0) / 1000.0,
+            max_size=max_size or settings.integration_batch_max_size,
+        )
+        self._coalescer = coalescer
+        try:
+            yield self
+        finally:
+            self._coalescer = None
+            await coalescer.drain()
+
+    def _method_url(self, path: str) -> str:
+        return APIClient.method_url(self.connected_integration_id, path)
+
     @retry(
         wait=wait_exponential(min=0.2, max=5),
         stop=stop_after_attempt(3),
         retry=retry_if_exception(_is_retryable_regos_error),
         reraise=True,
     )
-    async def call(self, path: str, body: Any, response_model: Type[T]) -> T:
+    async def _call_direct(self, path: str, body: Any, response_model: Type[T]) -> T:
         client = await self._acquire_client()
         return await client.post(
-            method_path=path, data=body, response_model=response_model
+            method_path=path,
+            data=body,
+            response_model=response_model,
+            lazy_result=self.lazy_results,
         )
 
     @retry(
@@ -154,6 +202,7 @@ class RegosAPI:
             data=data,
             files=files,
             response_model=response_model,
+            lazy_result=self.lazy_results,
         )
 
     async def close(self) -> None:
@@ -185,148 +234,91 @@ class RegosAPI:
         await self.close()
 
     # ------- Namespaces -------
-    class Common:
-        def __init__(self, api: "RegosAPI"):
-            from core.api.common.sys import SysService
-
-            self.sys = SysService(api)
-
-    class Docs:
-        def __init__(self, api: "RegosAPI"):
-            from core.api.docs.cheque import DocsChequeService
-            from core.api.docs.cash_session import DocCashSessionService
-            from core.api.docs.cheque_operation import DocChequeOperationService
-            from core.api.docs.cheque_payment import DocChequePaymentService
-            from core.api.docs.cash_operation import CashOperationService
-            from core.api.docs.purchase import DocPurchaseService
-            from core.api.docs.purchase_operation import PurchaseOperationService
-            from core.api.docs.wholesale import DocWholeSaleService
-            from core.api.docs.wholesale_operation import WholeSaleOperationService
-            from core.api.docs.inventory import DocInventoryService
-            from core.api.docs.inventory_operation import InventoryOperationService
-            from core.api.docs.movement import DocMovementService
-            from core.api.docs.movement_operation import MovementOperationService
-            from core.api.docs.order_delivery import DocOrderDeliveryService
-            from core.api.docs.doc_contract import DocContractService
-            from core.api.docs.doc_invoice import DocInvoiceService
-            from core.api.docs.invoice_operation import InvoiceOperationService
-
-            # Initialize services
-
-            self.cheque = DocsChequeService(api)
-            self.cash_session = DocCashSessionService(api)
-            self.cheque_operation = DocChequeOperationService(api)
-            self.cheque_payment = DocChequePaymentService(api)
-            self.cash_operation = CashOperationService(api)
-            self.purchase = DocPurchaseService(api)
-            self.purchase_operation = PurchaseOperationService(api)
-            self.wholesale = DocWholeSaleService(api)
-            self.wholesale_operation = WholeSaleOperationService(api)
-            self.inventory = DocInventoryService(api)
-            self.inventory_operation = InventoryOperationService(api)
-            self.movement = DocMovementService(api)
-            self.movement_operation = MovementOperationService(api)
-            self.order_delivery = DocOrderDeliveryService(api)
-            self.doc_contract = DocContractService(api)
-            self.doc_invoice = DocInvoiceService(api)
-            self.invoice_operation = InvoiceOperationService(api)
-
-    class Integrations:
-        def __init__(self, api: "RegosAPI"):
-            from core.api.integrations.connected_integration import (
-                ConnectedIntegrationService,
-            )
-            from core.api.integrations.connected_integration_setting import (
-                ConnectedIntegrationSettingService,
-            )
-
-            self.connected_integration = ConnectedIntegrationService(api)
-            self.connected_integration_setting = ConnectedIntegrationSettingService(api)
-
-    class Crm:
-        def __init__(self, api: "RegosAPI"):
-            from core.api.crm.channel import ChannelService
-            from core.api.crm.client import ClientService
-            from core.api.crm.deal import DealService
-            from core.api.crm.deal_type import DealTypeService
-            from core.api.crm.lead import LeadService
-            from core.api.crm.pipeline import PipelineService
-            from core.api.crm.project_task import ProjectTaskService
-            from core.api.crm.ticket import TicketService
-
-            self.channel = ChannelService(api)
-            self.client = ClientService(api)
-            self.deal = DealService(api)
-            self.deal_type = DealTypeService(api)
-            self.lead = LeadService(api)
-            self.pipeline = PipelineService(api)
-            self.project_task = ProjectTaskService(api)
-            self.ticket = TicketService(api)
-
-    class Chat:
-        def __init__(self, api: "RegosAPI"):
-            from core.api.chat.chat import ChatService
-            from core.api.chat.chat_message import ChatMessageService
-            from core.api.chat.quick_reply import QuickReplyService
-
-            self.chat = ChatService(api)
-            self.chat_message = ChatMessageService(api)
-            self.quick_reply = QuickReplyService(api)
-
-    class Files:
-        def __init__(self, api: "RegosAPI"):
-            from core.api.files.file import FileService
-
-            self.file = FileService(api)
-
-    class Reports:
-        def __init__(self, api: "RegosAPI"):
-            from core.api.reports.retail_report import RetailReportService
-
-            self.retail_report = RetailReportService(api)
-
-    class References:
-        def __init__(self, api: "RegosAPI"):
-
-            from core.api.references.brand import BrandService
-            from core.api.references.currency import CurrencyService
-            from core.api.references.delivery_type import DeliveryTypeService
-            from core.api.references.field import FieldService
-            from core.api.references.firm import FirmService
-            from core.api.references.item import ItemService
-            from core.api.references.item_group import ItemGroupService
-            from core.api.references.partner import PartnerService
-            from core.api.references.retail_customer import RetailCustomerService
-            from core.api.references.stock import StockService
-            from core.api.references.item_price import ItemPriceService
-            from core.api.references.item_operation import ItemOperationService
-            from core.api.references.price_type import PriceTypeService
-            from core.api.references.operating_cash import OperatingCashService 
-            from core.api.references.retail_card import RetailCardService
-
-            self.brand = BrandService(api)
-            self.currency = CurrencyService(api)
-            self.delivery_type = DeliveryTypeService(api)
-            self.field = FieldService(api)
-            self.firm = FirmService(api)
-            self.retail_customer = RetailCustomerService(api)
-            self.item = ItemService(api)
-            self.item_group = ItemGroupService(api)
-            self.stock = StockService(api)
-            self.item_price = ItemPriceService(api)
-            self.item_operation = ItemOperationService(api)
-            self.price_type = PriceTypeService(api)
-            self.partner = PartnerService(api)
-            self.operating_cash = OperatingCashService(api)
-            self.retail_card = RetailCardService(api)
-
-    class Rbac:
-        def __init__(self, api: "RegosAPI"):
-            from core.api.rbac.user import UserService
-            from core.api.rbac.work_attendance import WorkAttendanceService
-
-            self.user = UserService(api)
-            self.work_attendance = WorkAttendanceService(api)
+    class Common(ServiceNamespace):
+        sys = LazyService("core.api.common.sys", "SysService")
+
+    common = LazyNamespace(Common)
+
+    class Docs(ServiceNamespace):
+        cheque = LazyService("core.api.docs.cheque", "DocsChequeService")
+        cash_session = LazyService("core.api.docs.cash_session", "DocCashSessionService")
+        cheque_operation = LazyService("core.api.docs.cheque_operation", "DocChequeOperationService")
+        cheque_payment = LazyService("core.api.docs.cheque_payment", "DocChequePaymentService")
+        cash_operation = LazyService("core.api.docs.cash_operation", "CashOperationService")
+        purchase = LazyService("core.api.docs.purchase", "DocPurchaseService")
+        purchase_operation = LazyService("core.api.docs.purchase_operation", "PurchaseOperationService")
+        wholesale = LazyService("core.api.docs.wholesale", "DocWholeSaleService")
+        wholesale_operation = LazyService("core.api.docs.wholesale_operation", "WholeSaleOperationService")
+        inventory = LazyService("core.api.docs.inventory", "DocInventoryService")
+        inventory_operation = LazyService("core.api.docs.inventory_operation", "InventoryOperationService")
+        movement = LazyService("core.api.docs.movement", "DocMovementService")
+        movement_operation = LazyService("core.api.docs.movement_operation", "MovementOperationService")
+        order_delivery = LazyService("core.api.docs.order_delivery", "DocOrderDeliveryService")
+        doc_contract = LazyService("core.api.docs.doc_contract", "DocContractService")
+        doc_invoice = LazyService("core.api.docs.doc_invoice", "DocInvoiceService")
+        invoice_operation = LazyService("core.api.docs.invoice_operation", "InvoiceOperationService")
+
+    docs = LazyNamespace(Docs)
+
+    class Integrations(ServiceNamespace):
+        connected_integration = LazyService("core.api.integrations.connected_integration", "ConnectedIntegrationService")
+        connected_integration_setting = LazyService("core.api.integrations.connected_integration_setting", "ConnectedIntegrationSettingService")
+
+    integrations = LazyNamespace(Integrations)
+
+    class Crm(ServiceNamespace):
+        channel = LazyService("core.api.crm.channel", "ChannelService")
+        client = LazyService("core.api.crm.client", "ClientService")
+        deal = LazyService("core.api.crm.deal", "DealService")
+        deal_type = LazyService("core.api.crm.deal_type", "DealTypeService")
+        lead = LazyService("core.api.crm.lead", "LeadService")
+        pipeline = LazyService("core.api.crm.pipeline", "PipelineService")
+        project_task = LazyService("core.api.crm.project_task", "ProjectTaskService")
+        ticket = LazyService("core.api.crm.ticket", "TicketService")
+
+    crm = LazyNamespace(Crm)
+
+    class Chat(ServiceNamespace):
+        chat = LazyService("core.api.chat.chat", "ChatService")
+        chat_message = LazyService("core.api.chat.chat_message", "ChatMessageService")
+        quick_reply = LazyService("core.api.chat.quick_reply", "QuickReplyService")
+
+    chat = LazyNamespace(Chat)
+
+    class Files(ServiceNamespace):
+        file = LazyService("core.api.files.file", "FileService")
+
+    files = LazyNamespace(Files)
+
+    class Reports(ServiceNamespace):
+        retail_report = LazyService("core.api.reports.retail_report", "RetailReportService")
+
+    reports = LazyNamespace(Reports)
+
+    class References(ServiceNamespace):
+        brand = LazyService("core.api.references.brand", "BrandService")
+        currency = LazyService("core.api.references.currency", "CurrencyService")
+        delivery_type = LazyService("core.api.references.delivery_type", "DeliveryTypeService")
+        field = LazyService("core.api.references.field", "FieldService")
+        firm = LazyService("core.api.references.firm", "FirmService")
+        retail_customer = LazyService("core.api.references.retail_customer", "RetailCustomerService")
+        item = LazyService("core.api.references.item", "ItemService")
+        item_group = LazyService("core.api.references.item_group", "ItemGroupService")
+        stock = LazyService("core.api.references.stock", "StockService")
+        item_price = LazyService("core.api.references.item_price", "ItemPriceService")
+        item_operation = LazyService("core.api.references.item_operation", "ItemOperationService")
+        price_type = LazyService("core.api.references.price_type", "PriceTypeService")
+        partner = LazyService("core.api.references.partner", "PartnerService")
+        operating_cash = LazyService("core.api.references.operating_cash", "OperatingCashService")
+        retail_card = LazyService("core.api.references.retail_card", "RetailCardService")
+
+    references = LazyNamespace(References)
+
+    class Rbac(ServiceNamespace):
+        user = LazyService("core.api.rbac.user", "UserService")
+        work_attendance = LazyService("core.api.rbac.work_attendance", "WorkAttendanceService")
+
+    rbac = LazyNamespace(Rbac)
 
     class Batch:
         def __init__(self, api: "RegosAPI"):
@@ -336,3 +328,6 @@ class RegosAPI:
             return await self._service.run(req)
 
         # add helpers (map/result/etc.) here if you want them reachable via router
+
+
+install_generated_services(RegosAPI)
@@ -5,7 +5,7 @@ import asyncio
 import hashlib
 import json
 import time
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 import httpx
 
@@ -15,16 +15,84 @@ from core.redis import redis_ops as SHARED_REDIS
 
 logger = setup_logger("regos_oauth")
 
+# Повтор фоновой подмены токена после ошибки (пока текущий токен ещё действует)
+_REFRESH_RETRY_SEC = 5.0
+
+
+def _token_lifetime(expires_in: int) -> int:
+    # небольшой запас по времени
+    skew = min(60, max(0, int(expires_in * 0.1)))
+    return max(1, expires_in - skew)
+
+
+class _SharedToken:
+    """
+    Токен одного (token_url, client_id, scope) на весь процесс.
+
+    Сам токен общий для всех event loop; задачи получения и таймеры фоновой
+    подмены — свои у каждого loop (ключ id(loop)).
+    """
+
+    __slots__ = ("token", "expire_at", "lifetime", "inflight", "refreshers")
+
+    def __init__(self) -> None:
+        self.token: Optional[str] = None
+        self.expire_at: float = 0.0
+        self.lifetime: float = 0.0
+        self.inflight: Dict[int, asyncio.Task] = {}
+        self.refreshers: Dict[int, Tuple[asyncio.AbstractEventLoop, asyncio.TimerHandle]] = {}
+
+    def get(self) -> Optional[str]:
+        if self.token and time.time() < self.expire_at:
+            return self.token
+        return None
+
+    def set(self, token: str, ttl: float) -> None:
+        self.token = token
+        self.expire_at = time.time() + max(1.0, ttl)
+        self.lifetime = max(1.0, ttl)
+
+    def refresh_delay(self) -> float:
+        # подменяем заранее: за oauth_refresh_ahead_sec до истечения, но не раньше середины срока
+        ahead = min(float(settings.oauth_refresh_ahead_sec), self.lifetime / 2)
+        return max(0.0, self.expire_at - time.time() - ahead)
+
+
+_SHARED_TOKENS: Dict[Tuple[str, str, str], _SharedToken] = {}
+
+
+def _shared_token(token_url: str, client_id: str, scope: str) -> _SharedToken:
+    key = (token_url, client_id, scope)
+    shared = _SHARED_TOKENS.get(key)
+    if shared is None:
+        shared = _SHARED_TOKENS.setdefault(key, _SharedToken())
+    return shared
+
+
+def stop_token_refresh() -> None:
+    """Снять таймеры фоновой подмены токенов (shutdown)."""
+    for shared in _SHARED_TOKENS.values():
+        for _loop, handle in shared.refreshers.values():
+            handle.cancel()
+        shared.refreshers.clear()
+        for task in shared.inflight.values():
+            task.cancel()
+        shared.inflight.clear()
+
 
 class RegosOAuthProvider:
     """
     OAuth2 Client Credentials для REGOS c кэшированием access_token:
-    - In-memory кэш (всегда)
+    - Общий на процесс кэш по (token_url, client_id, scope) — провайдеры разных
+      APIClient видят один и тот же токен
     - Redis кэш (если включён)
-    - Защита от догоняющего запроса через Redis-лок или процессный лок.
+    - Защита от догоняющего запроса: одна задача получения на event loop и
+      Redis-лок между процессами
+    - Фоновая подмена токена незадолго до истечения, так что в штатном режиме
+      вызывающие получают токен из памяти без ожидания.
 
     Протокол получения токена минимальный:
-    POST x-www-form-urlencoded: grant_type, client_id, client_secret
+    POST x-www-form-urlencoded: grant_type, client_id, client_secret[, scope]
     """
 
     def __init__(
@@ -33,6 +101,7 @@ class RegosOAuthProvider:
         token_url: Optional[str] = None,
         client_id: Optional[str] = None,
         client_secret: Optional[str] = None,
+        scope: Optional[str] = None,
         http_client: Optional[httpx.AsyncClient] = None,
         http_timeout: int = 30,
         redis_backend=None,
@@ -41,56 +110,50 @@ class RegosOAuthProvider:
         self._token_url = token_url or f"{settings.oauth_endpoint.rstrip('/')}/oauth/token"
         self._client_id = client_id or settings.oauth_client_id
         self._client_secret = client_secret or settings.oauth_secret
+        self._scope = scope or ""
 
         # HTTP-клиент: реюзаем внешний, чтобы не плодить соединения
         self._http = http_client or httpx.AsyncClient(timeout=http_timeout)
         self._owns_http = http_client is None
+        # таймаут задаём и на запрос: внешний (общий) клиент может иметь другой
+        self._http_timeout = http_timeout
 
         # Redis (опционально)
         self._redis = redis_backend or SHARED_REDIS
 
-        # Ключи в Redis зависят от token_url + client_id
-        digest = hashlib.sha1(f"{self._token_url}|{self._client_id}".encode()).hexdigest()
+        # Ключи в Redis зависят от token_url + client_id (+ scope, если задан)
+        key_source = f"{self._token_url}|{self._client_id}"
+        if self._scope:
+            key_source = f"{key_source}|{self._scope}"
+        digest = hashlib.sha1(key_source.encode()).hexdigest()
         self._redis_key_token = f"oauth:cc:{settings.environment}:{digest}:token"
         self._redis_key_lock = f"oauth:cc:{settings.environment}:{digest}:lock"
 
-        # Лок на процесс на случай отсутствия Redis
-        self._process_lock = asyncio.Lock()
-
-        # In-memory кэш
-        self._mem_token: Optional[str] = None
-        self._mem_expire_at: float = 0.0
-
-    # ---------- in-memory кэш ----------
-
-    def _mem_get(self) -> Optional[str]:
-        if self._mem_token and time.time() < self._mem_expire_at:
-            return self._mem_token
-        return None
-
-    def _mem_set(self, token: str, expires_in: int) -> None:
-        # небольшой запас по времени
-        skew = min(60, max(0, int(expires_in * 0.1)))
-        self._mem_token = token
-        self._mem_expire_at = time.time() + max(1, expires_in - skew)
+        # Общий на процесс кэш
+        self._shared = _shared_token(self._token_url, self._client_id, self._scope)
 
     # ---------- redis кэш ----------
 
-    async def _redis_get(self) -> Optional[str]:
+    async def _redis_get(self) -> Tuple[Optional[str], float]:
+        """Токен из Redis и его остаток жизни в секундах."""
         if not self._redis:
-            return None
+            return None, 0.0
         try:
-            return await self._redis.get(self._redis_key_token)
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.get(self._redis_key_token)
+            pipe.pttl(self._redis_key_token)
+            token, pttl = await pipe.execute()
         except Exception:
-            return None
+            return None, 0.0
+        if not token:
+            return None, 0.0
+        return token, max(0.0, float(pttl or 0) / 1000.0)
 
-    async def _redis_set(self, token: str, expires_in: int) -> None:
+    async def _redis_set(self, token: str, lifetime: int) -> None:
         if not self._redis:
             return
-        skew = min(60, max(0, int(expires_in * 0.1)))
-        ttl = max(1, expires_in - skew)
         try:
-            await self._redis.set(self._redis_key_token, token, ex=ttl)
+            await self._redis.set(self._redis_key_token, token, ex=lifetime)
         except Exception:
             pass
 
@@ -98,27 +161,22 @@ class RegosOAuthProvider:
 
     async def _acquire_lock(self):
         if not self._redis:
-            await self._process_lock.acquire()
-            return ("process", None)
+            # внутри процесса догоняющие уже собраны в одну задачу на loop
+            return None
 
         lock = self._redis.lock(self._redis_key_lock, timeout=30, blocking_timeout=10)
         ok = await lock.acquire()
         if not ok:
             raise TimeoutError("Не удалось получить блокировку при запросе токена")
-        return ("redis", lock)
-
-    async def _release_lock(self, token) -> None:
-        kind, lock = token
-        if kind == "redis" and lock:
-            try:
-                await lock.release()
-            except Exception:
-                pass
-        elif kind == "process":
-            try:
-                self._process_lock.release()
-            except Exception:
-                pass
+        return lock
+
+    async def _release_lock(self, lock) -> None:
+        if lock is None:
+            return
+        try:
+            await lock.release()
+        except Exception:
+            pass
 
     # ---------- сетевой запрос токена ----------
 
@@ -132,9 +190,11 @@ class RegosOAuthProvider:
             "client_id": self._client_id,
             "client_secret": self._client_secret,
         }
+        if self._scope:
+            form["scope"] = self._scope
 
         logger.info("OAuth CC: POST %s", self._token_url)
-        resp = await self._http.post(self._token_url, headers=headers, data=form)
+        resp = await self._http.post(self._token_url, headers=headers, data=form, timeout=self._http_timeout)
         resp.raise_for_status()
 
         payload = resp.json()
@@ -144,38 +204,100 @@ class RegosOAuthProvider:
             raise ValueError(f"В ответе нет access_token: {json.dumps(payload, ensure_ascii=False)[:300]}")
         return token, expires_in
 
-    # ---------- публичный API ----------
+    # ---------- обновление общего токена ----------
 
-    async def get_access_token(self, *, force_refresh: bool = False) -> str:
-        # 1) память
-        if not force_refresh:
-            t = self._mem_get()
-            if t:
-                return t
+    def _fresh_enough(self, ttl: float) -> bool:
+        # токен из Redis, который и сам вот-вот истечёт, не принимаем
+        return ttl > min(float(settings.oauth_refresh_ahead_sec), 30.0)
 
-        # 2) redis
-        if not force_refresh:
-            t = await self._redis_get()
-            if t:
-                # мы не знаем точный остаток TTL, но сохраним в память на короткий срок
-                self._mem_set(t, expires_in=300)
-                return t
+    async def _refresh(self, stale: Optional[str]) -> str:
+        """Принять свежий токен из Redis (не `stale`) или получить новый под локом."""
+        shared = self._shared
+        token, ttl = await self._redis_get()
+        if token and token != stale and self._fresh_enough(ttl):
+            shared.set(token, ttl)
+            return token
 
-        # 3) сетевой фетч под локом
-        lk = await self._acquire_lock()
+        lock = await self._acquire_lock()
         try:
-            if not force_refresh:
-                t = await self._redis_get()
-                if t:
-                    self._mem_set(t, expires_in=300)
-                    return t
+            # пока ждали лок, токен мог обновить другой процесс
+            token, ttl = await self._redis_get()
+            if token and token != stale and self._fresh_enough(ttl):
+                shared.set(token, ttl)
+                return token
 
             token, expires_in = await self._fetch_token()
-            self._mem_set(token, expires_in)
-            await self._redis_set(token, expires_in)
+            lifetime = _token_lifetime(expires_in)
+            shared.set(token, lifetime)
+            await self._redis_set(token, lifetime)
             return token
         finally:
-            await self._release_lock(lk)
+            await self._release_lock(lock)
+
+    async def _refresh_shared(self, stale: Optional[str]) -> str:
+        loop = asyncio.get_running_loop()
+        inflight = self._shared.inflight
+        task = inflight.get(id(loop))
+        if task is None or task.done():
+            task = loop.create_task(self._refresh(stale))
+            inflight[id(loop)] = task
+            task.add_done_callback(lambda done: self._refresh_done(loop, done))
+        return await asyncio.shield(task)
+
+    def _refresh_done(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task) -> None:
+        inflight = self._shared.inflight
+        if inflight.get(id(loop)) is task:
+            inflight.pop(id(loop), None)
+        if task.cancelled():
+            return
+        if task.exception() is None:
+            self._schedule_refresh(loop)
+
+    def _schedule_refresh(self, loop: asyncio.AbstractEventLoop, delay: Optional[float] = None) -> None:
+        refreshers = self._shared.refreshers
+        for loop_id, (owner, _handle) in list(refreshers.items()):
+            if owner.is_closed():
+                refreshers.pop(loop_id, None)
+        current = refreshers.pop(id(loop), None)
+        if current is not None:
+            current[1].cancel()
+        if delay is None:
+            delay = self._shared.refresh_delay()
+        handle = loop.call_later(delay, self._start_background_refresh, loop)
+        refreshers[id(loop)] = (loop, handle)
+
+    def _start_background_refresh(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._shared.refreshers.pop(id(loop), None)
+        if self._shared.inflight.get(id(loop)) is not None:
+            return
+        loop.create_task(self._background_refresh(loop))
+
+    async def _background_refresh(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            await self._refresh_shared(stale=self._shared.token)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.warning("OAuth CC: фоновое обновление токена не удалось: %s", error)
+            if self._shared.get():
+                self._schedule_refresh(loop, delay=_REFRESH_RETRY_SEC)
+
+    # ---------- публичный API ----------
+
+    async def get_access_token(self, *, force_refresh: bool = False) -> str:
+        # 1) общий кэш процесса — штатный путь без ожидания
+        if not force_refresh:
+            t = self._shared.get()
+            if t:
+                return t
+
+        # 2) redis / сетевой фетч: одна задача на loop, между процессами — Redis-лок
+        stale = self._shared.token
+        token = await self._refresh_shared(stale)
+        if force_refresh and token == stale:
+            # присоединились к задаче, начатой до того, как токен отвергли
+            token = await self._refresh_shared(stale)
+        return token
 
     async def aclose(self) -> None:
         if self._owns_http:
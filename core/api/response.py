@@ -0,0 +1,184 @@
+# core/api/response.py
+"""Разбор ответов REGOS API.
+
+Быстрый путь — `model_validate_json` прямо по байтам ответа (парсер pydantic-core,
+без промежуточного dict). Ленивый режим — конверт ответа валидируется сразу, а
+элементы списка `result` только при обращении к ним: для больших страниц
+`Item/GetExt`, `Cheque/Get` и т.п., где вызывающему нужна часть строк или
+строки обрабатываются потоково.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import types
+import typing
+from typing import Any, Dict, Iterator, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+TResponse = TypeVar("TResponse", bound=BaseModel)
+
+_LIST_ITEM_MODELS: Dict[type, Optional[type]] = {}
+_MISSING = object()
+
+
+def json_loads(raw: bytes | str) -> Any:
+    """json.loads через orjson, если он установлен."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class LazyModelList(list):
+    """
+    list, элементы которого хранятся сырыми dict и валидируются в модель при первом
+    обращении (индекс, срез, итерация). Провалидированный элемент кешируется на месте.
+    """
+
+    __slots__ = ("_item_model",)
+
+    def __init__(self, raw_items: list, item_model: Type[BaseModel]):
+        super().__init__(raw_items)
+        self._item_model = item_model
+
+    def _resolve(self, index: int) -> Any:
+        value = list.__getitem__(self, index)
+        if isinstance(value, dict):
+            value = self._item_model.model_validate(value)
+            list.__setitem__(self, index, value)
+        return value
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._resolve(i) for i in range(*index.indices(len(self)))]
+        return self._resolve(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(len(self)):
+            yield self._resolve(index)
+
+    def __reversed__(self) -> Iterator[Any]:
+        for index in range(len(self) - 1, -1, -1):
+            yield self._resolve(index)
+
+    def __contains__(self, value: Any) -> bool:
+        return any(item == value for item in self)
+
+    def __eq__(self, other: Any) -> bool:
+        return list(self) == other
+
+    def __ne__(self, other: Any) -> bool:
+        return not self.__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"LazyModelList({self._item_model.__name__}, size={len(self)})"
+
+    def index(self, value: Any, *args: Any) -> int:
+        return self.materialize().index(value, *args)
+
+    def count(self, value: Any) -> int:
+        return self.materialize().count(value)
+
+    def pop(self, index: int = -1) -> Any:
+        value = self._resolve(index)
+        list.pop(self, index)
+        return value
+
+    def copy(self) -> list:
+        return self.materialize()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "LazyModelList":
+        # копия без валидации: сырые dict остаются сырыми
+        raw_items = copy.deepcopy(list(list.__iter__(self)), memo)
+        return LazyModelList(raw_items, self._item_model)
+
+    def raw(self, index: int) -> Any:
+        """Элемент как есть (dict, если ещё не провалидирован)."""
+        return list.__getitem__(self, index)
+
+    def materialize(self) -> list:
+        """Провалидировать все элементы и вернуть обычный list."""
+        return [self._resolve(index) for index in range(len(self))]
+
+
+def _list_item_model(annotation: Any) -> Optional[type]:
+    origin = typing.get_origin(annotation)
+    if origin is list:
+        args = typing.get_args(annotation)
+        if args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+            return args[0]
+        return None
+    if origin is typing.Union or origin is types.UnionType:
+        for arg in typing.get_args(annotation):
+            item_model = _list_item_model(arg)
+            if item_model is not None:
+                return item_model
+    return None
+
+
+def result_item_model(response_model: type) -> Optional[type]:
+    """Модель элемента списка `result` у конверта ответа (или None)."""
+    item_model = _LIST_ITEM_MODELS.get(response_model, _MISSING)
+    if item_model is _MISSING:
+        field = getattr(response_model, "model_fields", {}).get("result")
+        if field is not None and isinstance(field.annotation, (str, typing.ForwardRef)):
+            # сгенерированные схемы импортируют Error после моделей: до первой валидации
+            # аннотация — ForwardRef, разрешаем её сами
+            try:
+                response_model.model_rebuild()
+            except Exception:
+                return None
+            field = response_model.model_fields.get("result")
+            if isinstance(field.annotation, (str, typing.ForwardRef)):
+                return None
+        item_model = _list_item_model(field.annotation) if field is not None else None
+        _LIST_ITEM_MODELS[response_model] = item_model
+    return item_model
+
+
+def parse_response(
+    raw: bytes,
+    response_model: Type[TResponse],
+    *,
+    lazy: bool = False,
+) -> TResponse:
+    """Разобрать тело ответа в модель; `lazy=True` — ленивая валидация `result`."""
+    item_model = result_item_model(response_model) if lazy else None
+    if item_model is None:
+        return response_model.model_validate_json(raw)
+
+    return parse_response_data(json_loads(raw), response_model, lazy=True)
+
+
+def parse_response_data(
+    parsed: Any,
+    response_model: Type[TResponse],
+    *,
+    lazy: bool = False,
+) -> TResponse:
+    """То же для уже разобранного JSON (например, шаг ответа `batch`)."""
+    item_model = result_item_model(response_model) if lazy else None
+    raw_result = parsed.get("result") if item_model is not None and isinstance(parsed, dict) else None
+    if not isinstance(raw_result, list):
+        return response_model.model_validate(parsed)
+    envelope = response_model.model_validate({**parsed, "result": None})
+    envelope.__dict__["result"] = LazyModelList(raw_result, item_model)
+    return envelope
+
+
+__all__ = [
+    "LazyModelList",
+    "json_loads",
+    "parse_response",
+    "parse_response_data",
+    "result_item_model",
+]
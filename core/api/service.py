@@ -6,6 +6,26 @@ from __future__ import annotations
 from typing import Any
 
 from pydantic import BaseModel
+from pydantic_core import to_json
+
+from core.api.singleflight import (
+    is_read_only_path,
+    regos_read_singleflight,
+    singleflight_enabled,
+)
+
+
+class JsonPayload(bytes):
+    """Готовое JSON-тело запроса: транспорт отправляет байты как есть."""
+
+    @classmethod
+    def dump(cls, data: Any) -> 'JsonPayload':
+        # Один проход: модели (и вложенные в list/dict) сериализуются своими
+        # сериализаторами pydantic-core (exclude_none, by_alias, json_encoders
+        # модели — Decimal -> float), обычные dict/list — как есть.
+        if isinstance(data, JsonPayload):
+            return data
+        return cls(to_json(data, by_alias=True, exclude_none=True))
 
 
 class RegosAPIService:
@@ -15,17 +35,22 @@ class RegosAPIService:
         self.api = api
 
     @classmethod
-    def _payload(cls, data: Any) -> Any:
-        if isinstance(data, BaseModel):
-            return data.model_dump(mode='json', exclude_none=True, by_alias=True)
-        if isinstance(data, list):
-            return [cls._payload(item) for item in data]
-        if isinstance(data, dict):
-            return {key: cls._payload(value) for key, value in data.items()}
-        return data
+    def _payload(cls, data: Any) -> JsonPayload:
+        return JsonPayload.dump(data)
 
     async def _call(self, path: str, body: Any, response_model):
-        return await self.api.call(path, self._payload(body), response_model)
+        payload = self._payload(body)
+        if not (singleflight_enabled() and is_read_only_path(path)):
+            return await self.api.call(path, payload, response_model)
+        # одинаковые одновременные чтения делят один запрос (core.api.singleflight)
+        api_key = getattr(self.api, '_shared_key', None) or getattr(
+            self.api, 'connected_integration_id', id(self.api)
+        )
+        lazy = bool(getattr(self.api, 'lazy_results', False))
+        return await regos_read_singleflight.do(
+            (api_key, path, response_model, lazy, payload),
+            lambda: self.api.call(path, payload, response_model),
+        )
 
     def _request_model(self, method_name: str):
         model = self.REQUEST_MODELS.get(method_name)
@@ -46,4 +71,4 @@ class RegosAPIService:
         return result[0] if result else None
 
 
-__all__ = ['RegosAPIService']
+__all__ = ['JsonPayload', 'RegosAPIService']
@@ -0,0 +1,90 @@
+# core/api/singleflight.py
+"""Singleflight для чтений REGOS API.
+
+Одинаковые (интеграция, метод, payload) чтения, идущие одновременно, делят один
+HTTP-запрос. Запрос выполняется отдельной задачей, так что отмена одного из
+ожидающих не обрывает его для остальных.
+
+Инициатор получает разобранный ответ, каждый присоединившийся — свою глубокую
+копию: ответ можно менять, не задевая других участников.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from pydantic import BaseModel
+
+from config.settings import settings
+
+# Действия, которые ничего не меняют на стороне REGOS
+_READ_ONLY_ACTIONS = frozenset({"Search", "Count", "Counts"})
+
+
+def is_read_only_path(path: str) -> bool:
+    action = str(path or "").rstrip("/").rsplit("/", 1)[-1]
+    return action.startswith("Get") or action in _READ_ONLY_ACTIONS
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: Dict[Tuple[int, Hashable], Tuple[asyncio.Task, list]] = {}
+        self.calls = 0  # все вызовы через do()
+        self.hits = 0  # вызовы, присоединившиеся к уже идущему запросу
+        self.merges = 0  # запросы, обслужившие больше одного вызова
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        self.calls += 1
+        flight = self._inflight.get(flight_key)
+        if flight is not None:
+            task, followers = flight
+            self.hits += 1
+            if not followers:
+                self.merges += 1
+            followers.append(None)
+            return _private_copy(await asyncio.shield(task))
+
+        task = loop.create_task(func())
+        self._inflight[flight_key] = (task, [])
+        task.add_done_callback(lambda done: self._finish(flight_key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, flight_key: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        current = self._inflight.get(flight_key)
+        if current is not None and current[0] is task:
+            self._inflight.pop(flight_key, None)
+        if not task.cancelled():
+            task.exception()  # помечаем как полученное, если все ожидающие отменились
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "hits": self.hits,
+            "merges": self.merges,
+            "inflight": len(self._inflight),
+        }
+
+
+def _private_copy(result: Any) -> Any:
+    if isinstance(result, BaseModel):
+        return result.model_copy(deep=True)
+    return copy.deepcopy(result)
+
+
+regos_read_singleflight = SingleFlight()
+
+
+def singleflight_enabled() -> bool:
+    return bool(settings.integration_singleflight)
+
+
+__all__ = [
+    "SingleFlight",
+    "is_read_only_path",
+    "regos_read_singleflight",
+    "singleflight_enabled",
+]
@@ -79,6 +79,9 @@ class RedisOps:
     def lock(self, *args: Any, **kwargs: Any):
         return _require_redis_client().lock(*args, **kwargs)
 
+    def pubsub(self, *args: Any, **kwargs: Any):
+        return _require_redis_client().pubsub(*args, **kwargs)
+
     async def get(self, *args: Any, **kwargs: Any):
         return await _require_redis_client().get(*args, **kwargs)
 
@@ -100,12 +103,19 @@ class RedisOps:
     async def eval(self, *args: Any, **kwargs: Any):
         return await _require_redis_client().eval(*args, **kwargs)
 
+    def register_script(self, script: str):
+        """Lua-скрипт, вызываемый через EVALSHA (с автоматическим SCRIPT LOAD при NOSCRIPT)."""
+        return _require_redis_client().register_script(script)
+
     async def smembers(self, *args: Any, **kwargs: Any):
         return await _require_redis_client().smembers(*args, **kwargs)
 
     async def srem(self, *args: Any, **kwargs: Any):
         return await _require_redis_client().srem(*args, **kwargs)
 
+    async def hgetall(self, *args: Any, **kwargs: Any):
+        return await _require_redis_client().hgetall(*args, **kwargs)
+
     async def mget(self, *args: Any, **kwargs: Any):
         return await _require_redis_client().mget(*args, **kwargs)
 
@@ -121,6 +131,9 @@ class RedisOps:
     async def xautoclaim(self, *args: Any, **kwargs: Any):
         return await _require_redis_client().xautoclaim(*args, **kwargs)
 
+    async def xclaim(self, *args: Any, **kwargs: Any):
+        return await _require_redis_client().xclaim(*args, **kwargs)
+
     async def xreadgroup(self, *args: Any, **kwargs: Any):
         try:
             return await _require_redis_client().xreadgroup(*args, **kwargs)
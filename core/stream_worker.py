@@ -0,0 +1,673 @@
+"""Shared Redis stream consumer with per-key ordered lanes.
+
+Entries are read from a consumer group and sharded by an ordering key
+(chat, call, deal, ...) onto a fixed number of in-process lanes. Entries with
+the same key always land on the same lane and are handled one after another,
+while different keys run in parallel. Retries, dead-lettering, claiming of
+stale entries and heartbeats live here so integrations only plug in a handler.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+import zlib
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.logger import setup_logger
+from core.redis import (
+    redis_acquire_lock,
+    redis_error_contains,
+    redis_expire_if_due,
+    redis_is_enabled,
+    redis_ops,
+    redis_release_lock,
+    redis_stream_ack_delete,
+    redis_stream_add_with_ttl,
+    redis_stream_group_create_with_ttl,
+    redis_ttl_seconds,
+)
+
+logger = setup_logger("stream_worker")
+
+StreamFields = Dict[str, str]
+StreamHandler = Callable[[str, StreamFields], Awaitable[None]]
+OrderingKeyFn = Callable[[StreamFields], Optional[str]]
+DeadLetterHook = Callable[[StreamFields, BaseException], Awaitable[None]]
+HeartbeatHook = Callable[[int], Awaitable[None]]
+
+_ENQUEUE_DEDUPE_LUA = """
+local ok = redis.call('set', KEYS[1], '1', 'EX', ARGV[1], 'NX')
+if not ok then
+  return 0
+end
+redis.call('xadd', KEYS[2], 'MAXLEN', '~', ARGV[2], '*', unpack(ARGV, 5))
+if ARGV[4] == '1' then
+  redis.call('expire', KEYS[2], ARGV[3])
+end
+return 1
+"""
+
+
+class StreamEntryDrop(Exception):
+    """Acknowledge the entry without retrying it."""
+
+
+class StreamEntryRetry(Exception):
+    """Retry the entry in place without spending a retry attempt (transient contention)."""
+
+
+class StreamEntryDeadLetter(Exception):
+    """Move the entry to the DLQ right away."""
+
+
+@dataclass(frozen=True)
+class StreamWorkerConfig:
+    name: str
+    stream_key: str
+    group: str
+    dlq_stream_key: Optional[str] = None
+    workers: int = 1
+    lanes: int = 1
+    lane_queue_size: int = 100
+    batch_size: int = 50
+    read_block_ms: int = 5000
+    min_idle_ms: int = 60_000
+    claim_interval_sec: int = 30
+    max_retries: int = 3
+    maxlen: int = 100000
+    ttl_sec: int = 24 * 60 * 60
+    # >0 keeps a Redis lock per ordering key so the same key is not handled
+    # by two processes at once. The lock is held while a lane keeps draining
+    # entries of that key and released once the lane goes idle or switches key.
+    key_lock_ttl_sec: int = 0
+    key_lock_wait_sec: float = 10.0
+    key_lock_idle_release_sec: float = 0.5
+    # Contention (StreamEntryRetry, key lock timeout) is retried in place on the
+    # lane, so later entries of the same key keep waiting behind it. Past the
+    # cap the entry goes to the DLQ.
+    max_contention_retries: int = 20
+    contention_retry_delay_sec: float = 0.5
+
+
+def _now_ts() -> int:
+    return int(time.time())
+
+
+def serialize_stream_fields(fields: Dict[str, Any]) -> StreamFields:
+    serialized: StreamFields = {}
+    for key, value in fields.items():
+        if isinstance(value, (dict, list)):
+            serialized[str(key)] = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        elif value is None:
+            serialized[str(key)] = ""
+        else:
+            serialized[str(key)] = str(value)
+    return serialized
+
+
+class RedisStreamWorker:
+    def __init__(
+        self,
+        config: StreamWorkerConfig,
+        handler: StreamHandler,
+        *,
+        ordering_key: Optional[OrderingKeyFn] = None,
+        on_dead_letter: Optional[DeadLetterHook] = None,
+        heartbeat: Optional[HeartbeatHook] = None,
+        instance_id: Optional[str] = None,
+    ) -> None:
+        self.config = config
+        self._handler = handler
+        self._ordering_key = ordering_key
+        self._on_dead_letter = on_dead_letter
+        self._heartbeat = heartbeat
+        self._instance_id = instance_id or uuid.uuid4().hex[:12]
+
+        self._lock = asyncio.Lock()
+        self._reader_tasks: Dict[int, asyncio.Task] = {}
+        self._lane_tasks: Dict[int, asyncio.Task] = {}
+        self._lanes: List[asyncio.Queue] = []
+        # entry_id -> consumer that owns it in the group's PEL
+        self._in_flight: Dict[str, str] = {}
+        self._pending_refresh_task: Optional[asyncio.Task] = None
+        self._round_robin = 0
+        self._group_ready = False
+        self._last_claim_ts = 0
+        self._ttl_touch_ts: Dict[str, int] = {}
+
+    # ------------------------ lifecycle ------------------------
+
+    @property
+    def running_tasks(self) -> int:
+        return sum(1 for task in self._reader_tasks.values() if not task.done())
+
+    async def ensure_started(self, *, ensure_group: bool = True) -> None:
+        if not redis_is_enabled():
+            raise RuntimeError(f"Redis is required for stream worker {self.config.name}")
+        if ensure_group:
+            await self.ensure_group()
+        async with self._lock:
+            lanes = max(int(self.config.lanes), 1)
+            if not self._lanes:
+                queue_size = max(int(self.config.lane_queue_size), 1)
+                self._lanes = [asyncio.Queue(maxsize=queue_size) for _ in range(lanes)]
+            for index in range(lanes):
+                task = self._lane_tasks.get(index)
+                if task and not task.done():
+                    continue
+                self._lane_tasks[index] = asyncio.create_task(
+                    self._lane_loop(index),
+                    name=f"{self.config.name}_lane_{index}",
+                )
+            for index in range(max(int(self.config.workers), 1)):
+                task = self._reader_tasks.get(index)
+                if task and not task.done():
+                    continue
+                self._reader_tasks[index] = asyncio.create_task(
+                    self._reader_loop(index),
+                    name=f"{self.config.name}_stream_{index}",
+                )
+            if self._pending_refresh_task is None or self._pending_refresh_task.done():
+                self._pending_refresh_task = asyncio.create_task(
+                    self._pending_refresh_loop(),
+                    name=f"{self.config.name}_pending_refresh",
+                )
+
+    async def stop(self) -> None:
+        async with self._lock:
+            tasks = list(self._reader_tasks.values()) + list(self._lane_tasks.values())
+            if self._pending_refresh_task is not None:
+                tasks.append(self._pending_refresh_task)
+                self._pending_refresh_task = None
+            self._reader_tasks.clear()
+            self._lane_tasks.clear()
+            self._lanes = []
+            self._in_flight.clear()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception:
+                logger.exception("Error while stopping stream worker: name=%s", self.config.name)
+        self._group_ready = False
+        self._last_claim_ts = 0
+
+    # ------------------------ enqueue ------------------------
+
+    def _resolve_ttl(self, ttl_sec: Optional[int] = None) -> int:
+        return redis_ttl_seconds(ttl_sec if ttl_sec is not None else self.config.ttl_sec)
+
+    async def ensure_group(self, *, force: bool = False) -> None:
+        if self._group_ready and not force:
+            return
+        await redis_stream_group_create_with_ttl(
+            self.config.stream_key,
+            self.config.group,
+            ttl_sec=self._resolve_ttl(),
+            touch_ts_by_key=self._ttl_touch_ts,
+            now_ts=_now_ts(),
+        )
+        self._group_ready = True
+
+    async def enqueue(
+        self,
+        fields: Dict[str, Any],
+        *,
+        stream_key: Optional[str] = None,
+        ttl_sec: Optional[int] = None,
+    ) -> None:
+        await redis_stream_add_with_ttl(
+            stream_key or self.config.stream_key,
+            serialize_stream_fields(fields),
+            maxlen=self.config.maxlen,
+            ttl_sec=self._resolve_ttl(ttl_sec),
+            touch_ts_by_key=self._ttl_touch_ts,
+            now_ts=_now_ts(),
+        )
+
+    async def enqueue_deduped(
+        self,
+        dedupe_key: str,
+        fields: Dict[str, Any],
+        *,
+        dedupe_ttl_sec: int,
+        ttl_sec: Optional[int] = None,
+    ) -> bool:
+        stream_key = self.config.stream_key
+        stream_ttl = self._resolve_ttl(ttl_sec)
+        now_ts = _now_ts()
+        should_touch = (
+            now_ts - int(self._ttl_touch_ts.get(stream_key) or 0)
+            >= min(3600, max(10, stream_ttl // 4))
+        )
+        field_args: List[str] = []
+        for key, value in serialize_stream_fields(fields).items():
+            field_args.extend([key, value])
+        queued = await redis_ops.eval(
+            _ENQUEUE_DEDUPE_LUA,
+            2,
+            dedupe_key,
+            stream_key,
+            str(max(int(dedupe_ttl_sec), 1)),
+            str(self.config.maxlen),
+            str(stream_ttl),
+            "1" if should_touch else "0",
+            *field_args,
+        )
+        if queued and should_touch:
+            self._ttl_touch_ts[stream_key] = now_ts
+        return bool(queued)
+
+    async def enqueue_deduped_many(
+        self,
+        items: Sequence[Tuple[str, Dict[str, Any]]],
+        *,
+        dedupe_ttl_sec: int,
+        ttl_sec: Optional[int] = None,
+    ) -> List[bool]:
+        """Pipelined enqueue_deduped for (dedupe_key, fields) pairs; stream order is kept."""
+        if not items:
+            return []
+        stream_key = self.config.stream_key
+        stream_ttl = self._resolve_ttl(ttl_sec)
+        now_ts = _now_ts()
+        should_touch = (
+            now_ts - int(self._ttl_touch_ts.get(stream_key) or 0)
+            >= min(3600, max(10, stream_ttl // 4))
+        )
+        pipe = redis_ops.pipeline(transaction=False)
+        for dedupe_key, fields in items:
+            field_args: List[str] = []
+            for key, value in serialize_stream_fields(fields).items():
+                field_args.extend([key, value])
+            pipe.eval(
+                _ENQUEUE_DEDUPE_LUA,
+                2,
+                dedupe_key,
+                stream_key,
+                str(max(int(dedupe_ttl_sec), 1)),
+                str(self.config.maxlen),
+                str(stream_ttl),
+                "1" if should_touch else "0",
+                *field_args,
+            )
+        queued = [bool(result) for result in await pipe.execute()]
+        if should_touch and any(queued):
+            self._ttl_touch_ts[stream_key] = now_ts
+        return queued
+
+    # ------------------------ reader ------------------------
+
+    def _lane_index(self, key: Optional[str]) -> int:
+        lanes = len(self._lanes)
+        if lanes <= 1:
+            return 0
+        if key:
+            return zlib.crc32(key.encode("utf-8")) % lanes
+        self._round_robin = (self._round_robin + 1) % lanes
+        return self._round_robin
+
+    def _entry_key(self, fields: StreamFields) -> Optional[str]:
+        if self._ordering_key is None:
+            return None
+        try:
+            key = self._ordering_key(fields)
+        except Exception as error:
+            logger.warning(
+                "Stream ordering key failed: name=%s error=%s",
+                self.config.name,
+                error,
+            )
+            return None
+        return str(key) if key else None
+
+    async def _dispatch(self, entries: List[Tuple[Any, Any]], consumer: str) -> None:
+        for entry_id, fields in entries:
+            entry_id = str(entry_id)
+            if entry_id in self._in_flight:
+                continue
+            fields = fields if isinstance(fields, dict) else {}
+            key = self._entry_key(fields)
+            self._in_flight[entry_id] = consumer
+            # Bounded lanes give backpressure: the reader stops pulling new
+            # entries while the lane for this key is full.
+            await self._lanes[self._lane_index(key)].put((entry_id, fields, key))
+
+    def _lane_room(self) -> int:
+        return sum(max(queue.maxsize - queue.qsize(), 0) for queue in self._lanes)
+
+    def _pending_refresh_interval(self) -> float:
+        # well below min_idle_ms, so entries waiting in a lane never look abandoned
+        return max(min(float(self.config.claim_interval_sec), self.config.min_idle_ms / 3000.0), 1.0)
+
+    async def _pending_refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._pending_refresh_interval())
+            try:
+                await self._refresh_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning(
+                    "Stream pending refresh failed: name=%s error=%s",
+                    self.config.name,
+                    error,
+                )
+
+    async def _refresh_pending(self) -> None:
+        """Reset the idle time of entries this process has read but not finished."""
+        by_consumer: Dict[str, List[str]] = {}
+        for entry_id, consumer in list(self._in_flight.items()):
+            by_consumer.setdefault(consumer, []).append(entry_id)
+        for consumer, entry_ids in by_consumer.items():
+            for start in range(0, len(entry_ids), 500):
+                await redis_ops.xclaim(
+                    self.config.stream_key,
+                    self.config.group,
+                    consumer,
+                    min_idle_time=0,
+                    message_ids=entry_ids[start:start + 500],
+                    justid=True,
+                )
+
+    async def _claim_stale_entries(self, consumer: str) -> List[Tuple[Any, Any]]:
+        try:
+            claimed_raw = await redis_ops.xautoclaim(
+                self.config.stream_key,
+                self.config.group,
+                consumer,
+                min_idle_time=self.config.min_idle_ms,
+                start_id="0-0",
+                count=self.config.batch_size,
+            )
+        except Exception as error:
+            if redis_error_contains(error, "NOGROUP"):
+                await self.ensure_group(force=True)
+                return []
+            raise
+        if isinstance(claimed_raw, (list, tuple)) and len(claimed_raw) >= 2:
+            return list(claimed_raw[1] or [])
+        return []
+
+    async def _reader_loop(self, worker_index: int) -> None:
+        stream_key = self.config.stream_key
+        consumer = f"{self._instance_id}:{self.config.name}:{worker_index}"
+        logger.info("Stream worker started: name=%s index=%s", self.config.name, worker_index)
+        try:
+            await self.ensure_group()
+            while True:
+                try:
+                    if self._heartbeat is not None:
+                        await self._heartbeat(worker_index)
+                    await redis_expire_if_due(
+                        stream_key,
+                        self._resolve_ttl(),
+                        self._ttl_touch_ts,
+                        _now_ts(),
+                        min_refresh_sec=10,
+                    )
+                    now_ts = _now_ts()
+                    if now_ts - self._last_claim_ts >= self.config.claim_interval_sec:
+                        self._last_claim_ts = now_ts
+                        await self._dispatch(await self._claim_stale_entries(consumer), consumer)
+
+                    # read no more than the lanes can take right away
+                    room = min(int(self.config.batch_size), self._lane_room())
+                    if room <= 0:
+                        await asyncio.sleep(0.05)
+                        continue
+                    try:
+                        records = await redis_ops.xreadgroup(
+                            groupname=self.config.group,
+                            consumername=consumer,
+                            streams={stream_key: ">"},
+                            count=room,
+                            block=self.config.read_block_ms,
+                        )
+                    except Exception as error:
+                        if redis_error_contains(error, "NOGROUP"):
+                            await self.ensure_group(force=True)
+                            logger.warning(
+                                "Recovered missing Redis stream/group after NOGROUP: name=%s stream=%s",
+                                self.config.name,
+                                stream_key,
+                            )
+                            await asyncio.sleep(0.1)
+                            continue
+                        raise
+
+                    for _, entries in records or []:
+                        await self._dispatch(list(entries or []), consumer)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as error:
+                    logger.exception(
+                        "Stream worker error: name=%s index=%s error=%s",
+                        self.config.name,
+                        worker_index,
+                        error,
+                    )
+                    await asyncio.sleep(1.0)
+        finally:
+            current = self._reader_tasks.get(worker_index)
+            if current is asyncio.current_task():
+                self._reader_tasks.pop(worker_index, None)
+
+    # ------------------------ lanes ------------------------
+
+    async def _lane_loop(self, lane_index: int) -> None:
+        queue = self._lanes[lane_index]
+        held_key: Optional[str] = None
+        held_token: Optional[str] = None
+        held_since = 0.0
+        lock_ttl = int(self.config.key_lock_ttl_sec or 0)
+        try:
+            while True:
+                if held_token:
+                    try:
+                        entry_id, fields, key = await asyncio.wait_for(
+                            queue.get(),
+                            timeout=max(float(self.config.key_lock_idle_release_sec), 0.01),
+                        )
+                    except asyncio.TimeoutError:
+                        await self._release_key_lock(held_key, held_token)
+                        held_key, held_token = None, None
+                        continue
+                else:
+                    entry_id, fields, key = await queue.get()
+
+                try:
+                    contention = 0
+                    while True:
+                        retry_error: Optional[BaseException] = None
+                        if lock_ttl > 0 and key:
+                            if held_token and held_key != key:
+                                await self._release_key_lock(held_key, held_token)
+                                held_key, held_token = None, None
+                            if not held_token:
+                                held_token = await redis_acquire_lock(
+                                    self._key_lock_name(key),
+                                    lock_ttl,
+                                    wait_timeout_sec=self.config.key_lock_wait_sec,
+                                )
+                                held_key = key if held_token else None
+                                held_since = time.monotonic()
+                            elif time.monotonic() - held_since >= lock_ttl / 2:
+                                await redis_ops.expire(self._key_lock_name(key), lock_ttl)
+                                held_since = time.monotonic()
+                            if not held_token:
+                                retry_error = TimeoutError(
+                                    f"Timed out waiting for stream key lock {key}"
+                                )
+                        if retry_error is None:
+                            retry_error = await self._process_entry(entry_id, fields)
+                        if retry_error is None:
+                            break
+                        # The entry stays pending and in place on the lane, so
+                        # later entries of the same key cannot overtake it.
+                        contention += 1
+                        if contention > max(int(self.config.max_contention_retries), 0):
+                            await self._dead_letter(
+                                entry_id,
+                                fields,
+                                retry_error,
+                                self._attempt(fields) + 1,
+                                contention=contention - 1,
+                            )
+                            break
+                        logger.debug(
+                            "Stream entry retried in place: name=%s entry_id=%s contention=%s error=%s",
+                            self.config.name,
+                            entry_id,
+                            contention,
+                            retry_error,
+                        )
+                        await asyncio.sleep(
+                            min(float(self.config.contention_retry_delay_sec) * contention, 5.0)
+                        )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as error:
+                    logger.exception(
+                        "Stream lane error: name=%s lane=%s entry_id=%s error=%s",
+                        self.config.name,
+                        lane_index,
+                        entry_id,
+                        error,
+                    )
+                finally:
+                    self._in_flight.pop(entry_id, None)
+                    queue.task_done()
+        finally:
+            if held_token:
+                await self._release_key_lock(held_key, held_token)
+
+    def _key_lock_name(self, key: str) -> str:
+        return f"{self.config.stream_key}:kl:{key}"
+
+    async def _release_key_lock(self, key: Optional[str], token: Optional[str]) -> None:
+        if not key or not token:
+            return
+        try:
+            await redis_release_lock(self._key_lock_name(key), token)
+        except Exception as error:
+            logger.warning(
+                "Failed to release stream key lock: name=%s key=%s error=%s",
+                self.config.name,
+                key,
+                error,
+            )
+
+    # ------------------------ entry outcome ------------------------
+
+    async def _ack(self, entry_id: str) -> None:
+        await redis_stream_ack_delete(self.config.stream_key, self.config.group, entry_id)
+
+    async def _process_entry(self, entry_id: str, fields: StreamFields) -> Optional[BaseException]:
+        """Handle one entry; returns the error when it should be retried in place."""
+        try:
+            await self._handler(entry_id, fields)
+        except StreamEntryDrop as error:
+            await self._ack(entry_id)
+            logger.info(
+                "Stream entry dropped: name=%s entry_id=%s reason=%s",
+                self.config.name,
+                entry_id,
+                error,
+            )
+            return None
+        except StreamEntryRetry as error:
+            return error
+        except StreamEntryDeadLetter as error:
+            await self._dead_letter(entry_id, fields, error, self._attempt(fields) + 1)
+            return None
+        except Exception as error:
+            attempt = self._attempt(fields) + 1
+            if attempt >= max(int(self.config.max_retries), 1):
+                await self._dead_letter(entry_id, fields, error, attempt)
+                return None
+            await self._requeue(entry_id, fields, error)
+            return None
+        await self._ack(entry_id)
+        return None
+
+    @staticmethod
+    def _attempt(fields: StreamFields) -> int:
+        try:
+            return max(int(str(fields.get("attempt") or "0")), 0)
+        except ValueError:
+            return 0
+
+    async def _requeue(
+        self,
+        entry_id: str,
+        fields: StreamFields,
+        error: BaseException,
+    ) -> None:
+        retry_payload: Dict[str, Any] = dict(fields)
+        retry_payload["attempt"] = str(self._attempt(fields) + 1)
+        retry_payload["last_error"] = str(error)
+        await self.enqueue(retry_payload)
+        await self._ack(entry_id)
+        logger.warning(
+            "Stream entry requeued: name=%s entry_id=%s attempt=%s error=%s",
+            self.config.name,
+            entry_id,
+            retry_payload.get("attempt"),
+            error,
+        )
+
+    async def _dead_letter(
+        self,
+        entry_id: str,
+        fields: StreamFields,
+        error: BaseException,
+        attempt: int,
+        *,
+        contention: int = 0,
+    ) -> None:
+        if self.config.dlq_stream_key:
+            dlq_payload: Dict[str, Any] = dict(fields)
+            dlq_payload["attempt"] = str(attempt)
+            if contention:
+                dlq_payload["contention_retries"] = str(contention)
+            dlq_payload["error"] = str(error)
+            dlq_payload["source_stream"] = self.config.stream_key
+            dlq_payload["source_entry_id"] = entry_id
+            dlq_payload["failed_at"] = str(_now_ts())
+            await self.enqueue(dlq_payload, stream_key=self.config.dlq_stream_key)
+        if self._on_dead_letter is not None:
+            try:
+                await self._on_dead_letter(fields, error)
+            except Exception as hook_error:
+                logger.warning(
+                    "Stream dead-letter hook failed: name=%s entry_id=%s error=%s",
+                    self.config.name,
+                    entry_id,
+                    hook_error,
+                )
+        await self._ack(entry_id)
+        logger.error(
+            "Stream entry moved to DLQ: name=%s entry_id=%s attempt=%s error=%s",
+            self.config.name,
+            entry_id,
+            attempt,
+            error,
+        )
+
+
+__all__ = [
+    "RedisStreamWorker",
+    "StreamEntryDeadLetter",
+    "StreamEntryDrop",
+    "StreamEntryRetry",
+    "StreamWorkerConfig",
+    "serialize_stream_fields",
+]
@@ -747,6 +747,8 @@ async def handle_external(
         "connected_integration_id": resolved_connected_integration_id,
         "query": dict(request.query_params),
         "headers": headers,
+        # Accept-Encoding вырезан из headers; нужен интеграциям, отдающим готовый gzip
+        "accept_encoding": request.headers.get("accept-encoding", ""),
         "body": body_data,
         "raw_body": raw_body,
         "client": request.client.host if request.client else None,
@@ -1,4 +1,7 @@
 from fastapi import FastAPI
+from core.api.http_pool import close_shared_http_clients
+from core.api.rate_limit_cooldown import stop_cooldown_listeners
+from core.api.regos_oauth import stop_token_refresh
 from core.logger import setup_logger
 from routes.healthcheck import router as healthcheck
 from routes.clients import router as clients
@@ -18,6 +21,8 @@ from clients.marketplace_toserver.main import MarketplaceToServerIntegration
 from clients.bank_ipak_yuli.main import BankIpakYuliIntegration
 from clients.edo_fakturauz.main import EdoFakturaUzIntegration
 from clients.edo_didox.main import EdoDidoxIntegration
+from clients.email_sender.main import EmailSenderIntegration
+from clients.regos_pay_deals.main import RegosPayDealsIntegration
 
 
 _RESTORE_INTEGRATIONS = (
@@ -52,6 +57,8 @@ _SHUTDOWN_INTEGRATIONS = (
     ("Meta Leadgen", MetaLeadgenCrmChannelIntegration),
     ("EDO Faktura.uz", EdoFakturaUzIntegration),
     ("EDO Didox", EdoDidoxIntegration),
+    ("REGOS Pay deals", RegosPayDealsIntegration),
+    ("Email sender", EmailSenderIntegration),
 )
 
 
@@ -78,6 +85,12 @@ def create_app() -> FastAPI:
                 logger.info("%s shutdown cleanup completed", name)
             except Exception as error:
                 logger.exception("%s shutdown cleanup failed: %s", name, error)
+        try:
+            await stop_cooldown_listeners()
+            stop_token_refresh()
+            await close_shared_http_clients()
+        except Exception as error:
+            logger.exception("Shared HTTP pool cleanup failed: %s", error)
 
     app.add_middleware(GZipMiddleware, minimum_size=500)
 
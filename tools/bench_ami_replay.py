@@ -0,0 +1,239 @@
+"""Benchmark: replaying an AMI capture through the Asterisk listener parsing path.
+
+The capture is fed into an asyncio.StreamReader in socket-sized pieces and every
+mode runs the same normalization (_normalize_ami_packet + _normalize_ami_event)
+as the listener. Redis is not touched; the "xadd calls" column counts the
+enqueue round-trips each mode would make.
+
+Modes:
+    legacy   readline per line -> dict for every packet -> one XADD per event
+    buffered AmiPacketReader, Event: allow-list before parsing -> one pipeline per read
+
+Usage:
+    python tools/bench_ami_replay.py [--capture ami.log] [--calls 2000] [--repeat 3]
+
+The capture is the raw AMI byte stream (e.g. `ncat host 5038 | tee ami.log`
+after Login). Without --capture a synthetic stream of --calls calls is
+generated with a production-like mix of RTCP, VarSet, Newexten and call-stage events.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from clients.asterisk_crm_channel.main import (  # noqa: E402
+    AsteriskCrmChannelIntegration,
+    RuntimeConfig,
+)
+
+MODES = ("legacy", "buffered")
+SOCKET_READ_BYTES = 16 * 1024
+
+
+def _packet(**fields: Any) -> str:
+    return "".join(f"{key}: {value}\r\n" for key, value in fields.items()) + "\r\n"
+
+
+def _synthetic_call(index: int) -> str:
+    ts = 1_760_000_000 + index
+    linkedid = f"{ts}.{index}"
+    trunk = f"PJSIP/trunk-{index:08x}"
+    agent = f"PJSIP/1{index % 50:02d}-{index:08x}"
+    caller = f"99890{index % 10_000_000:07d}"
+    base = {"Privilege": "call,all", "Linkedid": linkedid}
+    parts: List[str] = [
+        _packet(Event="Newchannel", Channel=trunk, ChannelState="0", ChannelStateDesc="Down",
+                CallerIDNum=caller, Exten="712000000", Context="from-trunk", Uniqueid=linkedid, **base),
+    ]
+    for step in range(12):
+        parts.append(_packet(Event="Newexten", Channel=trunk, Context="from-trunk", Extension="s",
+                             Priority=str(step + 1), Application="Set", AppData=f"STEP={step}",
+                             Uniqueid=linkedid, **base))
+        parts.append(_packet(Event="VarSet", Channel=trunk, Variable=f"__VAR_{step}", Value=str(step),
+                             Uniqueid=linkedid, **base))
+    parts.append(_packet(Event="VarSet", Channel=trunk, Variable="MIXMONITOR_FILENAME",
+                         Value=f"/var/spool/asterisk/monitor/{linkedid}.wav", Uniqueid=linkedid, **base))
+    for leg in range(3):
+        leg_channel = f"PJSIP/1{(index + leg) % 50:02d}-{index:08x}{leg}"
+        leg_id = f"{ts}.{index}{leg}"
+        parts.append(_packet(Event="DialBegin", Channel=trunk, DestChannel=leg_channel,
+                             DestUniqueid=leg_id, Uniqueid=linkedid, **base))
+        parts.append(_packet(Event="Newchannel", Channel=leg_channel, ChannelState="0",
+                             ChannelStateDesc="Down", Exten=f"1{leg:02d}", Uniqueid=leg_id, **base))
+        parts.append(_packet(Event="Newstate", Channel=leg_channel, ChannelState="5",
+                             ChannelStateDesc="Ringing", Uniqueid=leg_id, **base))
+    parts.append(_packet(Event="Newstate", Channel=agent, ChannelState="6", ChannelStateDesc="Up",
+                         Uniqueid=f"{ts}.{index}0", **base))
+    parts.append(_packet(Event="DialEnd", Channel=trunk, DestChannel=agent, DialStatus="ANSWER",
+                         Uniqueid=linkedid, **base))
+    parts.append(_packet(Event="BridgeEnter", Channel=agent, BridgeUniqueid=f"b-{index}",
+                         Uniqueid=f"{ts}.{index}0", **base))
+    for _ in range(30):
+        parts.append(_packet(Event="RTCPSent", Channel=trunk, SSRC="12345", PT="200(SR)",
+                             To="10.0.0.1:10000", ReportBlock="0", Uniqueid=linkedid, **base))
+        parts.append(_packet(Event="RTCPReceived", Channel=trunk, SSRC="54321", PT="201(RR)",
+                             From="10.0.0.1:10001", Uniqueid=linkedid, **base))
+    parts.append(_packet(Event="BridgeLeave", Channel=agent, BridgeUniqueid=f"b-{index}",
+                         Uniqueid=f"{ts}.{index}0", **base))
+    parts.append(_packet(Event="Hangup", Channel=trunk, Cause="16", Uniqueid=linkedid, **base))
+    parts.append(_packet(Event="Cdr", Source=caller, Destination="100", Disposition="ANSWERED",
+                         UniqueID=linkedid))
+    return "".join(parts)
+
+
+def synthetic_capture(calls: int) -> bytes:
+    return b"".join(_synthetic_call(index).encode("utf-8") for index in range(calls))
+
+
+def _runtime(log_ami_events: bool = False) -> RuntimeConfig:
+    return RuntimeConfig(
+        connected_integration_id="bench",
+        asterisk_hash="bench",
+        ami_host="127.0.0.1",
+        ami_port=5038,
+        ami_user="bench",
+        ami_password="bench",
+        channel_id=1,
+        default_responsible_user_id=None,
+        subject_template="{from_phone}",
+        allowed_did_set=set(),
+        recording_base_url=None,
+        state_ttl_sec=3600,
+        default_country_code="998",
+        assign_responsible_by_operator_ext=True,
+        message_language="ru",
+        close_ticket_on_call_end=True,
+        min_external_digits=7,
+        create_ticket_on_call_start=True,
+        assign_responsible_requires_attendance=False,
+        post_status_messages=False,
+        log_ami_events=log_ami_events,
+    )
+
+
+def _stream_reader(capture: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader(limit=2 ** 20)
+    for start in range(0, len(capture), SOCKET_READ_BYTES):
+        reader.feed_data(capture[start:start + SOCKET_READ_BYTES])
+    reader.feed_eof()
+    return reader
+
+
+async def _legacy_read_packet(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    # Чтение до AmiPacketReader: построчно, каждый пакет разбирается целиком
+    lines: List[str] = []
+    while True:
+        raw_line = await reader.readline()
+        if raw_line == b"":
+            if not lines:
+                return None
+            break
+        line = raw_line.decode("utf-8", errors="ignore").rstrip("\r\n")
+        if not line:
+            if lines:
+                break
+            continue
+        lines.append(line)
+    payload: Dict[str, Any] = {}
+    for line in lines:
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        key = key.strip()
+        if key:
+            payload[key] = value.lstrip()
+    return payload
+
+
+def _normalize(runtime: RuntimeConfig, packet: Dict[str, Any], event_ids: List[str]) -> None:
+    integration = AsteriskCrmChannelIntegration
+    normalized = integration._normalize_ami_packet(packet)
+    if not normalized.get("event"):
+        return
+    event = integration._normalize_ami_event(runtime, normalized)
+    if event:
+        event_ids.append(event.event_id)
+
+
+async def _run_legacy(capture: bytes) -> Dict[str, Any]:
+    runtime = _runtime()
+    reader = _stream_reader(capture)
+    packets = 0
+    event_ids: List[str] = []
+    while True:
+        packet = await _legacy_read_packet(reader)
+        if packet is None:
+            break
+        packets += 1
+        _normalize(runtime, packet, event_ids)
+    return {"packets": packets, "parsed": packets, "event_ids": event_ids, "xadd_calls": len(event_ids)}
+
+
+async def _run_buffered(capture: bytes) -> Dict[str, Any]:
+    runtime = _runtime()
+    packets = AsteriskCrmChannelIntegration._ami_packet_reader(runtime, _stream_reader(capture))
+    event_ids: List[str] = []
+    xadd_calls = 0
+    while True:
+        batch = await packets.read_packets()
+        if batch is None:
+            break
+        before = len(event_ids)
+        for packet in batch:
+            _normalize(runtime, packet, event_ids)
+        if len(event_ids) > before:
+            xadd_calls += 1
+    return {
+        "packets": packets.parsed + packets.skipped,
+        "parsed": packets.parsed,
+        "event_ids": event_ids,
+        "xadd_calls": xadd_calls,
+    }
+
+
+RUNNERS = {"legacy": _run_legacy, "buffered": _run_buffered}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--capture", help="raw AMI byte stream recorded after Login")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.getLogger("asyncio").setLevel(logging.WARNING)
+
+    capture = Path(args.capture).read_bytes() if args.capture else synthetic_capture(args.calls)
+    print(f"capture: {len(capture) / 1024 / 1024:.1f} MB")
+    print(f"{'mode':<10} {'cpu_ms':>9} {'packets':>9} {'parsed':>9} {'events':>8} {'xadd calls':>11}")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for mode in MODES:
+        best = None
+        for _ in range(max(args.repeat, 1)):
+            started = time.process_time()
+            result = asyncio.run(RUNNERS[mode](capture))
+            elapsed = time.process_time() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results[mode] = result
+        print(
+            f"{mode:<10} {best * 1000:>9.1f} {result['packets']:>9} {result['parsed']:>9}"
+            f" {len(result['event_ids']):>8} {result['xadd_calls']:>11}"
+        )
+
+    if results["legacy"]["event_ids"] != results["buffered"]["event_ids"]:
+        print("MISMATCH: buffered mode produced a different event sequence", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
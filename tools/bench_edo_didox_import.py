@@ -0,0 +1,362 @@
+"""Benchmark: importing a page of Didox documents into REGOS.
+
+A local fake Didox server (Starlette + uvicorn on 127.0.0.1) serves the auth and
+document content endpoints; REGOS is an in-memory fake plugged in at
+RegosAPI._call_direct, so every HTTP round-trip to REGOS (including `batch`) is
+counted and delayed by --regos-latency-ms. Both modes start from an empty REGOS
+and must end with the same invoices, partners, contracts and items.
+
+Modes:
+    single  one stream entry at a time: DidoxClient.create + content + full REGOS chain per document
+    batch   stream entries grouped per read (--batch-size): contents fetched concurrently,
+            partners/contracts/items resolved once per batch, documents created concurrently
+
+Usage:
+    python tools/bench_edo_didox_import.py [--documents 500] [--batch-size 20]
+        [--didox-latency-ms 30] [--regos-latency-ms 40]
+
+Both modes reuse the cached Didox session (firm, settings, token) across
+documents; it is reset before each run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from clients.edo_didox.main import DidoxClient, EdoDidoxIntegration  # noqa: E402
+from config.settings import settings  # noqa: E402
+from core.api.http_pool import close_shared_http_clients  # noqa: E402
+from core.api.regos_api import RegosAPI  # noqa: E402
+from core.api.service import JsonPayload  # noqa: E402
+
+MODES = ("single", "batch")
+FIRM_ID = 1
+FIRM_INN = "300000001"
+CI = "bench"
+
+
+def synthetic_documents(count: int, partners: int, catalog: int) -> Dict[str, Dict[str, Any]]:
+    documents: Dict[str, Dict[str, Any]] = {}
+    for index in range(count):
+        seller = index % partners
+        products = []
+        for line in range(5):
+            code = (index * 7 + line * 13) % catalog
+            products.append(
+                {
+                    "name": f"Товар {code}",
+                    "catalogcode": f"{10_000_000 + code:017d}",
+                    "barcode": f"478{code:010d}" if code % 3 else "",
+                    "packagecode": 1_500_000 + code,
+                    "count": str(1 + line),
+                    "summa": str(1000 + code),
+                    "vatrate": "12",
+                    "deliverysumwithvat": str((1 + line) * (1000 + code)),
+                }
+            )
+        documents[f"didox-{index:05d}"] = {
+            "facturadoc": {"facturano": f"F-{index}", "facturadate": "2026-10-01"},
+            "contractdoc": {"contractno": f"C-{seller}-{index // partners % 2}", "contractdate": "2026-01-01"},
+            "sellertin": f"{200_000_000 + seller}",
+            "seller": {"name": f"Поставщик {seller}"},
+            "buyertin": FIRM_INN,
+            "buyer": {"name": "Bench firm"},
+            "productlist": {"products": products},
+        }
+    return documents
+
+
+def didox_app(documents: Dict[str, Dict[str, Any]], latency: float, counter: Counter) -> Starlette:
+    async def auth(request: Request) -> JSONResponse:
+        counter["auth"] += 1
+        await asyncio.sleep(latency)
+        return JSONResponse({"token": "bench-token"})
+
+    async def document(request: Request) -> JSONResponse:
+        counter["documents"] += 1
+        await asyncio.sleep(latency)
+        doc_id = request.path_params["doc_id"]
+        content = documents.get(doc_id)
+        if content is None:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        return JSONResponse({"data": {"json": content, "document": {"doc_id": doc_id}}})
+
+    return Starlette(
+        routes=[
+            Route("/v1/auth/{tax_id}/password/{locale}", auth, methods=["POST"]),
+            Route("/v1/documents/{doc_id}", document, methods=["GET"]),
+        ]
+    )
+
+
+class FakeRegos:
+    """Минимальное состояние REGOS для цепочки импорта входящего счёта."""
+
+    def __init__(self, latency: float, didox_url: str) -> None:
+        self.latency = latency
+        self.didox_url = didox_url
+        self.requests = 0
+        self.steps = 0
+        self.partners: Dict[int, Dict[str, Any]] = {}
+        self.contracts: Dict[int, Dict[str, Any]] = {}
+        self.invoices: Dict[int, Dict[str, Any]] = {}
+        self.items: Dict[Tuple[str, str], int] = {}
+        self._next_id = 0
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    async def call(self, path: str, body: Any, response_model: Any) -> Any:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        payload = json.loads(bytes(JsonPayload.dump(body)))
+        if path == "batch":
+            responses = []
+            for step in payload.get("requests") or []:
+                responses.append({"key": step["Key"], "status": 200, "response": self.handle(step["path"], step["payload"])})
+            return response_model.model_validate({"ok": True, "result": {"responses": responses}})
+        return response_model.model_validate(self.handle(path, payload))
+
+    def handle(self, path: str, payload: Any) -> Dict[str, Any]:
+        self.steps += 1
+        handler = getattr(self, "_" + path.replace("/", "_"), None)
+        if handler is None:
+            return {"ok": True, "result": {"row_affected": 1}}
+        return {"ok": True, "result": handler(payload)}
+
+    def _Firm_Get(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"id": FIRM_ID, "name": "Bench firm", "inn": FIRM_INN}]
+
+    def _ConnectedIntegrationSetting_Get(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {"key": "DIDOX_PASSWORD", "value": "bench"},
+            {"key": "DIDOX_PARTNER_TOKEN", "value": "bench"},
+            {"key": "DIDOX_BASE_URL", "value": self.didox_url},
+        ]
+
+    def _DocInvoice_Get(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        code = payload.get("external_code")
+        return [
+            {"id": invoice_id, "external_code": invoice["external_code"]}
+            for invoice_id, invoice in self.invoices.items()
+            if invoice.get("external_code") == code
+        ][:1]
+
+    def _DocInvoice_Add(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        invoice_id = self._new_id()
+        self.invoices[invoice_id] = {**payload, "operations": []}
+        return {"new_id": invoice_id}
+
+    def _DocInvoice_SetExternalData(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.invoices[payload["document_id"]]["external_code"] = payload["external_id"]
+        return {"row_affected": 1}
+
+    def _DocInvoice_SetStatus(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.invoices[payload["document_id"]]["status"] = payload["status"]
+        return {"row_affected": 1}
+
+    def _InvoiceOperation_Add(self, payload: List[Dict[str, Any]]) -> Dict[str, Any]:
+        for row in payload:
+            self.invoices[row["document_id"]]["operations"].append(row)
+        return {"row_affected": len(payload)}
+
+    def _Partner_Get(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        search = payload.get("search") or ""
+        return [
+            {"id": partner_id, **partner}
+            for partner_id, partner in self.partners.items()
+            if search in (partner.get("inn") or "") or search in partner["name"]
+        ][:10]
+
+    def _Partner_Add(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        partner_id = self._new_id()
+        self.partners[partner_id] = {"name": payload["name"], "inn": payload.get("inn")}
+        return {"new_id": partner_id}
+
+    def _DocContract_GetShort(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        search = payload.get("search") or ""
+        partner_ids = set(payload.get("partner_ids") or [])
+        return [
+            {"id": contract_id, "code": contract["code"], "name": contract["name"]}
+            for contract_id, contract in self.contracts.items()
+            if contract["partner_id"] in partner_ids and search in contract["name"]
+        ][:10]
+
+    def _DocContract_Add(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        contract_id = self._new_id()
+        self.contracts[contract_id] = {
+            "code": payload["code"],
+            "name": payload["name"],
+            "partner_id": payload["partner_id"],
+        }
+        return {"new_id": contract_id}
+
+    def _Item_Import(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        kind = payload["comparation_value"]
+        field = {"ICPSBarcode": "icpsbarcode", "ICPS": "icps", "Barcode": "barcodes"}[kind]
+        rows = []
+        for row in payload.get("data") or []:
+            key = (kind, row[field])
+            if key not in self.items:
+                self.items[key] = self._new_id()
+            rows.append({"success": True, "index": row["index"], "item_id": self.items[key]})
+        return rows
+
+    def _Item_Match(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        kind = payload["type"]
+        return [
+            {"index": row["index"], "item_id": self.items.get((kind, row["value"])), "value": row["value"]}
+            for row in payload.get("data") or []
+        ]
+
+    def snapshot(self) -> List[Tuple[Any, ...]]:
+        """Импортированные счета в виде, не зависящем от порядка выдачи id."""
+        item_keys = {item_id: key for key, item_id in self.items.items()}
+        rows = []
+        for invoice in self.invoices.values():
+            partner = self.partners[invoice["partner_id"]]
+            contract = self.contracts[invoice["contract_id"]]
+            operations = tuple(
+                (item_keys[row["item_id"]], row["quantity"], row["price"]) for row in invoice["operations"]
+            )
+            rows.append((invoice.get("external_code"), invoice.get("status"), partner["inn"], contract["name"], operations))
+        return sorted(rows)
+
+
+def _free_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    return sock
+
+
+async def _run_single(integration: EdoDidoxIntegration, ids: List[str], batch_size: int) -> List[Optional[Exception]]:
+    errors: List[Optional[Exception]] = []
+    for doc_id in ids:
+        try:
+            await integration._process_task(action="import", document_id=doc_id, firm_id=FIRM_ID)
+            errors.append(None)
+        except Exception as error:
+            errors.append(error)
+    return errors
+
+
+async def _run_batch(integration: EdoDidoxIntegration, ids: List[str], batch_size: int) -> List[Optional[Exception]]:
+    errors: List[Optional[Exception]] = []
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        errors.extend(await integration._import_documents_batch(FIRM_ID, [(doc_id, 0) for doc_id in chunk]))
+    return errors
+
+
+RUNNERS = {"single": _run_single, "batch": _run_batch}
+
+
+async def _run(mode: str, args: argparse.Namespace, documents: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    counter: Counter = Counter()
+    sock = _free_socket()
+    didox_url = "http://127.0.0.1:%d" % sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(
+            didox_app(documents, args.didox_latency_ms / 1000.0, counter),
+            log_level="warning",
+            lifespan="off",
+        )
+    )
+    server_task = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    regos = FakeRegos(args.regos_latency_ms / 1000.0, didox_url)
+    original_call = RegosAPI._call_direct
+
+    async def fake_call(self, path, body, response_model):
+        return await regos.call(path, body, response_model)
+
+    RegosAPI._call_direct = fake_call
+    DidoxClient.forget(CI)
+    try:
+        integration = EdoDidoxIntegration()
+        integration.connected_integration_id = CI
+        started = time.perf_counter()
+        errors = await RUNNERS[mode](integration, list(documents), args.batch_size)
+        elapsed = time.perf_counter() - started
+    finally:
+        RegosAPI._call_direct = original_call
+        await close_shared_http_clients()
+        server.should_exit = True
+        await server_task
+    return {
+        "elapsed": elapsed,
+        "errors": [error for error in errors if error is not None],
+        "regos_requests": regos.requests,
+        "regos_steps": regos.steps,
+        "didox_requests": counter["auth"] + counter["documents"],
+        "partners": len(regos.partners),
+        "contracts": len(regos.contracts),
+        "items": len(regos.items),
+        "snapshot": regos.snapshot(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--partners", type=int, default=40)
+    parser.add_argument("--catalog", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=settings.edo_didox_stream_batch_size)
+    parser.add_argument("--didox-latency-ms", type=float, default=30.0)
+    parser.add_argument("--regos-latency-ms", type=float, default=40.0)
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    documents = synthetic_documents(args.documents, args.partners, args.catalog)
+    print(
+        f"documents: {len(documents)}  batch size: {args.batch_size}"
+        f"  latency: didox={args.didox_latency_ms:g}ms regos={args.regos_latency_ms:g}ms"
+    )
+    print(
+        f"{'mode':<8} {'wall_s':>8} {'docs/s':>8} {'regos http':>11} {'regos calls':>12}"
+        f" {'didox http':>11} {'partners':>9} {'contracts':>10} {'items':>6} {'errors':>7}"
+    )
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for mode in [mode.strip() for mode in args.modes.split(",") if mode.strip()]:
+        result = asyncio.run(_run(mode, args, documents))
+        results[mode] = result
+        print(
+            f"{mode:<8} {result['elapsed']:>8.2f} {len(documents) / result['elapsed']:>8.1f}"
+            f" {result['regos_requests']:>11} {result['regos_steps']:>12} {result['didox_requests']:>11}"
+            f" {result['partners']:>9} {result['contracts']:>10} {result['items']:>6} {len(result['errors']):>7}"
+        )
+        for error in result["errors"][:3]:
+            print(f"  error: {error!r}", file=sys.stderr)
+
+    if len(results) == len(MODES) and results["single"]["snapshot"] != results["batch"]["snapshot"]:
+        print("MISMATCH: batch mode produced different REGOS documents", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
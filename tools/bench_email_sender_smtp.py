@@ -0,0 +1,254 @@
+"""Benchmark: email_sender throughput against a local aiosmtpd sink.
+
+The sink runs in aiosmtpd's Controller thread on 127.0.0.1, accepts AUTH
+without TLS and drops every message after DATA. Every EHLO sleeps
+--handshake-ms to stand in for the TCP + TLS + AUTH round-trips of a real
+provider. The integration reads its settings from a local map; Redis and
+the REGOS API are not touched.
+
+Modes:
+    fresh   the pre-pool worker: every batch opens pool_size connections
+            (connect, STARTTLS attempt, AUTH), builds MIME on the event loop
+            and QUITs at the end
+    pooled  EmailSenderIntegration.send_messages: long-lived connections per
+            integration, MIME rendered in a worker thread
+
+Usage:
+    pip install aiosmtpd
+    python tools/bench_email_sender_smtp.py [--requests 20] [--messages 100] [--pool-size 10]
+        [--handshake-ms 100] [--body-kb 8]
+
+Each request is one send_messages call of --messages letters, as the
+campaign sender issues them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from clients.email_sender.main import EmailSenderIntegration  # noqa: E402
+from clients.email_sender.smtp_pool import close_smtp_pools  # noqa: E402
+
+MODES = ("fresh", "pooled")
+CI = "bench-email"
+SENDER = "bench@example.uz"
+
+
+class SinkHandler:
+    def __init__(self, handshake_sec: float) -> None:
+        self.handshake_sec = handshake_sec
+        self._lock = threading.Lock()
+        self.sessions = 0
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        with self._lock:
+            self.sessions += 1
+        if self.handshake_sec:
+            await asyncio.sleep(self.handshake_sec)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.received += 1
+        return "250 Message accepted for delivery"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.sessions = 0
+            self.received = 0
+
+
+def _accept_all(server, session, envelope, mechanism, auth_data) -> AuthResult:
+    return AuthResult(success=True)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _messages(count: int, body_kb: int) -> List[Dict[str, Any]]:
+    paragraph = "<p>Уважаемый клиент, ваш заказ готов к выдаче. Спасибо, что выбираете нас.</p>\n"
+    body = paragraph * max(1, body_kb * 1024 // len(paragraph.encode("utf-8")))
+    return [
+        {
+            "campaign_recipient_id": index,
+            "sms_id": index,
+            "recipient": f"client{index}@example.uz",
+            "message": body,
+            "is_html": True,
+        }
+        for index in range(count)
+    ]
+
+
+def _integration(port: int, pool_size: int) -> EmailSenderIntegration:
+    settings_map = {
+        "smtp_host": "127.0.0.1",
+        "smtp_port": str(port),
+        "smtp_email": SENDER,
+        "smtp_password": "bench",
+        "smtp_use_ssl": "false",
+        "smtp_name": "Bench",
+        "smtp_pool_size": str(pool_size),
+    }
+    integration = EmailSenderIntegration()
+    integration.connected_integration_id = CI
+
+    async def fetch_settings(cache_key: str) -> dict:
+        return settings_map
+
+    integration._fetch_settings = fetch_settings
+    return integration
+
+
+async def _send_fresh(
+    integration: EmailSenderIntegration, port: int, messages: List[Dict[str, Any]], pool_size: int
+) -> int:
+    # Отправка до пула: соединения батча открываются воркерами и закрываются после него
+    sent = 0
+    for start in range(0, len(messages), integration.BATCH_SIZE):
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in messages[start:start + integration.BATCH_SIZE]:
+            queue.put_nowait(item)
+
+        async def worker() -> int:
+            delivered = 0
+            smtp = await integration._open_smtp("127.0.0.1", port, SENDER, "bench", False)
+            try:
+                while True:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    email_msg = integration._build_email_message(
+                        from_addr=SENDER,
+                        to_addr=item["recipient"],
+                        subject="Уведомление",
+                        body=item["message"],
+                        is_html=True,
+                    )
+                    await smtp.send_message(email_msg, sender=SENDER, recipients=[item["recipient"]])
+                    delivered += 1
+            finally:
+                await smtp.quit()
+            return delivered
+
+        workers = min(pool_size, max(1, queue.qsize()))
+        sent += sum(await asyncio.gather(*(worker() for _ in range(workers))))
+    return sent
+
+
+async def _send_pooled(
+    integration: EmailSenderIntegration, port: int, messages: List[Dict[str, Any]], pool_size: int
+) -> int:
+    response = await integration.send_messages(messages)
+    result = response.result
+    if not isinstance(result, dict):
+        raise RuntimeError(f"send_messages failed: {result}")
+    return sum(
+        1
+        for batch in result["details"]
+        for item in batch["items"]
+        if "error" not in item
+    )
+
+
+RUNNERS = {"fresh": _send_fresh, "pooled": _send_pooled}
+
+
+async def _run(mode: str, args: argparse.Namespace, port: int) -> Dict[str, Any]:
+    integration = _integration(port, args.pool_size)
+    messages = _messages(args.messages, args.body_kb)
+    loop_lag: List[float] = []
+    stop = asyncio.Event()
+
+    async def probe() -> None:
+        # задержка event loop: насколько сборка MIME мешает остальным задачам процесса
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            loop_lag.append(time.perf_counter() - started - 0.005)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    sent = 0
+    try:
+        for _ in range(args.requests):
+            sent += await RUNNERS[mode](integration, port, messages, args.pool_size)
+        elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        await probe_task
+        await close_smtp_pools()
+    loop_lag.sort()
+    p99 = loop_lag[int(len(loop_lag) * 0.99)] if loop_lag else 0.0
+    return {"elapsed": elapsed, "sent": sent, "p99_lag_ms": p99 * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--handshake-ms", type=float, default=100.0)
+    parser.add_argument("--body-kb", type=int, default=8)
+    parser.add_argument("--mode", choices=MODES, action="append")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    handler = SinkHandler(args.handshake_ms / 1000.0)
+    port = _free_port()
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=port,
+        authenticator=_accept_all,
+        auth_require_tls=False,
+    )
+    controller.start()
+    try:
+        print(
+            f"{args.requests} requests x {args.messages} messages, body {args.body_kb} KB,"
+            f" pool {args.pool_size}, handshake {args.handshake_ms:.0f} ms"
+        )
+        print(f"{'mode':<8} {'sec':>8} {'msg/s':>9} {'sent':>7} {'received':>9} {'sessions':>9} {'p99 lag ms':>11}")
+        rates: Dict[str, float] = {}
+        for mode in args.mode or MODES:
+            handler.reset()
+            result = asyncio.run(_run(mode, args, port))
+            rate = result["sent"] / result["elapsed"] if result["elapsed"] else 0.0
+            print(
+                f"{mode:<8} {result['elapsed']:>8.2f} {rate:>9.0f} {result['sent']:>7}"
+                f" {handler.received:>9} {handler.sessions:>9} {result['p99_lag_ms']:>11.1f}"
+            )
+            if handler.received != args.requests * args.messages:
+                print(f"MISMATCH: sink received {handler.received} messages in {mode} mode", file=sys.stderr)
+                sys.exit(1)
+            rates[mode] = rate
+        if rates.get("fresh") and "pooled" in rates:
+            print(f"speedup pooled/fresh: {rates['pooled'] / rates['fresh']:.1f}x")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
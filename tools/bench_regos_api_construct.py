@@ -0,0 +1,98 @@
+"""Micro-benchmark: cost of constructing RegosAPI(...).
+
+Compares the current lazy class-level registry against the previous eager
+behaviour (every service instantiated and attached via setattr on each
+construction), which is emulated here from the same GENERATED_SERVICES table.
+
+Usage:
+    python tools/bench_regos_api_construct.py [--iterations 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core.api.regos_api import RegosAPI  # noqa: E402
+from core.api.registry import (  # noqa: E402
+    GENERATED_NAMESPACES,
+    GENERATED_SERVICES,
+    LazyNamespace,
+    LazyService,
+    _service_class,
+)
+
+
+def _resolved_services() -> list[tuple[str, str, str, type]]:
+    return [
+        (namespace, attr, flat_attr, _service_class(module, class_name))
+        for namespace, attr, flat_attr, module, class_name in GENERATED_SERVICES
+    ]
+
+
+def _handwritten_services() -> list[tuple[str, str, type]]:
+    generated = {(namespace, attr) for namespace, attr, *_ in GENERATED_SERVICES}
+    services = []
+    for name, holder in vars(RegosAPI).items():
+        if not isinstance(holder, LazyNamespace) or name == "by_tag":
+            continue
+        for attr, descriptor in vars(holder.namespace_cls).items():
+            if isinstance(descriptor, LazyService) and (name, attr) not in generated:
+                services.append(
+                    (name, attr, _service_class(descriptor.module, descriptor.class_name))
+                )
+    return services
+
+
+def build_eager(resolved, handwritten) -> SimpleNamespace:
+    """Previous behaviour: namespaces + all services built on every construction."""
+    api = SimpleNamespace(connected_integration_id="1", by_tag=SimpleNamespace())
+    for name in GENERATED_NAMESPACES:
+        setattr(api, name, SimpleNamespace())
+    for name, attr, service_cls in handwritten:
+        setattr(getattr(api, name), attr, service_cls(api))
+    for namespace, attr, flat_attr, service_cls in resolved:
+        service = service_cls(api)
+        setattr(getattr(api, namespace), attr, service)
+        setattr(api.by_tag, attr, service)
+        setattr(api, flat_attr, service)
+    return api
+
+
+def build_lazy() -> RegosAPI:
+    return RegosAPI("1")
+
+
+def build_lazy_and_touch() -> object:
+    api = RegosAPI("1")
+    return api.references.item, api.docs.cheque, api.batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    resolved = _resolved_services()
+    handwritten = _handwritten_services()
+    cases = {
+        "eager (previous)": lambda: build_eager(resolved, handwritten),
+        "lazy": build_lazy,
+        "lazy + 3 services": build_lazy_and_touch,
+    }
+    print(f"services: {len(resolved)} generated, {len(handwritten)} handwritten")
+    for label, func in cases.items():
+        func()
+        elapsed = min(timeit.repeat(func, number=args.iterations, repeat=3))
+        print(f"{label:<20} {elapsed / args.iterations * 1e6:9.2f} us/construct")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Benchmark: request payload serialization for large REGOS writes.
+
+Compares the previous path (RegosAPIService._payload model_dump walk ->
+APIClient._serialize_payload walk -> json.dumps in httpx) with the
+single-pass JsonPayload.dump used now.
+
+Usage:
+    python tools/bench_regos_payload_serialize.py [--rows 5000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from pydantic import BaseModel  # noqa: E402
+
+from core.api.service import JsonPayload  # noqa: E402
+from schemas.api import models  # noqa: E402
+
+
+def _legacy_service_payload(data: Any) -> Any:
+    if isinstance(data, BaseModel):
+        return data.model_dump(mode="json", exclude_none=True, by_alias=True)
+    if isinstance(data, list):
+        return [_legacy_service_payload(item) for item in data]
+    if isinstance(data, dict):
+        return {key: _legacy_service_payload(value) for key, value in data.items()}
+    return data
+
+
+def _legacy_client_payload(data: Any) -> Any:
+    if isinstance(data, BaseModel):
+        return data.model_dump(mode="json", exclude_none=True, by_alias=True)
+    if data is None or isinstance(data, (str, int, float, bool)):
+        return data
+    if isinstance(data, list):
+        return [_legacy_client_payload(item) for item in data]
+    if isinstance(data, dict):
+        return {key: _legacy_client_payload(value) for key, value in data.items()}
+    raise TypeError(f"Unsupported data type for POST: {type(data)}")
+
+
+def legacy(data: Any) -> bytes:
+    payload = _legacy_client_payload(_legacy_service_payload(data))
+    # то же, что делает httpx для json=
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode()
+
+
+def single_pass(data: Any) -> bytes:
+    return JsonPayload.dump(data)
+
+
+def _operations(rows: int) -> list:
+    return [
+        models.PurchaseOperationAdd(
+            document_id=1001,
+            item_id=index,
+            quantity=Decimal("3.500"),
+            cost=Decimal("12650.75"),
+            price=Decimal("15990.00"),
+            order=index,
+            vat_value=Decimal("12"),
+            description=f"Позиция {index}",
+        )
+        for index in range(1, rows + 1)
+    ]
+
+
+def _item_import(rows: int) -> BaseModel:
+    return models.ItemImportRequest(
+        comparation_value="Code",
+        group_separator="/",
+        barcode_separator=",",
+        data=[
+            models.ItemImportData(
+                index=str(index),
+                name=f"Товар {index}",
+                fullname=f"Полное наименование товара {index}",
+                code=str(100000 + index),
+                articul=f"ART-{index:06d}",
+                group_path="Каталог/Напитки/Соки",
+                barcodes=f"478{index:010d}",
+                unit_name="шт",
+                vat_name="12%",
+                icps="02202001001000000",
+            )
+            for index in range(1, rows + 1)
+        ],
+    )
+
+
+def _measure(func, data: Any, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(data)
+        best = min(best, time.perf_counter() - started)
+        size = len(body)
+    return best * 1000.0, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = {
+        f"PurchaseOperation/Add x{args.rows}": _operations(args.rows),
+        f"Item/Import x{args.rows * 2}": _item_import(args.rows * 2),
+    }
+    print(f"{'payload':<30} {'legacy ms':>10} {'single ms':>10} {'speedup':>8} {'bytes':>10}")
+    for label, data in cases.items():
+        if json.loads(legacy(data)) != json.loads(single_pass(data)):
+            raise SystemExit(f"{label}: serialized bodies differ")
+        legacy_ms, size = _measure(legacy, data, args.repeat)
+        single_ms, _ = _measure(single_pass, data, args.repeat)
+        print(
+            f"{label:<30} {legacy_ms:>10.1f} {single_ms:>10.1f} "
+            f"{legacy_ms / single_ms:>7.1f}x {size:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
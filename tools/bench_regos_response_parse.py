@@ -0,0 +1,157 @@
+"""Benchmark: parsing a large Item/GetExt response.
+
+Each mode runs in its own subprocess and reports CPU time and peak RSS growth
+over the baseline (payload already loaded in memory).
+
+Modes:
+    legacy       gzip -> json.loads -> response_model(**parsed)
+    fast         response_model.model_validate_json(bytes)
+    lazy         envelope validated, items validated on access (none touched)
+    lazy_10pct   lazy + every 10th item accessed
+    lazy_all     lazy + every item accessed
+
+Usage:
+    python tools/bench_regos_response_parse.py [--payload recorded.json[.gz]] [--items 10000]
+
+Without --payload a synthetic GetExt page of --items rows is generated.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+MODES = ("legacy", "fast", "lazy", "lazy_10pct", "lazy_all")
+
+
+def _synthetic_item(index: int) -> dict:
+    return {
+        "item": {
+            "id": index,
+            "group": {"id": index % 50, "name": f"Группа {index % 50}", "path": "Каталог/Группа"},
+            "department": {"id": 1, "name": "Основной"},
+            "vat": {"id": 1, "name": "НДС 12%", "value": 12},
+            "barcode_list": f"478{index:010d},479{index:010d}",
+            "base_barcode": f"478{index:010d}",
+            "unit": {"id": 1, "name": "шт", "description": "Штука", "type": "pcs"},
+            "brand": {"id": index % 20, "name": f"Brand {index % 20}"},
+            "country": {"id": 1, "name": "Узбекистан", "code": "UZ"},
+            "compound": False,
+            "deleted_mark": False,
+            "image_url": f"https://cdn.example.uz/items/{index}.jpg",
+            "has_child": False,
+            "min_quantity": 0,
+            "fields": [
+                {"key": "field_color", "name": "Цвет", "value": "красный"},
+                {"key": "field_size", "name": "Размер", "value": "M"},
+            ],
+            "last_update": 1_700_000_000 + index,
+            "type": "Item",
+            "code": 100000 + index,
+            "name": f"Товар {index}",
+            "fullname": f"Полное наименование товара {index}",
+            "description": "Описание товара для витрины маркетплейса",
+            "articul": f"ART-{index:06d}",
+            "icps": "06911001001000000",
+            "is_labeled": False,
+            "package_code": "1514511",
+        },
+        "quantity": {"common": 12.5, "allowed": 10, "booked": 2.5},
+        "pricetype": {"id": 1, "name": "Розничная", "round_to": 100},
+        "price": 125000.5,
+        "last_purchase_cost": 98000,
+        "image_url": f"https://cdn.example.uz/items/{index}.jpg",
+    }
+
+
+def _load_payload(path: str) -> bytes:
+    data = Path(path).read_bytes()
+    if data.startswith(b"\x1f\x8b"):
+        data = gzip.decompress(data)
+    return data
+
+
+def _run_mode(mode: str, payload_path: str) -> None:
+    from core.api.response import parse_response
+    from schemas.api import models
+
+    response_model = models.ItemExtRegosOffsettedArrayResult
+    raw = _load_payload(payload_path)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started = time.process_time()
+    if mode == "legacy":
+        parsed = json.loads(raw.decode("utf-8", errors="replace"))
+        response = response_model(**parsed)
+        rows = len(response.result)
+    elif mode == "fast":
+        response = parse_response(raw, response_model)
+        rows = len(response.result)
+    else:
+        response = parse_response(raw, response_model, lazy=True)
+        rows = len(response.result)
+        if mode == "lazy_10pct":
+            for index in range(0, rows, 10):
+                _ = response.result[index].item.id
+        elif mode == "lazy_all":
+            for row in response.result:
+                _ = row.item.id
+    cpu_ms = (time.process_time() - started) * 1000.0
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"rows": rows, "cpu_ms": cpu_ms, "rss_kb": peak_rss - baseline_rss}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload", help="recorded Item/GetExt response (json or gzip)")
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _run_mode(args.mode, args.payload)
+        return
+
+    payload_path = args.payload
+    if not payload_path:
+        body = {
+            "ok": True,
+            "result": [_synthetic_item(index) for index in range(1, args.items + 1)],
+            "next_offset": args.items,
+            "total": args.items * 3,
+        }
+        tmp = tempfile.NamedTemporaryFile(prefix="getext_", suffix=".json", delete=False)
+        tmp.write(json.dumps(body, ensure_ascii=False).encode("utf-8"))
+        tmp.close()
+        payload_path = tmp.name
+
+    size_mb = len(_load_payload(payload_path)) / 1024 / 1024
+    print(f"payload: {payload_path} ({size_mb:.1f} MB)")
+    print(f"{'mode':<12} {'rows':>7} {'cpu ms':>10} {'peak RSS +MB':>13}")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--payload", payload_path],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        print(
+            f"{mode:<12} {result['rows']:>7} {result['cpu_ms']:>10.1f} "
+            f"{result['rss_kb'] / 1024:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -951,6 +951,26 @@ def render_service_base() -> str:
             "from typing import Any",
             "",
             "from pydantic import BaseModel",
+            "from pydantic_core import to_json",
+            "",
+            "from core.api.singleflight import (",
+            "    is_read_only_path,",
+            "    regos_read_singleflight,",
+            "    singleflight_enabled,",
+            ")",
+            "",
+            "",
+            "class JsonPayload(bytes):",
+            '    """Готовое JSON-тело запроса: транспорт отправляет байты как есть."""',
+            "",
+            "    @classmethod",
+            "    def dump(cls, data: Any) -> 'JsonPayload':",
+            "        # Один проход: модели (и вложенные в list/dict) сериализуются своими",
+            "        # сериализаторами pydantic-core (exclude_none, by_alias, json_encoders",
+            "        # модели — Decimal -> float), обычные dict/list — как есть.",
+            "        if isinstance(data, JsonPayload):",
+            "            return data",
+            "        return cls(to_json(data, by_alias=True, exclude_none=True))",
             "",
             "",
             "class RegosAPIService:",
@@ -960,17 +980,22 @@ def render_service_base() -> str:
             "        self.api = api",
             "",
             "    @classmethod",
-            "    def _payload(cls, data: Any) -> Any:",
-            "        if isinstance(data, BaseModel):",
-            "            return data.model_dump(mode='json', exclude_none=True, by_alias=True)",
-            "        if isinstance(data, list):",
-            "            return [cls._payload(item) for item in data]",
-            "        if isinstance(data, dict):",
-            "            return {key: cls._payload(value) for key, value in data.items()}",
-            "        return data",
+            "    def _payload(cls, data: Any) -> JsonPayload:",
+            "        return JsonPayload.dump(data)",
             "",
             "    async def _call(self, path: str, body: Any, response_model):",
-            "        return await self.api.call(path, self._payload(body), response_model)",
+            "        payload = self._payload(body)",
+            "        if not (singleflight_enabled() and is_read_only_path(path)):",
+            "            return await self.api.call(path, payload, response_model)",
+            "        # одинаковые одновременные чтения делят один запрос (core.api.singleflight)",
+            "        api_key = getattr(self.api, '_shared_key', None) or getattr(",
+            "            self.api, 'connected_integration_id', id(self.api)",
+            "        )",
+            "        lazy = bool(getattr(self.api, 'lazy_results', False))",
+            "        return await regos_read_singleflight.do(",
+            "            (api_key, path, response_model, lazy, payload),",
+            "            lambda: self.api.call(path, payload, response_model),",
+            "        )",
             "",
             "    def _request_model(self, method_name: str):",
             "        model = self.REQUEST_MODELS.get(method_name)",
@@ -991,72 +1016,172 @@ def render_service_base() -> str:
             "        return result[0] if result else None",
             "",
             "",
-            "__all__ = ['RegosAPIService']",
+            "__all__ = ['JsonPayload', 'RegosAPIService']",
             "",
         ]
     )
 
 
+SERVICE_REGISTRY_RUNTIME = '''
+class ServiceNamespace:
+    """Группа сервисов API (`api.docs`, `api.by_tag`, ...)."""
+
+    def __init__(self, api):
+        self._api = api
+
+
+class LazyNamespace:
+    """Дескриптор пространства имён: объект создаётся при первом обращении."""
+
+    def __init__(self, namespace_cls: type[ServiceNamespace]):
+        self.namespace_cls = namespace_cls
+        self.name: str | None = None
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        namespace = self.namespace_cls(instance)
+        instance.__dict__[self.name] = namespace
+        return namespace
+
+
+class LazyService:
+    """Дескриптор сервиса.
+
+    Класс сервиса импортируется один раз на процесс, экземпляр создаётся при первом
+    обращении и кешируется в `__dict__` владельца, поэтому дальнейший доступ — обычный
+    атрибут. Один и тот же сервис, доступный по нескольким путям
+    (`api.references.item`, `api.by_tag.item`, `api.item`), разделяет один экземпляр.
+    """
+
+    def __init__(self, module: str, class_name: str):
+        self.module = module
+        self.class_name = class_name
+        self.name: str | None = None
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        api = instance._api if isinstance(instance, ServiceNamespace) else instance
+        services = api.__dict__.setdefault('_services', {})
+        key = (self.module, self.class_name)
+        service = services.get(key)
+        if service is None:
+            service = _service_class(self.module, self.class_name)(api)
+            services[key] = service
+        instance.__dict__[self.name] = service
+        return service
+
+
+_SERVICE_CLASSES: dict[tuple[str, str], type] = {}
+
+
+def _service_class(module: str, class_name: str) -> type:
+    key = (module, class_name)
+    service_cls = _SERVICE_CLASSES.get(key)
+    if service_cls is None:
+        service_cls = getattr(import_module(module), class_name)
+        _SERVICE_CLASSES[key] = service_cls
+    return service_cls
+
+
+def _install(owner: type, name: str, descriptor) -> None:
+    setattr(owner, name, descriptor)
+    descriptor.__set_name__(owner, name)
+
+
+def _namespace_class(api_cls: type, name: str) -> type[ServiceNamespace]:
+    holder = api_cls.__dict__.get(name)
+    if isinstance(holder, LazyNamespace):
+        return holder.namespace_cls
+    class_name = ''.join(part.title() for part in name.split('_')) + 'Namespace'
+    namespace_cls = type(class_name, (ServiceNamespace,), {'__module__': __name__})
+    _install(api_cls, name, LazyNamespace(namespace_cls))
+    return namespace_cls
+
+
+def install_generated_services(api_cls: type) -> None:
+    """Вешает дескрипторы сгенерированных сервисов на класс API.
+
+    Выполняется один раз на класс; сгенерированные сервисы перекрывают одноимённые
+    рукописные в пространствах имён, как и раньше.
+    """
+    if api_cls.__dict__.get('_generated_services_installed'):
+        return
+    namespaces = {name: _namespace_class(api_cls, name) for name in GENERATED_NAMESPACES}
+    by_tag = _namespace_class(api_cls, 'by_tag')
+    for namespace, attr, flat_attr, module, class_name in GENERATED_SERVICES:
+        _install(namespaces[namespace], attr, LazyService(module, class_name))
+        _install(by_tag, attr, LazyService(module, class_name))
+        _install(api_cls, flat_attr, LazyService(module, class_name))
+    api_cls._generated_services_installed = True
+'''
+
+
 def render_service_registry(
     by_tag: dict[str, list[tuple[str, dict[str, Any]]]],
     sections: dict[str, str],
 ) -> str:
     tag_modules = {tag: tag_module(tag, sections) for tag in by_tag}
-    lines: list[str] = [
-        '"""Generated REGOS API service registry."""',
-        f"# {GENERATED_MARKER}",
-        "",
-        "from __future__ import annotations",
-        "",
-        "from types import SimpleNamespace",
-        "",
-    ]
-
-    for tag in sorted(by_tag):
-        module = tag_modules[tag]
-        import_path = module_import("core.api", module)
-        lines.append(f"from {import_path} import {tag}Service")
-    lines.append("")
-    lines.append("")
-    lines.append("def _ensure_namespace(api, name: str) -> SimpleNamespace:")
-    lines.append("    namespace = getattr(api, name, None)")
-    lines.append("    if namespace is None:")
-    lines.append("        namespace = SimpleNamespace()")
-    lines.append("        setattr(api, name, namespace)")
-    lines.append("    return namespace")
-    lines.append("")
-    lines.append("")
-    lines.append("def attach_generated_services(api) -> None:")
-    lines.append("    api.by_tag = getattr(api, 'by_tag', SimpleNamespace())")
-
     namespace_names = sorted(
         {
             module[0] if len(module) > 1 else "root"
             for module in tag_modules.values()
         }
     )
-    for namespace in namespace_names:
-        lines.append(f"    _ensure_namespace(api, {namespace!r})")
-    lines.append("")
-
+    entries: list[tuple[str, str, str, str, str]] = []
     used_flat_attrs = set(namespace_names) | {"by_tag"}
     for tag in sorted(by_tag):
         module = tag_modules[tag]
         namespace = module[0] if len(module) > 1 else "root"
         attr = snake_case(tag)
-        service_var = f"_{attr}_service"
-        service_name = f"{tag}Service"
         flat_attr = attr
         if flat_attr in used_flat_attrs:
             flat_attr = f"{attr}_service"
         used_flat_attrs.add(flat_attr)
-        lines.append(f"    {service_var} = {service_name}(api)")
-        lines.append(f"    setattr(api.{namespace}, {attr!r}, {service_var})")
-        lines.append(f"    setattr(api.by_tag, {attr!r}, {service_var})")
-        lines.append(f"    setattr(api, {flat_attr!r}, {service_var})")
+        entries.append(
+            (namespace, attr, flat_attr, module_import("core.api", module), f"{tag}Service")
+        )
+    return render_service_registry_entries(namespace_names, entries)
+
+
+def render_service_registry_entries(
+    namespace_names: list[str],
+    entries: list[tuple[str, str, str, str, str]],
+) -> str:
+    lines: list[str] = [
+        '"""Generated REGOS API service registry."""',
+        f"# {GENERATED_MARKER}",
+        "",
+        "from __future__ import annotations",
+        "",
+        "from importlib import import_module",
+        "",
+        "",
+        "GENERATED_NAMESPACES: tuple[str, ...] = (",
+    ]
+    for namespace in namespace_names:
+        lines.append(f"    {namespace!r},")
+    lines.append(")")
     lines.append("")
+    lines.append("# (namespace, attr, flat_attr, module, class_name)")
+    lines.append("GENERATED_SERVICES: tuple[tuple[str, str, str, str, str], ...] = (")
+    for entry in entries:
+        lines.append(f"    {entry!r},")
+    lines.append(")")
     lines.append("")
-    lines.append("__all__ = ['attach_generated_services']")
+    lines.append(SERVICE_REGISTRY_RUNTIME)
+    lines.append("")
+    lines.append(
+        "__all__ = ['LazyNamespace', 'LazyService', 'ServiceNamespace', "
+        "'install_generated_services']"
+    )
     lines.append("")
     return "\n".join(lines)
 